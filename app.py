@@ -10,13 +10,15 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
+import io
 import tempfile
 import os
 from datetime import datetime, date
 from typing import Dict, List, Optional
 
 # Import processing functions
-from components.aggregation.pipeline import run_pipeline, resolve_hebrew_encoding
+from components.aggregation.pipeline import run_pipeline, drop_moment_columns
+from components.aggregation.ingestion import resolve_hebrew_encoding
 
 # Import maps page
 from components.maps import render_maps_page
@@ -414,9 +416,15 @@ def main_processing_page():
         st.markdown("#### 📁 File Input")
         uploaded_file = st.file_uploader(
             "Upload CSV file containing Google Maps link monitoring data",
-            type=['csv'],
+            type=['csv', 'gz', 'zip', 'zst'],
             help="Select a CSV file with the required columns"
         )
+        input_path_pattern = st.text_input(
+            "Or read a folder / glob of CSV files on disk",
+            value="",
+            placeholder="e.g. data/exports or data/exports/*.csv",
+            help="Files are validated and read in parallel, one per worker; bad files are reported and skipped"
+        ).strip()
 
         # Automatic folder detection for control output files
         extracted_folder_info = None
@@ -497,6 +505,24 @@ def main_processing_page():
             step=10000,
             help="Number of rows to process at once. Larger values use more memory but may be faster."
         )
+        adaptive_chunk_size = st.checkbox(
+            "Adapt chunk size to memory",
+            value=True,
+            help="Start at this chunk size, then resize chunks from the measured memory per row and process RSS"
+        )
+        spill_to_disk = st.checkbox(
+            "Spill to disk near the memory limit",
+            value=False,
+            help="When process memory reaches 80% of the available memory, move processed chunks to Arrow files "
+                 "in the output folder and aggregate them link group by link group (pandas backend)"
+        )
+        execution_backend = st.selectbox(
+            "Execution backend",
+            options=['pandas', 'duckdb'],
+            index=0,
+            help="pandas reads the data into memory in chunks. duckdb runs the aggregation out of core and "
+                 "spills to disk for inputs larger than RAM (needs the duckdb package; UTF-8 CSV, .csv.gz, .csv.zst or Parquet)"
+        )
         
         # Minimum valid rows per hour
         min_valid_per_hour = st.number_input(
@@ -743,7 +769,14 @@ def main_processing_page():
                 recompute_std = st.checkbox(
                     "Recompute standard deviation from raw data",
                     value=False,
-                    help="If checked, compute stddur from pooled raw data. Otherwise use mean of hourly std values."
+                    help="If checked, compute stddur as the exact pooled std of all valid observations (from hourly moments). Otherwise use mean of hourly std values."
+                )
+                
+                reliability_percentiles = st.checkbox(
+                    "Travel-time reliability percentiles",
+                    value=False,
+                    help="Add p50/p85/p95 travel times and buffer/planning time indices to the hourly and weekly "
+                         "outputs, from mergeable per-hour quantile sketches (t-digest)"
                 )
             
             with col_opt2:
@@ -758,6 +791,30 @@ def main_processing_page():
                     value=False,
                     help="Save intermediate results as Parquet files for faster downstream processing"
                 )
+                
+                incremental_store = st.text_input(
+                    "Incremental hourly store (optional)",
+                    value="",
+                    placeholder="e.g. runs/hourly_store",
+                    help="Keep hourly partials per date in this folder; dates in the new file replace stored dates "
+                         "and outputs cover every stored date without reprocessing older raw files"
+                ).strip()
+                
+                rolling_window_days = st.number_input(
+                    "Rolling weekly profile window (days, 0 = off)",
+                    min_value=0,
+                    max_value=366,
+                    value=0,
+                    help="Also write weekly_hourly_profile_rolling.csv: one weekly profile per sliding window of this "
+                         "many days, updated from the hourly partials by adding and removing days"
+                )
+                rolling_stride_days = st.number_input(
+                    "Rolling window stride (days)",
+                    min_value=1,
+                    max_value=366,
+                    value=1,
+                    disabled=rolling_window_days == 0
+                )
         
         # Store all configuration in session state
         if 'full_config' not in st.session_state:
@@ -773,9 +830,13 @@ def main_processing_page():
         
         st.session_state.full_config.update({
             'uploaded_file': uploaded_file,
+            'input_path_pattern': input_path_pattern,
             'extracted_folder_info': extracted_folder_info,
             'output_dir': output_dir,
             'chunk_size': chunk_size,
+            'adaptive_chunk_size': adaptive_chunk_size,
+            'spill_to_disk': spill_to_disk,
+            'execution_backend': execution_backend,
             'min_valid_per_hour': min_valid_per_hour,
             'timezone': timezone,
             'timestamp_format': timestamp_format,
@@ -799,8 +860,12 @@ def main_processing_page():
             'link_blacklist': blacklist_links,
             'weekly_grouping': weekly_grouping,
             'recompute_std': recompute_std,
+            'reliability_percentiles': reliability_percentiles,
             'generate_quality_reports': generate_quality_reports,
-            'output_parquet': output_parquet
+            'output_parquet': output_parquet,
+            'incremental_store': incremental_store,
+            'rolling_window_days': int(rolling_window_days),
+            'rolling_stride_days': int(rolling_stride_days)
         })
         
         # Show configuration summary
@@ -830,16 +895,15 @@ def main_processing_page():
             try:
                 # Read sample to validate columns and detect date range
                 # First detect encoding, then read with proper encoding
-                from components.aggregation.pipeline import detect_file_encoding
+                from components.aggregation.ingestion import detect_file_encoding, open_csv_input
                 
-                # Save uploaded file temporarily to detect encoding
-                temp_file_path = save_uploaded_file(uploaded_file)
+                # Stream the upload from memory (compressed uploads are decompressed on the fly)
+                source = io.BytesIO(uploaded_file.getvalue())
                 try:
-                    detected_encoding = detect_file_encoding(temp_file_path)
-                    sample_df = pd.read_csv(temp_file_path, nrows=1000, encoding=detected_encoding)
+                    detected_encoding = detect_file_encoding(source)
+                    with open_csv_input(source) as stream:
+                        sample_df = pd.read_csv(stream, nrows=1000, encoding=detected_encoding)
                 finally:
-                    # Clean up temp file
-                    Path(temp_file_path).unlink(missing_ok=True)
                     # Reset file pointer for later use
                     uploaded_file.seek(0)
                 # Use the proper validation function from processing.py
@@ -980,7 +1044,7 @@ def main_processing_page():
         """, unsafe_allow_html=True)
         
         # Run Processing Button
-        can_run = (uploaded_file is not None and 
+        can_run = ((uploaded_file is not None or bool(input_path_pattern)) and 
                   len(selected_weekdays) > 0 and 
                   len(selected_hours) > 0 and
                   (not start_date or not end_date or start_date <= end_date))
@@ -1000,7 +1064,7 @@ def main_processing_page():
             if results.get('success', False):
                 st.success("🎉 Processing completed successfully!")
 
-                hourly_df = results.get('hourly_df', pd.DataFrame())
+                hourly_df = drop_moment_columns(results.get('hourly_df', pd.DataFrame()))
                 weekly_df = results.get('weekly_df', pd.DataFrame())
                 output_files = results.get('output_files', {})
 
@@ -1072,6 +1136,7 @@ def run_processing():
         # Show processing status with progress information
         progress_bar = st.progress(0)
         status_text = st.empty()
+        temp_file_path = None
         
         try:
             # Get configuration from session state
@@ -1083,18 +1148,27 @@ def run_processing():
             # Prepare parameters for processing pipeline
             params = prepare_processing_parameters(config)
             
-            status_text.text("💾 Saving uploaded file...")
-            progress_bar.progress(20)
-            
-            # Save uploaded file temporarily
-            temp_file_path = save_uploaded_file(config['uploaded_file'])
-            params['input_file_path'] = temp_file_path
-            
-            status_text.text("📊 Getting input data preview...")
-            progress_bar.progress(30)
-            
-            # Get a sample of parsed input for preview
-            parsed_input_sample = get_parsed_input_sample(config['uploaded_file'], params)
+            if config.get('input_path_pattern'):
+                # Folder or glob on disk: the pipeline expands and reads the files itself
+                params['input_file_path'] = config['input_path_pattern']
+                parsed_input_sample = pd.DataFrame()
+            else:
+                if params.get('execution_backend') == 'duckdb':
+                    status_text.text("💾 Saving uploaded file...")
+                    progress_bar.progress(20)
+                    
+                    # DuckDB scans the CSV from disk, so the upload is saved temporarily
+                    temp_file_path = save_uploaded_file(config['uploaded_file'])
+                    params['input_file_path'] = temp_file_path
+                else:
+                    # The upload is streamed from memory through the chunked CSV reader
+                    params['input_file_path'] = config['uploaded_file']
+                
+                status_text.text("📊 Getting input data preview...")
+                progress_bar.progress(30)
+                
+                # Get a sample of parsed input for preview
+                parsed_input_sample = get_parsed_input_sample(config['uploaded_file'], params)
             
             status_text.text("🚀 Running processing pipeline... This may take a few minutes for large files.")
             progress_bar.progress(40)
@@ -1117,11 +1191,12 @@ def run_processing():
             }
 
             # Clean up temporary file
-            Path(temp_file_path).unlink(missing_ok=True)
+            if temp_file_path:
+                Path(temp_file_path).unlink(missing_ok=True)
             
         except Exception as e:
             # Clean up temporary file on error
-            if 'temp_file_path' in locals():
+            if temp_file_path:
                 Path(temp_file_path).unlink(missing_ok=True)
             raise e
             
@@ -1187,12 +1262,21 @@ def prepare_processing_parameters(config: dict) -> dict:
     # Create subdirectory based on input file name
     uploaded_file = config['uploaded_file']
     base_output_dir = config['output_dir']
+    input_path_pattern = config.get('input_path_pattern')
 
-    if uploaded_file is not None:
+    if input_path_pattern:
+        # Name the subfolder after the folder (or the glob's parent folder)
+        pattern_path = Path(input_path_pattern)
+        folder_name = pattern_path.name if pattern_path.is_dir() else pattern_path.parent.name
+        subfolder = (folder_name or 'multi_file').replace(' ', '_').replace('.', '_')
+        output_dir = str(Path(base_output_dir) / subfolder)
+    elif uploaded_file is not None:
         # Get the filename without extension
         file_name = uploaded_file.name
-        if file_name.endswith('.csv.zip'):
-            base_name = file_name[:-8]  # Remove .csv.zip
+        if file_name.endswith(('.csv.zip', '.csv.zst')):
+            base_name = file_name[:-8]  # Remove .csv.zip / .csv.zst
+        elif file_name.endswith('.csv.gz'):
+            base_name = file_name[:-7]  # Remove .csv.gz
         elif file_name.endswith('.csv'):
             base_name = file_name[:-4]  # Remove .csv
         else:
@@ -1263,6 +1347,9 @@ def prepare_processing_parameters(config: dict) -> dict:
     params = {
         'output_dir': output_dir,
         'chunk_size': config['chunk_size'],
+        'adaptive_chunk_size': config.get('adaptive_chunk_size', True),
+        'spill_to_disk': config.get('spill_to_disk', False),
+        'execution_backend': config.get('execution_backend', 'pandas'),
         'min_valid_per_hour': config['min_valid_per_hour'],
         'timezone': config['timezone'],
         'timestamp_format': config['timestamp_format'],
@@ -1281,8 +1368,12 @@ def prepare_processing_parameters(config: dict) -> dict:
         'blacklist_links': config['link_blacklist'] if config['link_blacklist'] else None,
         'weekly_grouping': config['weekly_grouping'],
         'recompute_std_from_raw': config['recompute_std'],
+        'reliability_percentiles': config.get('reliability_percentiles', False),
         'generate_quality_reports': config['generate_quality_reports'],
-        'output_parquet': config['output_parquet']
+        'output_parquet': config['output_parquet'],
+        'incremental_store': config.get('incremental_store') or None,
+        'rolling_window_days': config.get('rolling_window_days') or None,
+        'rolling_stride_days': config.get('rolling_stride_days') or 1
     }
     
     # Handle custom holidays file if provided
@@ -1307,16 +1398,12 @@ def get_parsed_input_sample(uploaded_file, params: dict) -> pd.DataFrame:
         # Reset file pointer
         uploaded_file.seek(0)
         
-        # Read a small sample (first 100 rows) for preview
-        # Save uploaded file temporarily to detect encoding
-        temp_file_path = save_uploaded_file(uploaded_file)
-        try:
-            from components.aggregation.pipeline import detect_file_encoding
-            detected_encoding = detect_file_encoding(temp_file_path)
-            sample_df = pd.read_csv(temp_file_path, nrows=100, encoding=detected_encoding)
-        finally:
-            # Clean up temp file
-            Path(temp_file_path).unlink(missing_ok=True)
+        # Read a small sample (first 100 rows) for preview, streamed from memory
+        from components.aggregation.ingestion import detect_file_encoding, open_csv_input
+        source = io.BytesIO(uploaded_file.getvalue())
+        detected_encoding = detect_file_encoding(source)
+        with open_csv_input(source) as stream:
+            sample_df = pd.read_csv(stream, nrows=100, encoding=detected_encoding)
         
         # Apply basic column normalization like the processing pipeline does
         from components.aggregation.pipeline import normalize_column_names, validate_csv_columns
@@ -1371,7 +1458,7 @@ def display_processing_results():
         st.error(f"❌ Processing failed: {results['error_message']}")
         return
     
-    hourly_df = results['hourly_df']
+    hourly_df = drop_moment_columns(results['hourly_df'])
     weekly_df = results['weekly_df']
     output_files = results['output_files']
     
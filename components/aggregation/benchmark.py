@@ -0,0 +1,324 @@
+"""
+Stage-by-stage benchmark of the aggregation pipeline on synthetic exports
+
+For each size the harness writes a deterministic synthetic export (cached under
+the work directory), then runs the run_pipeline stages one at a time: read
+(chunked ingest), filter, hourly, weekly and write. Each stage records wall time,
+peak process RSS (sampled while the stage runs) and input rows per second.
+Results are compared with a JSON baseline; a stage that is slower, or uses more
+memory, than the baseline by more than the tolerance is a regression and the
+command exits with status 1. --ingestion also reports CSV read MB/s for each
+parser (pandas C and pyarrow) through the aggregation and control readers.
+
+Usage:
+    python -m components.aggregation.benchmark --sizes 1M 10M 50M --baseline benchmarks/aggregation.json
+    python -m components.aggregation.benchmark --sizes 1M --baseline benchmarks/aggregation.json --update-baseline
+    python -m components.aggregation.benchmark --sizes 10M --ingestion
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from components.aggregation.ingestion import detect_file_encoding, read_csv_frame
+from components.aggregation.pipeline import (
+    _current_rss_mb,
+    apply_filtering_and_selection,
+    create_hourly_aggregation,
+    create_weekly_profile,
+    read_input_files,
+    write_all_output_files
+)
+from components.aggregation.synthetic_data import SyntheticDataConfig, generate_synthetic_csv, parse_row_count
+
+logger = logging.getLogger(__name__)
+
+BASELINE_VERSION = 1
+BENCHMARK_PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem'}
+# Stages shorter than this are too noisy for a relative time check
+MIN_TIMED_SECONDS = 0.5
+
+
+class PeakRssSampler:
+    """Context manager that samples process RSS on a background thread and keeps the peak"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> None:
+        rss_mb = _current_rss_mb()
+        if rss_mb is not None:
+            self.peak_mb = max(self.peak_mb or 0.0, rss_mb)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> 'PeakRssSampler':
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def _measure(stage: Callable[[], object], rows: int) -> Tuple[object, dict]:
+    """Run one stage and return its result with seconds, peak RSS and rows per second"""
+    with PeakRssSampler() as sampler:
+        start = time.perf_counter()
+        result = stage()
+        seconds = time.perf_counter() - start
+    return result, {
+        'seconds': round(seconds, 3),
+        'peak_rss_mb': round(sampler.peak_mb, 1) if sampler.peak_mb is not None else None,
+        'rows': rows,
+        'rows_per_second': round(rows / seconds) if seconds > 0 else None
+    }
+
+
+def benchmark_stages(input_path: Union[str, Path], output_dir: Union[str, Path], params: Optional[dict] = None) -> dict:
+    """
+    Run the pipeline stages of run_pipeline one at a time on one input
+
+    Args:
+        input_path: Input CSV (or anything read_input_files accepts)
+        output_dir: Folder for the stage outputs
+        params: Pipeline parameters (BENCHMARK_PARAMS by default)
+
+    Returns:
+        Dictionary of stage name to measurements, plus 'total'
+    """
+    params = dict(BENCHMARK_PARAMS if params is None else params, input_file_path=str(input_path),
+                  output_dir=str(output_dir))
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    processing_start_time = datetime.now()
+    stages = {}
+
+    (raw_df, validation_stats), stages['read'] = _measure(lambda: read_input_files(str(input_path), params), 0)
+    stages['read']['rows'] = validation_stats.get('read_pruning', {}).get('rows_read', len(raw_df))
+    stages['read']['rows_per_second'] = (round(stages['read']['rows'] / stages['read']['seconds'])
+                                         if stages['read']['seconds'] > 0 else None)
+    df_filtered, stages['filter'] = _measure(lambda: apply_filtering_and_selection(raw_df, params), len(raw_df))
+    hourly_df, stages['hourly'] = _measure(lambda: create_hourly_aggregation(df_filtered, params), len(df_filtered))
+    weekly_df, stages['weekly'] = _measure(lambda: create_weekly_profile(hourly_df, params), len(hourly_df))
+    _, stages['write'] = _measure(
+        lambda: write_all_output_files(raw_df, hourly_df, weekly_df, validation_stats, params,
+                                       processing_start_time, str(output_dir)),
+        len(hourly_df)
+    )
+
+    total_seconds = sum(stage['seconds'] for stage in stages.values())
+    peaks = [stage['peak_rss_mb'] for stage in stages.values() if stage['peak_rss_mb'] is not None]
+    stages['total'] = {
+        'seconds': round(total_seconds, 3),
+        'peak_rss_mb': max(peaks) if peaks else None,
+        'rows': stages['read']['rows'],
+        'rows_per_second': round(stages['read']['rows'] / total_seconds) if total_seconds > 0 else None
+    }
+    return stages
+
+
+def run_benchmarks(sizes: List[int], work_dir: Union[str, Path], params: Optional[dict] = None, **config_overrides) -> dict:
+    """
+    Generate (or reuse) one synthetic export per size and benchmark it
+
+    Args:
+        sizes: Target row counts
+        work_dir: Folder for the synthetic inputs and stage outputs
+        params: Pipeline parameters (BENCHMARK_PARAMS by default)
+        **config_overrides: SyntheticDataConfig fields
+
+    Returns:
+        Results document (same layout as the baseline file)
+    """
+    work_dir = Path(work_dir)
+    results = {
+        'version': BASELINE_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+        'sizes': {}
+    }
+    for size in sizes:
+        config = SyntheticDataConfig.for_rows(size, **config_overrides)
+        input_path = work_dir / f"synthetic_{size}_links{config.n_links}_seed{config.seed}.csv"
+        if not input_path.exists():
+            logger.info(f"Generating synthetic input with about {size:,} rows: {input_path}")
+            generate_synthetic_csv(input_path, config)
+        logger.info(f"Benchmarking {input_path}")
+        results['sizes'][str(size)] = {
+            'input': input_path.name,
+            'input_mb': round(input_path.stat().st_size / (1024 * 1024), 1),
+            'stages': benchmark_stages(input_path, work_dir / f"output_{size}", params)
+        }
+    return results
+
+
+def benchmark_ingestion(input_path: Union[str, Path], params: Optional[dict] = None,
+                        engines: Tuple[str, ...] = ('c', 'pyarrow')) -> dict:
+    """
+    CSV read throughput of each parser through the aggregation and control readers
+
+    Args:
+        input_path: Input CSV
+        params: Pipeline parameters (BENCHMARK_PARAMS by default)
+        engines: csv_engine values to compare
+        
+    Returns:
+        Dictionary of engine to {'aggregation': measurements, 'control': measurements},
+        each with seconds, peak RSS, rows, rows per second and mb_per_second
+    """
+    params = dict(BENCHMARK_PARAMS if params is None else params, input_file_path=str(input_path))
+    input_mb = Path(input_path).stat().st_size / (1024 * 1024)
+    encoding = detect_file_encoding(str(input_path))
+    results = {}
+    for engine in engines:
+        engine_params = dict(params, csv_engine=engine)
+        (raw_df, _), aggregation = _measure(lambda: read_input_files(str(input_path), engine_params), 0)
+        (control_df, _, _), control = _measure(lambda: read_csv_frame(str(input_path), encoding, engine=engine,
+                                                                   dtypes={'Polyline': 'category', 'Url': 'category'}), 0)
+        for measurements, rows in ((aggregation, len(raw_df)), (control, len(control_df))):
+            measurements['rows'] = rows
+            measurements['rows_per_second'] = round(rows / measurements['seconds']) if measurements['seconds'] > 0 else None
+            measurements['mb_per_second'] = round(input_mb / measurements['seconds'], 1) if measurements['seconds'] > 0 else None
+        results[engine] = {'aggregation': aggregation, 'control': control}
+        del raw_df, control_df
+    return results
+
+
+def format_ingestion(results: dict) -> str:
+    """Plain-text table of the parser comparison"""
+    lines = [f"{'rows':>12} {'engine':<8} {'reader':<12} {'seconds':>9} {'MB/s':>8} {'peak MB':>9}"]
+    for size, by_engine in results.items():
+        for engine, readers in by_engine.items():
+            for reader, values in readers.items():
+                peak = f"{values['peak_rss_mb']:,.1f}" if values['peak_rss_mb'] is not None else 'n/a'
+                rate = f"{values['mb_per_second']:,.1f}" if values['mb_per_second'] else 'n/a'
+                lines.append(f"{int(size):>12,} {engine:<8} {reader:<12} {values['seconds']:>9.2f} {rate:>8} {peak:>9}")
+    return '\n'.join(lines)
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float = 0.2,
+                        memory_tolerance: float = 0.1) -> List[str]:
+    """
+    List tracked metrics that regressed beyond the tolerance
+
+    Seconds and rows per second use tolerance (times shorter than
+    MIN_TIMED_SECONDS in both runs are skipped); peak RSS uses memory_tolerance.
+    Sizes or stages missing from either side are not compared.
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Baseline document in the same layout
+        tolerance: Allowed relative slowdown
+        memory_tolerance: Allowed relative growth of peak RSS
+
+    Returns:
+        Human-readable regression messages (empty when nothing regressed)
+    """
+    regressions = []
+    for size, measured in results.get('sizes', {}).items():
+        reference = baseline.get('sizes', {}).get(size)
+        if reference is None:
+            continue
+        for stage, current in measured['stages'].items():
+            expected = reference['stages'].get(stage)
+            if expected is None:
+                continue
+            label = f"{int(size):,} rows / {stage}"
+            if max(current['seconds'], expected['seconds']) >= MIN_TIMED_SECONDS:
+                if current['seconds'] > expected['seconds'] * (1 + tolerance):
+                    regressions.append(f"{label}: {current['seconds']:.2f} s vs baseline {expected['seconds']:.2f} s")
+                elif (current.get('rows_per_second') and expected.get('rows_per_second')
+                        and current['rows_per_second'] < expected['rows_per_second'] * (1 - tolerance)):
+                    regressions.append(f"{label}: {current['rows_per_second']:,} rows/s vs baseline "
+                                       f"{expected['rows_per_second']:,} rows/s")
+            if (current.get('peak_rss_mb') is not None and expected.get('peak_rss_mb') is not None
+                    and current['peak_rss_mb'] > expected['peak_rss_mb'] * (1 + memory_tolerance)):
+                regressions.append(f"{label}: peak RSS {current['peak_rss_mb']:,.1f} MB vs baseline "
+                                   f"{expected['peak_rss_mb']:,.1f} MB")
+    return regressions
+
+
+def format_results(results: dict) -> str:
+    """Plain-text table of the stage measurements"""
+    lines = [f"{'rows':>12} {'stage':<8} {'seconds':>9} {'peak MB':>9} {'rows/s':>12}"]
+    for size, measured in results['sizes'].items():
+        for stage, values in measured['stages'].items():
+            peak = f"{values['peak_rss_mb']:,.1f}" if values['peak_rss_mb'] is not None else 'n/a'
+            rate = f"{values['rows_per_second']:,}" if values['rows_per_second'] else 'n/a'
+            lines.append(f"{int(size):>12,} {stage:<8} {values['seconds']:>9.2f} {peak:>9} {rate:>12}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the aggregation pipeline on synthetic exports")
+    parser.add_argument('--sizes', nargs='+', type=parse_row_count, default=[1_000_000, 10_000_000, 50_000_000],
+                        help="Row counts to benchmark (e.g. 1M 10M 50M)")
+    parser.add_argument('--work-dir', default='benchmark_work', help="Folder for synthetic inputs and outputs")
+    parser.add_argument('--baseline', help="Baseline JSON to compare with (and to write with --update-baseline)")
+    parser.add_argument('--update-baseline', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--results', help="Also write the results JSON here")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown (default 0.2)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.1,
+                        help="Allowed relative growth of peak RSS (default 0.1)")
+    parser.add_argument('--seed', type=int, default=SyntheticDataConfig.seed)
+    parser.add_argument('--ingestion', action='store_true',
+                        help="Also compare CSV read MB/s of the pandas C and pyarrow parsers")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s %(levelname)s %(message)s')
+    logger.setLevel(logging.INFO)
+    results = run_benchmarks(args.sizes, args.work_dir, seed=args.seed)
+    print(format_results(results))
+
+    if args.ingestion:
+        ingestion = {
+            size: benchmark_ingestion(Path(args.work_dir) / measured['input'])
+            for size, measured in results['sizes'].items()
+        }
+        results['ingestion'] = ingestion
+        print(format_ingestion(ingestion))
+
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    baseline_path = Path(args.baseline)
+    if args.update_baseline or not baseline_path.exists():
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {baseline_path}")
+        return 0
+
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance, args.memory_tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {baseline_path}:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print(f"No regressions against {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
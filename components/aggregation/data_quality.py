@@ -8,13 +8,65 @@ and join audit with counts for missing/duplicate/invalid data.
 
 import pandas as pd
 import geopandas as gpd
+from collections import OrderedDict
+import copy
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from typing import Dict, List, Tuple, Optional, Any, Union
+import hashlib
+import json
 import logging
+import time
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Profiles of the most recent inputs, so dashboard reruns on unchanged data skip the checks
+PROFILE_CACHE_SIZE = 8
+_PROFILE_CACHE: 'OrderedDict[Tuple[str, str], QualityProfile]' = OrderedDict()
+
+
+def data_fingerprint(gdf: gpd.GeoDataFrame, results_df: pd.DataFrame) -> str:
+    """
+    Content hash of a shapefile and results pair
+    
+    Args:
+        gdf: Shapefile GeoDataFrame
+        results_df: Results DataFrame
+        
+    Returns:
+        Hex digest that changes whenever any value, column or index changes
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    attributes = pd.DataFrame(gdf.drop(columns=gdf.geometry.name)) if gdf.columns.size else pd.DataFrame(index=gdf.index)
+    for frame in (results_df, attributes):
+        hasher.update(repr((list(frame.columns), frame.shape)).encode())
+        if frame.size:
+            hasher.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    if len(gdf):
+        hasher.update(pd.util.hash_pandas_object(gdf.geometry.to_wkb(), index=False).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+
+@dataclass
+class QualityProfile:
+    """
+    Result of one profiling pass over a shapefile and results pair
+    
+    Holds every section of the quality report; report() assembles the dictionary
+    returned by perform_comprehensive_quality_check. Cached profiles are shared
+    between reruns, so report() hands out a copy stamped with the time it was
+    requested; created is when the data was profiled.
+    """
+    fingerprint: str
+    created: str
+    sections: Dict[str, Any] = field(default_factory=dict)
+    seconds: float = 0.0
+    
+    def report(self) -> Dict[str, Any]:
+        """Quality report dictionary (same layout as before profiling was cached)"""
+        return {'timestamp': datetime.now().isoformat(), **copy.deepcopy(self.sections)}
+
 
 class DataQualityChecker:
     """
@@ -72,30 +124,112 @@ class DataQualityChecker:
         Returns:
             Dictionary with comprehensive quality check results
         """
+        return self.get_quality_profile(gdf, results_df).report()
+    
+    def get_quality_profile(self, gdf: gpd.GeoDataFrame,
+                            results_df: pd.DataFrame) -> QualityProfile:
+        """
+        Profile both inputs in one pass, reusing the cached profile for unchanged data.
+        
+        Every results column is scanned once (statistics, quantiles and threshold
+        counts come from the same array) and distinct link_ids are found once for
+        the summary and the join audit. Profiles are cached by data
+        fingerprint and configuration, so Streamlit reruns on the same data return
+        immediately.
+        
+        Args:
+            gdf: Shapefile GeoDataFrame
+            results_df: Results DataFrame
+            
+        Returns:
+            QualityProfile of the inputs
+        """
+        fingerprint = data_fingerprint(gdf, results_df)
+        cache_key = (fingerprint, json.dumps(self.config, sort_keys=True, default=str))
+        cached = _PROFILE_CACHE.get(cache_key)
+        if cached is not None:
+            _PROFILE_CACHE.move_to_end(cache_key)
+            logger.info(f"Quality profile reused from cache ({fingerprint[:12]})")
+            return cached
+        
+        start = time.perf_counter()
+        link_ids = self._unique_link_ids(results_df)
         quality_report = {
-            'timestamp': datetime.now().isoformat(),
-            'data_summary': self._get_data_summary(gdf, results_df),
-            'speed_validation': self._validate_speeds(results_df),
-            'duration_validation': self._validate_durations(results_df),
-            'observation_validation': self._validate_observations(results_df),
+            'data_summary': self._get_data_summary(gdf, results_df, link_ids),
+            'speed_validation': self._validate_speeds(results_df, self._profile_column(results_df, 'avg_speed_kmh')),
+            'duration_validation': self._validate_durations(results_df, self._profile_column(results_df, 'avg_duration_sec')),
+            'observation_validation': self._validate_observations(results_df, self._profile_column(results_df, 'n_valid')),
             'geometry_validation': self._validate_geometries(gdf),
-            'join_audit': self._perform_join_audit(gdf, results_df),
+            'join_audit': self._perform_join_audit(gdf, results_df, link_ids),
             'overall_quality': {}
         }
         
         # Calculate overall quality score
         quality_report['overall_quality'] = self._calculate_overall_quality(quality_report)
         
-        logger.info(f"Comprehensive quality check completed: {quality_report['overall_quality']}")
-        return quality_report
+        profile = QualityProfile(
+            fingerprint=fingerprint,
+            created=datetime.now().isoformat(),
+            sections=quality_report,
+            seconds=time.perf_counter() - start
+        )
+        _PROFILE_CACHE[cache_key] = profile
+        while len(_PROFILE_CACHE) > PROFILE_CACHE_SIZE:
+            _PROFILE_CACHE.popitem(last=False)
+        
+        logger.info(f"Comprehensive quality check completed in {profile.seconds:.2f}s: {quality_report['overall_quality']}")
+        return profile
+    
+    @staticmethod
+    def _unique_link_ids(results_df: pd.DataFrame) -> Optional[pd.Index]:
+        """Distinct link_id values (nulls included) as a hash index, or None without link_id"""
+        if 'link_id' not in results_df.columns:
+            return None
+        return pd.Index(results_df['link_id'].unique())
+    
+    @staticmethod
+    def _profile_column(results_df: pd.DataFrame, column: str) -> Optional[Dict[str, Any]]:
+        """
+        One scan of a numeric results column: non-null values, their positions and statistics.
+        
+        Args:
+            results_df: Results DataFrame
+            column: Column to profile
+            
+        Returns:
+            Dictionary with values, positions, null_count and statistics, or None if the column is missing
+        """
+        if column not in results_df.columns:
+            return None
+        raw = pd.to_numeric(results_df[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        positions = np.flatnonzero(~np.isnan(raw))
+        values = raw[positions]
+        profile = {'values': values, 'positions': positions, 'null_count': len(raw) - len(values), 'statistics': {}}
+        if len(values):
+            q25, median, q75 = np.percentile(values, [25, 50, 75])
+            profile['statistics'] = {
+                'count': len(values),
+                'null_count': profile['null_count'],
+                'mean': float(values.mean()),
+                'median': float(median),
+                'std': float(values.std(ddof=1)) if len(values) > 1 else float('nan'),
+                'min': float(values.min()),
+                'max': float(values.max()),
+                'q25': float(q25),
+                'q75': float(q75)
+            }
+        return profile
     
     def _get_data_summary(self, gdf: gpd.GeoDataFrame, 
-                         results_df: pd.DataFrame) -> Dict[str, Any]:
+                         results_df: pd.DataFrame,
+                         link_ids: Optional[pd.Index] = None) -> Dict[str, Any]:
         """Get basic data summary statistics."""
+        if link_ids is None:
+            link_ids = self._unique_link_ids(results_df)
         return {
             'shapefile_features': len(gdf),
             'results_records': len(results_df),
-            'unique_link_ids': results_df['link_id'].nunique() if 'link_id' in results_df.columns else 0,
+            'unique_link_ids': int(link_ids.notna().sum()) if link_ids is not None else 0,
             'date_range': {
                 'start': results_df['date'].min() if 'date' in results_df.columns else None,
                 'end': results_df['date'].max() if 'date' in results_df.columns else None,
@@ -108,12 +242,14 @@ class DataQualityChecker:
             }
         }
     
-    def _validate_speeds(self, results_df: pd.DataFrame) -> Dict[str, Any]:
+    def _validate_speeds(self, results_df: pd.DataFrame,
+                         column_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Validate speed data for non-positive and extreme values.
         
         Args:
             results_df: Results DataFrame with speed data
+            column_profile: _profile_column result for avg_speed_kmh (computed when not given)
             
         Returns:
             Dictionary with speed validation results
@@ -130,25 +266,17 @@ class DataQualityChecker:
             validation_result['issues'].append("No speed data column found (avg_speed_kmh)")
             return validation_result
         
-        speed_col = results_df['avg_speed_kmh']
-        speed_values = speed_col.dropna()
+        if column_profile is None:
+            column_profile = self._profile_column(results_df, 'avg_speed_kmh')
+        speed_values = column_profile['values']
+        row_index = results_df.index[column_profile['positions']]
         
-        if speed_values.empty:
+        if len(speed_values) == 0:
             validation_result['issues'].append("All speed values are null/missing")
             return validation_result
         
         # Basic statistics
-        validation_result['statistics'] = {
-            'count': len(speed_values),
-            'null_count': speed_col.isnull().sum(),
-            'mean': float(speed_values.mean()),
-            'median': float(speed_values.median()),
-            'std': float(speed_values.std()),
-            'min': float(speed_values.min()),
-            'max': float(speed_values.max()),
-            'q25': float(speed_values.quantile(0.25)),
-            'q75': float(speed_values.quantile(0.75))
-        }
+        validation_result['statistics'] = column_profile['statistics']
         
         # Validation checks
         thresholds = self.config['speed_thresholds']
@@ -158,9 +286,7 @@ class DataQualityChecker:
         if non_positive.any():
             count = non_positive.sum()
             validation_result['issues'].append(f"Found {count} non-positive speed values")
-            validation_result['flagged_records'].extend(
-                results_df[results_df['avg_speed_kmh'] <= 0].index.tolist()
-            )
+            validation_result['flagged_records'].extend(row_index[non_positive].tolist())
         
         # Extreme low speeds
         extreme_low = (speed_values > 0) & (speed_values < thresholds['extreme_low_speed'])
@@ -177,9 +303,7 @@ class DataQualityChecker:
             validation_result['issues'].append(
                 f"Found {count} extremely high speeds (> {thresholds['extreme_high_speed']} km/h)"
             )
-            validation_result['flagged_records'].extend(
-                results_df[results_df['avg_speed_kmh'] > thresholds['extreme_high_speed']].index.tolist()
-            )
+            validation_result['flagged_records'].extend(row_index[extreme_high].tolist())
         
         # Invalid range speeds
         invalid_range = (speed_values < thresholds['min_valid_speed']) | \
@@ -206,12 +330,14 @@ class DataQualityChecker:
         
         return validation_result
     
-    def _validate_durations(self, results_df: pd.DataFrame) -> Dict[str, Any]:
+    def _validate_durations(self, results_df: pd.DataFrame,
+                            column_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Validate duration data for non-positive and extreme values.
         
         Args:
             results_df: Results DataFrame with duration data
+            column_profile: _profile_column result for avg_duration_sec (computed when not given)
             
         Returns:
             Dictionary with duration validation results
@@ -228,26 +354,21 @@ class DataQualityChecker:
             validation_result['issues'].append("No duration data column found (avg_duration_sec)")
             return validation_result
         
-        duration_col = results_df['avg_duration_sec']
-        duration_values = duration_col.dropna()
+        if column_profile is None:
+            column_profile = self._profile_column(results_df, 'avg_duration_sec')
+        duration_values = column_profile['values']
+        row_index = results_df.index[column_profile['positions']]
         
-        if duration_values.empty:
+        if len(duration_values) == 0:
             validation_result['issues'].append("All duration values are null/missing")
             return validation_result
         
         # Basic statistics
+        statistics = column_profile['statistics']
         validation_result['statistics'] = {
-            'count': len(duration_values),
-            'null_count': duration_col.isnull().sum(),
-            'mean': float(duration_values.mean()),
-            'median': float(duration_values.median()),
-            'std': float(duration_values.std()),
-            'min': float(duration_values.min()),
-            'max': float(duration_values.max()),
-            'q25': float(duration_values.quantile(0.25)),
-            'q75': float(duration_values.quantile(0.75)),
-            'mean_minutes': float(duration_values.mean() / 60),
-            'median_minutes': float(duration_values.median() / 60)
+            **statistics,
+            'mean_minutes': statistics['mean'] / 60,
+            'median_minutes': statistics['median'] / 60
         }
         
         # Validation checks
@@ -258,9 +379,7 @@ class DataQualityChecker:
         if non_positive.any():
             count = non_positive.sum()
             validation_result['issues'].append(f"Found {count} non-positive duration values")
-            validation_result['flagged_records'].extend(
-                results_df[results_df['avg_duration_sec'] <= 0].index.tolist()
-            )
+            validation_result['flagged_records'].extend(row_index[non_positive].tolist())
         
         # Extreme short durations
         extreme_short = (duration_values > 0) & (duration_values < thresholds['extreme_short_duration'])
@@ -277,9 +396,7 @@ class DataQualityChecker:
             validation_result['issues'].append(
                 f"Found {count} extremely long durations (> {thresholds['extreme_long_duration']} sec)"
             )
-            validation_result['flagged_records'].extend(
-                results_df[results_df['avg_duration_sec'] > thresholds['extreme_long_duration']].index.tolist()
-            )
+            validation_result['flagged_records'].extend(row_index[extreme_long].tolist())
         
         # Invalid range durations
         invalid_range = (duration_values < thresholds['min_valid_duration']) | \
@@ -306,12 +423,14 @@ class DataQualityChecker:
         
         return validation_result
     
-    def _validate_observations(self, results_df: pd.DataFrame) -> Dict[str, Any]:
+    def _validate_observations(self, results_df: pd.DataFrame,
+                               column_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Validate observation counts and flag sparse observations.
         
         Args:
             results_df: Results DataFrame with observation counts
+            column_profile: _profile_column result for n_valid (computed when not given)
             
         Returns:
             Dictionary with observation validation results
@@ -329,25 +448,29 @@ class DataQualityChecker:
             validation_result['issues'].append("No observation count column found (n_valid)")
             return validation_result
         
-        obs_col = results_df['n_valid']
-        obs_values = obs_col.dropna()
+        if column_profile is None:
+            column_profile = self._profile_column(results_df, 'n_valid')
+        obs_values = column_profile['values']
+        link_ids = (results_df['link_id'].to_numpy()[column_profile['positions']]
+                    if 'link_id' in results_df.columns else None)
         
-        if obs_values.empty:
+        if len(obs_values) == 0:
             validation_result['issues'].append("All observation count values are null/missing")
             return validation_result
         
         # Basic statistics
+        statistics = column_profile['statistics']
         validation_result['statistics'] = {
-            'count': len(obs_values),
-            'null_count': obs_col.isnull().sum(),
+            'count': statistics['count'],
+            'null_count': statistics['null_count'],
             'total_observations': int(obs_values.sum()),
-            'mean': float(obs_values.mean()),
-            'median': float(obs_values.median()),
-            'std': float(obs_values.std()),
-            'min': int(obs_values.min()),
-            'max': int(obs_values.max()),
-            'q25': float(obs_values.quantile(0.25)),
-            'q75': float(obs_values.quantile(0.75))
+            'mean': statistics['mean'],
+            'median': statistics['median'],
+            'std': statistics['std'],
+            'min': int(statistics['min']),
+            'max': int(statistics['max']),
+            'q25': statistics['q25'],
+            'q75': statistics['q75']
         }
         
         # Validation checks
@@ -360,9 +483,7 @@ class DataQualityChecker:
             validation_result['issues'].append(
                 f"Found {count} links with critically low observations (< {thresholds['min_observations_critical']})"
             )
-            validation_result['critical_links'] = results_df[
-                results_df['n_valid'] < thresholds['min_observations_critical']
-            ]['link_id'].tolist() if 'link_id' in results_df.columns else []
+            validation_result['critical_links'] = link_ids[critical_mask].tolist() if link_ids is not None else []
         
         # Sparse links
         sparse_mask = (obs_values >= thresholds['min_observations_critical']) & \
@@ -373,10 +494,7 @@ class DataQualityChecker:
                 f"Found {count} links with sparse observations "
                 f"({thresholds['min_observations_critical']}-{thresholds['min_observations_sparse']})"
             )
-            validation_result['sparse_links'] = results_df[
-                (results_df['n_valid'] >= thresholds['min_observations_critical']) &
-                (results_df['n_valid'] < thresholds['min_observations_sparse'])
-            ]['link_id'].tolist() if 'link_id' in results_df.columns else []
+            validation_result['sparse_links'] = link_ids[sparse_mask].tolist() if link_ids is not None else []
         
         # Unreliable links (below reliable threshold)
         unreliable_mask = obs_values < thresholds['min_observations_reliable']
@@ -494,13 +612,19 @@ class DataQualityChecker:
         return validation_result
     
     def _perform_join_audit(self, gdf: gpd.GeoDataFrame, 
-                           results_df: pd.DataFrame) -> Dict[str, Any]:
+                           results_df: pd.DataFrame,
+                           link_ids: Optional[pd.Index] = None) -> Dict[str, Any]:
         """
         Perform comprehensive join audit with counts for missing/duplicate/invalid data.
         
+        Shapefile keys are built once per distinct (From, To) pair and matched to
+        the distinct result link_ids by hash lookup, instead of concatenating key
+        strings for every row.
+        
         Args:
             gdf: Shapefile GeoDataFrame
             results_df: Results DataFrame
+            link_ids: _unique_link_ids result (computed when not given)
             
         Returns:
             Dictionary with join audit results
@@ -515,14 +639,18 @@ class DataQualityChecker:
         }
         
         # Shapefile summary
+        shapefile_keys = None
         if not gdf.empty and all(col in gdf.columns for col in ['From', 'To']):
-            shapefile_keys = 's_' + gdf['From'].astype(str) + '-' + gdf['To'].astype(str)
+            pairs = pd.MultiIndex.from_arrays([gdf['From'], gdf['To']]).unique()
+            shapefile_keys = pd.Index(
+                's_' + pairs.get_level_values(0).astype(str) + '-' + pairs.get_level_values(1).astype(str)
+            ).unique()
             audit_result['shapefile_summary'] = {
                 'total_features': len(gdf),
                 'unique_from_nodes': gdf['From'].nunique(),
                 'unique_to_nodes': gdf['To'].nunique(),
-                'unique_link_keys': shapefile_keys.nunique(),
-                'duplicate_keys_in_shapefile': len(shapefile_keys) - shapefile_keys.nunique()
+                'unique_link_keys': len(shapefile_keys),
+                'duplicate_keys_in_shapefile': len(gdf) - len(shapefile_keys)
             }
         else:
             audit_result['shapefile_summary'] = {
@@ -531,12 +659,15 @@ class DataQualityChecker:
             }
         
         # Results summary
-        if not results_df.empty and 'link_id' in results_df.columns:
+        if link_ids is None:
+            link_ids = self._unique_link_ids(results_df)
+        if not results_df.empty and link_ids is not None:
+            results_keys = link_ids
             audit_result['results_summary'] = {
                 'total_records': len(results_df),
-                'unique_link_ids': results_df['link_id'].nunique(),
-                'duplicate_records': len(results_df) - len(results_df.drop_duplicates()),
-                'null_link_ids': results_df['link_id'].isnull().sum()
+                'unique_link_ids': int(results_keys.notna().sum()),
+                'duplicate_records': int(results_df.duplicated().sum()),
+                'null_link_ids': int(results_df['link_id'].isnull().sum())
             }
         else:
             audit_result['results_summary'] = {
@@ -548,22 +679,23 @@ class DataQualityChecker:
         if ('error' not in audit_result['shapefile_summary'] and 
             'error' not in audit_result['results_summary']):
             
-            shapefile_keys = set('s_' + gdf['From'].astype(str) + '-' + gdf['To'].astype(str))
-            results_keys = set(results_df['link_id'].unique())
+            in_shapefile = shapefile_keys.isin(results_keys)
+            in_results = results_keys.isin(shapefile_keys)
+            matches = int(in_results.sum())
             
             audit_result['join_analysis'] = {
                 'shapefile_keys_count': len(shapefile_keys),
                 'results_keys_count': len(results_keys),
-                'successful_matches': len(shapefile_keys & results_keys),
-                'missing_in_shapefile': len(results_keys - shapefile_keys),
-                'missing_in_results': len(shapefile_keys - results_keys),
-                'join_success_rate': (len(shapefile_keys & results_keys) / len(shapefile_keys)) * 100 if shapefile_keys else 0
+                'successful_matches': matches,
+                'missing_in_shapefile': len(results_keys) - matches,
+                'missing_in_results': int((~in_shapefile).sum()),
+                'join_success_rate': (matches / len(shapefile_keys)) * 100 if len(shapefile_keys) else 0
             }
             
             # Missing data details
             audit_result['missing_data'] = {
-                'results_links_not_in_shapefile': list(results_keys - shapefile_keys),
-                'shapefile_links_not_in_results': list(shapefile_keys - results_keys)
+                'results_links_not_in_shapefile': results_keys[~in_results].tolist(),
+                'shapefile_links_not_in_results': shapefile_keys[~in_shapefile].tolist()
             }
         
         # Duplicate analysis
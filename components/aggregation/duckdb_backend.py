@@ -0,0 +1,464 @@
+"""
+DuckDB execution backend for the aggregation pipeline
+
+Runs the row-level part of the pipeline (typed scan, validity rules, deduplication,
+filtering and the calendar join) as embedded DuckDB SQL over CSV or Parquet input,
+so inputs larger than RAM spill to a local temp directory instead of running out of
+memory. Everything that depends only on distinct values (timestamp parsing and
+localization, Hebrew day names, DayType mapping, holidays, filters) is evaluated
+once per distinct (timestamp, day_in_week, day_type) by the same functions the
+pandas pipeline uses and joined back as a calendar table, and the hourly reduction
+runs on group-ordered batches, so hourly_agg.csv and weekly_hourly_profile.csv are
+byte-identical to the pandas backend.
+"""
+
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from components.aggregation.ingestion import (
+    CSV_NA_VALUES,
+    detect_compression,
+    detect_csv_format,
+    normalize_column_names
+)
+from components.aggregation.pipeline import (
+    AGGREGATION_UNUSED_COLUMNS,
+    apply_date_range_filter,
+    apply_hour_filter,
+    apply_preset_filters,
+    apply_temporal_enhancements,
+    apply_weekday_filter,
+    build_chunk_predicate,
+    create_hourly_aggregation,
+    parse_timestamps_vectorized,
+    resolve_input_files,
+    validate_csv_columns,
+    _parse_link_list
+)
+
+logger = logging.getLogger(__name__)
+
+# Normalized input columns the backend reads; everything else is projected away at scan time
+DUCKDB_INPUT_COLUMNS = (
+    'data_id', 'name', 'timestamp', 'day_in_week', 'day_type',
+    'duration', 'static_duration', 'distance', 'speed', 'valid', 'is_valid', 'valid_code'
+)
+DUCKDB_FLOAT_COLUMNS = ('duration', 'static_duration', 'distance', 'speed')
+DUCKDB_CALENDAR_KEYS = ('timestamp', 'day_in_week', 'day_type')
+HOURLY_GROUP_COLUMNS = ['name', 'date', 'hour_of_day', 'daytype']
+DUCKDB_BATCH_ROWS = 500000
+
+
+def _quote(identifier: str) -> str:
+    """Quote a SQL identifier"""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _sql_literal(value) -> str:
+    """Render a Python scalar as a SQL literal"""
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, float) and np.isinf(value):
+        return "'inf'::DOUBLE" if value > 0 else "'-inf'::DOUBLE"
+    return repr(value)
+
+
+def _bool_sql(column: str) -> str:
+    """SQL truth value of a text validity column: non-zero numbers or TRUE/1/YES, missing is False"""
+    text = f"trim({_quote(column)})"
+    return (
+        f"COALESCE(CASE WHEN TRY_CAST({text} AS DOUBLE) IS NOT NULL THEN TRY_CAST({text} AS DOUBLE) <> 0 "
+        f"ELSE upper({text}) IN ('TRUE', 'YES') END, FALSE)"
+    )
+
+
+def _scan_sql(files: List[str], params: dict) -> Tuple[str, List[str]]:
+    """
+    Build the projected scan over the input files and return it with the normalized columns read
+
+    Args:
+        files: Input CSV or Parquet files (one format and compression for all)
+        params: Processing parameters (delimiter, decimal, encoding overrides)
+
+    Returns:
+        Tuple of (SELECT statement producing typed, normalized columns, list of those columns)
+    """
+    file_list = '[' + ', '.join(_sql_literal(str(path)) for path in files) + ']'
+    is_parquet = all(Path(path).suffix.lower() == '.parquet' for path in files)
+
+    if is_parquet:
+        import pyarrow.parquet as pq
+        header = pq.read_schema(files[0]).names
+        source = f"read_parquet({file_list}, filename = true)"
+        decimal = '.'
+    else:
+        compressions = {detect_compression(path) for path in files}
+        if len(compressions) > 1:
+            raise ValueError(f"DuckDB backend needs one compression for all input files, got {sorted(map(str, compressions))}")
+        compression = compressions.pop()
+        if compression == 'zip':
+            raise ValueError("DuckDB backend cannot read zip archives; use .csv.gz/.csv.zst or the pandas backend")
+
+        csv_format = detect_csv_format(files[0])
+        delimiter = params.get('delimiter', csv_format['delimiter'])
+        decimal = params.get('decimal', csv_format['decimal'])
+        encoding = params.get('encoding', csv_format['encoding'])
+        if encoding.lower().replace('_', '-') not in ('utf-8', 'utf-8-sig', 'ascii'):
+            raise ValueError(f"DuckDB backend reads UTF-8 input only (detected {encoding}); use the pandas backend")
+
+        header = list(pd.read_csv(files[0], sep=delimiter, encoding=encoding, nrows=0,
+                                  compression={'gzip': 'gzip', 'zstd': 'zstd'}.get(compression)).columns)
+        na_list = '[' + ', '.join(_sql_literal(value) for value in CSV_NA_VALUES) + ']'
+        source = (
+            f"read_csv({file_list}, header = true, all_varchar = true, delim = {_sql_literal(delimiter)}, "
+            f"quote = '\"', escape = '\"', nullstr = {na_list}, filename = true, "
+            f"compression = {_sql_literal(compression or 'none')})"
+        )
+
+    is_valid_header, missing_columns = validate_csv_columns(pd.DataFrame(columns=header))
+    if not is_valid_header:
+        raise ValueError(f"Missing required columns: {missing_columns}")
+
+    normalized = normalize_column_names(pd.DataFrame(columns=header)).columns
+    selected = []
+    columns = []
+    for original, name in zip(header, normalized):
+        if name not in DUCKDB_INPUT_COLUMNS or name in columns or original in AGGREGATION_UNUSED_COLUMNS:
+            continue
+        value = f"CAST({_quote(original)} AS VARCHAR)"
+        if name in DUCKDB_FLOAT_COLUMNS:
+            if decimal != '.':
+                value = f"replace({value}, {_sql_literal(decimal)}, '.')"
+            # Declared float32 like CSV_SCHEMA_DTYPES, so metrics round exactly as in pandas
+            value = f"CAST(TRY_CAST({value} AS DOUBLE) AS FLOAT)"
+        selected.append(f"{value} AS {_quote(name)}")
+        columns.append(name)
+
+    return f"SELECT filename AS _file, {', '.join(selected)} FROM {source}", columns
+
+
+def _validity_sql(columns: List[str], params: dict) -> Tuple[str, str]:
+    """
+    SQL expression for is_valid following determine_data_validity, with the method name
+
+    Args:
+        columns: Normalized columns present in the scan
+        params: Validation parameters (valid_codes_ok, *_range_*)
+
+    Returns:
+        Tuple of (boolean SQL expression, method name as reported by determine_data_validity)
+    """
+    if 'valid' in columns:
+        return _bool_sql('valid'), 'boolean_valid_column'
+    if 'is_valid' in columns:
+        return _bool_sql('is_valid'), 'boolean_is_valid_column'
+    if 'valid_code' in columns:
+        codes = params.get('valid_codes_ok', [])
+        if not codes:
+            logger.warning("No valid codes specified, treating all as invalid")
+            return 'FALSE', 'valid_code_column'
+        code_list = ', '.join(_sql_literal(str(code)) for code in codes)
+        return (
+            f"COALESCE(COALESCE(CAST(TRY_CAST(valid_code AS BIGINT) AS VARCHAR), valid_code) IN ({code_list}), FALSE)",
+            'valid_code_column'
+        )
+    return ' AND '.join(f"NOT ({rule})" for _, rule in _range_rules_sql(params)) or 'TRUE', 'numeric_range_rules'
+
+
+def _range_rules_sql(params: dict) -> List[Tuple[str, str]]:
+    """Invalid-row SQL conditions per numeric range rule (bounds compared in float32, like pandas)"""
+    rules = []
+    for column, param, reason in [('duration', 'duration_range_sec', 'duration_out_of_range'),
+                                  ('distance', 'distance_range_m', 'distance_out_of_range'),
+                                  ('speed', 'speed_range_kmh', 'speed_out_of_range')]:
+        valid_range = params.get(param, [0, float('inf')])
+        if len(valid_range) != 2:
+            continue
+        low, high = (f"CAST({_sql_literal(float(bound))} AS FLOAT)" for bound in valid_range)
+        rules.append((reason, f"({column} < {low} OR {column} > {high} OR {column} IS NULL)"))
+    return rules
+
+
+def build_calendar_table(keys: pd.DataFrame, params: dict) -> Tuple[pd.DataFrame, dict]:
+    """
+    Enrich the distinct (timestamp, day_in_week, day_type) keys of the input once
+
+    Uses the pandas pipeline's own parsing, calendar, day-name, daytype, holiday and
+    filter functions, so joining this table back gives every row the values the
+    pandas backend would compute for it.
+
+    Args:
+        keys: Distinct raw key values (columns from DUCKDB_CALENDAR_KEYS present in the input)
+        params: Processing parameters
+
+    Returns:
+        Tuple of (calendar table with the keys plus pair_ts, date, hour_of_day, weekday_index,
+        daytype, pushdown_keep and filter_keep, timestamp parse state)
+    """
+    parse_state = {}
+    parsed = parse_timestamps_vectorized(
+        keys['timestamp'], params.get('ts_format', '%Y-%m-%d %H:%M:%S'),
+        params.get('tz', 'Asia/Jerusalem'), parse_state
+    )
+
+    calendar = keys.copy()
+    calendar['pair_ts'] = pd.Series(parsed.astype(str), index=keys.index).where(parsed.notna(), None)
+
+    # Read-time predicate on timestamp, weekday and hour (links are filtered in SQL)
+    link_free_params = {k: v for k, v in params.items() if k not in ('whitelist_links', 'blacklist_links')}
+    predicate = build_chunk_predicate(link_free_params) if params.get('filter_pushdown', True) else None
+    if predicate is not None:
+        prune_frame = pd.DataFrame({'timestamp': parsed})
+        if 'day_in_week' in keys.columns:
+            prune_frame['day_in_week'] = keys['day_in_week']
+        calendar['pushdown_keep'] = predicate(prune_frame)
+    else:
+        calendar['pushdown_keep'] = True
+
+    enriched = pd.DataFrame({col: keys[col] for col in keys.columns if col != 'timestamp'})
+    enriched['timestamp'] = parsed
+    enriched = apply_temporal_enhancements(enriched, params)
+    if 'date' not in enriched.columns:
+        enriched['date'] = None
+        enriched['hour_of_day'] = np.nan
+        enriched['weekday_index'] = np.nan
+        enriched['daytype'] = None
+
+    calendar['date'] = enriched['date'].where(enriched['date'].notna(), None)
+    calendar['hour_of_day'] = pd.to_numeric(enriched['hour_of_day'], errors='coerce').astype('Int32')
+    calendar['weekday_index'] = pd.to_numeric(enriched['weekday_index'], errors='coerce').astype('float64')
+    calendar['daytype'] = enriched['daytype'].astype(object).where(enriched['daytype'].notna(), None)
+
+    # Post-load filters that depend only on the calendar (date range, weekday, hour, presets)
+    selected = enriched
+    for calendar_filter in (apply_date_range_filter, apply_weekday_filter, apply_hour_filter, apply_preset_filters):
+        selected = calendar_filter(selected, params)
+    calendar['filter_keep'] = calendar.index.isin(selected.index)
+
+    logger.info(f"Built DuckDB calendar table: {len(calendar):,} distinct timestamp/day keys")
+    return calendar, parse_state
+
+
+def _link_filter_sql(params: dict) -> str:
+    """SQL condition for the whitelist/blacklist link filters"""
+    conditions = []
+    whitelist = _parse_link_list(params.get('whitelist_links'))
+    blacklist = _parse_link_list(params.get('blacklist_links'))
+    if whitelist:
+        conditions.append(f"name IN ({', '.join(_sql_literal(str(link)) for link in whitelist)})")
+    if blacklist:
+        conditions.append(f"(name IS NULL OR name NOT IN ({', '.join(_sql_literal(str(link)) for link in blacklist)}))")
+    return ' AND '.join(conditions) or 'TRUE'
+
+
+def iter_group_batches(reader, group_columns: List[str]) -> Iterator[pd.DataFrame]:
+    """
+    Re-cut Arrow record batches of rows sorted by group_columns so no group spans two frames
+
+    Args:
+        reader: pyarrow RecordBatchReader over rows ordered by group_columns
+        group_columns: Sort/group key columns
+
+    Yields:
+        DataFrames each holding complete groups
+    """
+    carry = None
+    for batch in reader:
+        frame = batch.to_pandas()
+        if carry is not None:
+            frame = pd.concat([carry, frame], ignore_index=True)
+        if frame.empty:
+            continue
+
+        # Rows of the last key may continue in the next batch; hold them back
+        last_key = frame[group_columns].iloc[-1]
+        is_last = np.ones(len(frame), dtype=bool)
+        for col in group_columns:
+            is_last &= (frame[col] == last_key[col]).to_numpy()
+        tail_start = len(frame) - int(np.argmin(is_last[::-1])) if not is_last.all() else 0
+
+        carry = frame.iloc[tail_start:].reset_index(drop=True)
+        if tail_start > 0:
+            yield frame.iloc[:tail_start]
+
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+def run_duckdb_aggregation(input_path, params: dict) -> Tuple[pd.DataFrame, dict]:
+    """
+    Read, validate, deduplicate, enrich, filter and aggregate the input hourly with DuckDB
+
+    Args:
+        input_path: Input CSV/Parquet file, list of files, directory or glob
+        params: Processing parameters; duckdb_memory_limit (e.g. '4GB', default from
+            available_memory_gb), duckdb_temp_dir (default <output_dir>/.duckdb_tmp)
+            and duckdb_threads tune the engine; spill files are removed when the run ends
+
+    Returns:
+        Tuple of (hourly aggregation DataFrame as create_hourly_aggregation returns it,
+        validation_stats dict)
+
+    Raises:
+        ImportError: If duckdb is not installed
+        ValueError: If the input cannot be read by DuckDB (zip archives, non-UTF-8 CSV)
+    """
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("The DuckDB backend requires the duckdb package (pip install duckdb)") from e
+
+    backend_start = time.perf_counter()
+    files = resolve_input_files(input_path)
+    temp_root = Path(params.get('duckdb_temp_dir') or Path(params.get('output_dir', '.')) / '.duckdb_tmp')
+    temp_root.mkdir(parents=True, exist_ok=True)
+    temp_dir = Path(tempfile.mkdtemp(prefix='spill_', dir=temp_root))
+    memory_limit = params.get('duckdb_memory_limit') or f"{params.get('available_memory_gb', 2.0)}GB"
+
+    config = {
+        'memory_limit': memory_limit,
+        'temp_directory': str(temp_dir),
+        'preserve_insertion_order': True
+    }
+    if params.get('duckdb_threads'):
+        config['threads'] = int(params['duckdb_threads'])
+    con = duckdb.connect(database=':memory:', config=config)
+
+    try:
+        scan_sql, columns = _scan_sql(files, params)
+        logger.info(f"DuckDB backend: scanning {len(files)} file(s) with memory_limit={memory_limit}, temp={temp_dir}")
+
+        # Materialize the projected scan; with insertion order preserved, rowid is the file row order
+        con.execute(f"CREATE TABLE raw AS {scan_sql}")
+        rows_read = con.execute("SELECT count(*) FROM raw").fetchone()[0]
+
+        key_columns = [col for col in DUCKDB_CALENDAR_KEYS if col in columns]
+        keys = con.execute(f"SELECT DISTINCT {', '.join(map(_quote, key_columns))} FROM raw").df()
+        calendar, parse_state = build_calendar_table(keys, params)
+        con.register('calendar_keys', calendar)
+
+        join_condition = ' AND '.join(f"r.{_quote(col)} IS NOT DISTINCT FROM c.{_quote(col)}" for col in key_columns)
+        validity_sql, method_used = _validity_sql(columns, params)
+        metric_columns = [col for col in DUCKDB_FLOAT_COLUMNS if col in columns]
+        raw_exclude = ' EXCLUDE (is_valid)' if 'is_valid' in columns else ''
+        
+        # Same switch as the pandas prune stage: filters (links included) applied before dedup
+        pushdown = params.get('filter_pushdown', True) and build_chunk_predicate(params) is not None
+        link_condition = _link_filter_sql(params) if pushdown else 'TRUE'
+
+        con.execute(f"""
+            CREATE TABLE kept AS
+            SELECT r.rowid AS _row, r.*{raw_exclude}, c.pair_ts, c.date, c.hour_of_day, c.weekday_index, c.daytype,
+                   c.filter_keep, {validity_sql} AS is_valid
+            FROM raw r JOIN calendar_keys c ON {join_condition}
+            WHERE c.pushdown_keep AND {link_condition}
+        """)
+        con.execute("DROP TABLE raw")
+        total_rows, valid_rows = con.execute("SELECT count(*), COALESCE(sum(is_valid::INTEGER), 0) FROM kept").fetchone()
+
+        invalid_reasons = {}
+        if method_used == 'numeric_range_rules':
+            rules = _range_rules_sql(params)
+            if rules:
+                counts = con.execute(
+                    'SELECT ' + ', '.join(f"COALESCE(sum(({rule})::INTEGER), 0)" for _, rule in rules) + ' FROM kept'
+                ).fetchone()
+                invalid_reasons = {reason: int(count) for (reason, _), count in zip(rules, counts)}
+        elif method_used == 'valid_code_column':
+            invalid_reasons = dict(con.execute(
+                "SELECT valid_code, count(*) FROM kept WHERE NOT is_valid GROUP BY valid_code ORDER BY 2 DESC"
+            ).fetchall())
+
+        # Deduplicate per file: first row per DataID, then first per link + timestamp among the rest;
+        # timestamps compare parsed when filters were pushed down (as in the pandas prune stage)
+        dedup_filters = []
+        ranked = 'kept'
+        if params.get('remove_data_id_duplicates', True) and 'data_id' in columns:
+            data_key = "COALESCE(CAST(TRY_CAST(data_id AS DOUBLE) AS VARCHAR), data_id)"
+            ranked = f"(SELECT *, row_number() OVER (PARTITION BY _file, {data_key} ORDER BY _row) AS _id_rank FROM {ranked})"
+            dedup_filters.append('_id_rank = 1')
+        if params.get('remove_link_timestamp_duplicates', True):
+            pair_key = 'pair_ts' if pushdown else 'timestamp'
+            ranked = (
+                f"(SELECT *, row_number() OVER (PARTITION BY _file, name, {pair_key} ORDER BY _row) AS _pair_rank "
+                f"FROM {ranked}" + (f" WHERE {dedup_filters[-1]}" if dedup_filters else '') + ")"
+            )
+            dedup_filters = ['_pair_rank = 1']
+        con.execute(f"CREATE TABLE deduped AS SELECT * FROM {ranked} WHERE {' AND '.join(dedup_filters) or 'TRUE'}")
+        con.execute("DROP TABLE kept")
+
+        rows_loaded = con.execute("SELECT count(*) FROM deduped").fetchone()[0]
+        link_partial = con.execute(
+            "SELECT name, count(*) AS total_rows, sum(is_valid::INTEGER) AS valid_rows FROM deduped "
+            "WHERE name IS NOT NULL GROUP BY name ORDER BY name"
+        ).df()
+        link_partial['invalid_rows'] = link_partial['total_rows'] - link_partial['valid_rows']
+        link_partial = link_partial.set_index(pd.Index(link_partial.pop('name').astype(object), name='link_id'))
+        link_partial = link_partial[['total_rows', 'valid_rows', 'invalid_rows']].astype('int64')
+
+        # Stream complete groups in file order within each group, so pandas reduces them bitwise alike
+        select_columns = ', '.join(HOURLY_GROUP_COLUMNS + ['is_valid'] + metric_columns)
+        result = con.execute(f"""
+            SELECT {select_columns} FROM deduped
+            WHERE filter_keep AND {_link_filter_sql(params)}
+              AND name IS NOT NULL AND date IS NOT NULL AND hour_of_day IS NOT NULL AND daytype IS NOT NULL
+            ORDER BY {', '.join(HOURLY_GROUP_COLUMNS)}, _row
+        """)
+        # to_arrow_reader replaces fetch_record_batch in newer DuckDB releases
+        fetch_reader = getattr(result, 'to_arrow_reader', None) or result.fetch_record_batch
+        reader = fetch_reader(params.get('duckdb_batch_rows', DUCKDB_BATCH_ROWS))
+
+        hourly_parts = []
+        rows_aggregated = 0
+        for batch in iter_group_batches(reader, HOURLY_GROUP_COLUMNS):
+            rows_aggregated += len(batch)
+            hourly_parts.append(create_hourly_aggregation(batch, params))
+
+        hourly_df = pd.concat(hourly_parts, ignore_index=True) if hourly_parts else pd.DataFrame()
+        if not hourly_df.empty:
+            for col in ('link_id', 'daytype'):
+                hourly_df[col] = hourly_df[col].astype(pd.CategoricalDtype(sorted(hourly_df[col].unique(), key=str)))
+
+        seconds = time.perf_counter() - backend_start
+        validation_stats = {
+            'total_rows': int(total_rows),
+            'valid_rows': int(valid_rows),
+            'invalid_reasons': invalid_reasons,
+            'method_used': method_used,
+            'rows_loaded': int(rows_loaded),
+            'link_quality_partial': link_partial,
+            'read_pruning': {
+                'rows_read': int(rows_read),
+                'rows_pruned': int(rows_read - total_rows),
+                'filters_pushed_down': bool(pushdown),
+                'columns_skipped': list(AGGREGATION_UNUSED_COLUMNS)
+            },
+            'execution_backend': {
+                'engine': f'duckdb {duckdb.__version__}',
+                'memory_limit': memory_limit,
+                'temp_directory': str(temp_dir),
+                'calendar_keys': len(calendar),
+                'timestamp_format': parse_state.get('format'),
+                'rows_aggregated': rows_aggregated,
+                'hourly_batches': len(hourly_parts),
+                'seconds': round(seconds, 3)
+            }
+        }
+        logger.info(f"DuckDB backend finished in {seconds:.2f}s: {rows_read:,} rows read, "
+                    f"{rows_aggregated:,} aggregated into {len(hourly_df):,} hourly rows")
+        return hourly_df, validation_stats
+
+    finally:
+        con.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        try:
+            temp_root.rmdir()
+        except OSError:
+            pass  # Not empty (shared with other runs) or already gone
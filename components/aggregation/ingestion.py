@@ -0,0 +1,734 @@
+"""
+Shared CSV ingestion for the aggregation pipeline and the control page
+
+Opening (plain, gzip, zip and zstd) inputs as decompressed streams, encoding and
+format detection, column-name normalization, and chunked or whole-file parsing with
+the multithreaded pyarrow reader or the pandas C parser.
+"""
+
+import codecs
+import gzip
+import hashlib
+import logging
+import os
+import re
+import zipfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Column name mapping to snake_case (handles variations with spaces/units)
+COLUMN_MAPPING = {
+    'DataID': 'data_id',
+    'Name': 'name',  # Used as link_id
+    'SegmentID': 'segment_id',
+    'RouteAlternative': 'route_alternative',
+    'RequestedTime': 'requested_time',
+    'Timestamp': 'timestamp',
+    'DayInWeek': 'day_in_week',
+    'DayType': 'day_type',
+    'Duration': 'duration',
+    'Duration (seconds)': 'duration',  # Handle test data format
+    'Static Duration': 'static_duration',  # Optional field
+    'Static Duration (seconds)': 'static_duration',  # Handle test data format
+    'Distance': 'distance',
+    'Distance (meters)': 'distance',  # Handle test data format
+    'Speed': 'speed',
+    'Speed (km/h)': 'speed',  # Handle test data format
+    'Url': 'url',
+    'Polyline': 'polyline'
+}
+
+
+def normalize_column_names(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    """
+    Normalize column names to snake_case using predefined mapping
+    
+    Args:
+        df: Input DataFrame with original column names
+        inplace: Rename the columns of df itself instead of a copy
+        
+    Returns:
+        DataFrame with normalized column names
+    """
+    # Work on a copy unless the caller owns the frame
+    df_normalized = df if inplace else df.copy()
+    
+    # Apply the column mapping
+    df_normalized.rename(columns=COLUMN_MAPPING, inplace=True)
+    
+    # Also handle any additional columns that might exist (like 'valid', 'valid_code')
+    # by converting them to snake_case
+    additional_columns = {}
+    for col in df_normalized.columns:
+        if col not in COLUMN_MAPPING.values():
+            snake_case_col = _to_snake_case(col)
+            if snake_case_col != col:
+                additional_columns[col] = snake_case_col
+    
+    if additional_columns:
+        df_normalized.rename(columns=additional_columns, inplace=True)
+    
+    return df_normalized
+
+
+def _to_snake_case(name: str) -> str:
+    """
+    Convert a string to snake_case
+    
+    Args:
+        name: Input string to convert
+        
+    Returns:
+        String in snake_case format
+    """
+    # Handle camelCase and PascalCase
+    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
+    s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
+    
+    # Replace spaces and other separators with underscores
+    s3 = re.sub(r'[\s\-\.]+', '_', s2)
+    
+    # Convert to lowercase and remove multiple underscores
+    s4 = re.sub(r'_+', '_', s3.lower())
+    
+    # Remove leading/trailing underscores
+    return s4.strip('_')
+
+
+# Leading bytes of compressed inputs; checked instead of the suffix because uploads are saved as .csv
+COMPRESSION_MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'PK\x03\x04': 'zip',
+    b'\x28\xb5\x2f\xfd': 'zstd'
+}
+
+
+def detect_compression(source: Union[str, Path, IO[bytes]]) -> Optional[str]:
+    """
+    Detect the compression of a CSV input from its magic bytes
+    
+    Args:
+        source: File path or seekable binary buffer
+        
+    Returns:
+        'gzip', 'zip', 'zstd' or None for plain files
+    """
+    try:
+        if isinstance(source, (str, Path)):
+            with open(source, 'rb') as f:
+                head = f.read(4)
+        else:
+            position = source.tell()
+            source.seek(0)
+            head = source.read(4)
+            source.seek(position)
+    except OSError:
+        return None
+    
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def select_zip_member(archive: zipfile.ZipFile, member: Optional[str] = None) -> str:
+    """Pick the requested zip member, or the first CSV (else first file) in the archive"""
+    names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    if member is not None:
+        if member not in names:
+            raise ValueError(f"Member '{member}' not found in zip archive (members: {', '.join(names)})")
+        return member
+    
+    csv_names = [name for name in names if name.lower().endswith('.csv')]
+    if not (csv_names or names):
+        raise ValueError("Zip archive is empty")
+    return (csv_names or names)[0]
+
+
+@contextmanager
+def open_csv_input(source: Union[str, Path, IO[bytes]], member: Optional[str] = None) -> Iterator[IO[bytes]]:
+    """
+    Open a CSV input as a streaming, decompressed binary file object
+    
+    Plain, gzip, zip and zstd inputs are decompressed on the fly, so nothing is
+    unpacked to disk. zstd needs the optional 'zstandard' package.
+    
+    Args:
+        source: File path or seekable binary buffer (e.g. an upload's BytesIO)
+        member: Zip member to read (default: first CSV in the archive)
+        
+    Yields:
+        Binary file object positioned at the start of the uncompressed CSV bytes
+    """
+    compression = detect_compression(source)
+    
+    with ExitStack() as stack:
+        if isinstance(source, (str, Path)):
+            raw = stack.enter_context(open(source, 'rb'))
+        else:
+            raw = source
+            raw.seek(0)
+        
+        if compression == 'gzip':
+            stream = stack.enter_context(gzip.GzipFile(fileobj=raw, mode='rb'))
+        elif compression == 'zip':
+            archive = stack.enter_context(zipfile.ZipFile(raw))
+            stream = stack.enter_context(archive.open(select_zip_member(archive, member)))
+        elif compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError("Reading .zst inputs requires the 'zstandard' package") from e
+            stream = stack.enter_context(zstandard.ZstdDecompressor().stream_reader(raw, closefd=False))
+        else:
+            stream = raw
+        
+        yield stream
+
+
+def read_input_prefix(source: Union[str, Path, IO[bytes]], size: int, member: Optional[str] = None) -> bytes:
+    """Read the first size uncompressed bytes of a CSV input"""
+    with open_csv_input(source, member) as stream:
+        return stream.read(size)
+
+
+def is_csv_buffer(source: Any) -> bool:
+    """True for an in-memory binary input (BytesIO, an upload) rather than a path"""
+    return hasattr(source, 'read') and hasattr(source, 'seek')
+
+
+def csv_input_name(source: Union[str, Path, IO[bytes]]) -> str:
+    """Display name of a CSV input: its path, or the file name of an upload"""
+    if is_csv_buffer(source):
+        return getattr(source, 'name', None) or '<in-memory upload>'
+    return str(source)
+
+
+def csv_input_size(source: Union[str, Path, IO[bytes]]) -> int:
+    """Stored (compressed) size in bytes of a CSV file or binary buffer"""
+    if not is_csv_buffer(source):
+        return Path(source).stat().st_size
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def describe_read_throughput(compressed_bytes: int, uncompressed_bytes: Optional[int], seconds: float,
+                             compression: Optional[str]) -> dict:
+    """
+    Summarize read volume and speed in MB and MB/s for compressed and uncompressed bytes
+    
+    Args:
+        compressed_bytes: Bytes on disk (equal to uncompressed for plain files)
+        uncompressed_bytes: Decompressed CSV bytes, or None if unknown
+        seconds: Wall time spent reading
+        compression: Compression name or None
+        
+    Returns:
+        Dictionary for validation_stats['read_throughput']
+    """
+    compressed_mb = compressed_bytes / (1024 * 1024)
+    uncompressed_mb = uncompressed_bytes / (1024 * 1024) if uncompressed_bytes is not None else None
+    return {
+        'compression': compression or 'none',
+        'compressed_mb': round(compressed_mb, 3),
+        'uncompressed_mb': round(uncompressed_mb, 3) if uncompressed_mb is not None else None,
+        'seconds': round(seconds, 3),
+        'compressed_mb_per_s': round(compressed_mb / seconds, 2) if seconds > 0 else None,
+        'uncompressed_mb_per_s': round(uncompressed_mb / seconds, 2) if seconds > 0 and uncompressed_mb is not None else None
+    }
+
+
+def resolve_hebrew_encoding(raw_data: bytes, detected_encoding: Optional[str]) -> str:
+    """Normalize detector output for Hebrew datasets frequently misclassified as Greek."""
+    if not detected_encoding:
+        return 'cp1255'
+
+    normalized = detected_encoding.lower().replace('_', '-')
+    greek_aliases = {'iso-8859-7', 'iso8859-7', 'windows-1253', 'cp1253', 'greek'}
+
+    if normalized in greek_aliases:
+        hebrew_text = raw_data.decode('cp1255', errors='ignore')
+        greek_text = raw_data.decode(detected_encoding, errors='ignore')
+        hebrew_chars = sum(1 for ch in hebrew_text if 0x0590 <= ord(ch) <= 0x05FF)
+        greek_chars = sum(1 for ch in greek_text if 0x0370 <= ord(ch) <= 0x03FF)
+
+        if hebrew_chars and hebrew_chars >= greek_chars:
+            logger.info(
+                "Overriding detected encoding '%s' with cp1255 based on Hebrew character frequency",
+                detected_encoding
+            )
+            return 'cp1255'
+
+    return detected_encoding
+
+# Encoding probes by digest of the sampled prefix, so every reader of one file (format
+# detection, dtype plan, header, upload preview) shares a single chardet run
+ENCODING_PROBE_CACHE_SIZE = 64
+_ENCODING_PROBE_CACHE: Dict[str, str] = {}
+
+
+def detect_file_encoding(file_path: Union[str, IO[bytes]], sample_size: int = 8192,
+                         member: Optional[str] = None) -> str:
+    """
+    Detect file encoding by trying common encodings
+    
+    Detection runs on the decompressed prefix for gzip, zip and zstd inputs. The result
+    is cached by a digest of that prefix, so repeated probes of one file (or of the same
+    upload on a Streamlit rerun) only re-read the prefix.
+    
+    Args:
+        file_path: Path to file or seekable binary buffer
+        sample_size: Number of bytes to read for detection
+        member: Zip member to inspect (default: first CSV in the archive)
+        
+    Returns:
+        Detected encoding string
+    """
+    # Common encodings to try, in order of preference
+    encodings_to_try = [
+        'utf-8',
+        'utf-8-sig',  # UTF-8 with BOM
+        'cp1255',     # Hebrew Windows encoding
+        'iso-8859-8', # Hebrew ISO encoding
+        'cp1252',     # Western European Windows encoding
+        'latin1',     # Fallback that accepts any byte sequence
+    ]
+    
+    try:
+        raw_data = read_input_prefix(file_path, sample_size, member)
+    except Exception as e:
+        logger.warning(f"Could not read {file_path} for encoding detection: {e}")
+        return 'latin1'
+    
+    probe_key = hashlib.blake2b(raw_data, digest_size=16).hexdigest()
+    cached = _ENCODING_PROBE_CACHE.get(probe_key)
+    if cached is not None:
+        return cached
+    encoding = _probe_encoding(raw_data, encodings_to_try)
+    if len(_ENCODING_PROBE_CACHE) >= ENCODING_PROBE_CACHE_SIZE:
+        _ENCODING_PROBE_CACHE.pop(next(iter(_ENCODING_PROBE_CACHE)))
+    _ENCODING_PROBE_CACHE[probe_key] = encoding
+    return encoding
+
+
+def _probe_encoding(raw_data: bytes, encodings_to_try: List[str]) -> str:
+    """Encoding of a sampled prefix: chardet (with the Hebrew override), then trial decoding"""
+    # Try to detect using chardet if available
+    try:
+        import chardet
+        
+        detected = chardet.detect(raw_data)
+        if detected and detected.get('encoding'):
+            candidate = detected['encoding']
+            confidence = detected.get('confidence') or 0.0
+            resolved = resolve_hebrew_encoding(raw_data, candidate)
+
+            if resolved.lower() != candidate.lower():
+                logger.info(
+                    "Detected encoding %s (confidence %.2f) overridden to %s for Hebrew dataset",
+                    candidate, confidence, resolved
+                )
+                return resolved
+
+            if confidence > 0.7:
+                logger.info("Detected encoding: %s (confidence: %.2f)", resolved, confidence)
+                return resolved
+    except ImportError:
+        logger.debug("chardet not available, using fallback encoding detection")
+    except Exception as e:
+        logger.debug(f"chardet detection failed: {e}")
+    
+    # Fallback: try encodings manually
+    for encoding in encodings_to_try:
+        try:
+            # Incremental decode so a multi-byte character cut at the prefix end is not an error
+            codecs.getincrementaldecoder(encoding)().decode(raw_data, final=False)
+            # If we can decode without errors, this encoding works
+            logger.info(f"Using encoding: {encoding}")
+            return encoding
+        except UnicodeDecodeError:
+            continue
+        except Exception:
+            continue
+    
+    # Last resort: use latin1 which accepts any byte sequence
+    logger.warning("Could not detect encoding reliably, using latin1 as fallback")
+    return 'latin1'
+
+
+def detect_csv_format(file_path: Union[str, IO[bytes]], sample_size: int = 1000,
+                      member: Optional[str] = None) -> dict:
+    """
+    Detect CSV format parameters (decimal separator, delimiter, encoding) from file sample
+    
+    Args:
+        file_path: Path to CSV file (plain or compressed) or seekable binary buffer
+        sample_size: Number of characters to sample for detection
+        member: Zip member to inspect (default: first CSV in the archive)
+        
+    Returns:
+        Dictionary with detected format parameters
+    """
+    format_params = {
+        'delimiter': ',',
+        'decimal': '.',
+        'encoding': 'utf-8'
+    }
+    
+    # First, detect encoding
+    encoding = detect_file_encoding(file_path, member=member)
+    format_params['encoding'] = encoding
+    
+    try:
+        # Read a small (decompressed) sample of the file with detected encoding
+        sample = read_input_prefix(file_path, sample_size * 4, member).decode(encoding, errors='replace')[:sample_size]
+        
+        # Count potential delimiters
+        delimiter_counts = {
+            ',': sample.count(','),
+            ';': sample.count(';'),
+            '\t': sample.count('\t'),
+            '|': sample.count('|')
+        }
+        
+        # Choose delimiter with highest count
+        best_delimiter = max(delimiter_counts, key=delimiter_counts.get)
+        if delimiter_counts[best_delimiter] > 0:
+            format_params['delimiter'] = best_delimiter
+        
+        # Detect decimal separator by looking for patterns
+        # Look for numbers with decimal points vs commas
+        import re
+        decimal_point_pattern = r'\d+\.\d+'
+        decimal_comma_pattern = r'\d+,\d+'
+        
+        decimal_points = len(re.findall(decimal_point_pattern, sample))
+        decimal_commas = len(re.findall(decimal_comma_pattern, sample))
+        
+        # If we find more decimal commas and delimiter is not comma, use comma as decimal
+        if decimal_commas > decimal_points and format_params['delimiter'] != ',':
+            format_params['decimal'] = ','
+        
+        logger.info(f"Detected CSV format: delimiter='{format_params['delimiter']}', decimal='{format_params['decimal']}'")
+        
+    except Exception as e:
+        logger.warning(f"Could not detect CSV format, using defaults: {e}")
+    
+    return format_params
+
+
+# Parsers: the multithreaded pyarrow reader or the pandas C parser
+CSV_ENGINES = ('auto', 'pyarrow', 'c')
+
+# Values read as missing: the pipeline's na_values plus pandas' default NA strings
+CSV_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                 '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+# Declared text columns (normalized names); the pyarrow engine would otherwise infer
+# timestamp and time types for them
+CSV_TEXT_COLUMNS = ('name', 'requested_time', 'timestamp', 'day_in_week', 'day_type', 'url', 'polyline')
+
+ARROW_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def resolve_csv_engine(engine: str = 'auto', decimal: str = '.') -> str:
+    """
+    Parser for a CSV read: 'pyarrow' (multithreaded) when installed and the file uses
+    a '.' decimal separator, otherwise the pandas C parser
+    
+    Args:
+        engine: 'auto', 'pyarrow' or 'c'
+        decimal: Decimal separator of the file
+        
+    Returns:
+        'pyarrow' or 'c'
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"csv_engine must be one of {CSV_ENGINES}, got {engine!r}")
+    if engine == 'c' or decimal != '.':
+        return 'c'
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        if engine == 'pyarrow':
+            logger.warning("pyarrow is not installed; reading CSV with the pandas C parser")
+        return 'c'
+    return 'pyarrow'
+
+
+def read_csv_header(source: Union[str, Path, IO[bytes]], delimiter: str = ',', encoding: str = 'utf-8',
+                    member: Optional[str] = None) -> Optional[List[str]]:
+    """Column names of a (possibly compressed) CSV, or None when the header cannot be read"""
+    try:
+        with open_csv_input(source, member) as stream:
+            return list(pd.read_csv(stream, delimiter=delimiter, encoding=encoding, nrows=0).columns)
+    except Exception as e:
+        logger.warning(f"Could not read CSV header: {e}")
+        return None
+
+
+def _arrow_csv_options(header: List[str], delimiter: str, encoding: str,
+                       dtypes: Optional[Dict[str, str]], usecols: Optional[List[str]]) -> dict:
+    """pyarrow.csv options for the declared schema: planned dtypes, text columns as strings"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    
+    arrow_types = {'category': pa.dictionary(pa.int32(), pa.string()), 'float32': pa.float32(),
+                   'float64': pa.float64(), 'Int64': pa.int64(), 'Int32': pa.int32()}
+    dtypes = dtypes or {}
+    column_types = {}
+    normalized_names = normalize_column_names(pd.DataFrame(columns=header)).columns
+    for original_name, normalized_name in zip(header, normalized_names):
+        if original_name in dtypes and dtypes[original_name] in arrow_types:
+            column_types[original_name] = arrow_types[dtypes[original_name]]
+        elif normalized_name in CSV_TEXT_COLUMNS:
+            column_types[original_name] = pa.string()
+    
+    # Transcoding other encodings happens in pyarrow; the UTF-8 BOM is skipped by the parser
+    arrow_encoding = 'utf8' if codecs.lookup(encoding).name in ('utf-8', 'utf-8-sig') else encoding
+    return {
+        'read_options': pa_csv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE, encoding=arrow_encoding),
+        'parse_options': pa_csv.ParseOptions(delimiter=delimiter),
+        'convert_options': pa_csv.ConvertOptions(
+            column_types=column_types, null_values=CSV_NA_VALUES, strings_can_be_null=True,
+            include_columns=usecols
+        )
+    }
+
+
+def _arrow_table_to_frame(table, dtypes: Optional[Dict[str, str]], start: int = 0) -> pd.DataFrame:
+    """Pandas frame of an Arrow CSV table with the dtypes the C parser gives for the same declaration"""
+    df = table.to_pandas()
+    for col, dtype in (dtypes or {}).items():
+        if col not in df.columns:
+            continue
+        if dtype in ('Int64', 'Int32'):
+            df[col] = df[col].astype(dtype)
+        elif dtype == 'category':
+            # Arrow dictionaries are in first-seen order; read_csv sorts categories
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+
+class ArrowCsvChunkReader:
+    """
+    Streaming pyarrow CSV reader with the get_chunk interface of pandas' chunked reader
+    
+    Blocks are parsed and converted on pyarrow's thread pool; record batches are
+    buffered and sliced so each chunk has exactly the requested number of rows.
+    """
+    
+    def __init__(self, stream: IO[bytes], header: List[str], delimiter: str = ',', encoding: str = 'utf-8',
+                 chunk_size: int = 100000, dtypes: Optional[Dict[str, str]] = None,
+                 usecols: Optional[List[str]] = None):
+        import pyarrow.csv as pa_csv
+        
+        self.chunk_size = chunk_size
+        self.dtypes = dtypes
+        self._reader = pa_csv.open_csv(stream, **_arrow_csv_options(header, delimiter, encoding, dtypes, usecols))
+        self._pending = []
+        self._pending_rows = 0
+        self._rows_emitted = 0
+        self._exhausted = False
+    
+    def get_chunk(self, size: Optional[int] = None) -> pd.DataFrame:
+        """Next chunk of up to size rows; raises StopIteration when the file is exhausted"""
+        import pyarrow as pa
+        
+        size = size or self.chunk_size
+        while self._pending_rows < size and not self._exhausted:
+            try:
+                batch = self._reader.read_next_batch()
+            except StopIteration:
+                self._exhausted = True
+                break
+            self._pending.append(batch)
+            self._pending_rows += batch.num_rows
+        if self._pending_rows == 0:
+            raise StopIteration
+        
+        table = pa.Table.from_batches(self._pending)
+        chunk_table = table.slice(0, size)
+        remainder = table.slice(size)
+        self._pending = remainder.to_batches()
+        self._pending_rows = remainder.num_rows
+        
+        chunk = _arrow_table_to_frame(chunk_table, self.dtypes, self._rows_emitted)
+        self._rows_emitted += len(chunk)
+        return chunk
+    
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        while True:
+            try:
+                yield self.get_chunk()
+            except StopIteration:
+                return
+
+
+def open_csv_chunk_reader(stream: IO[bytes], header: Optional[List[str]], engine: str = 'auto',
+                          delimiter: str = ',', decimal: str = '.', encoding: str = 'utf-8',
+                          chunk_size: int = 100000, dtypes: Optional[Dict[str, str]] = None,
+                          usecols: Optional[List[str]] = None):
+    """
+    Chunked reader over a decompressed CSV stream with the pyarrow or pandas C parser
+    
+    Both readers expose get_chunk(size) and parse to the same declared schema: dtypes
+    (original header -> dtype, e.g. a dtype plan) and text columns kept as strings.
+    
+    Args:
+        stream: Binary stream from open_csv_input
+        header: Column names of the file (required for the pyarrow engine)
+        engine: 'auto', 'pyarrow' or 'c' (see resolve_csv_engine)
+        delimiter: Field delimiter
+        decimal: Decimal separator
+        encoding: File encoding
+        chunk_size: Default rows per chunk
+        dtypes: Declared dtypes by original column name
+        usecols: Column projection
+        
+    Returns:
+        ArrowCsvChunkReader or pandas TextFileReader
+    """
+    if header is not None and resolve_csv_engine(engine, decimal) == 'pyarrow':
+        return ArrowCsvChunkReader(stream, header, delimiter, encoding, chunk_size, dtypes, usecols)
+    return pd.read_csv(
+        stream,
+        delimiter=delimiter,
+        decimal=decimal,
+        encoding=encoding,
+        chunksize=chunk_size,
+        low_memory=False,  # Let pandas infer dtypes not covered by the plan
+        na_values=['', 'NA', 'NULL', 'null', 'NaN', 'nan'],
+        keep_default_na=True,
+        dtype=dtypes,
+        usecols=usecols
+    )
+
+
+def read_csv_frame(source: Union[str, Path, IO[bytes]], encoding: str, delimiter: str = ',',
+                   engine: str = 'auto', exclude_columns: Tuple[str, ...] = (),
+                   dtypes: Optional[Dict[str, str]] = None, member: Optional[str] = None,
+                   chunk_filter: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                   chunk_size: int = 500000) -> Tuple[pd.DataFrame, int, int]:
+    """
+    Read a whole (possibly compressed) CSV in one multithreaded pass
+    
+    Input pyarrow cannot decode or parse is re-read with the C parser, so decoding
+    errors surface as UnicodeDecodeError like a plain read_csv. With chunk_filter the
+    file is streamed in chunks and only the rows each chunk_filter call keeps are held.
+    
+    Args:
+        source: Path or seekable binary buffer
+        encoding: File encoding (e.g. from detect_file_encoding)
+        delimiter: Field delimiter
+        engine: 'auto', 'pyarrow' or 'c' (see resolve_csv_engine)
+        exclude_columns: Columns the caller never reads (projected away at parse time)
+        dtypes: Declared dtypes by original column name
+        member: Zip member to read (default: first CSV in the archive)
+        chunk_filter: Row filter applied to every chunk as it is parsed
+        chunk_size: Rows per chunk when chunk_filter is given
+        
+    Returns:
+        Tuple of (DataFrame, uncompressed bytes read, data rows read before chunk_filter)
+    """
+    header = read_csv_header(source, delimiter, encoding, member)
+    usecols = None
+    if header is not None and exclude_columns:
+        usecols = [col for col in header if col not in exclude_columns]
+    
+    def _read(engine: str) -> Tuple[pd.DataFrame, int, int]:
+        with open_csv_input(source, member) as stream:
+            if chunk_filter is not None:
+                reader = open_csv_chunk_reader(stream, header, engine, delimiter=delimiter, encoding=encoding,
+                                               chunk_size=chunk_size, dtypes=dtypes, usecols=usecols)
+                chunks = []
+                rows_read = 0
+                for chunk in reader:
+                    rows_read += len(chunk)
+                    chunks.append(chunk_filter(chunk))
+                df = concat_categorical_chunks(chunks) if chunks else pd.DataFrame(columns=usecols or header)
+                return df, stream.tell(), rows_read
+            elif engine == 'pyarrow':
+                import pyarrow.csv as pa_csv
+                table = pa_csv.read_csv(stream, **_arrow_csv_options(header, delimiter, encoding, dtypes, usecols))
+                df = _arrow_table_to_frame(table, dtypes)
+            else:
+                df = pd.read_csv(stream, delimiter=delimiter, encoding=encoding, usecols=usecols, dtype=dtypes)
+            return df, stream.tell(), len(df)
+    
+    if header is not None and resolve_csv_engine(engine) == 'pyarrow':
+        try:
+            return _read('pyarrow')
+        except ValueError as e:
+            logger.warning(f"pyarrow could not read the CSV ({e}); re-reading with the C parser")
+    return _read('c')
+
+
+def concat_categorical_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate parsed chunks without losing their categorical columns
+    
+    Each chunk carries its own category table, and pd.concat falls back to object
+    strings when the tables differ. Categorical columns are recoded onto the sorted
+    union of the categories the chunks actually use, so the result stays one code
+    array plus one table of distinct values.
+    
+    Args:
+        chunks: Parsed (and possibly filtered) chunks with identical columns
+        
+    Returns:
+        Concatenated DataFrame with a fresh RangeIndex
+    """
+    categorical = [col for col, dtype in chunks[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if categorical:
+        dtypes = {}
+        for col in categorical:
+            used = [chunk[col].cat.remove_unused_categories().cat.categories for chunk in chunks]
+            dtypes[col] = pd.CategoricalDtype(used[0].append(used[1:]).unique().sort_values())
+        chunks = [chunk.astype(dtypes) for chunk in chunks]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def map_unique_values(series: pd.Series, func: Callable[[Any], Any]) -> Tuple[pd.Series, int]:
+    """
+    Apply a per-value function to the distinct values of a column only
+    
+    Categoricals are mapped through their categories; other columns are factorized,
+    mapped per unique value and expanded back by code. Missing values are kept.
+    
+    Args:
+        series: Column to transform
+        func: Function of one non-missing value
+        
+    Returns:
+        Tuple of (transformed Series, number of rows whose value changed)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        mapped = pd.Index([func(value) for value in categories])
+        codes = series.cat.codes.to_numpy()
+        changed_codes = np.flatnonzero(mapped.astype(str) != categories.astype(str))
+        changed = int(np.isin(codes, changed_codes).sum())
+        if mapped.is_unique:
+            return series.cat.rename_categories(mapped), changed
+        return pd.Series(pd.Categorical(mapped.take(codes).where(codes >= 0)), index=series.index,
+                         name=series.name), changed
+    
+    codes, uniques = pd.factorize(series)
+    mapped = np.array([func(value) for value in uniques], dtype=object)
+    changed_codes = np.flatnonzero([str(new) != str(old) for new, old in zip(mapped, uniques)])
+    changed = int(np.isin(codes, changed_codes).sum())
+    values = np.empty(len(series), dtype=object)
+    present = codes >= 0
+    values[present] = mapped[codes[present]]
+    values[~present] = series.to_numpy(dtype=object)[~present]
+    return pd.Series(values, index=series.index, name=series.name), changed
@@ -8,15 +8,38 @@ traffic monitoring datasets with optimized pandas operations.
 import pandas as pd
 import numpy as np
 from datetime import datetime, date
-from typing import Dict, List, Optional, Tuple, Union
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass
 import holidays
 from pathlib import Path
 import json
 import logging
-import re
 import pytz
 from zoneinfo import ZoneInfo
 import warnings
+import time
+import os
+import hashlib
+from contextlib import ExitStack
+from functools import lru_cache
+
+from components.aggregation.ingestion import (
+    CSV_ENGINES,
+    csv_input_name,
+    csv_input_size,
+    describe_read_throughput,
+    detect_compression,
+    detect_csv_format,
+    detect_file_encoding,
+    is_csv_buffer,
+    normalize_column_names,
+    open_csv_chunk_reader,
+    open_csv_input,
+    read_csv_header,
+    resolve_csv_engine
+)
+# Re-exported for callers that imported these from the pipeline before the ingestion split
+from components.aggregation.ingestion import COLUMN_MAPPING, resolve_hebrew_encoding  # noqa: F401
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,28 +52,95 @@ REQUIRED_COLUMNS = [
     'Url', 'Polyline'
 ]
 
-# Column name mapping to snake_case (handles variations with spaces/units)
-COLUMN_MAPPING = {
-    'DataID': 'data_id',
-    'Name': 'name',  # Used as link_id
-    'SegmentID': 'segment_id',
-    'RouteAlternative': 'route_alternative',
-    'RequestedTime': 'requested_time',
-    'Timestamp': 'timestamp',
-    'DayInWeek': 'day_in_week',
-    'DayType': 'day_type',
-    'Duration': 'duration',
-    'Duration (seconds)': 'duration',  # Handle test data format
-    'Static Duration': 'static_duration',  # Optional field
-    'Static Duration (seconds)': 'static_duration',  # Handle test data format
-    'Distance': 'distance',
-    'Distance (meters)': 'distance',  # Handle test data format
-    'Speed': 'speed',
-    'Speed (km/h)': 'speed',  # Handle test data format
-    'Url': 'url',
-    'Polyline': 'polyline'
+# Default Hebrew day name mapping (יום א=Sunday=6, יום ב=Monday=0, etc.)
+# Note: In Hebrew calendar, Sunday is the first day, but we use Monday=0 as per ISO standard
+HEBREW_DAY_MAPPING = {
+    'יום א': 6,  # Sunday
+    'יום ב': 0,  # Monday  
+    'יום ג': 1,  # Tuesday
+    'יום ד': 2,  # Wednesday
+    'יום ה': 3,  # Thursday
+    'יום ו': 4,  # Friday
+    'יום ש': 5,  # Saturday (Shabbat)
+    # Alternative spellings with apostrophe
+    'יום א\'': 6,
+    'יום ב\'': 0,
+    'יום ג\'': 1,
+    'יום ד\'': 2,
+    'יום ה\'': 3,
+    'יום ו\'': 4,
+    'יום ש\'': 5,
+    # Short forms
+    'א': 6,
+    'ב': 0,
+    'ג': 1,
+    'ד': 2,
+    'ה': 3,
+    'ו': 4,
+    'ש': 5,
+    # Short forms with apostrophe
+    'א\'': 6,
+    'ב\'': 0,
+    'ג\'': 1,
+    'ד\'': 2,
+    'ה\'': 3,
+    'ו\'': 4,
+    'ש\'': 5
 }
 
+# Declared input dtypes (docs/CSV_SCHEMA.md), keyed by normalized column name. Integer
+# widths are fixed and nullable so every chunk of a file parses to the same dtype.
+CSV_SCHEMA_DTYPES = {
+    'data_id': 'Int64',
+    'segment_id': 'Int64',
+    'route_alternative': 'Int32',
+    'duration': 'float32',
+    'static_duration': 'float32',
+    'distance': 'float32',
+    'speed': 'float32',
+}
+
+# Raw columns the aggregation never reads; skipped at parse time when the header is complete
+AGGREGATION_UNUSED_COLUMNS = ('Url', 'Polyline')
+
+# Low-cardinality text columns kept as categoricals with one vocabulary per file
+CATEGORICAL_COLUMNS = ('name', 'day_in_week', 'day_type', 'daytype', 'holiday_name')
+
+# Rows kept in the raw, hourly and weekly preview files for GUI display
+PREVIEW_ROWS = 100
+
+# Mergeable moment columns carried on the hourly aggregation (n, M2 per metric; the mean
+# is the matching avg_* column). They are not part of hourly_agg.csv but let weekly and
+# downstream stages pool exact standard deviations without re-reading raw data.
+HOURLY_MOMENT_COLUMNS = {
+    'duration': ('_duration_n', 'avg_duration_sec', '_duration_m2'),
+    'static_duration': ('_static_duration_n', 'avg_static_duration_sec', '_static_duration_m2'),
+}
+
+# Mergeable t-digest of valid durations per hour (centroid means, centroid weights), carried
+# like the moments when reliability_percentiles is set so weekly percentiles need no raw rows
+HOURLY_SKETCH_COLUMNS = ('_duration_sketch_means', '_duration_sketch_weights')
+
+# Optional travel-time reliability columns appended after the published hourly/weekly metrics
+HOURLY_RELIABILITY_COLUMNS = ['p50_duration_sec', 'p85_duration_sec', 'p95_duration_sec',
+                              'buffer_time_index', 'planning_time_index']
+WEEKLY_RELIABILITY_COLUMNS = ['p50_dur', 'p85_dur', 'p95_dur', 'buffer_time_index', 'planning_time_index']
+
+
+def drop_moment_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a view of an hourly DataFrame without the internal moment and sketch columns
+    
+    Args:
+        df: Hourly aggregation DataFrame (possibly carrying moment or sketch columns)
+        
+    Returns:
+        DataFrame with only the published hourly_agg columns
+    """
+    hidden = [col for cols in HOURLY_MOMENT_COLUMNS.values() for col in (cols[0], cols[2]) if col in df.columns]
+    hidden.extend(col for col in HOURLY_SKETCH_COLUMNS if col in df.columns)
+    return df.drop(columns=hidden) if hidden else df
+
 
 def validate_csv_columns(df: pd.DataFrame) -> Tuple[bool, List[str]]:
     """
@@ -92,61 +182,6 @@ def validate_csv_columns(df: pd.DataFrame) -> Tuple[bool, List[str]]:
     return is_valid, missing_columns
 
 
-def normalize_column_names(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Normalize column names to snake_case using predefined mapping
-    
-    Args:
-        df: Input DataFrame with original column names
-        
-    Returns:
-        DataFrame with normalized column names
-    """
-    # Create a copy to avoid modifying the original
-    df_normalized = df.copy()
-    
-    # Apply the column mapping
-    df_normalized = df_normalized.rename(columns=COLUMN_MAPPING)
-    
-    # Also handle any additional columns that might exist (like 'valid', 'valid_code')
-    # by converting them to snake_case
-    additional_columns = {}
-    for col in df_normalized.columns:
-        if col not in COLUMN_MAPPING.values():
-            snake_case_col = _to_snake_case(col)
-            if snake_case_col != col:
-                additional_columns[col] = snake_case_col
-    
-    if additional_columns:
-        df_normalized = df_normalized.rename(columns=additional_columns)
-    
-    return df_normalized
-
-
-def _to_snake_case(name: str) -> str:
-    """
-    Convert a string to snake_case
-    
-    Args:
-        name: Input string to convert
-        
-    Returns:
-        String in snake_case format
-    """
-    # Handle camelCase and PascalCase
-    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-    s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
-    
-    # Replace spaces and other separators with underscores
-    s3 = re.sub(r'[\s\-\.]+', '_', s2)
-    
-    # Convert to lowercase and remove multiple underscores
-    s4 = re.sub(r'_+', '_', s3.lower())
-    
-    # Remove leading/trailing underscores
-    return s4.strip('_')
-
-
 def parse_timestamp_with_timezone(timestamp_str: str, ts_format: str, timezone: str) -> Optional[pd.Timestamp]:
     """
     Parse a timestamp string to timezone-aware datetime
@@ -199,14 +234,69 @@ def parse_timestamp_with_timezone(timestamp_str: str, ts_format: str, timezone:
         return None
 
 
-def parse_timestamps_vectorized(timestamps: pd.Series, ts_format: str, timezone: str) -> pd.Series:
+# Candidate timestamp formats tried (after the user-specified one) when sniffing a file
+TIMESTAMP_FORMATS = [
+    '%d/%m/%Y %H:%M',  # European format DD/MM/YYYY HH:MM (common)
+    '%Y-%m-%d %H:%M:%S',  # Default format YYYY-MM-DD HH:MM:SS
+    '%d/%m/%Y %H:%M:%S',  # European format DD/MM/YYYY HH:MM:SS
+    '%m/%d/%Y %H:%M',  # US format MM/DD/YYYY HH:MM
+    '%m/%d/%Y %H:%M:%S',  # US format MM/DD/YYYY HH:MM:SS
+    '%Y-%m-%d %H:%M',  # ISO format without seconds
+    '%Y-%m-%d %H:%M:%S.%f',  # With microseconds
+    '%d-%m-%Y %H:%M:%S',  # European with dashes
+    '%d-%m-%Y %H:%M',  # European with dashes, no seconds
+]
+
+
+def detect_timestamp_format(sample: pd.Series, ts_format: str, sample_size: int = 500) -> Optional[str]:
+    """
+    Detect the timestamp format from a sample of distinct timestamp strings
+    
+    Args:
+        sample: Series of (cleaned) timestamp strings
+        ts_format: User-specified format, tried first
+        sample_size: Maximum number of distinct values to test
+        
+    Returns:
+        Best matching format string, or None if no format parses at least half the sample
+    """
+    sample = pd.Series(pd.unique(sample.dropna()))[:sample_size]
+    if sample.empty:
+        return None
+    
+    best_format = None
+    best_rate = 0.5  # At least 50% success rate
+    for fmt in [ts_format] + [f for f in TIMESTAMP_FORMATS if f != ts_format]:
+        try:
+            success_rate = pd.to_datetime(sample, format=fmt, errors='coerce').notna().mean()
+        except Exception as e:
+            logger.debug(f"Format {fmt} failed: {e}")
+            continue
+        
+        if success_rate > best_rate:
+            best_format, best_rate = fmt, success_rate
+            if success_rate > 0.9:  # Very good success rate, use this format
+                break
+    
+    return best_format
+
+
+def parse_timestamps_vectorized(timestamps: pd.Series, ts_format: str, timezone: str,
+                                parse_state: Optional[dict] = None) -> pd.Series:
     """
     Parse a series of timestamps to timezone-aware datetimes using vectorized operations
     
+    Timestamps repeat across every link of a polling cycle, so only the distinct
+    strings are parsed and localized; results are broadcast back through
+    factorize codes. The format is sniffed once and cached in ``parse_state``
+    so subsequent chunks of the same file skip detection.
+    
     Args:
         timestamps: Series of timestamp strings
         ts_format: Format string for parsing
         timezone: Timezone string
+        parse_state: Optional per-file dict caching the detected format and
+            accumulating throughput counters ('format', 'rows', 'unique_values', 'seconds')
         
     Returns:
         Series of timezone-aware pandas Timestamps
@@ -215,138 +305,90 @@ def parse_timestamps_vectorized(timestamps: pd.Series, ts_format: str, timezone:
     
     # Handle empty or all-null series
     if timestamps.empty or timestamps.isna().all():
-        return pd.Series(dtype='datetime64[ns, UTC]')
-    
-    # Clean timestamp strings first - remove leading/trailing whitespace
-    cleaned_timestamps = timestamps.astype(str).str.strip()
+        return pd.Series(pd.NaT, index=timestamps.index, dtype=pd.DatetimeTZDtype(tz=timezone))
     
-    # Log sample timestamps for debugging
-    logger.debug(f"Sample timestamps to parse: {cleaned_timestamps.head(3).tolist()}")
+    if parse_state is None:
+        parse_state = {}
+    parse_start = datetime.now()
     
     try:
-        # Try multiple timestamp formats for better compatibility
-        timestamp_formats = [
-            ts_format,  # User-specified format
-            '%d/%m/%Y %H:%M',  # European format DD/MM/YYYY HH:MM (common)
-            '%Y-%m-%d %H:%M:%S',  # Default format YYYY-MM-DD HH:MM:SS
-            '%d/%m/%Y %H:%M:%S',  # European format DD/MM/YYYY HH:MM:SS
-            '%m/%d/%Y %H:%M',  # US format MM/DD/YYYY HH:MM
-            '%m/%d/%Y %H:%M:%S',  # US format MM/DD/YYYY HH:MM:SS
-            '%Y-%m-%d %H:%M',  # ISO format without seconds
-            '%Y-%m-%d %H:%M:%S.%f',  # With microseconds
-            '%d-%m-%Y %H:%M:%S',  # European with dashes
-            '%d-%m-%Y %H:%M',  # European with dashes, no seconds
-        ]
-        
-        parsed_series = None
-        successful_format = None
-        failed_count = len(timestamps)
-        
-        # Try each format until we find one that works well
-        for fmt in timestamp_formats:
-            try:
-                test_parsed = pd.to_datetime(cleaned_timestamps, format=fmt, errors='coerce')
-                test_failed_count = test_parsed.isna().sum() - timestamps.isna().sum()
-                success_rate = (len(timestamps) - test_failed_count) / len(timestamps)
-                
-                if success_rate > 0.5:  # At least 50% success rate
-                    parsed_series = test_parsed
-                    failed_count = test_failed_count
-                    successful_format = fmt
-                    if success_rate > 0.9:  # Very good success rate, use this format
-                        break
-            except Exception as e:
-                logger.debug(f"Format {fmt} failed: {e}")
-                continue
+        # Parse distinct values only - clean timestamp strings (strip whitespace) on uniques
+        codes, uniques = pd.factorize(timestamps)
+        cleaned_uniques = pd.Series(uniques).astype(str).str.strip()
+        
+        # Log sample timestamps for debugging
+        logger.debug(f"Sample timestamps to parse: {cleaned_uniques.head(3).tolist()}")
+        
+        successful_format = parse_state.get('format')
+        parsed_uniques = None
+        if successful_format and successful_format != 'automatic':
+            parsed_uniques = pd.to_datetime(cleaned_uniques, format=successful_format, errors='coerce')
+            if parsed_uniques.isna().mean() > 0.5:
+                logger.warning(f"Cached timestamp format '{successful_format}' no longer matches, re-detecting")
+                parsed_uniques = None
+        
+        if parsed_uniques is None:
+            successful_format = detect_timestamp_format(cleaned_uniques, ts_format)
+            if successful_format is not None:
+                parsed_uniques = pd.to_datetime(cleaned_uniques, format=successful_format, errors='coerce')
         
         # Fallback to automatic parsing if no format worked well
-        if parsed_series is None or failed_count > len(timestamps) * 0.5:
+        if parsed_uniques is None or parsed_uniques.isna().mean() > 0.5:
             logger.warning(f"Trying automatic timestamp parsing as fallback")
-            parsed_series = pd.to_datetime(cleaned_timestamps, errors='coerce')
-            failed_count = parsed_series.isna().sum() - timestamps.isna().sum()
+            parsed_uniques = pd.to_datetime(cleaned_uniques, errors='coerce')
             successful_format = "automatic"
         
-        if failed_count > 0:
+        if parse_state.get('format') != successful_format:
+            logger.info(f"Detected timestamp format: {successful_format}")
+        parse_state['format'] = successful_format
+        
+        failed_uniques = parsed_uniques.isna()
+        if failed_uniques.any():
+            failed_count = int(np.isin(codes, np.flatnonzero(failed_uniques.to_numpy())).sum())
             logger.warning(f"{failed_count} timestamps failed to parse and were set to NaT (format: {successful_format})")
             
             # Log some failed examples for debugging
-            failed_mask = parsed_series.isna() & timestamps.notna()
-            if failed_mask.any():
-                failed_examples = cleaned_timestamps[failed_mask].head(3).tolist()
-                logger.warning(f"Failed timestamp examples: {failed_examples}")
+            failed_examples = cleaned_uniques[failed_uniques].head(3).tolist()
+            logger.warning(f"Failed timestamp examples: {failed_examples}")
         else:
             logger.info(f"Successfully parsed all timestamps using format: {successful_format}")
         
-        # Localize to timezone if naive
-        if parsed_series.dt.tz is None:
-            try:
-                # Try to localize all at once
-                parsed_series = parsed_series.dt.tz_localize(timezone)
-            except pytz.AmbiguousTimeError:
-                # Handle DST transitions by processing individually
-                logger.warning("Detected ambiguous times during DST transition, processing individually")
-                parsed_series = parsed_series.apply(
-                    lambda x: _handle_dst_transition(x, timezone) if pd.notna(x) else x
-                )
-            except pytz.NonExistentTimeError:
-                # Handle non-existent times (spring forward)
-                logger.warning("Detected non-existent times during DST transition, processing individually")
-                parsed_series = parsed_series.apply(
-                    lambda x: _handle_dst_transition(x, timezone) if pd.notna(x) else x
-                )
+        # Localize distinct values to timezone if naive
+        parsed_index = pd.DatetimeIndex(parsed_uniques)
+        if parsed_index.tz is None:
+            # DST: ambiguous fall-back times resolve to standard time, non-existent
+            # spring-forward times shift forward one hour
+            parsed_index = parsed_index.tz_localize(
+                timezone,
+                ambiguous=np.zeros(len(parsed_index), dtype=bool),
+                nonexistent=pd.Timedelta(hours=1)
+            )
         else:
             # Convert to target timezone if already timezone-aware
-            parsed_series = parsed_series.dt.tz_convert(timezone)
+            parsed_index = parsed_index.tz_convert(timezone)
+        
+        # Broadcast back to rows (code -1 marks nulls and maps to NaT)
+        parsed_series = pd.Series(
+            parsed_index.take(codes, allow_fill=True, fill_value=pd.NaT),
+            index=timestamps.index
+        )
+        
+        elapsed = (datetime.now() - parse_start).total_seconds()
+        parse_state['rows'] = parse_state.get('rows', 0) + len(timestamps)
+        parse_state['unique_values'] = parse_state.get('unique_values', 0) + len(uniques)
+        parse_state['seconds'] = parse_state.get('seconds', 0.0) + elapsed
         
         success_count = len(parsed_series) - parsed_series.isna().sum()
-        logger.info(f"Successfully parsed {success_count} timestamps")
+        logger.info(f"Successfully parsed {success_count} timestamps ({len(uniques):,} distinct) in {elapsed:.3f}s")
         return parsed_series
         
     except Exception as e:
         logger.error(f"Failed to parse timestamps vectorized, falling back to individual parsing: {e}")
         # Fallback to individual parsing
+        cleaned_timestamps = timestamps.astype(str).str.strip()
         return cleaned_timestamps.apply(lambda x: parse_timestamp_with_timezone(x, ts_format, timezone))
 
 
-def _handle_dst_transition(dt: pd.Timestamp, timezone: str) -> pd.Timestamp:
-    """
-    Handle DST transition edge cases for individual timestamps
-    
-    Args:
-        dt: Naive pandas Timestamp
-        timezone: Target timezone string
-        
-    Returns:
-        Timezone-aware pandas Timestamp
-    """
-    try:
-        tz = pytz.timezone(timezone)
-        # Convert to python datetime for pytz handling
-        py_dt = dt.to_pydatetime()
-        # Localize with DST handling (assume standard time for ambiguous)
-        localized = tz.localize(py_dt, is_dst=False)
-        return pd.Timestamp(localized)
-    except pytz.AmbiguousTimeError:
-        # Time exists twice (fall back), choose standard time
-        logger.warning(f"Ambiguous time {dt} in {timezone}, choosing standard time")
-        tz = pytz.timezone(timezone)
-        py_dt = dt.to_pydatetime()
-        localized = tz.localize(py_dt, is_dst=False)
-        return pd.Timestamp(localized)
-    except pytz.NonExistentTimeError:
-        # Time doesn't exist (spring forward), shift forward
-        logger.warning(f"Non-existent time {dt} in {timezone}, shifting forward 1 hour")
-        tz = pytz.timezone(timezone)
-        py_dt = dt.to_pydatetime()
-        # Add 1 hour and localize
-        shifted_dt = py_dt.replace(hour=py_dt.hour + 1)
-        localized = tz.localize(shifted_dt, is_dst=True)
-        return pd.Timestamp(localized)
-    except Exception as e:
-        logger.error(f"Failed to handle DST transition for {dt}: {e}")
-        return pd.NaT
-
-
 def validate_timezone(timezone: str) -> bool:
     """
     Validate that a timezone string is valid
@@ -386,18 +428,19 @@ def validate_timestamp_format(ts_format: str, sample_timestamp: str) -> bool:
         return False
 
 
-def determine_data_validity(df: pd.DataFrame, params: dict) -> Tuple[pd.DataFrame, dict]:
+def determine_data_validity(df: pd.DataFrame, params: dict, inplace: bool = False) -> Tuple[pd.DataFrame, dict]:
     """
     Determine data validity using available validity columns or numeric range rules
     
     Args:
         df: DataFrame with normalized column names
         params: Dictionary containing validation parameters
+        inplace: Add is_valid to df itself instead of a copy
         
     Returns:
         Tuple of (DataFrame with is_valid column, validity_stats dict)
     """
-    df_with_validity = df.copy()
+    df_with_validity = df if inplace else df.copy()
     validity_stats = {
         'method_used': None,
         'total_rows': len(df),
@@ -440,7 +483,7 @@ def determine_data_validity(df: pd.DataFrame, params: dict) -> Tuple[pd.DataFram
         validity_stats['valid_rows'] = df_with_validity['is_valid'].sum()
         
         # Count invalid reasons by code
-        invalid_codes = df[~df_with_validity['is_valid']]['valid_code'].value_counts()
+        invalid_codes = df_with_validity.loc[~df_with_validity['is_valid'], 'valid_code'].value_counts()
         validity_stats['invalid_reasons'] = invalid_codes.to_dict()
         
         return df_with_validity, validity_stats
@@ -449,73 +492,65 @@ def determine_data_validity(df: pd.DataFrame, params: dict) -> Tuple[pd.DataFram
     logger.info("Using numeric range validation rules for validity determination")
     validity_stats['method_used'] = 'numeric_range_rules'
     
-    # Initialize validity as True for all rows
-    df_with_validity['is_valid'] = True
+    # Combine the per-rule masks and assign is_valid once
+    invalid_mask = np.zeros(len(df), dtype=bool)
     invalid_reasons = {}
     
-    # Duration validation
-    duration_range = params.get('duration_range_sec', [0, float('inf')])
-    if len(duration_range) == 2:
-        # Ensure duration column is not categorical for comparison
-        if pd.api.types.is_categorical_dtype(df['duration']):
-            df['duration'] = df['duration'].astype(float)
-        
-        duration_invalid = (
-            (df['duration'] < duration_range[0]) | 
-            (df['duration'] > duration_range[1]) |
-            pd.isna(df['duration'])
-        )
-        df_with_validity.loc[duration_invalid, 'is_valid'] = False
-        invalid_reasons['duration_out_of_range'] = duration_invalid.sum()
-    
-    # Distance validation
-    distance_range = params.get('distance_range_m', [0, float('inf')])
-    if len(distance_range) == 2:
-        # Ensure distance column is not categorical for comparison
-        if pd.api.types.is_categorical_dtype(df['distance']):
-            df['distance'] = df['distance'].astype(float)
-        
-        distance_invalid = (
-            (df['distance'] < distance_range[0]) | 
-            (df['distance'] > distance_range[1]) |
-            pd.isna(df['distance'])
-        )
-        df_with_validity.loc[distance_invalid, 'is_valid'] = False
-        invalid_reasons['distance_out_of_range'] = distance_invalid.sum()
-    
-    # Speed validation
-    speed_range = params.get('speed_range_kmh', [0, float('inf')])
-    if len(speed_range) == 2:
-        # Ensure speed column is not categorical for comparison
-        if pd.api.types.is_categorical_dtype(df['speed']):
-            df['speed'] = df['speed'].astype(float)
-        
-        speed_invalid = (
-            (df['speed'] < speed_range[0]) | 
-            (df['speed'] > speed_range[1]) |
-            pd.isna(df['speed'])
-        )
-        df_with_validity.loc[speed_invalid, 'is_valid'] = False
-        invalid_reasons['speed_out_of_range'] = speed_invalid.sum()
+    range_rules = [
+        ('duration', params.get('duration_range_sec', [0, float('inf')]), 'duration_out_of_range'),
+        ('distance', params.get('distance_range_m', [0, float('inf')]), 'distance_out_of_range'),
+        ('speed', params.get('speed_range_kmh', [0, float('inf')]), 'speed_out_of_range')
+    ]
+    for column, valid_range, reason in range_rules:
+        if len(valid_range) != 2:
+            continue
+        
+        # Compare on a float view so categorical columns stay untouched in the frame
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(float)
+        
+        rule_invalid = ((values < valid_range[0]) | (values > valid_range[1]) | values.isna()).to_numpy()
+        invalid_mask |= rule_invalid
+        invalid_reasons[reason] = int(rule_invalid.sum())
     
+    df_with_validity['is_valid'] = ~invalid_mask
     validity_stats['valid_rows'] = df_with_validity['is_valid'].sum()
     validity_stats['invalid_reasons'] = invalid_reasons
     
     return df_with_validity, validity_stats
 
 
-def remove_duplicates(df: pd.DataFrame, params: dict) -> Tuple[pd.DataFrame, dict]:
+def _seen_before(hashes: np.ndarray, seen_keys: dict, key: str) -> np.ndarray:
+    """Mask of hashes already recorded under key in seen_keys (a sorted unique array)"""
+    seen = seen_keys.get(key)
+    if seen is None or len(seen) == 0:
+        return np.zeros(len(hashes), dtype=bool)
+    positions = np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)
+    return seen[positions] == hashes
+
+
+def _remember_keys(hashes: np.ndarray, seen_keys: dict, key: str) -> None:
+    """Add hashes to the sorted unique array stored under key"""
+    seen = seen_keys.get(key)
+    seen_keys[key] = np.unique(hashes) if seen is None else np.union1d(seen, hashes)
+
+
+def remove_duplicates(df: pd.DataFrame, params: dict, inplace: bool = False,
+                      seen_keys: Optional[dict] = None) -> Tuple[pd.DataFrame, dict]:
     """
     Remove duplicates based on DataID or link+timestamp combinations
     
     Args:
         df: DataFrame to deduplicate
         params: Dictionary containing deduplication parameters
+        inplace: Return df itself when no rows are removed instead of a copy
+        seen_keys: Key hashes from earlier chunks of the same file, updated in place, so
+            chunked reads drop the same rows as deduplicating the whole file at once
         
     Returns:
         Tuple of (deduplicated DataFrame, deduplication_stats dict)
     """
-    df_dedup = df.copy()
     dedup_stats = {
         'original_rows': len(df),
         'duplicates_removed': 0,
@@ -523,12 +558,18 @@ def remove_duplicates(df: pd.DataFrame, params: dict) -> Tuple[pd.DataFrame, dic
         'method_used': []
     }
     
+    # Build one keep mask across both methods so rows are taken at most once
+    keep = np.ones(len(df), dtype=bool)
+    
     # Method 1: Remove exact duplicates by DataID
     if params.get('remove_data_id_duplicates', True) and 'data_id' in df.columns:
         logger.info("Removing duplicates by DataID")
-        initial_count = len(df_dedup)
-        df_dedup = df_dedup.drop_duplicates(subset=['data_id'], keep='first')
-        data_id_duplicates = initial_count - len(df_dedup)
+        keep &= ~df['data_id'].duplicated(keep='first').to_numpy()
+        if seen_keys is not None:
+            data_id_hashes = pd.util.hash_pandas_object(df['data_id'], index=False).to_numpy()
+            keep &= ~_seen_before(data_id_hashes, seen_keys, 'data_id')
+            _remember_keys(data_id_hashes, seen_keys, 'data_id')
+        data_id_duplicates = len(df) - int(keep.sum())
         dedup_stats['duplicates_removed'] += data_id_duplicates
         dedup_stats['method_used'].append(f'data_id_duplicates: {data_id_duplicates}')
         logger.info(f"Removed {data_id_duplicates} DataID duplicates")
@@ -537,15 +578,27 @@ def remove_duplicates(df: pd.DataFrame, params: dict) -> Tuple[pd.DataFrame, dic
     if params.get('remove_link_timestamp_duplicates', True):
         if 'name' in df.columns and 'timestamp' in df.columns:
             logger.info("Removing duplicates by link+timestamp")
-            initial_count = len(df_dedup)
-            df_dedup = df_dedup.drop_duplicates(subset=['name', 'timestamp'], keep='first')
-            link_timestamp_duplicates = initial_count - len(df_dedup)
+            initial_count = int(keep.sum())
+            remaining = np.flatnonzero(keep)
+            link_timestamp = df[['name', 'timestamp']].iloc[remaining]
+            link_timestamp_dup = link_timestamp.duplicated(keep='first').to_numpy()
+            if seen_keys is not None:
+                pair_hashes = pd.util.hash_pandas_object(link_timestamp, index=False).to_numpy()
+                link_timestamp_dup |= _seen_before(pair_hashes, seen_keys, 'link_timestamp')
+                _remember_keys(pair_hashes[~link_timestamp_dup], seen_keys, 'link_timestamp')
+            keep[remaining[link_timestamp_dup]] = False
+            link_timestamp_duplicates = initial_count - int(keep.sum())
             dedup_stats['duplicates_removed'] += link_timestamp_duplicates
             dedup_stats['method_used'].append(f'link_timestamp_duplicates: {link_timestamp_duplicates}')
             logger.info(f"Removed {link_timestamp_duplicates} link+timestamp duplicates")
         else:
             logger.warning("Cannot remove link+timestamp duplicates: missing 'name' or 'timestamp' columns")
     
+    if keep.all():
+        df_dedup = df if inplace else df.copy()
+    else:
+        df_dedup = df.take(np.flatnonzero(keep))
+    
     dedup_stats['final_rows'] = len(df_dedup)
     
     return df_dedup, dedup_stats
@@ -624,12 +677,13 @@ def apply_data_validation_and_cleaning(df: pd.DataFrame, params: dict) -> Tuple[
     return df_cleaned, processing_stats
 
 
-def validate_and_normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+def validate_and_normalize_columns(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Validate required columns exist and normalize all column names
     
     Args:
         df: Input DataFrame to validate and normalize
+        inplace: Rename the columns of df itself instead of a copy
         
     Returns:
         DataFrame with validated and normalized columns
@@ -650,23 +704,24 @@ def validate_and_normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
         raise ValueError(error_msg)
     
     # Normalize column names
-    df_normalized = normalize_column_names(df)
+    df_normalized = normalize_column_names(df, inplace=inplace)
     
     logger.info(f"Successfully validated and normalized {len(df.columns)} columns")
     return df_normalized
 
 
-def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+def optimize_dtypes(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Optimize DataFrame dtypes for memory efficiency and performance
     
     Args:
         df: DataFrame to optimize
+        inplace: Downcast the columns of df itself instead of a copy
         
     Returns:
         DataFrame with optimized dtypes
     """
-    df_optimized = df.copy()
+    df_optimized = df if inplace else df.copy()
     
     # Optimize numeric columns
     for col in df_optimized.select_dtypes(include=['int64']).columns:
@@ -728,156 +783,122 @@ def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
     return df_optimized
 
 
+def _sample_is_integral(values: pd.Series) -> bool:
+    """Whether a sampled column holds only whole numbers (ints, or floats widened by missing values)"""
+    if pd.api.types.is_integer_dtype(values):
+        return True
+    if pd.api.types.is_float_dtype(values):
+        non_null = values.dropna()
+        return bool((non_null == non_null.round()).all())
+    return False
 
 
-def resolve_hebrew_encoding(raw_data: bytes, detected_encoding: Optional[str]) -> str:
-    """Normalize detector output for Hebrew datasets frequently misclassified as Greek."""
-    if not detected_encoding:
-        return 'cp1255'
-
-    normalized = detected_encoding.lower().replace('_', '-')
-    greek_aliases = {'iso-8859-7', 'iso8859-7', 'windows-1253', 'cp1253', 'greek'}
-
-    if normalized in greek_aliases:
-        hebrew_text = raw_data.decode('cp1255', errors='ignore')
-        greek_text = raw_data.decode(detected_encoding, errors='ignore')
-        hebrew_chars = sum(1 for ch in hebrew_text if 0x0590 <= ord(ch) <= 0x05FF)
-        greek_chars = sum(1 for ch in greek_text if 0x0370 <= ord(ch) <= 0x03FF)
-
-        if hebrew_chars and hebrew_chars >= greek_chars:
-            logger.info(
-                "Overriding detected encoding '%s' with cp1255 based on Hebrew character frequency",
-                detected_encoding
-            )
-            return 'cp1255'
-
-    return detected_encoding
-
-def detect_file_encoding(file_path: str, sample_size: int = 8192) -> str:
+def build_dtype_plan(file_path: str, delimiter: str = ',', decimal: str = '.', encoding: str = 'utf-8',
+                     sample_rows: int = 5000, member: Optional[str] = None) -> Optional[dict]:
     """
-    Detect file encoding by trying common encodings
+    Decide the dtypes of a CSV file once, from a sample plus the declared input schema
+    
+    Declared float columns are read as float32 and declared integer columns with fixed
+    nullable widths (only when the sample confirms they are integral); link and day
+    name columns are read as categoricals whose vocabulary is unioned across chunks
+    by apply_dtype_plan, so every chunk ends with identical dtypes.
     
     Args:
-        file_path: Path to file
-        sample_size: Number of bytes to read for detection
+        file_path: Path to CSV file
+        delimiter: Field delimiter
+        decimal: Decimal separator
+        encoding: File encoding
+        sample_rows: Number of rows to sample for integral/numeric checks
+        member: Zip member to sample (default: first CSV in the archive)
         
     Returns:
-        Detected encoding string
+        Plan dict with 'read_dtypes' (original header -> dtype for read_csv) and
+        'categorical_columns' (normalized names), or None if the sample cannot be read
     """
-    # Common encodings to try, in order of preference
-    encodings_to_try = [
-        'utf-8',
-        'utf-8-sig',  # UTF-8 with BOM
-        'cp1255',     # Hebrew Windows encoding
-        'iso-8859-8', # Hebrew ISO encoding
-        'cp1252',     # Western European Windows encoding
-        'latin1',     # Fallback that accepts any byte sequence
-    ]
-    
-    # Try to detect using chardet if available
     try:
-        import chardet
-        with open(file_path, 'rb') as f:
-            raw_data = f.read(sample_size)
-        
-        detected = chardet.detect(raw_data)
-        if detected and detected.get('encoding'):
-            candidate = detected['encoding']
-            confidence = detected.get('confidence') or 0.0
-            resolved = resolve_hebrew_encoding(raw_data, candidate)
-
-            if resolved.lower() != candidate.lower():
-                logger.info(
-                    "Detected encoding %s (confidence %.2f) overridden to %s for Hebrew dataset",
-                    candidate, confidence, resolved
-                )
-                return resolved
-
-            if confidence > 0.7:
-                logger.info("Detected encoding: %s (confidence: %.2f)", resolved, confidence)
-                return resolved
-    except ImportError:
-        logger.debug("chardet not available, using fallback encoding detection")
+        with open_csv_input(file_path, member) as stream:
+            sample = pd.read_csv(
+                stream, delimiter=delimiter, decimal=decimal, encoding=encoding, nrows=sample_rows,
+                na_values=['', 'NA', 'NULL', 'null', 'NaN', 'nan'], keep_default_na=True
+            )
     except Exception as e:
-        logger.debug(f"chardet detection failed: {e}")
+        logger.warning(f"Could not sample {csv_input_name(file_path)} for dtype plan: {e}")
+        return None
     
-    # Fallback: try encodings manually
-    for encoding in encodings_to_try:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                # Try to read a sample
-                sample = f.read(sample_size)
-                # If we can read without errors, this encoding works
-                logger.info(f"Using encoding: {encoding}")
-                return encoding
-        except UnicodeDecodeError:
-            continue
-        except Exception:
+    normalized_names = normalize_column_names(sample.head(0)).columns
+    read_dtypes = {}
+    for original_name, normalized_name in zip(sample.columns, normalized_names):
+        declared = CSV_SCHEMA_DTYPES.get(normalized_name)
+        sample_column = sample[original_name]
+        
+        if normalized_name in CATEGORICAL_COLUMNS:
+            read_dtypes[original_name] = 'category'
+        elif declared is None:
             continue
-    
-    # Last resort: use latin1 which accepts any byte sequence
-    logger.warning("Could not detect encoding reliably, using latin1 as fallback")
-    return 'latin1'
+        elif declared.startswith('float'):
+            # Only plan numeric columns the sample parsed as numbers (e.g. not mis-declared decimals)
+            if pd.api.types.is_numeric_dtype(sample_column):
+                read_dtypes[original_name] = declared
+        elif _sample_is_integral(sample_column):
+            read_dtypes[original_name] = declared
+    
+    plan = {
+        'read_dtypes': read_dtypes,
+        'categorical_columns': list(CATEGORICAL_COLUMNS)
+    }
+    logger.info(f"Dtype plan for {Path(csv_input_name(file_path)).name}: {read_dtypes}")
+    return plan
 
 
-def detect_csv_format(file_path: str, sample_size: int = 1000) -> dict:
+def apply_dtype_plan(df: pd.DataFrame, plan: dict, vocabularies: Dict[str, dict]) -> pd.DataFrame:
     """
-    Detect CSV format parameters (decimal separator, delimiter, encoding) from file sample
+    Bring a chunk to the file's planned dtypes in place and grow the categorical vocabularies
+    
+    Columns derived after reading (e.g. daytype) are converted here; categories seen for the
+    first time are appended to vocabularies[column] in first-seen order.
     
     Args:
-        file_path: Path to CSV file
-        sample_size: Number of bytes to sample for detection
+        df: Chunk owned by the caller
+        plan: Plan returned by build_dtype_plan
+        vocabularies: Per-column ordered vocabularies (dict used as ordered set), updated in place
         
     Returns:
-        Dictionary with detected format parameters
+        The same DataFrame with categorical columns converted
     """
-    format_params = {
-        'delimiter': ',',
-        'decimal': '.',
-        'encoding': 'utf-8'
-    }
+    for col in plan['categorical_columns']:
+        if col not in df.columns:
+            continue
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+        vocabulary = vocabularies.setdefault(col, {})
+        for category in df[col].cat.categories:
+            vocabulary.setdefault(category, None)
+    return df
+
+
+def concat_planned_chunks(chunks: List[pd.DataFrame], vocabularies: Dict[str, dict]) -> pd.DataFrame:
+    """
+    Concatenate chunks that follow one dtype plan without dtype reconciliation
     
-    # First, detect encoding
-    encoding = detect_file_encoding(file_path)
-    format_params['encoding'] = encoding
+    Each chunk's categoricals are re-coded onto the union vocabulary (a code remap,
+    no string work), so every column has one dtype across chunks and concat keeps it.
     
-    try:
-        # Read a small sample of the file with detected encoding
-        with open(file_path, 'r', encoding=encoding, errors='replace') as f:
-            sample = f.read(sample_size)
-        
-        # Count potential delimiters
-        delimiter_counts = {
-            ',': sample.count(','),
-            ';': sample.count(';'),
-            '\t': sample.count('\t'),
-            '|': sample.count('|')
-        }
-        
-        # Choose delimiter with highest count
-        best_delimiter = max(delimiter_counts, key=delimiter_counts.get)
-        if delimiter_counts[best_delimiter] > 0:
-            format_params['delimiter'] = best_delimiter
-        
-        # Detect decimal separator by looking for patterns
-        # Look for numbers with decimal points vs commas
-        import re
-        decimal_point_pattern = r'\d+\.\d+'
-        decimal_comma_pattern = r'\d+,\d+'
-        
-        decimal_points = len(re.findall(decimal_point_pattern, sample))
-        decimal_commas = len(re.findall(decimal_comma_pattern, sample))
-        
-        # If we find more decimal commas and delimiter is not comma, use comma as decimal
-        if decimal_commas > decimal_points and format_params['delimiter'] != ',':
-            format_params['decimal'] = ','
-        
-        logger.info(f"Detected CSV format: delimiter='{format_params['delimiter']}', decimal='{format_params['decimal']}'")
+    Args:
+        chunks: Chunks processed with apply_dtype_plan
+        vocabularies: Union vocabularies collected by apply_dtype_plan
         
-    except Exception as e:
-        logger.warning(f"Could not detect CSV format, using defaults: {e}")
-    
-    return format_params
+    Returns:
+        Combined DataFrame
+    """
+    # Sorted so groupby output order matches plain string columns
+    union_dtypes = {
+        col: pd.CategoricalDtype(sorted(vocabulary, key=str)) for col, vocabulary in vocabularies.items()
+    }
+    for chunk in chunks:
+        for col, dtype in union_dtypes.items():
+            if col in chunk.columns and chunk[col].dtype != dtype:
+                chunk[col] = chunk[col].cat.set_categories(dtype.categories)
+    return pd.concat(chunks, ignore_index=True)
 
 
 def configure_chunk_size(file_path: str, available_memory_gb: float = 2.0) -> int:
@@ -893,7 +914,7 @@ def configure_chunk_size(file_path: str, available_memory_gb: float = 2.0) -> in
     """
     try:
         # Get file size
-        file_size_bytes = Path(file_path).stat().st_size
+        file_size_bytes = csv_input_size(file_path)
         file_size_mb = file_size_bytes / (1024 * 1024)
         
         # Estimate rows per MB (rough estimate: ~1000 rows per MB for typical CSV)
@@ -919,34 +940,486 @@ def configure_chunk_size(file_path: str, available_memory_gb: float = 2.0) -> in
         return 10000  # Default fallback
 
 
-def read_csv_chunked(file_path: str, params: dict) -> Tuple[pd.DataFrame, dict]:
+@dataclass(frozen=True)
+class PipelineStage:
+    """
+    A per-chunk processing stage that mutates a frame owned by the stage runner
+    
+    reads/writes document the column contract; '*' in writes means the stage may
+    rename or re-type any existing column. Stages return the frame to continue with,
+    which is the same object unless the stage removed rows.
+    """
+    name: str
+    func: Callable[[pd.DataFrame, dict, dict], pd.DataFrame]
+    reads: Tuple[str, ...]
+    writes: Tuple[str, ...]
+
+
+def _stage_normalize_columns(df: pd.DataFrame, params: dict, context: dict) -> pd.DataFrame:
+    # A projected read was validated on the full header; its chunks lack the skipped columns
+    if context.get('projected_columns'):
+        return normalize_column_names(df, inplace=True)
+    return validate_and_normalize_columns(df, inplace=True)
+
+
+def _stage_prune_rows(df: pd.DataFrame, params: dict, context: dict) -> pd.DataFrame:
+    predicate = context.get('row_predicate')
+    if predicate is None or df.empty or 'timestamp' not in df.columns:
+        return df
+    
+    # Parse timestamps here so filters can prune before validation, dedup and enrichment
+    if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        df['timestamp'] = parse_timestamps_vectorized(
+            df['timestamp'], params.get('ts_format', '%Y-%m-%d %H:%M:%S'),
+            params.get('tz', 'Asia/Jerusalem'), context.get('parse_state')
+        )
+    
+    keep = predicate(df)
+    rows_pruned = len(df) - int(keep.sum())
+    context['rows_pruned'] = context.get('rows_pruned', 0) + rows_pruned
+    return df if rows_pruned == 0 else df.take(np.flatnonzero(keep))
+
+
+def _stage_data_validity(df: pd.DataFrame, params: dict, context: dict) -> pd.DataFrame:
+    df, context['validity_stats'] = determine_data_validity(df, params, inplace=True)
+    return df
+
+
+def _stage_remove_duplicates(df: pd.DataFrame, params: dict, context: dict) -> pd.DataFrame:
+    # Keys seen in earlier chunks make the result independent of chunk boundaries
+    df, context['dedup_stats'] = remove_duplicates(
+        df, params, inplace=True, seen_keys=context.setdefault('dedup_seen', {})
+    )
+    return df
+
+
+def _stage_temporal_enhancements(df: pd.DataFrame, params: dict, context: dict) -> pd.DataFrame:
+    return apply_temporal_enhancements(df, params, context.get('parse_state'), inplace=True)
+
+
+def _stage_optimize_dtypes(df: pd.DataFrame, params: dict, context: dict) -> pd.DataFrame:
+    # With a per-file dtype plan the chunk already has its final dtypes except derived categoricals
+    if context.get('dtype_plan') is not None:
+        return apply_dtype_plan(df, context['dtype_plan'], context.setdefault('category_vocabularies', {}))
+    return optimize_dtypes(df, inplace=True)
+
+
+CHUNK_STAGES = (
+    PipelineStage('normalize_columns', _stage_normalize_columns,
+                  reads=tuple(REQUIRED_COLUMNS), writes=('*',)),
+    PipelineStage('prune_rows', _stage_prune_rows,
+                  reads=('timestamp', 'name', 'day_in_week'), writes=('timestamp',)),
+    PipelineStage('determine_data_validity', _stage_data_validity,
+                  reads=('valid', 'is_valid', 'valid_code', 'duration', 'distance', 'speed'),
+                  writes=('is_valid',)),
+    PipelineStage('remove_duplicates', _stage_remove_duplicates,
+                  reads=('data_id', 'name', 'timestamp'), writes=()),
+    PipelineStage('apply_temporal_enhancements', _stage_temporal_enhancements,
+                  reads=('timestamp', 'day_in_week', 'day_type'),
+                  writes=('timestamp', 'date', 'hour_of_day', 'iso_week', 'weekday_index',
+                          'daytype', 'is_holiday', 'holiday_name')),
+    PipelineStage('optimize_dtypes', _stage_optimize_dtypes, reads=(), writes=('*',)),
+)
+
+
+def select_read_columns(file_path: str, delimiter: str, encoding: str, params: dict,
+                        header: Optional[List[str]] = None) -> Optional[List[str]]:
+    """
+    Column projection for read_csv: every header column except those the aggregation never reads
+    
+    Returns None (read everything) when projection is disabled or the header is missing
+    required columns, so chunk validation still reports them as before. The header is
+    read from the file unless the caller already has it.
+    """
+    if not params.get('project_columns', True):
+        return None
+    
+    if header is None:
+        header = read_csv_header(file_path, delimiter, encoding, params.get('zip_member'))
+        if header is None:
+            return None
+    
+    is_valid, _ = validate_csv_columns(pd.DataFrame(columns=header))
+    if not is_valid:
+        return None
+    return [col for col in header if col not in AGGREGATION_UNUSED_COLUMNS]
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB, or None when psutil is not installed"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+class AdaptiveChunkSizer:
+    """
+    Resize CSV chunks toward a memory budget from measured cost instead of a rows-per-MB guess
+    
+    After each chunk the controller measures bytes per input row of the processed
+    (dtype-optimized) frame and the process RSS, then sizes the next chunk so it
+    fits a fixed share of the remaining headroom under the budget: chunks shrink
+    as memory fills up and grow (at most doubling per step) while there is room.
+    """
+    
+    # Share of the remaining headroom one chunk may use; the raw chunk and its
+    # processed copy coexist while the stages run
+    HEADROOM_SHARE = 0.2
+    MAX_GROWTH = 2.0
+    
+    def __init__(self, initial_size: int, memory_budget_mb: float,
+                 min_size: int = 1000, max_size: int = 1000000):
+        self.size = initial_size
+        self.memory_budget_mb = memory_budget_mb
+        self.min_size = min_size
+        self.max_size = max_size
+        self.bytes_per_row = None
+        self.peak_rss_mb = None
+        self.retained_mb = 0.0
+        self.history = []
+    
+    def update(self, rows_read: int, frame_bytes: int, rss_mb: Optional[float] = None) -> int:
+        """
+        Record one processed chunk and return the size for the next one
+        
+        Args:
+            rows_read: Rows read from the file for this chunk (before pruning)
+            frame_bytes: Deep memory usage of the processed chunk
+            rss_mb: Current process RSS in MB (None without psutil; retained bytes are used instead)
+            
+        Returns:
+            Number of rows to read for the next chunk
+        """
+        if rows_read <= 0:
+            return self.size
+        
+        # Processed chunks are kept until the final concat, so they count against the budget
+        self.retained_mb += frame_bytes / (1024 * 1024)
+        bytes_per_row = max(frame_bytes / rows_read, 1.0)
+        self.bytes_per_row = bytes_per_row if self.bytes_per_row is None else 0.5 * (self.bytes_per_row + bytes_per_row)
+        
+        used_mb = rss_mb if rss_mb is not None else self.retained_mb
+        if rss_mb is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss_mb)
+        
+        headroom_mb = max(self.memory_budget_mb - used_mb, 0.0)
+        target = int(headroom_mb * self.HEADROOM_SHARE * 1024 * 1024 / self.bytes_per_row)
+        target = min(target, int(self.size * self.MAX_GROWTH))
+        next_size = max(self.min_size, min(target, self.max_size))
+        
+        self.history.append({
+            'rows': rows_read,
+            'bytes_per_row': round(bytes_per_row, 1),
+            'rss_mb': round(rss_mb, 1) if rss_mb is not None else None,
+            'next_size': next_size
+        })
+        self.size = next_size
+        return next_size
+    
+    def summary(self) -> dict:
+        """Chunk sizing record for validation_stats['chunk_sizing']"""
+        return {
+            'memory_budget_mb': round(self.memory_budget_mb, 1),
+            'chunk_sizes': [record['rows'] for record in self.history],
+            'bytes_per_row': round(self.bytes_per_row, 1) if self.bytes_per_row is not None else None,
+            'peak_rss_mb': round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            'history': self.history
+        }
+
+
+class SpillBuffer:
+    """
+    Move processed chunks to local Arrow IPC (or Parquet) files when RSS nears the memory budget
+
+    Rows are hash-partitioned by link name into buckets, so every (link, date, hour)
+    group lives in exactly one bucket and the final merge can stream the buckets
+    back one at a time through filtering and the hourly aggregation. Pieces are
+    read back in the order they were read from the input (file, then chunk), so
+    each group sees its rows in the same order as the in-memory path.
+    """
+
+    FORMATS = ('arrow', 'parquet')
+
+    def __init__(self, spill_dir: Union[str, Path], memory_budget_mb: float, threshold: float = 0.8,
+                 n_buckets: int = 16, file_format: str = 'arrow'):
+        """
+        Args:
+            spill_dir: Parent folder for the spill files (a private subfolder is created on first spill)
+            memory_budget_mb: Process RSS budget in MB
+            threshold: Share of the budget at which held chunks are spilled
+            n_buckets: Number of link-name hash partitions
+            file_format: 'arrow' (IPC, lz4 when available) or 'parquet'
+        """
+        if file_format not in self.FORMATS:
+            raise ValueError(f"spill_format must be one of {self.FORMATS}, got {file_format!r}")
+        self.spill_root = Path(spill_dir)
+        self.spill_dir = None
+        self.memory_budget_mb = memory_budget_mb
+        self.threshold_mb = memory_budget_mb * threshold
+        self.n_buckets = n_buckets
+        self.file_format = file_format
+        self.current_file = 0
+        self.pieces = []
+        self.events = 0
+        self.bytes_written = 0
+        self.write_seconds = 0.0
+        self.read_seconds = 0.0
+        self.peak_rss_mb = None
+
+    @classmethod
+    def from_params(cls, params: dict, output_dir: Union[str, Path]) -> 'SpillBuffer':
+        """Spill buffer configured from run parameters (memory_budget_mb, spill_* keys)"""
+        memory_budget_mb = params.get('memory_budget_mb')
+        if memory_budget_mb is None:
+            memory_budget_mb = params.get('available_memory_gb', 2.0) * 1024
+        return cls(
+            params.get('spill_dir') or Path(output_dir) / '.spill',
+            memory_budget_mb,
+            threshold=params.get('spill_threshold', 0.8),
+            n_buckets=params.get('spill_buckets', 16),
+            file_format=params.get('spill_format', 'arrow')
+        )
+
+    @property
+    def spilled(self) -> bool:
+        return bool(self.pieces)
+
+    def should_spill(self) -> bool:
+        """True once process RSS reaches the spill threshold (never without psutil)"""
+        rss_mb = _current_rss_mb()
+        if rss_mb is None:
+            return False
+        self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss_mb)
+        return rss_mb >= self.threshold_mb
+
+    def _bucket_codes(self, names: pd.Series) -> np.ndarray:
+        """Bucket of every row from a stable hash of its link name (hashed once per category)"""
+        if isinstance(names.dtype, pd.CategoricalDtype):
+            category_buckets = pd.util.hash_array(names.cat.categories.astype(str).to_numpy(dtype=object)) % self.n_buckets
+            codes = names.cat.codes.to_numpy()
+            return np.where(codes >= 0, category_buckets[codes], 0).astype(np.int64)
+        return (pd.util.hash_array(names.astype(str).to_numpy(dtype=object)) % self.n_buckets).astype(np.int64)
+
+    def write(self, frames: List[pd.DataFrame], file_index: Optional[int] = None) -> None:
+        """
+        Append held frames to the bucket files; the caller drops its references afterwards
+
+        Args:
+            frames: Processed chunks (or whole-file frames) in read order
+            file_index: Input file the frames came from (defaults to current_file)
+        """
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return
+        import pyarrow as pa
+
+        start = time.perf_counter()
+        if self.spill_dir is None:
+            import tempfile
+            self.spill_root.mkdir(parents=True, exist_ok=True)
+            self.spill_dir = Path(tempfile.mkdtemp(prefix='spill_', dir=self.spill_root))
+
+        # Stable sort by bucket once per frame, then slice each bucket out
+        sliced = []
+        for frame in frames:
+            buckets = self._bucket_codes(frame['name'])
+            order = np.argsort(buckets, kind='stable')
+            bounds = np.searchsorted(buckets[order], np.arange(self.n_buckets + 1))
+            sliced.append((frame, order, bounds))
+
+        sequence = (self.current_file if file_index is None else file_index, len(self.pieces))
+        for bucket in range(self.n_buckets):
+            parts = [frame.take(order[bounds[bucket]:bounds[bucket + 1]])
+                     for frame, order, bounds in sliced if bounds[bucket + 1] > bounds[bucket]]
+            if not parts:
+                continue
+            piece = concat_file_frames(parts) if len(parts) > 1 else parts[0].reset_index(drop=True)
+            table = pa.Table.from_pandas(piece, preserve_index=False)
+            path = self.spill_dir / f"bucket{bucket:03d}_{len(self.pieces):06d}.{self.file_format}"
+            if self.file_format == 'parquet':
+                import pyarrow.parquet as pq
+                pq.write_table(table, path)
+            else:
+                try:
+                    options = pa.ipc.IpcWriteOptions(compression='lz4')
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    options = None
+                with pa.ipc.new_file(str(path), table.schema, options=options) as writer:
+                    writer.write_table(table)
+            self.pieces.append({'sequence': sequence, 'bucket': bucket, 'path': path, 'rows': len(piece)})
+            self.bytes_written += path.stat().st_size
+
+        self.events += 1
+        self.write_seconds += time.perf_counter() - start
+        logger.info(f"Spilled {sum(len(frame) for frame in frames):,} rows to {self.spill_dir} "
+                    f"(spill {self.events}, {self.bytes_written / (1024 * 1024):,.1f} MB on disk)")
+
+    def iter_buckets(self) -> Iterator[pd.DataFrame]:
+        """
+        Yield the spilled rows one bucket at a time, pieces in read order
+
+        Returns:
+            Iterator of DataFrames, each holding every row of its links
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        for bucket in range(self.n_buckets):
+            start = time.perf_counter()
+            pieces = sorted((piece for piece in self.pieces if piece['bucket'] == bucket),
+                            key=lambda piece: piece['sequence'])
+            if not pieces:
+                continue
+            frames = []
+            for piece in pieces:
+                if self.file_format == 'parquet':
+                    table = pq.read_table(piece['path'])
+                else:
+                    with pa.ipc.open_file(str(piece['path'])) as reader:
+                        table = reader.read_all()
+                frames.append(table.to_pandas())
+            bucket_df = concat_file_frames(frames) if len(frames) > 1 else frames[0]
+            self.read_seconds += time.perf_counter() - start
+            yield bucket_df
+
+    def spilled_rows(self, file_index: Optional[int] = None) -> int:
+        """Rows on disk, optionally for one input file"""
+        return sum(piece['rows'] for piece in self.pieces if file_index is None or piece['sequence'][0] == file_index)
+
+    def discard_file(self, file_index: int) -> None:
+        """Delete the pieces of one input file (before it is re-read)"""
+        for piece in [piece for piece in self.pieces if piece['sequence'][0] == file_index]:
+            self.bytes_written -= piece['path'].stat().st_size
+            piece['path'].unlink()
+            self.pieces.remove(piece)
+
+    def summary(self) -> dict:
+        """Spill record for validation_stats['spill']"""
+        return {
+            'memory_budget_mb': round(self.memory_budget_mb, 1),
+            'threshold_mb': round(self.threshold_mb, 1),
+            'format': self.file_format,
+            'events': self.events,
+            'rows': self.spilled_rows(),
+            'files': len(self.pieces),
+            'bytes': self.bytes_written,
+            'buckets': self.n_buckets,
+            'write_seconds': round(self.write_seconds, 3),
+            'read_seconds': round(self.read_seconds, 3),
+            'peak_rss_mb': round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None
+        }
+
+    def cleanup(self) -> None:
+        """Delete this run's spill files"""
+        if self.spill_dir is not None:
+            import shutil
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+            try:
+                self.spill_root.rmdir()
+            except OSError:
+                pass  # shared with other runs or not empty
+
+
+def run_chunk_stages(chunk: pd.DataFrame, params: dict, context: dict,
+                     stages: Tuple[PipelineStage, ...] = CHUNK_STAGES) -> pd.DataFrame:
+    """
+    Run the per-chunk stages on a frame owned by the pipeline, without defensive copies
+    
+    The chunk is handed from stage to stage and mutated in place. With
+    params['debug_stage_memory'] set, RSS and DataFrame memory are recorded after
+    every stage in context['stage_memory'] so any remaining copies show up as jumps,
+    and columns added outside a stage's declared writes are logged.
+    
+    Args:
+        chunk: DataFrame freshly read from the CSV reader (owned by the caller)
+        params: Processing parameters
+        context: Per-file state shared by stages ('parse_state', 'chunk_number'); stages
+            store 'validity_stats' and 'dedup_stats' here
+        stages: Stages to run in order
+        
+    Returns:
+        Processed chunk
+    """
+    debug_memory = params.get('debug_stage_memory', False)
+    df = chunk
+    
+    for stage in stages:
+        columns_before = set(df.columns)
+        stage_start = time.perf_counter()
+        
+        df = stage.func(df, params, context)
+        
+        if debug_memory:
+            undeclared = set(df.columns) - columns_before - set(stage.writes)
+            if undeclared and '*' not in stage.writes:
+                logger.warning(f"Stage {stage.name} added undeclared columns: {sorted(undeclared)}")
+            
+            rss_mb = _current_rss_mb()
+            record = {
+                'chunk': context.get('chunk_number'),
+                'stage': stage.name,
+                'rows': len(df),
+                'seconds': round(time.perf_counter() - stage_start, 4),
+                'frame_mb': round(df.memory_usage(deep=True).sum() / (1024 * 1024), 4),
+                'rss_mb': round(rss_mb, 1) if rss_mb is not None else None
+            }
+            context.setdefault('stage_memory', []).append(record)
+            logger.info(f"Stage memory: {record}")
+    
+    return df
+
+
+def read_csv_chunked(file_path: Union[str, IO[bytes]], params: dict,
+                     spill: Optional[SpillBuffer] = None) -> Tuple[pd.DataFrame, dict]:
     """
     Read CSV file using chunked processing for memory efficiency
     
     Args:
-        file_path: Path to CSV file
+        file_path: Path to CSV file, or a seekable binary buffer (e.g. an upload)
         params: Dictionary containing CSV reading parameters
+        spill: Optional SpillBuffer; held chunks move to disk whenever RSS reaches its threshold
         
     Returns:
-        Tuple of (combined DataFrame from all chunks, validation_stats dict)
+        Tuple of (combined DataFrame from all chunks, validation_stats dict); the
+        DataFrame is empty when the rows were spilled (spill.spilled)
     """
-    logger.info(f"Starting chunked CSV reading from: {file_path}")
+    logger.info(f"Starting chunked CSV reading from: {csv_input_name(file_path)}")
     
-    # Get CSV format parameters
-    csv_format = detect_csv_format(file_path)
+    # Get CSV format parameters (detected on the decompressed prefix for compressed inputs)
+    member = params.get('zip_member')
+    compression = detect_compression(file_path)
+    csv_format = detect_csv_format(file_path, member=member)
     
     # Override with user-specified parameters
     delimiter = params.get('delimiter', csv_format['delimiter'])
     decimal = params.get('decimal', csv_format['decimal'])
     encoding = params.get('encoding', csv_format['encoding'])
     
-    # Get chunk size
+    # Get chunk size; the first chunk is measured and later chunks are sized toward the memory budget
     chunk_size = params.get('chunk_size')
+    available_memory = params.get('available_memory_gb', 2.0)
     if chunk_size is None:
-        available_memory = params.get('available_memory_gb', 2.0)
         chunk_size = configure_chunk_size(file_path, available_memory)
     
-    logger.info(f"Reading CSV with: delimiter='{delimiter}', decimal='{decimal}', chunk_size={chunk_size:,}")
+    chunk_sizer = None
+    if params.get('adaptive_chunk_size', params.get('chunk_size') is None):
+        start_rss = _current_rss_mb()
+        memory_budget_mb = params.get('memory_budget_mb')
+        if memory_budget_mb is None:
+            # Same 25% share of available memory the static heuristic assumed, on top of current usage
+            memory_budget_mb = (start_rss or 0.0) + available_memory * 1024 * 0.25
+        chunk_sizer = AdaptiveChunkSizer(chunk_size, memory_budget_mb)
+    
+    logger.info(f"Reading CSV with: delimiter='{delimiter}', decimal='{decimal}', chunk_size={chunk_size:,}"
+                + (" (adaptive)" if chunk_sizer is not None else ""))
+    
+    # Decide dtypes once per file so every chunk parses to the same schema
+    dtype_plan = None
+    if params.get('use_dtype_plan', True):
+        dtype_plan = build_dtype_plan(file_path, delimiter, decimal, encoding, member=member)
     
     # Initialize list to store processed chunks and validation stats
     processed_chunks = []
@@ -960,30 +1433,59 @@ def read_csv_chunked(file_path: str, params: dict) -> Tuple[pd.DataFrame, dict]:
         'chunks_processed': 0
     }
     
+    # Timestamp format is detected once per file and reused for every chunk
+    timestamp_parse_state = {}
+    # Filters compiled for read-time pruning and the projected column list
+    row_predicate = build_chunk_predicate(params) if params.get('filter_pushdown', True) else None
+    header = read_csv_header(file_path, delimiter, encoding, member)
+    usecols = select_read_columns(file_path, delimiter, encoding, params, header) if header is not None else None
+    engine = resolve_csv_engine(params.get('csv_engine', 'auto'), decimal) if header is not None else 'c'
+    
+    stage_context = {
+        'parse_state': timestamp_parse_state,
+        'dtype_plan': dtype_plan,
+        'row_predicate': row_predicate,
+        'projected_columns': usecols is not None
+    }
+    rows_read = 0
+    link_quality_partials = []
+    
+    # gzip/zip/zstd inputs are decompressed as they stream into the chunk reader
+    input_stack = ExitStack()
+    read_start = time.perf_counter()
+    
     try:
-        # Read CSV in chunks
-        chunk_reader = pd.read_csv(
-            file_path,
+        input_stream = input_stack.enter_context(open_csv_input(file_path, member))
+        
+        # Read CSV in chunks (pyarrow parses on its thread pool; the C parser is the fallback)
+        chunk_reader = open_csv_chunk_reader(
+            input_stream, header, engine,
             delimiter=delimiter,
             decimal=decimal,
             encoding=encoding,
-            chunksize=chunk_size,
-            low_memory=False,  # Let pandas infer dtypes
-            na_values=['', 'NA', 'NULL', 'null', 'NaN', 'nan'],
-            keep_default_na=True
+            chunk_size=chunk_size,
+            dtypes=dtype_plan['read_dtypes'] if dtype_plan else None,
+            usecols=usecols
         )
+        logger.info(f"CSV parser: {engine}")
         
-        for chunk_num, chunk in enumerate(chunk_reader, 1):
-            logger.info(f"Processing chunk {chunk_num}: {len(chunk):,} rows")
+        chunk_num = 0
+        next_chunk_size = chunk_size
+        while True:
+            try:
+                chunk = chunk_reader.get_chunk(next_chunk_size)
+            except StopIteration:
+                break
+            chunk_num += 1
+            chunk_rows = len(chunk)
+            logger.info(f"Processing chunk {chunk_num}: {chunk_rows:,} rows")
+            rows_read += chunk_rows
             
-            # Validate and normalize columns for this chunk
+            # Run normalize, validity, dedup, temporal and dtype stages in place on the chunk
             try:
-                # Step 1: Validate and normalize column names
-                chunk_normalized = validate_and_normalize_columns(chunk)
-                
-                # Step 2: Apply data validation and cleaning (skip column validation since already done)
-                chunk_with_validity, validity_stats = determine_data_validity(chunk_normalized, params)
-                chunk_cleaned, dedup_stats = remove_duplicates(chunk_with_validity, params)
+                stage_context['chunk_number'] = chunk_num
+                chunk_optimized = run_chunk_stages(chunk, params, stage_context)
+                validity_stats = stage_context['validity_stats']
                 
                 # Accumulate validation statistics
                 combined_validation_stats['total_rows'] += validity_stats['total_rows']
@@ -997,11 +1499,8 @@ def read_csv_chunked(file_path: str, params: dict) -> Tuple[pd.DataFrame, dict]:
                         combined_validation_stats['invalid_reasons'].get(reason, 0) + count
                     )
                 
-                # Step 3: Apply temporal enhancements
-                chunk_enhanced = apply_temporal_enhancements(chunk_cleaned, params)
-                
-                # Step 4: Optimize dtypes for memory efficiency
-                chunk_optimized = optimize_dtypes(chunk_enhanced)
+                # Mergeable per-link counts for quality_by_link.csv
+                link_quality_partials.append(compute_link_quality_partial(chunk_optimized))
                 
                 processed_chunks.append(chunk_optimized)
                 total_rows_processed += len(chunk_optimized)
@@ -1009,18 +1508,77 @@ def read_csv_chunked(file_path: str, params: dict) -> Tuple[pd.DataFrame, dict]:
                 
                 logger.info(f"Chunk {chunk_num} processed: {len(chunk_optimized):,} rows after cleaning")
                 
+                if chunk_sizer is not None:
+                    next_chunk_size = chunk_sizer.update(
+                        chunk_rows, int(chunk_optimized.memory_usage(deep=True).sum()), _current_rss_mb()
+                    )
+                    logger.info(f"Next chunk size: {next_chunk_size:,} rows")
+                
+                # Near the memory budget: move every held chunk to disk
+                if spill is not None and spill.should_spill():
+                    spill.write(processed_chunks)
+                    processed_chunks = []
+                
             except Exception as e:
                 logger.error(f"Error processing chunk {chunk_num}: {e}")
                 # Continue with next chunk rather than failing completely
                 continue
         
+        try:
+            uncompressed_bytes = input_stream.tell()
+        except (OSError, ValueError):
+            uncompressed_bytes = None
+        combined_validation_stats['read_throughput'] = describe_read_throughput(
+            csv_input_size(file_path), uncompressed_bytes, time.perf_counter() - read_start, compression
+        )
+        combined_validation_stats['read_throughput']['engine'] = engine
+        logger.info(f"Read throughput: {combined_validation_stats['read_throughput']}")
+        
+        if timestamp_parse_state.get('rows'):
+            parse_seconds = timestamp_parse_state['seconds']
+            combined_validation_stats['timestamp_parsing'] = {
+                'format': timestamp_parse_state.get('format'),
+                'rows': timestamp_parse_state['rows'],
+                'unique_values': timestamp_parse_state['unique_values'],
+                'seconds': round(parse_seconds, 3),
+                'rows_per_second': round(timestamp_parse_state['rows'] / parse_seconds) if parse_seconds > 0 else None
+            }
+            logger.info(f"Timestamp parsing: {combined_validation_stats['timestamp_parsing']}")
+        
+        combined_validation_stats['link_quality_partial'] = merge_link_quality_partials(link_quality_partials)
+        
+        combined_validation_stats['read_pruning'] = {
+            'rows_read': rows_read,
+            'rows_pruned': stage_context.get('rows_pruned', 0),
+            'filters_pushed_down': row_predicate is not None,
+            'columns_skipped': list(AGGREGATION_UNUSED_COLUMNS) if usecols is not None else []
+        }
+        if row_predicate is not None:
+            logger.info(f"Read-time filtering pruned {stage_context.get('rows_pruned', 0):,}/{rows_read:,} rows")
+        
+        if stage_context.get('stage_memory'):
+            combined_validation_stats['stage_memory'] = stage_context['stage_memory']
+        
+        if chunk_sizer is not None:
+            combined_validation_stats['chunk_sizing'] = chunk_sizer.summary()
+        
+        # Once anything spilled, the rest of the file joins it on disk for the bucketed merge
+        if spill is not None and spill.spilled:
+            spill.write(processed_chunks)
+            logger.info(f"Chunked CSV reading completed: {total_rows_processed:,} total rows processed (spilled to disk)")
+            return pd.DataFrame(), combined_validation_stats
+        
         # Combine all processed chunks
         if processed_chunks:
             logger.info(f"Combining {len(processed_chunks)} processed chunks...")
-            combined_df = pd.concat(processed_chunks, ignore_index=True)
-            
-            # Final dtype optimization on combined data
-            combined_df = optimize_dtypes(combined_df)
+            if dtype_plan is not None:
+                # Chunks share one schema; only categoricals need the union vocabulary
+                combined_df = concat_planned_chunks(processed_chunks, stage_context.get('category_vocabularies', {}))
+            else:
+                combined_df = pd.concat(processed_chunks, ignore_index=True)
+                
+                # Final dtype optimization on combined data (concat already produced a new frame)
+                combined_df = optimize_dtypes(combined_df, inplace=True)
             
             logger.info(f"Chunked CSV reading completed: {total_rows_processed:,} total rows processed")
             logger.info(f"Validation summary: {combined_validation_stats['valid_rows']:,}/{combined_validation_stats['total_rows']:,} valid rows ({combined_validation_stats['valid_rows']/combined_validation_stats['total_rows']*100:.1f}%)")
@@ -1029,27 +1587,643 @@ def read_csv_chunked(file_path: str, params: dict) -> Tuple[pd.DataFrame, dict]:
             logger.error("No chunks were successfully processed")
             return pd.DataFrame(), combined_validation_stats
             
+    except (ValueError, TypeError) as e:
+        if engine == 'pyarrow':
+            # pyarrow rejected the input (e.g. quoting or a value outside the declared schema)
+            logger.warning(f"pyarrow could not parse {file_path} ({e}); re-reading with the C parser")
+            input_stack.close()
+            if spill is not None:
+                spill.discard_file(spill.current_file)
+            return read_csv_chunked(file_path, {**params, 'csv_engine': 'c'}, spill)
+        if dtype_plan is None:
+            logger.error(f"Error during chunked CSV reading: {e}")
+            raise
+        # A later chunk contradicted the sampled plan (e.g. text in an integer column)
+        logger.warning(f"Dtype plan did not fit {file_path} ({e}); re-reading with inferred dtypes")
+        input_stack.close()
+        if spill is not None:
+            spill.discard_file(spill.current_file)
+        return read_csv_chunked(file_path, {**params, 'use_dtype_plan': False}, spill)
     except Exception as e:
         logger.error(f"Error during chunked CSV reading: {e}")
         raise
+    finally:
+        input_stack.close()
 
 
-def run_pipeline(params: dict) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
+INPUT_FILE_PATTERNS = ('*.csv', '*.csv.gz', '*.csv.zst', '*.zip')
+
+
+def resolve_input_files(input_path: Union[str, Path, IO[bytes], List[Union[str, Path]]]) -> List[Union[str, IO[bytes]]]:
     """
-    Main processing pipeline function that integrates all processing components
+    Expand the pipeline input into an ordered list of CSV files
     
     Args:
-        params: Dictionary containing all processing parameters including:
-            - input_file_path: Path to input CSV file
-            - output_dir: Directory for output files
-            - All other processing parameters for validation, filtering, aggregation
+        input_path: Single file, list of files, directory, glob pattern or one
+            in-memory binary buffer (an uploaded file)
         
     Returns:
-        tuple: (hourly_df, weekly_df, output_files_dict)
+        List of file paths in a stable (sorted) order, or the buffer alone
         
     Raises:
-        ValueError: If required parameters are missing
-        FileNotFoundError: If input file doesn't exist
+        FileNotFoundError: If a listed file is missing or nothing matches
+    """
+    if is_csv_buffer(input_path):
+        return [input_path]
+    if isinstance(input_path, (list, tuple)):
+        files = [str(path) for path in input_path]
+        missing = [path for path in files if not Path(path).is_file()]
+        if missing:
+            raise FileNotFoundError(f"Input file not found: {', '.join(missing)}")
+    else:
+        path_str = str(input_path)
+        path = Path(path_str)
+        if path.is_dir():
+            files = sorted({str(match) for pattern in INPUT_FILE_PATTERNS for match in path.glob(pattern)})
+        elif any(char in path_str for char in '*?['):
+            import glob
+            files = sorted(match for match in glob.glob(path_str) if Path(match).is_file())
+        elif path.is_file():
+            files = [path_str]
+        else:
+            raise FileNotFoundError(f"Input file not found: {path_str}")
+    
+    if not files:
+        raise FileNotFoundError(f"No input files matched: {input_path}")
+    
+    return files
+
+
+def scan_input_dates(file_path: str, params: dict) -> List[str]:
+    """
+    List the local dates a raw export covers, reading only its timestamp column
+    
+    Timestamps are parsed as in the temporal enhancements (ts_format, tz), so the
+    dates match the hourly store partitions the file's rows fall into. Rows that are
+    dropped later (invalid, duplicate, filtered) still count.
+    
+    Args:
+        file_path: Path to a plain or compressed CSV export
+        params: Processing parameters (ts_format, tz, zip_member, chunk_size, csv_engine)
+        
+    Returns:
+        Sorted ISO date strings (empty if the file has no readable timestamp column)
+    """
+    member = params.get('zip_member')
+    csv_format = detect_csv_format(file_path, member=member)
+    delimiter = params.get('delimiter', csv_format['delimiter'])
+    decimal = params.get('decimal', csv_format['decimal'])
+    encoding = params.get('encoding', csv_format['encoding'])
+    header = read_csv_header(file_path, delimiter, encoding, member)
+    if header is None:
+        return []
+    normalized = normalize_column_names(pd.DataFrame(columns=header)).columns
+    timestamp_cols = [col for col, name in zip(header, normalized) if name == 'timestamp']
+    if not timestamp_cols:
+        return []
+    
+    ts_format = params.get('ts_format', '%Y-%m-%d %H:%M:%S')
+    timezone = params.get('tz', 'Asia/Jerusalem')
+    parse_state = {}
+    dates = set()
+    with open_csv_input(file_path, member) as stream:
+        reader = open_csv_chunk_reader(
+            stream, header, resolve_csv_engine(params.get('csv_engine', 'auto'), decimal),
+            delimiter=delimiter, decimal=decimal, encoding=encoding,
+            chunk_size=params.get('chunk_size') or 500000, usecols=timestamp_cols[:1]
+        )
+        for chunk in reader:
+            timestamps = parse_timestamps_vectorized(chunk[timestamp_cols[0]], ts_format, timezone, parse_state)
+            dates.update(timestamps.dropna().dt.date.unique())
+    return sorted(day.isoformat() for day in dates)
+
+
+def _ingest_file(file_path: str, params: dict, spill: Optional[SpillBuffer] = None,
+                 aggregate: bool = False) -> dict:
+    """
+    Validate and read one input file; runs inside a worker process
+    
+    Failures are returned rather than raised so one bad file cannot abort the run.
+    
+    Args:
+        file_path: Path to CSV file
+        params: Processing parameters
+        spill: Optional SpillBuffer (in-process reads only)
+        aggregate: Filter and aggregate the file here and return its hourly partial
+            and a preview instead of the processed rows
+        
+    Returns:
+        Dictionary with file, status ('ok' or 'quarantined'), error, seconds, df and stats;
+        with aggregate, df is None and hourly, preview, rows_loaded and rows_filtered are set
+    """
+    start = time.perf_counter()
+    result = {'file': file_path, 'status': 'ok', 'error': None, 'df': None, 'stats': {}}
+    
+    try:
+        csv_format = detect_csv_format(file_path, member=params.get('zip_member'))
+        with open_csv_input(file_path, params.get('zip_member')) as stream:
+            header = pd.read_csv(
+                stream,
+                delimiter=params.get('delimiter', csv_format['delimiter']),
+                encoding=params.get('encoding', csv_format['encoding']),
+                nrows=0
+            )
+        is_valid, missing_columns = validate_csv_columns(header)
+        if not is_valid:
+            result['status'] = 'quarantined'
+            result['error'] = f"Missing required columns: {', '.join(missing_columns)}"
+        else:
+            df, stats = read_csv_chunked(file_path, params, spill)
+            result['stats'] = stats
+            if df.empty and not (spill is not None and spill.spilled_rows(spill.current_file)):
+                result['status'] = 'quarantined'
+                result['error'] = 'No rows could be processed'
+            elif aggregate:
+                # Only the hourly partial travels back; the stats carry the link-quality partial
+                df_filtered = apply_filtering_and_selection(df, params)
+                result['preview'] = df.head(PREVIEW_ROWS)
+                result['rows_loaded'] = len(df)
+                result['rows_filtered'] = len(df_filtered)
+                result['hourly'] = create_hourly_aggregation(df_filtered, params)
+            else:
+                result['df'] = df
+    except Exception as e:
+        result['status'] = 'quarantined'
+        result['error'] = f"{type(e).__name__}: {e}"
+    
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def merge_validation_stats(stats_list: List[dict]) -> dict:
+    """
+    Merge per-file validation statistics into run-level totals
+    
+    Args:
+        stats_list: validation_stats dictionaries returned by read_csv_chunked
+        
+    Returns:
+        Combined validation_stats dictionary
+    """
+    merged = {
+        'total_rows': 0,
+        'valid_rows': 0,
+        'invalid_reasons': {},
+        'method_used': None,
+        'chunks_processed': 0
+    }
+    partials = []
+    pruning = None
+    parsing = None
+    throughput = None
+    chunk_sizing = None
+    stage_memory = []
+    
+    for stats in stats_list:
+        merged['total_rows'] += stats.get('total_rows', 0)
+        merged['valid_rows'] += stats.get('valid_rows', 0)
+        merged['chunks_processed'] += stats.get('chunks_processed', 0)
+        merged['method_used'] = stats.get('method_used') or merged['method_used']
+        for reason, count in stats.get('invalid_reasons', {}).items():
+            merged['invalid_reasons'][reason] = merged['invalid_reasons'].get(reason, 0) + count
+        
+        if stats.get('link_quality_partial') is not None:
+            partials.append(stats['link_quality_partial'])
+        
+        if 'read_pruning' in stats:
+            file_pruning = stats['read_pruning']
+            if pruning is None:
+                pruning = dict(file_pruning)
+            else:
+                pruning['rows_read'] += file_pruning['rows_read']
+                pruning['rows_pruned'] += file_pruning['rows_pruned']
+        
+        if 'timestamp_parsing' in stats:
+            file_parsing = stats['timestamp_parsing']
+            if parsing is None:
+                parsing = dict(file_parsing)
+            else:
+                formats = {parsing['format'], file_parsing['format']} - {None}
+                parsing['format'] = ', '.join(sorted(formats)) or None
+                for key in ('rows', 'unique_values', 'seconds'):
+                    parsing[key] += file_parsing[key]
+        
+        if 'read_throughput' in stats:
+            file_throughput = stats['read_throughput']
+            if throughput is None:
+                throughput = {'compression': set(), 'engine': set(), 'compressed_bytes': 0, 'uncompressed_bytes': 0,
+                              'seconds': 0.0}
+            throughput['compression'].add(file_throughput['compression'])
+            throughput['engine'].add(file_throughput.get('engine', 'c'))
+            throughput['compressed_bytes'] += file_throughput['compressed_mb'] * 1024 * 1024
+            if throughput['uncompressed_bytes'] is not None and file_throughput['uncompressed_mb'] is not None:
+                throughput['uncompressed_bytes'] += file_throughput['uncompressed_mb'] * 1024 * 1024
+            else:
+                throughput['uncompressed_bytes'] = None
+            throughput['seconds'] += file_throughput['seconds']
+        
+        if 'chunk_sizing' in stats:
+            file_sizing = stats['chunk_sizing']
+            if chunk_sizing is None:
+                chunk_sizing = {**file_sizing, 'chunk_sizes': [], 'history': []}
+            chunk_sizing['chunk_sizes'] = chunk_sizing['chunk_sizes'] + file_sizing['chunk_sizes']
+            chunk_sizing['history'] = chunk_sizing['history'] + file_sizing['history']
+            if file_sizing['peak_rss_mb'] is not None:
+                chunk_sizing['peak_rss_mb'] = max(chunk_sizing['peak_rss_mb'] or 0.0, file_sizing['peak_rss_mb'])
+        
+        stage_memory.extend(stats.get('stage_memory', []))
+    
+    merged['link_quality_partial'] = merge_link_quality_partials(partials)
+    if pruning is not None:
+        merged['read_pruning'] = pruning
+    if parsing is not None:
+        parsing['seconds'] = round(parsing['seconds'], 3)
+        parsing['rows_per_second'] = round(parsing['rows'] / parsing['seconds']) if parsing['seconds'] > 0 else None
+        merged['timestamp_parsing'] = parsing
+    if throughput is not None:
+        # Seconds are summed over workers, so the rates are per-worker throughput
+        merged['read_throughput'] = describe_read_throughput(
+            throughput['compressed_bytes'], throughput['uncompressed_bytes'], throughput['seconds'],
+            ', '.join(sorted(throughput['compression']))
+        )
+        merged['read_throughput']['engine'] = ', '.join(sorted(throughput['engine']))
+    if chunk_sizing is not None:
+        merged['chunk_sizing'] = chunk_sizing
+    if stage_memory:
+        merged['stage_memory'] = stage_memory
+    
+    return merged
+
+
+def concat_file_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate per-file frames, unifying categorical vocabularies across files
+    
+    Args:
+        frames: DataFrames returned by read_csv_chunked
+        
+    Returns:
+        Combined DataFrame
+    """
+    vocabularies = {}
+    for col in CATEGORICAL_COLUMNS:
+        if not any(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            continue
+        vocabulary = {}
+        for frame in frames:
+            if col not in frame.columns:
+                continue
+            if not isinstance(frame[col].dtype, pd.CategoricalDtype):
+                frame[col] = frame[col].astype('category')
+            vocabulary.update(dict.fromkeys(frame[col].cat.categories))
+        vocabularies[col] = vocabulary
+    
+    return concat_planned_chunks(frames, vocabularies)
+
+
+def resolve_input_workers(files: List[str], params: dict) -> int:
+    """
+    Number of worker processes for a list of input files
+    
+    Args:
+        files: Resolved input files
+        params: Processing parameters (max_workers, spill_to_disk)
+        
+    Returns:
+        1 for a single file or spill_to_disk (files are then read in this process),
+        otherwise max_workers capped by the number of files
+    """
+    if len(files) < 2 or params.get('spill_to_disk'):
+        return 1
+    return min(len(files), params.get('max_workers') or os.cpu_count() or 1)
+
+
+def _aggregate_files_in_pool(files: List[str], params: dict, max_workers: int) -> List[dict]:
+    """
+    Run _ingest_file with aggregate=True for every file in a process pool, one task per file
+    
+    A task that fails in the pool itself (a crashed worker raises BrokenProcessPool,
+    a result that cannot be pickled raises in the parent) quarantines its file
+    like any other failure.
+    
+    Args:
+        files: Input files
+        params: Processing parameters
+        max_workers: Number of worker processes
+        
+    Returns:
+        _ingest_file results in file order
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_ingest_file, file_path, params, None, True): file_path
+                   for file_path in files}
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                results[file_path] = future.result()
+            except Exception as e:
+                results[file_path] = {'file': file_path, 'status': 'quarantined', 'df': None, 'stats': {},
+                                      'error': f"Worker failed: {type(e).__name__}: {e}", 'seconds': 0.0}
+    return [results[file_path] for file_path in files]
+
+
+def _report_input_files(results: List[dict], params: dict) -> Tuple[List[dict], dict]:
+    """
+    Build the per-file report, quarantining failed files, and merge the stats of the rest
+    
+    Args:
+        results: _ingest_file results in file order
+        params: Processing parameters (quarantine_dir)
+        
+    Returns:
+        Tuple of (results of the files read, merged validation_stats with the 'files' report)
+    """
+    ok_results = []
+    file_report = []
+    quarantine_dir = params.get('quarantine_dir')
+    
+    for result in results:
+        stats = result['stats']
+        entry = {
+            'file': result['file'],
+            'status': result['status'],
+            'rows': stats.get('total_rows', 0),
+            'valid_rows': stats.get('valid_rows', 0),
+            'seconds': result['seconds'],
+            'error': result['error']
+        }
+        
+        if result['status'] == 'ok':
+            ok_results.append(result)
+        else:
+            logger.error(f"Quarantined input file {result['file']}: {result['error']}")
+            if quarantine_dir:
+                try:
+                    import shutil
+                    Path(quarantine_dir).mkdir(parents=True, exist_ok=True)
+                    entry['quarantined_to'] = shutil.move(result['file'], str(Path(quarantine_dir) / Path(result['file']).name))
+                except OSError as e:
+                    logger.warning(f"Could not move {result['file']} to quarantine: {e}")
+        
+        file_report.append(entry)
+    
+    validation_stats = merge_validation_stats([result['stats'] for result in ok_results])
+    validation_stats['files'] = file_report
+    return ok_results, validation_stats
+
+
+def read_input_files(input_path: Union[str, Path, List[Union[str, Path]]], params: dict,
+                     spill: Optional[SpillBuffer] = None) -> Tuple[pd.DataFrame, dict]:
+    """
+    Read one or many input files into this process, one file after another
+    
+    Each file is validated and read independently; files that fail are
+    quarantined (moved to params['quarantine_dir'] when set) and reported
+    instead of aborting the run. Parallel runs use aggregate_input_files,
+    which never ships processed rows between processes.
+    
+    Args:
+        input_path: Single file, list of files, directory or glob pattern
+        params: Processing parameters (quarantine_dir)
+        spill: Optional SpillBuffer; every chunk is then checked against the memory budget
+        
+    Returns:
+        Tuple of (combined DataFrame, merged validation_stats with per-file 'files' report);
+        the DataFrame is empty when the rows were spilled (spill.spilled)
+    """
+    files = resolve_input_files(input_path)
+    
+    # A single file keeps the plain chunked reader and its error behaviour
+    if len(files) == 1:
+        return read_csv_chunked(files[0], params, spill)
+    
+    logger.info(f"Reading {len(files)} input files")
+    
+    if spill is not None:
+        results = []
+        held = []
+        for file_index, file_path in enumerate(files):
+            spill.current_file = file_index
+            result = _ingest_file(file_path, params, spill)
+            results.append(result)
+            if result['df'] is not None and not result['df'].empty:
+                held.append((file_index, result))
+            # Whole files read earlier follow the spill, keeping their place in the read order
+            if held and (spill.spilled or spill.should_spill()):
+                for held_index, held_result in held:
+                    spill.write([held_result['df']], held_index)
+                    held_result['df'] = pd.DataFrame()
+                held = []
+    else:
+        results = [_ingest_file(file_path, params) for file_path in files]
+    
+    ok_results, validation_stats = _report_input_files(results, params)
+    frames = [result['df'] for result in ok_results if not result['df'].empty]
+    
+    if spill is not None and spill.spilled:
+        logger.info(f"Read {len(ok_results)}/{len(files)} input files into {spill.spilled_rows():,} spilled rows")
+        return pd.DataFrame(), validation_stats
+    
+    if not frames:
+        logger.error("No input files were successfully processed")
+        return pd.DataFrame(), validation_stats
+    
+    combined_df = concat_file_frames(frames)
+    logger.info(f"Combined {len(frames)}/{len(files)} input files: {len(combined_df):,} rows")
+    return combined_df, validation_stats
+
+
+def aggregate_input_files(files: List[str], params: dict,
+                          max_workers: int) -> Tuple[pd.DataFrame, dict, pd.DataFrame]:
+    """
+    Read, filter and aggregate each input file in its own worker process
+    
+    Workers send back only their file's hourly aggregation (with moment and sketch
+    columns), link-quality partial and a short preview, never the processed rows;
+    the parent combines them with merge_hourly_aggregations and
+    merge_validation_stats. Files that fail are quarantined as in read_input_files.
+    
+    Args:
+        files: Resolved input files
+        params: Processing parameters (quarantine_dir)
+        max_workers: Number of worker processes (see resolve_input_workers)
+        
+    Returns:
+        Tuple of (hourly DataFrame, merged validation_stats with the 'files' report,
+        rows_loaded and rows_filtered, raw preview DataFrame)
+    """
+    logger.info(f"Aggregating {len(files)} input files with {max_workers} worker(s)")
+    results = _aggregate_files_in_pool(files, params, max_workers)
+    ok_results, validation_stats = _report_input_files(results, params)
+    
+    validation_stats['rows_loaded'] = sum(result['rows_loaded'] for result in ok_results)
+    validation_stats['rows_filtered'] = sum(result['rows_filtered'] for result in ok_results)
+    previews = [result['preview'] for result in ok_results]
+    raw_preview = concat_file_frames(previews).head(PREVIEW_ROWS) if previews else pd.DataFrame()
+    
+    hourly_df = merge_hourly_aggregations([result['hourly'] for result in ok_results], params)
+    logger.info(f"Aggregated {len(ok_results)}/{len(files)} input files: "
+                f"{validation_stats['rows_loaded']:,} rows into {len(hourly_df):,} hour-link combinations")
+    return hourly_df, validation_stats, raw_preview
+
+
+def _merge_shared_hours(rows: pd.DataFrame, keys: List[str], params: dict) -> pd.DataFrame:
+    """
+    Merge hourly partials that share a key into one row per key
+    
+    Args:
+        rows: Hourly rows from several partial aggregations, each key present at least twice
+        keys: Hourly key columns
+        params: Processing parameters (min_valid_per_hour, quantile_sketch_compression)
+        
+    Returns:
+        DataFrame with one merged row per key and the columns of rows
+    """
+    rows = rows.reset_index(drop=True)
+    codes = rows.groupby(keys, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    n_groups = int(codes.max()) + 1
+    merged = rows.loc[~pd.Series(codes).duplicated().to_numpy()].reset_index(drop=True)
+    
+    def group_sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights=values, minlength=n_groups)
+    
+    def numeric(col: str) -> np.ndarray:
+        return pd.to_numeric(rows[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    merged['n_total'] = group_sum(numeric('n_total')).astype(rows['n_total'].dtype)
+    merged['n_valid'] = group_sum(numeric('n_valid')).astype(rows['n_valid'].dtype)
+    merged['valid_hour'] = merged['n_valid'] >= params.get('min_valid_per_hour', 1)
+    merged['no_valid_hour'] = (~merged['valid_hour']).astype(int)
+    
+    # Means and stds pool from the moments as in _compute_pooled_std (Chan et al.)
+    for n_col, mean_col, m2_col in HOURLY_MOMENT_COLUMNS.values():
+        if n_col not in rows.columns:
+            continue
+        n = np.nan_to_num(numeric(n_col))
+        mean = np.where(n > 0, numeric(mean_col), 0.0)
+        total_n = group_sum(n)
+        pooled_mean = group_sum(n * mean) / np.where(total_n > 0, total_n, np.nan)
+        m2 = np.nan_to_num(numeric(m2_col)) + n * (mean - np.nan_to_num(pooled_mean)[codes]) ** 2
+        pooled_m2 = group_sum(np.where(n > 0, m2, 0.0))
+        merged[n_col] = total_n.astype('int64')
+        merged[mean_col] = pooled_mean
+        merged[m2_col] = pooled_m2
+        merged[mean_col.replace('avg_', 'std_')] = np.sqrt(pooled_m2 / np.where(total_n > 1, total_n - 1, np.nan))
+    
+    # Distance and speed means are weighted by the valid rows behind them
+    n_valid = numeric('n_valid')
+    for col in ['avg_distance_m', 'avg_speed_kmh']:
+        if col in rows.columns:
+            values = numeric(col)
+            weights = np.where(np.isnan(values), 0.0, n_valid)
+            total = group_sum(weights)
+            merged[col] = group_sum(weights * np.nan_to_num(values)) / np.where(total > 0, total, np.nan)
+    
+    # Duration sketches merge by recompressing their centroids
+    if all(col in rows.columns for col in HOURLY_SKETCH_COLUMNS):
+        means_col, weights_col = HOURLY_SKETCH_COLUMNS
+        centroids = flatten_sketches(codes, rows[means_col], rows[weights_col])
+        centroids = compress_centroids(*centroids, n_groups,
+                                       params.get('quantile_sketch_compression', QUANTILE_SKETCH_COMPRESSION))
+        estimates = sketch_quantiles(*centroids, n_groups, [q for _, q in RELIABILITY_QUANTILES])
+        merged[means_col], merged[weights_col] = split_sketches(*centroids, n_groups)
+        for j, (label, _) in enumerate(RELIABILITY_QUANTILES):
+            merged[f'{label}_duration_sec'] = estimates[:, j]
+    if 'buffer_time_index' in rows.columns:
+        add_reliability_indices(merged, 'p95_duration_sec', 'avg_duration_sec', 'avg_static_duration_sec')
+    
+    # Hours without valid rows are already null; merged metrics keep the parts' dtypes
+    for col in merged.columns:
+        if pd.api.types.is_float_dtype(rows[col].dtype):
+            merged[col] = merged[col].astype(rows[col].dtype)
+    
+    return merged
+
+
+def merge_hourly_aggregations(parts: List[pd.DataFrame], params: dict) -> pd.DataFrame:
+    """
+    Combine hourly aggregations of separate row sets (files, link buckets) into one
+    
+    Keys aggregated in a single part keep their row as is. Keys found in several
+    parts are merged from their partials: counts add up, duration means and stds
+    pool from the moment columns, distance and speed means are weighted by
+    n_valid and duration sketches are recompressed for the reliability
+    percentiles. The result gets the sorted categoricals and row order of the
+    in-memory path, so disjoint parts give identical outputs.
+    
+    Args:
+        parts: DataFrames returned by create_hourly_aggregation (with moment columns)
+        params: Processing parameters
+        
+    Returns:
+        Combined hourly DataFrame
+    """
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame()
+    
+    keys = ['link_id', 'date', 'hour_of_day', 'daytype']
+    hourly_df = pd.concat(parts, ignore_index=True)
+    shared = hourly_df.duplicated(keys, keep=False)
+    if shared.any():
+        logger.info(f"Merging {int(shared.sum()):,} hourly partials that share a link-hour")
+        merged = _merge_shared_hours(hourly_df[shared], keys, params)
+        hourly_df = pd.concat([hourly_df[~shared], merged], ignore_index=True)
+    
+    for col in ['link_id', 'daytype']:
+        if col in hourly_df.columns:
+            values = hourly_df[col].astype(object)
+            hourly_df[col] = values.astype(pd.CategoricalDtype(sorted(values.dropna().unique(), key=str)))
+    hourly_df = hourly_df.sort_values(keys, kind='stable')
+    return hourly_df.reset_index(drop=True)
+
+
+def aggregate_spilled_input(spill: SpillBuffer, params: dict) -> Tuple[pd.DataFrame, int]:
+    """
+    Filter and aggregate spilled rows one bucket at a time
+    
+    Buckets partition rows by link, so each hourly group is aggregated from all
+    of its rows and merge_hourly_aggregations only concatenates and orders
+    them; the outputs are identical to the in-memory path.
+    
+    Args:
+        spill: SpillBuffer holding every processed row
+        params: Processing parameters
+        
+    Returns:
+        Tuple of (hourly DataFrame, rows remaining after filtering)
+    """
+    hourly_parts = []
+    rows_filtered = 0
+    for bucket_df in spill.iter_buckets():
+        df_filtered = apply_filtering_and_selection(bucket_df, params)
+        rows_filtered += len(df_filtered)
+        if not df_filtered.empty:
+            hourly_parts.append(create_hourly_aggregation(df_filtered, params))
+        del bucket_df, df_filtered
+    
+    return merge_hourly_aggregations(hourly_parts, params), rows_filtered
+
+
+def run_pipeline(params: dict) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Main processing pipeline function that integrates all processing components
+    
+    Args:
+        params: Dictionary containing all processing parameters including:
+            - input_file_path: Path to input CSV file, list of files, directory or glob
+            - output_dir: Directory for output files
+            - All other processing parameters for validation, filtering, aggregation
+        
+    Returns:
+        tuple: (hourly_df, weekly_df, output_files_dict)
+        
+    Raises:
+        ValueError: If required parameters are missing
+        FileNotFoundError: If input file doesn't exist
         Exception: For other processing errors with proper context
     """
     processing_start_time = datetime.now()
@@ -1062,6 +2236,7 @@ def run_pipeline(params: dict) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
     weekly_df = pd.DataFrame()
     output_files = {}
     raw_df = pd.DataFrame()
+    raw_preview = None
     validation_stats = {}
     
     try:
@@ -1076,41 +2251,107 @@ def run_pipeline(params: dict) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         logger.info(f"Output directory: {output_dir}")
         
-        # Step 2: Read and process CSV data using chunked reading
-        logger.info("Step 2: Reading and processing CSV data...")
-        logger.info(f"Input file: {file_path}")
-        
-        if not Path(file_path).exists():
-            raise FileNotFoundError(f"Input file not found: {file_path}")
-        
-        # Read CSV data with chunked processing and validation
-        raw_df, validation_stats = read_csv_chunked(file_path, params)
-        
-        if raw_df.empty:
-            logger.warning("No data loaded from CSV file")
-            return pd.DataFrame(), pd.DataFrame(), {}
-        
-        logger.info(f"Loaded {len(raw_df):,} rows from CSV file")
-        
-        # Step 3: Apply filtering and data selection
-        logger.info("Step 3: Applying filtering and data selection...")
-        df_filtered = apply_filtering_and_selection(raw_df, params)
-        
-        if df_filtered.empty:
-            logger.warning("No data remaining after filtering")
-            return pd.DataFrame(), pd.DataFrame(), {}
-        
-        logger.info(f"After filtering: {len(df_filtered):,} rows remaining ({len(df_filtered)/len(raw_df)*100:.1f}% retained)")
-        
-        # Step 4: Create hourly aggregation
-        logger.info("Step 4: Creating hourly aggregation...")
-        hourly_df = create_hourly_aggregation(df_filtered, params)
+        # Several input files are read, filtered and aggregated one per worker process
+        backend = params.get('execution_backend', 'pandas')
+        input_files = resolve_input_files(file_path) if backend != 'duckdb' else [file_path]
+        input_workers = resolve_input_workers(input_files, params)
+        
+        # Steps 2-4 run out of core in DuckDB when selected; raw rows are never held in memory
+        if backend == 'duckdb':
+            from components.aggregation.duckdb_backend import run_duckdb_aggregation
+            logger.info("Steps 2-4: Reading, filtering and aggregating with the DuckDB backend...")
+            logger.info(f"Input file: {file_path}")
+            hourly_df, validation_stats = run_duckdb_aggregation(file_path, params)
+            
+            if validation_stats['total_rows'] == 0:
+                logger.warning("No data loaded from CSV file")
+                return pd.DataFrame(), pd.DataFrame(), {}
+        elif input_workers > 1:
+            # Steps 2-4 per file in worker processes; only hourly partials come back to be merged
+            logger.info("Steps 2-4: Reading, filtering and aggregating input files in parallel...")
+            logger.info(f"Input files: {file_path}")
+            hourly_df, validation_stats, raw_preview = aggregate_input_files(input_files, params, input_workers)
+            rows_loaded = validation_stats['rows_loaded']
+            rows_filtered = validation_stats.pop('rows_filtered')
+            
+            if rows_loaded == 0:
+                logger.warning("No data loaded from CSV file")
+                return pd.DataFrame(), pd.DataFrame(), {}
+            
+            logger.info(f"Loaded {rows_loaded:,} rows from CSV files")
+            
+            if rows_filtered == 0:
+                logger.warning("No data remaining after filtering")
+                return pd.DataFrame(), pd.DataFrame(), {}
+            
+            logger.info(f"After filtering: {rows_filtered:,} rows remaining ({rows_filtered/rows_loaded*100:.1f}% retained)")
+        else:
+            # Step 2: Read and process CSV data using chunked reading
+            logger.info("Step 2: Reading and processing CSV data...")
+            logger.info(f"Input file: {csv_input_name(file_path)}")
+            
+            # Read CSV data (one or many files) with chunked processing and validation;
+            # with spill_to_disk, chunks move to disk whenever RSS nears the memory budget
+            spill = SpillBuffer.from_params(params, output_dir) if params.get('spill_to_disk') else None
+            try:
+                raw_df, validation_stats = read_input_files(file_path, params, spill)
+                
+                if spill is not None and spill.spilled:
+                    # Steps 3-4 stream the spilled buckets back through filtering and aggregation
+                    logger.info(f"Loaded {spill.spilled_rows():,} rows from CSV file (spilled to disk)")
+                    logger.info("Steps 3-4: Filtering and aggregating spilled rows bucket by bucket...")
+                    hourly_df, rows_filtered = aggregate_spilled_input(spill, params)
+                    validation_stats['rows_loaded'] = spill.spilled_rows()
+                    validation_stats['spill'] = spill.summary()
+                    logger.info(f"Spill: {validation_stats['spill']}")
+                    
+                    if rows_filtered == 0:
+                        logger.warning("No data remaining after filtering")
+                        return pd.DataFrame(), pd.DataFrame(), {}
+                    
+                    logger.info(f"After filtering: {rows_filtered:,} rows remaining "
+                                f"({rows_filtered/spill.spilled_rows()*100:.1f}% retained)")
+                else:
+                    if raw_df.empty:
+                        logger.warning("No data loaded from CSV file")
+                        return pd.DataFrame(), pd.DataFrame(), {}
+                    
+                    logger.info(f"Loaded {len(raw_df):,} rows from CSV file")
+                    
+                    # Step 3: Apply filtering and data selection
+                    logger.info("Step 3: Applying filtering and data selection...")
+                    df_filtered = apply_filtering_and_selection(raw_df, params)
+                    
+                    if df_filtered.empty:
+                        logger.warning("No data remaining after filtering")
+                        return pd.DataFrame(), pd.DataFrame(), {}
+                    
+                    logger.info(f"After filtering: {len(df_filtered):,} rows remaining ({len(df_filtered)/len(raw_df)*100:.1f}% retained)")
+                    
+                    # Step 4: Create hourly aggregation
+                    logger.info("Step 4: Creating hourly aggregation...")
+                    hourly_df = create_hourly_aggregation(df_filtered, params)
+            finally:
+                if spill is not None:
+                    spill.cleanup()
         
         if hourly_df.empty:
             logger.warning("No hourly aggregation data generated")
         else:
             logger.info(f"Created hourly aggregation: {len(hourly_df):,} hour-link combinations")
         
+        # Incremental mode: new dates (or incremental_store_dates only) replace their store
+        # partitions; outputs cover the whole store
+        store_dir = params.get('incremental_store')
+        if store_dir:
+            logger.info(f"Updating incremental hourly store: {store_dir}")
+            validation_stats['incremental_store'] = update_hourly_store(
+                store_dir, hourly_df, params.get('parquet_row_group_size', PARQUET_ROW_GROUP_SIZE),
+                params.get('incremental_store_dates')
+            )
+            validation_stats['incremental_store']['path'] = str(store_dir)
+            hourly_df = load_hourly_store(store_dir, params)
+        
         # Step 5: Create weekly hourly profile
         logger.info("Step 5: Creating weekly hourly profile...")
         if not hourly_df.empty:
@@ -1131,7 +2372,8 @@ def run_pipeline(params: dict) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
             validation_stats=validation_stats,
             params=params,
             processing_start_time=processing_start_time,
-            output_dir=output_dir
+            output_dir=output_dir,
+            raw_preview=raw_preview
         )
         
         processing_end_time = datetime.now()
@@ -1172,7 +2414,7 @@ def run_pipeline(params: dict) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
                 
                 # Add context information
                 f.write(f"\nContext Information:\n")
-                f.write(f"Input file: {params.get('input_file_path', 'Not specified')}\n")
+                f.write(f"Input file: {csv_input_name(params.get('input_file_path', 'Not specified'))}\n")
                 f.write(f"Output directory: {params.get('output_dir', 'Not specified')}\n")
                 f.write(f"Raw data rows: {len(raw_df) if not raw_df.empty else 0}\n")
                 f.write(f"Hourly data rows: {len(hourly_df) if not hourly_df.empty else 0}\n")
@@ -1205,8 +2447,10 @@ def _validate_pipeline_parameters(params: dict) -> None:
     
     # Validate file path exists
     input_file = params['input_file_path']
-    if not isinstance(input_file, (str, Path)):
-        raise ValueError(f"input_file_path must be a string or Path, got {type(input_file)}")
+    if not (isinstance(input_file, (str, Path, list, tuple)) or is_csv_buffer(input_file)):
+        raise ValueError(f"input_file_path must be a string, Path, list of paths or binary buffer, got {type(input_file)}")
+    if is_csv_buffer(input_file) and params.get('execution_backend', 'pandas') == 'duckdb':
+        raise ValueError("The DuckDB backend reads from disk; pass input_file_path as a file path")
     
     # Validate output directory is writable if specified
     output_dir = params.get('output_dir', '.')
@@ -1219,7 +2463,15 @@ def _validate_pipeline_parameters(params: dict) -> None:
     numeric_params = {
         'chunk_size': (int, 1, 1000000),
         'min_valid_per_hour': (int, 0, 1000),
-        'available_memory_gb': (float, 0.1, 100.0)
+        'available_memory_gb': (float, 0.1, 100.0),
+        'max_workers': (int, 1, 64),
+        'output_writer_threads': (int, 1, 16),
+        'duckdb_threads': (int, 1, 256),
+        'quantile_sketch_compression': (int, 20, 2000),
+        'rolling_window_days': (int, 1, 366),
+        'rolling_stride_days': (int, 1, 366),
+        'spill_threshold': (float, 0.0, 1.0),
+        'spill_buckets': (int, 1, 1024)
     }
     
     for param_name, (param_type, min_val, max_val) in numeric_params.items():
@@ -1230,6 +2482,16 @@ def _validate_pipeline_parameters(params: dict) -> None:
             if not (min_val <= value <= max_val):
                 raise ValueError(f"{param_name} must be between {min_val} and {max_val}, got {value}")
     
+    execution_backend = params.get('execution_backend', 'pandas')
+    if execution_backend not in ('pandas', 'duckdb'):
+        raise ValueError(f"execution_backend must be 'pandas' or 'duckdb', got {execution_backend!r}")
+    
+    if params.get('spill_format', 'arrow') not in SpillBuffer.FORMATS:
+        raise ValueError(f"spill_format must be one of {SpillBuffer.FORMATS}, got {params['spill_format']!r}")
+    
+    if params.get('csv_engine', 'auto') not in CSV_ENGINES:
+        raise ValueError(f"csv_engine must be one of {CSV_ENGINES}, got {params['csv_engine']!r}")
+    
     # Validate timezone if specified
     if 'tz' in params and params['tz']:
         if not validate_timezone(params['tz']):
@@ -1238,12 +2500,63 @@ def _validate_pipeline_parameters(params: dict) -> None:
     logger.info("All pipeline parameters validated successfully")
 
 
+OUTPUT_MANIFEST_NAME = 'output_manifest.json'
+
+
+def _output_size_bytes(file_path: str) -> int:
+    """Size on disk of an output; a Parquet dataset manifest stands for its whole directory"""
+    path = Path(file_path)
+    if path.name == PARQUET_MANIFEST_NAME:
+        return sum(part.stat().st_size for part in path.parent.rglob('*') if part.is_file())
+    return path.stat().st_size
+
+
+def write_output_manifest(output_files: Dict[str, str], write_info: Dict[str, dict], output_dir: str) -> str:
+    """
+    Write a JSON manifest describing every output file of a run
+    
+    Args:
+        output_files: Output type to file path, as returned to the GUI
+        write_info: Output type to writer name, duration and (where known) rows and checksum
+        output_dir: Directory to write the manifest into
+        
+    Returns:
+        Path to the written manifest
+    """
+    entries = []
+    for output_type, file_path in output_files.items():
+        info = write_info.get(output_type, {})
+        entries.append({
+            'output': output_type,
+            'path': os.path.relpath(file_path, output_dir),
+            'bytes': _output_size_bytes(file_path),
+            'rows': info.get('rows'),
+            'sha256': info.get('sha256'),
+            'writer': info.get('writer'),
+            'write_seconds': round(info.get('seconds', 0.0), 4)
+        })
+    
+    manifest = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'total_bytes': sum(entry['bytes'] for entry in entries),
+        'files': entries
+    }
+    manifest_path = Path(output_dir) / OUTPUT_MANIFEST_NAME
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return str(manifest_path)
+
+
 def write_all_output_files(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekly_df: pd.DataFrame,
                           validation_stats: dict, params: dict, processing_start_time: datetime,
-                          output_dir: str) -> Dict[str, str]:
+                          output_dir: str, raw_preview: Optional[pd.DataFrame] = None) -> Dict[str, str]:
     """
     Write all required and optional output files to specified output directory
     
+    Independent outputs (CSVs, quality reports, Parquet datasets, previews) are written
+    concurrently on a thread pool; the processing log follows so it can report them, and
+    an output manifest with sizes, row counts, checksums and write durations comes last.
+    
     Args:
         raw_df: Original processed DataFrame
         hourly_df: Hourly aggregation DataFrame
@@ -1252,75 +2565,137 @@ def write_all_output_files(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekly
         params: Processing parameters
         processing_start_time: When processing started
         output_dir: Directory to write output files
+        raw_preview: Leading raw rows for raw_data_preview.csv when raw_df is empty
+            because the rows were aggregated elsewhere (worker processes)
         
     Returns:
         Dictionary mapping output type to file path for GUI download links
     """
+    from concurrent.futures import ThreadPoolExecutor
+    
     output_files = {}
+    write_info = {}
     processing_end_time = datetime.now()
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     logger.info(f"Writing output files to: {output_dir}")
     
-    try:
+    def write_hourly() -> Dict[str, str]:
         # Required Output 1: hourly_agg.csv
-        if not hourly_df.empty:
-            hourly_output_path = Path(output_dir) / 'hourly_agg.csv'
-            if write_hourly_aggregation_csv(hourly_df, str(hourly_output_path)):
-                output_files['hourly_agg'] = str(hourly_output_path)
-                logger.info(f"Written: hourly_agg.csv ({len(hourly_df):,} rows)")
-            else:
-                logger.error("✗ Failed to write hourly_agg.csv")
-        else:
+        if hourly_df.empty:
             logger.warning("Skipping hourly_agg.csv - no data available")
-        
+            return {}
+        hourly_output_path = Path(output_dir) / 'hourly_agg.csv'
+        record = {}
+        if not write_hourly_aggregation_csv(hourly_df, str(hourly_output_path), record):
+            logger.error("✗ Failed to write hourly_agg.csv")
+            return {}
+        write_info['hourly_agg'] = record
+        logger.info(f"Written: hourly_agg.csv ({len(hourly_df):,} rows)")
+        return {'hourly_agg': str(hourly_output_path)}
+    
+    def write_weekly() -> Dict[str, str]:
         # Required Output 2: weekly_hourly_profile.csv
-        if not weekly_df.empty:
-            weekly_output_path = Path(output_dir) / 'weekly_hourly_profile.csv'
-            if write_weekly_hourly_profile_csv(weekly_df, str(weekly_output_path)):
-                output_files['weekly_hourly_profile'] = str(weekly_output_path)
-                logger.info(f"Written: weekly_hourly_profile.csv ({len(weekly_df):,} rows)")
-            else:
-                logger.error("✗ Failed to write weekly_hourly_profile.csv")
-        else:
+        if weekly_df.empty:
             logger.warning("Skipping weekly_hourly_profile.csv - no data available")
-        
-        # Optional Output 3: Quality reports (if enabled)
-        if params.get('generate_quality_reports', True) and not raw_df.empty and not hourly_df.empty:
-            try:
-                quality_files = write_quality_reports(raw_df, hourly_df, validation_stats, output_dir)
-                output_files.update(quality_files)
-                logger.info(f"Written: {len(quality_files)} quality report files")
-            except Exception as e:
-                logger.error(f"✗ Failed to write quality reports: {e}")
+            return {}
+        weekly_output_path = Path(output_dir) / 'weekly_hourly_profile.csv'
+        record = {}
+        if not write_weekly_hourly_profile_csv(weekly_df, str(weekly_output_path), record):
+            logger.error("✗ Failed to write weekly_hourly_profile.csv")
+            return {}
+        write_info['weekly_hourly_profile'] = record
+        logger.info(f"Written: weekly_hourly_profile.csv ({len(weekly_df):,} rows)")
+        return {'weekly_hourly_profile': str(weekly_output_path)}
+    
+    writers = {'hourly_csv': write_hourly, 'weekly_csv': write_weekly}
+    
+    # Optional Output 3: Quality reports (if enabled)
+    has_raw_counts = not raw_df.empty or validation_stats.get('link_quality_partial') is not None
+    if params.get('generate_quality_reports', True) and has_raw_counts and not hourly_df.empty:
+        writers['quality_reports'] = lambda: write_quality_reports(raw_df, hourly_df, validation_stats, output_dir)
+    
+    # Optional Output 5: Parquet files for faster downstream processing
+    if params.get('write_parquet_output', params.get('output_parquet', False)):
+        write_info['hourly_agg_parquet'] = {'rows': len(hourly_df)}
+        write_info['weekly_hourly_profile_parquet'] = {'rows': len(weekly_df)}
+        writers['parquet'] = lambda: write_parquet_outputs(
+            hourly_df, weekly_df, output_dir,
+            row_group_size=params.get('parquet_row_group_size', PARQUET_ROW_GROUP_SIZE)
+        )
+    
+    # Optional Output 6: Data preview files for GUI
+    if params.get('write_preview_files', True):
+        preview_source = raw_preview if raw_df.empty and raw_preview is not None else raw_df
+        writers['previews'] = lambda: write_preview_files(preview_source, hourly_df, weekly_df, output_dir)
+    
+    def write_rolling() -> Dict[str, str]:
+        # Optional Output 7: weekly profiles over sliding date windows, computed from the hourly partials
+        started = time.perf_counter()
+        rolling_df = create_rolling_weekly_profiles(hourly_df, params)
+        validation_stats['rolling_profiles'] = {
+            'window_days': params['rolling_window_days'],
+            'stride_days': params.get('rolling_stride_days') or 1,
+            'windows': int(rolling_df['window_start'].nunique()) if not rolling_df.empty else 0,
+            'rows': len(rolling_df),
+            'seconds': time.perf_counter() - started
+        }
+        if rolling_df.empty:
+            logger.warning("Skipping weekly_hourly_profile_rolling.csv - no complete windows")
+            return {}
+        rolling_output_path = Path(output_dir) / 'weekly_hourly_profile_rolling.csv'
+        record = {}
+        if not write_weekly_hourly_profile_csv(rolling_df, str(rolling_output_path), record):
+            logger.error("✗ Failed to write weekly_hourly_profile_rolling.csv")
+            return {}
+        write_info['weekly_hourly_profile_rolling'] = record
+        return {'weekly_hourly_profile_rolling': str(rolling_output_path)}
+    
+    if params.get('rolling_window_days') and not hourly_df.empty:
+        writers['rolling_weekly_csv'] = write_rolling
+    
+    def run_writer(writer: Callable[[], Dict[str, str]]) -> Tuple[Dict[str, str], float]:
+        started = time.perf_counter()
+        return writer(), time.perf_counter() - started
+    
+    try:
+        max_threads = params.get('output_writer_threads') or min(len(writers), 4)
+        with ThreadPoolExecutor(max_workers=max_threads) as executor:
+            futures = {name: executor.submit(run_writer, writer) for name, writer in writers.items()}
+            # Collect in submission order so output_files keeps a stable order
+            for name, future in futures.items():
+                try:
+                    written, seconds = future.result()
+                except Exception as e:
+                    logger.error(f"✗ Failed to write {name}: {e}")
+                    continue
+                for output_type, file_path in written.items():
+                    output_files[output_type] = file_path
+                    write_info.setdefault(output_type, {}).update({'writer': name, 'seconds': seconds})
+                logger.info(f"Written: {name} ({len(written)} files, {seconds:.2f} seconds)")
+        
+        validation_stats['output_writes'] = {
+            output_type: dict(write_info[output_type], path=os.path.basename(file_path))
+            for output_type, file_path in output_files.items()
+        }
         
         # Optional Output 4: Processing log and configuration
         try:
-            log_config_files = write_processing_log_and_config(
+            log_config_files, seconds = run_writer(lambda: write_processing_log_and_config(
                 raw_df, hourly_df, weekly_df, validation_stats, params,
                 processing_start_time, processing_end_time, output_dir
-            )
+            ))
             output_files.update(log_config_files)
+            for output_type in log_config_files:
+                write_info[output_type] = {'writer': 'processing_log', 'seconds': seconds}
             logger.info(f"Written: processing log and configuration files")
         except Exception as e:
             logger.error(f"✗ Failed to write processing log/config: {e}")
         
-        # Optional Output 5: Parquet files for faster downstream processing
-        if params.get('write_parquet_output', False):
-            try:
-                parquet_files = write_parquet_outputs(hourly_df, weekly_df, output_dir)
-                output_files.update(parquet_files)
-                logger.info(f"Written: {len(parquet_files)} Parquet files")
-            except Exception as e:
-                logger.error(f"✗ Failed to write Parquet files: {e}")
-        
-        # Optional Output 6: Data preview files for GUI
-        if params.get('write_preview_files', True):
-            try:
-                preview_files = write_preview_files(raw_df, hourly_df, weekly_df, output_dir)
-                output_files.update(preview_files)
-                logger.info(f"Written: {len(preview_files)} preview files")
-            except Exception as e:
-                logger.error(f"✗ Failed to write preview files: {e}")
+        try:
+            output_files['output_manifest'] = write_output_manifest(output_files, write_info, output_dir)
+        except Exception as e:
+            logger.error(f"✗ Failed to write output manifest: {e}")
         
         logger.info(f"Output file writing completed: {len(output_files)} files generated")
         return output_files
@@ -1331,32 +2706,179 @@ def write_all_output_files(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekly
         return output_files
 
 
-def write_parquet_outputs(hourly_df: pd.DataFrame, weekly_df: pd.DataFrame, output_dir: str) -> Dict[str, str]:
+# Hive-partitioned Parquet layouts: partition column and in-partition sort order (link first,
+# so row-group statistics on link_id let readers skip row groups for other links)
+PARQUET_DATASET_LAYOUTS = {
+    'hourly_agg': {'partition_column': 'date', 'sort_columns': ['link_id', 'hour_of_day']},
+    'weekly_hourly_profile': {'partition_column': 'daytype', 'sort_columns': ['link_id', 'hour_of_day']}
+}
+PARQUET_ROW_GROUP_SIZE = 50000
+PARQUET_MANIFEST_NAME = '_manifest.json'
+
+
+def _partition_time_range(part: pd.DataFrame) -> dict:
+    """Time span covered by one partition: timestamps when dates are present, else hours of day"""
+    if 'hour_of_day' not in part.columns or part.empty:
+        return {}
+    hours = part['hour_of_day'].astype(int)
+    if 'date' not in part.columns:
+        return {'hour_start': int(hours.min()), 'hour_end': int(hours.max())}
+    starts = pd.to_datetime(part['date'].astype(str)) + pd.to_timedelta(hours.to_numpy(), unit='h')
+    return {
+        'start': starts.min().isoformat(),
+        'end': (starts.max() + pd.Timedelta(hours=1)).isoformat()
+    }
+
+
+def _write_parquet_file(data: pd.DataFrame, file_path: Path, row_group_size: int) -> None:
+    """Write one partition file with dictionary encoding, statistics and bounded row groups"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    # Drop categories absent from this partition so each file's dictionary stays small
+    data = data.copy(deep=False)
+    for col in data.columns:
+        if isinstance(data[col].dtype, pd.CategoricalDtype):
+            data[col] = data[col].cat.remove_unused_categories()
+    
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    pq.write_table(table, file_path, row_group_size=row_group_size, use_dictionary=True,
+                   write_statistics=True, compression='snappy')
+
+
+def write_parquet_dataset(df: pd.DataFrame, dataset_dir: Union[str, Path], partition_column: str,
+                          sort_columns: List[str], row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> dict:
     """
-    Write Parquet files for faster downstream processing
+    Write a DataFrame as a hive-partitioned Parquet dataset with a manifest
+    
+    Each partition directory (partition_column=value) holds one file sorted by
+    sort_columns, written in row groups of row_group_size with dictionary
+    encoding and column statistics, so readers can prune by partition and link.
+    Any previous dataset at dataset_dir is replaced.
+    
+    Args:
+        df: DataFrame to write (moment columns are dropped)
+        dataset_dir: Dataset root directory
+        partition_column: Column used for hive partitions (written unpartitioned if absent)
+        sort_columns: Row order within each partition file
+        row_group_size: Maximum rows per row group
+        
+    Returns:
+        Manifest dictionary (also written to dataset_dir/_manifest.json)
+    """
+    import shutil
+    
+    dataset_path = Path(dataset_dir)
+    if dataset_path.is_dir():
+        shutil.rmtree(dataset_path)
+    elif dataset_path.exists():
+        dataset_path.unlink()  # Flat file written by an older version
+    dataset_path.mkdir(parents=True)
+    
+    published = drop_moment_columns(df)
+    if 'link_id' in published.columns and not isinstance(published['link_id'].dtype, pd.CategoricalDtype):
+        published = published.assign(link_id=published['link_id'].astype('category'))
+    
+    partitioned = partition_column in published.columns
+    groups = published.groupby(partition_column, observed=True, sort=True) if partitioned else [(None, published)]
+    
+    partitions = []
+    for value, part in groups:
+        sort_by = [col for col in sort_columns if col in part.columns]
+        part = part.sort_values(sort_by, kind='stable') if sort_by else part
+        
+        if partitioned:
+            value_str = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+            partition_dir = dataset_path / f"{partition_column}={value_str}"
+            partition_dir.mkdir()
+            data = part.drop(columns=[partition_column])
+        else:
+            value_str = None
+            partition_dir = dataset_path
+            data = part
+        
+        file_path = partition_dir / 'part-0.parquet'
+        _write_parquet_file(data, file_path, row_group_size)
+        
+        partitions.append({
+            'partition': value_str,
+            'path': str(file_path.relative_to(dataset_path)),
+            'rows': len(part),
+            'row_groups': -(-len(part) // row_group_size) if len(part) else 0,
+            'links': int(part['link_id'].nunique()) if 'link_id' in part.columns else None,
+            'time_range': _partition_time_range(part)
+        })
+    
+    manifest = {
+        'dataset': dataset_path.name,
+        'created': datetime.now().isoformat(),
+        'partition_column': partition_column if partitioned else None,
+        'sort_columns': sort_columns,
+        'row_group_size': row_group_size,
+        'total_rows': len(published),
+        'partitions': partitions
+    }
+    with open(dataset_path / PARQUET_MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    logger.info(f"Parquet dataset {dataset_path}: {len(partitions)} partitions, {len(published):,} rows")
+    return manifest
+
+
+def read_parquet_dataset(dataset_dir: Union[str, Path], partitions: Optional[List[str]] = None,
+                         links: Optional[List[str]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a dataset written by write_parquet_dataset, pruning partitions and row groups
+    
+    Args:
+        dataset_dir: Dataset root directory
+        partitions: Partition values to keep (e.g. dates 'YYYY-MM-DD' or daytypes)
+        links: link_id values to keep (row groups are skipped using column statistics)
+        columns: Columns to read (default all)
+        
+    Returns:
+        DataFrame with the partition column restored
+    """
+    with open(Path(dataset_dir) / PARQUET_MANIFEST_NAME, encoding='utf-8') as f:
+        partition_column = json.load(f).get('partition_column')
+    
+    filters = []
+    if partitions is not None and partition_column:
+        filters.append((partition_column, 'in', [str(value) for value in partitions]))
+    if links is not None:
+        filters.append(('link_id', 'in', list(links)))
+    
+    return pd.read_parquet(dataset_dir, engine='pyarrow', columns=columns, filters=filters or None)
+
+
+def write_parquet_outputs(hourly_df: pd.DataFrame, weekly_df: pd.DataFrame, output_dir: str,
+                          row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> Dict[str, str]:
+    """
+    Write partitioned Parquet datasets for faster downstream processing
+    
+    hourly_agg.parquet/ is partitioned by date= and weekly_hourly_profile.parquet/
+    by daytype=; each dataset carries a _manifest.json with per-partition row
+    counts and time ranges.
     
     Args:
         hourly_df: Hourly aggregation DataFrame
         weekly_df: Weekly profile DataFrame
         output_dir: Output directory
+        row_group_size: Maximum rows per Parquet row group
         
     Returns:
-        Dictionary of written Parquet file paths
+        Dictionary of written dataset manifest paths
     """
     parquet_files = {}
     
     try:
-        # Write hourly aggregation as Parquet
-        if not hourly_df.empty:
-            hourly_parquet_path = Path(output_dir) / 'hourly_agg.parquet'
-            hourly_df.to_parquet(hourly_parquet_path, index=False, engine='pyarrow')
-            parquet_files['hourly_agg_parquet'] = str(hourly_parquet_path)
-        
-        # Write weekly profile as Parquet
-        if not weekly_df.empty:
-            weekly_parquet_path = Path(output_dir) / 'weekly_hourly_profile.parquet'
-            weekly_df.to_parquet(weekly_parquet_path, index=False, engine='pyarrow')
-            parquet_files['weekly_hourly_profile_parquet'] = str(weekly_parquet_path)
+        for name, df in (('hourly_agg', hourly_df), ('weekly_hourly_profile', weekly_df)):
+            if df.empty:
+                continue
+            layout = PARQUET_DATASET_LAYOUTS[name]
+            dataset_dir = Path(output_dir) / f'{name}.parquet'
+            write_parquet_dataset(df, dataset_dir, layout['partition_column'], layout['sort_columns'], row_group_size)
+            parquet_files[f'{name}_parquet'] = str(dataset_dir / PARQUET_MANIFEST_NAME)
         
     except ImportError:
         logger.warning("PyArrow not available, skipping Parquet output")
@@ -1366,8 +2888,144 @@ def write_parquet_outputs(hourly_df: pd.DataFrame, weekly_df: pd.DataFrame, outp
     return parquet_files
 
 
+HOURLY_STORE_MANIFEST = '_store.json'
+
+
+def update_hourly_store(store_dir: Union[str, Path], hourly_df: pd.DataFrame,
+                        row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+                        dates: Optional[List[str]] = None) -> dict:
+    """
+    Replace the date partitions of a persistent hourly store with freshly aggregated hours
+    
+    The store keeps hourly rows with their mergeable moments, partitioned by date=.
+    Every date present in hourly_df replaces that date's partition as a whole, so
+    re-ingesting a date is idempotent; other dates are left untouched. hourly_df
+    must therefore hold every input row of the dates it carries. Each partition is
+    written to a temporary directory and swapped in.
+    
+    Args:
+        store_dir: Store root directory (created if missing)
+        hourly_df: Output of create_hourly_aggregation (moment columns included)
+        row_group_size: Maximum rows per Parquet row group
+        dates: Optional ISO dates to replace; hours of other dates in hourly_df are
+            not written
+        
+    Returns:
+        Dictionary with dates_replaced, dates_added, rows_written and dates_stored
+    """
+    import shutil
+    
+    store_path = Path(store_dir)
+    store_path.mkdir(parents=True, exist_ok=True)
+    manifest_path = store_path / HOURLY_STORE_MANIFEST
+    if manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    else:
+        manifest = {'columns': list(hourly_df.columns), 'dates': {}}
+    
+    update = {'dates_replaced': [], 'dates_added': [], 'rows_written': 0}
+    if dates is not None and not hourly_df.empty:
+        day_strings = pd.to_datetime(hourly_df['date'].astype(str)).dt.strftime('%Y-%m-%d')
+        hourly_df = hourly_df[day_strings.isin(dates).to_numpy()]
+    if hourly_df.empty:
+        update['dates_stored'] = len(manifest['dates'])
+        return update
+    
+    for day, part in hourly_df.groupby('date', sort=True, observed=True):
+        day_str = day.isoformat() if hasattr(day, 'isoformat') else str(day)
+        partition_dir = store_path / f"date={day_str}"
+        staging_dir = store_path / f".date={day_str}.tmp"
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+        staging_dir.mkdir()
+        
+        part = part.sort_values(['link_id', 'hour_of_day'], kind='stable')
+        _write_parquet_file(part.drop(columns=['date']), staging_dir / 'part-0.parquet', row_group_size)
+        
+        if partition_dir.exists():
+            shutil.rmtree(partition_dir)
+            update['dates_replaced'].append(day_str)
+        else:
+            update['dates_added'].append(day_str)
+        staging_dir.rename(partition_dir)
+        
+        manifest['dates'][day_str] = {'rows': len(part), 'updated': datetime.now().isoformat()}
+        update['rows_written'] += len(part)
+    
+    manifest['dates'] = dict(sorted(manifest['dates'].items()))
+    manifest['updated'] = datetime.now().isoformat()
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    update['dates_stored'] = len(manifest['dates'])
+    logger.info(f"Hourly store {store_path}: replaced {len(update['dates_replaced'])}, "
+                f"added {len(update['dates_added'])} dates ({update['dates_stored']} stored)")
+    return update
+
+
+def load_hourly_store(store_dir: Union[str, Path], params: dict) -> pd.DataFrame:
+    """
+    Load stored hourly rows for the weekly refresh, applying the run's filters
+    
+    Date range filters prune partitions; weekday (from the date), hour and link
+    filters are applied to the loaded rows. valid_hour is recomputed with the
+    run's min_valid_per_hour, so the store does not pin the threshold.
+    
+    Args:
+        store_dir: Store root directory written by update_hourly_store
+        params: Processing parameters (filters, min_valid_per_hour)
+        
+    Returns:
+        Hourly DataFrame in create_hourly_aggregation's column layout
+    """
+    store_path = Path(store_dir)
+    with open(store_path / HOURLY_STORE_MANIFEST, encoding='utf-8') as f:
+        manifest = json.load(f)
+    
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    start_date = pd.to_datetime(start_date).date() if start_date else None
+    end_date = pd.to_datetime(end_date).date() if end_date else None
+    dates = [
+        day_str for day_str in manifest['dates']
+        if (start_date is None or date.fromisoformat(day_str) >= start_date)
+        and (end_date is None or date.fromisoformat(day_str) <= end_date)
+    ]
+    if not dates:
+        return pd.DataFrame(columns=manifest['columns'])
+    
+    hourly = pd.read_parquet(store_path, engine='pyarrow', filters=[('date', 'in', dates)])
+    hourly['date'] = pd.to_datetime(hourly['date'].astype(str)).dt.date
+    
+    keep = np.ones(len(hourly), dtype=bool)
+    weekdays = params.get('weekday_include')
+    if isinstance(weekdays, (list, tuple)) and weekdays:
+        keep &= pd.to_datetime(hourly['date']).dt.weekday.isin(weekdays).to_numpy()
+    hours = params.get('hours_include')
+    if isinstance(hours, (list, tuple)) and hours:
+        keep &= hourly['hour_of_day'].isin(hours).to_numpy()
+    whitelist = _parse_link_list(params.get('whitelist_links'))
+    blacklist = _parse_link_list(params.get('blacklist_links'))
+    if whitelist:
+        keep &= hourly['link_id'].isin(whitelist).to_numpy()
+    if blacklist:
+        keep &= ~hourly['link_id'].isin(blacklist).to_numpy()
+    if not keep.all():
+        hourly = hourly.take(np.flatnonzero(keep))
+    
+    min_valid_per_hour = params.get('min_valid_per_hour', 1)
+    hourly['valid_hour'] = hourly['n_valid'] >= min_valid_per_hour
+    hourly['no_valid_hour'] = (~hourly['valid_hour']).astype(int)
+    
+    columns = [col for col in manifest['columns'] if col in hourly.columns]
+    hourly = hourly[columns].sort_values(['date', 'link_id', 'hour_of_day'], kind='stable').reset_index(drop=True)
+    logger.info(f"Loaded {len(hourly):,} stored hourly rows over {len(dates)} dates from {store_path}")
+    return hourly
+
+
 def write_preview_files(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekly_df: pd.DataFrame, 
-                       output_dir: str, preview_rows: int = 100) -> Dict[str, str]:
+                       output_dir: str, preview_rows: int = PREVIEW_ROWS) -> Dict[str, str]:
     """
     Write preview CSV files with limited rows for GUI display
     
@@ -1394,7 +3052,7 @@ def write_preview_files(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekly_df
         # Write hourly aggregation preview
         if not hourly_df.empty:
             hourly_preview_path = Path(output_dir) / 'hourly_agg_preview.csv'
-            preview_df = hourly_df.head(preview_rows)
+            preview_df = drop_moment_columns(hourly_df).head(preview_rows)
             preview_df.to_csv(hourly_preview_path, index=False)
             preview_files['hourly_agg_preview'] = str(hourly_preview_path)
         
@@ -1426,7 +3084,10 @@ def apply_filtering_and_selection(df: pd.DataFrame, params: dict) -> pd.DataFram
         return df
     
     logger.info(f"Starting filtering and selection on {len(df):,} rows")
-    df_filtered = df.copy()
+    
+    # Filters only select rows and never modify df, so no defensive copy is needed;
+    # each filter allocates only when it actually removes rows
+    df_filtered = df
     
     # Apply date range filtering
     df_filtered = apply_date_range_filter(df_filtered, params)
@@ -1463,34 +3124,34 @@ def apply_date_range_filter(df: pd.DataFrame, params: dict) -> pd.DataFrame:
         logger.warning("Cannot apply date range filter: 'date' column not found")
         return df
     
-    df_filtered = df.copy()
-    initial_count = len(df_filtered)
+    initial_count = len(df)
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    if start_date is None and end_date is None:
+        return df
+    
+    # Compare on a plain date view so categorical date columns stay untouched in the frame
+    dates = df['date']
+    if isinstance(dates.dtype, pd.CategoricalDtype):
+        dates = pd.to_datetime(dates).dt.date
+    keep = np.ones(initial_count, dtype=bool)
     
     # Apply start_date filter
-    start_date = params.get('start_date')
     if start_date is not None:
         if isinstance(start_date, str):
             start_date = pd.to_datetime(start_date).date()
-        # Ensure date column is not categorical for comparison
-        if pd.api.types.is_categorical_dtype(df_filtered['date']):
-            df_filtered['date'] = pd.to_datetime(df_filtered['date']).dt.date
-        df_filtered = df_filtered[df_filtered['date'] >= start_date]
-        logger.info(f"Applied start_date filter ({start_date}): {len(df_filtered):,} rows remaining")
+        keep &= (dates >= start_date).to_numpy()
+        logger.info(f"Applied start_date filter ({start_date}): {int(keep.sum()):,} rows remaining")
     
     # Apply end_date filter
-    end_date = params.get('end_date')
     if end_date is not None:
         if isinstance(end_date, str):
             end_date = pd.to_datetime(end_date).date()
-        # Ensure date column is not categorical for comparison
-        if pd.api.types.is_categorical_dtype(df_filtered['date']):
-            df_filtered['date'] = pd.to_datetime(df_filtered['date']).dt.date
-        df_filtered = df_filtered[df_filtered['date'] <= end_date]
-        logger.info(f"Applied end_date filter ({end_date}): {len(df_filtered):,} rows remaining")
+        keep &= (dates <= end_date).to_numpy()
+        logger.info(f"Applied end_date filter ({end_date}): {int(keep.sum()):,} rows remaining")
     
-    if start_date or end_date:
-        filtered_count = len(df_filtered)
-        logger.info(f"Date range filtering: {initial_count:,} -> {filtered_count:,} rows")
+    df_filtered = df[keep]
+    logger.info(f"Date range filtering: {initial_count:,} -> {len(df_filtered):,} rows")
     
     return df_filtered
 
@@ -1585,7 +3246,7 @@ def apply_link_filter(df: pd.DataFrame, params: dict) -> pd.DataFrame:
         logger.warning("Cannot apply link filter: 'name' column not found")
         return df
     
-    df_filtered = df.copy()
+    df_filtered = df
     initial_count = len(df_filtered)
     
     # Apply whitelist (include only specified links)
@@ -1625,7 +3286,7 @@ def apply_preset_filters(df: pd.DataFrame, params: dict) -> pd.DataFrame:
     Returns:
         Filtered DataFrame
     """
-    df_filtered = df.copy()
+    df_filtered = df
     initial_count = len(df_filtered)
     
     # Apply weekday_only preset
@@ -1665,6 +3326,91 @@ def apply_preset_filters(df: pd.DataFrame, params: dict) -> pd.DataFrame:
     return df_filtered
 
 
+def _parse_link_list(links) -> List[str]:
+    """Normalize a whitelist/blacklist parameter (list or comma-separated string) to a list"""
+    if isinstance(links, str):
+        return [link.strip() for link in links.split(',') if link.strip()]
+    return list(links) if links else []
+
+
+def build_chunk_predicate(params: dict) -> Optional[Callable[[pd.DataFrame], np.ndarray]]:
+    """
+    Compile date, weekday, hour and link filters into a row predicate for read-time pruning
+    
+    The predicate runs on a chunk with parsed timestamps, before validation, dedup and
+    enrichment, and keeps exactly the rows apply_filtering_and_selection would keep for
+    these filters (weekday honours Hebrew day names the same way map_hebrew_day_names
+    does). Daytype presets depend on holiday classification and stay post-load only.
+    
+    Args:
+        params: Filtering parameters (start_date, end_date, weekday_include, hours_include,
+            whitelist_links, blacklist_links)
+        
+    Returns:
+        Function mapping a chunk to a boolean keep mask, or None when no filter applies
+    """
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    if isinstance(start_date, str):
+        start_date = pd.to_datetime(start_date).date()
+    if isinstance(end_date, str):
+        end_date = pd.to_datetime(end_date).date()
+    
+    weekdays = params.get('weekday_include')
+    if isinstance(weekdays, (list, tuple)):
+        weekdays = [w for w in weekdays if isinstance(w, int) and 0 <= w <= 6] or None
+    else:
+        weekdays = None
+    
+    hours = params.get('hours_include')
+    if isinstance(hours, (list, tuple)):
+        hours = [h for h in hours if isinstance(h, int) and 0 <= h <= 23] or None
+    else:
+        hours = None
+    
+    whitelist = _parse_link_list(params.get('whitelist_links'))
+    blacklist = _parse_link_list(params.get('blacklist_links'))
+    
+    if all(value is None for value in (start_date, end_date, weekdays, hours)) and not whitelist and not blacklist:
+        return None
+    
+    def predicate(chunk: pd.DataFrame) -> np.ndarray:
+        keep = np.ones(len(chunk), dtype=bool)
+        
+        if start_date is not None or end_date is not None or hours or weekdays:
+            # Evaluate calendar conditions once per distinct date-hour
+            codes, calendar = build_calendar_dimension(chunk['timestamp'], include_holidays=False)
+            has_date = calendar['date'].notna().to_numpy()
+            dates = calendar['date'].where(has_date, date.min)
+            calendar_keep = np.ones(len(calendar), dtype=bool)
+            if start_date is not None or end_date is not None:
+                calendar_keep &= has_date
+            if start_date is not None:
+                calendar_keep &= (dates >= start_date).to_numpy()
+            if end_date is not None:
+                calendar_keep &= (dates <= end_date).to_numpy()
+            if hours:
+                calendar_keep &= calendar['hour_of_day'].isin(hours).to_numpy()
+            keep &= calendar_keep[codes]
+            
+            if weekdays:
+                weekday_index = pd.Series(calendar['weekday_index'].to_numpy(dtype='float64')[codes], index=chunk.index)
+                if 'day_in_week' in chunk.columns:
+                    hebrew_weekday = _map_hebrew_day_values(chunk['day_in_week'])
+                    if hebrew_weekday is not None:
+                        weekday_index = hebrew_weekday.fillna(weekday_index)
+                keep &= weekday_index.isin(weekdays).to_numpy()
+        
+        if whitelist:
+            keep &= chunk['name'].isin(whitelist).to_numpy()
+        if blacklist:
+            keep &= ~chunk['name'].isin(blacklist).to_numpy()
+        
+        return keep
+    
+    return predicate
+
+
 def validate_and_clean_data(df_chunk: pd.DataFrame, params: dict) -> pd.DataFrame:
     """Apply validation rules and data cleaning to a chunk"""
     # Step 1: Validate and normalize column names
@@ -1676,12 +3422,13 @@ def validate_and_clean_data(df_chunk: pd.DataFrame, params: dict) -> pd.DataFram
     return df_cleaned
 
 
-def apply_temporal_enhancements(df: pd.DataFrame, params: dict) -> pd.DataFrame:
-    """Add time-based columns and holiday classifications"""
+def apply_temporal_enhancements(df: pd.DataFrame, params: dict, parse_state: Optional[dict] = None,
+                                inplace: bool = False) -> pd.DataFrame:
+    """Add time-based columns and holiday classifications (parse_state caches per-file timestamp format)"""
     if df.empty:
         return df
     
-    df_enhanced = df.copy()
+    df_enhanced = df if inplace else df.copy()
     
     # Ensure timestamp column exists and is parsed
     if 'timestamp' not in df_enhanced.columns:
@@ -1693,21 +3440,30 @@ def apply_temporal_enhancements(df: pd.DataFrame, params: dict) -> pd.DataFrame:
         ts_format = params.get('ts_format', '%Y-%m-%d %H:%M:%S')
         timezone = params.get('tz', 'Asia/Jerusalem')
         df_enhanced['timestamp'] = parse_timestamps_vectorized(
-            df_enhanced['timestamp'], ts_format, timezone
+            df_enhanced['timestamp'], ts_format, timezone, parse_state
         )
     
-    # Add derived time columns
-    df_enhanced = add_derived_time_columns(df_enhanced)
+    if df_enhanced['timestamp'].isna().all():
+        logger.warning("Cannot add derived time columns: timestamp column all NaT")
+        return df_enhanced
+    
+    # Build the calendar dimension over distinct date-hours and join back by integer codes
+    classify_holidays_enabled = params.get('enable_holiday_classification', True)
+    calendar_codes, calendar = build_calendar_dimension(
+        df_enhanced['timestamp'], params, include_holidays=classify_holidays_enabled
+    )
+    join_calendar_columns(df_enhanced, calendar_codes, calendar, ['date', 'hour_of_day', 'iso_week', 'weekday_index'])
     
     # Map Hebrew day names to weekday_index
-    df_enhanced = map_hebrew_day_names(df_enhanced)
+    map_hebrew_day_names(df_enhanced, inplace=True)
     
     # Map DayType to weekday/weekend/holiday categories
-    df_enhanced = map_daytype_categories(df_enhanced, params)
+    map_daytype_categories(df_enhanced, params, inplace=True)
     
-    # Apply holiday classification system
-    if params.get('enable_holiday_classification', True):
-        df_enhanced = classify_holidays(df_enhanced, params)
+    # Apply holiday classification from the calendar dimension
+    if classify_holidays_enabled:
+        join_calendar_columns(df_enhanced, calendar_codes, calendar, ['is_holiday', 'holiday_name'])
+        _apply_holiday_daytype(df_enhanced, params)
     
     logger.info("Temporal enhancements completed")
     return df_enhanced
@@ -1763,7 +3519,7 @@ def create_hourly_aggregation(df: pd.DataFrame, params: dict) -> pd.DataFrame:
     
     # Perform initial groupby for counts
     logger.info("Performing hourly groupby aggregation...")
-    hourly_groups = df.groupby(groupby_cols).agg(agg_dict).reset_index()
+    hourly_groups = df.groupby(groupby_cols, observed=True).agg(agg_dict).reset_index()
     
     # Flatten column names
     hourly_groups.columns = [
@@ -1796,15 +3552,15 @@ def create_hourly_aggregation(df: pd.DataFrame, params: dict) -> pd.DataFrame:
             valid_agg_dict = {}
             
             if 'duration' in metric_cols:
-                valid_agg_dict['duration'] = ['mean', 'std']
+                valid_agg_dict['duration'] = ['mean', 'std', 'count', 'var']
             if 'static_duration' in metric_cols:
-                valid_agg_dict['static_duration'] = ['mean', 'std']
+                valid_agg_dict['static_duration'] = ['mean', 'std', 'count', 'var']
             if 'distance' in metric_cols:
                 valid_agg_dict['distance'] = ['mean']
             if 'speed' in metric_cols:
                 valid_agg_dict['speed'] = ['mean']
             
-            valid_groups = valid_df.groupby(groupby_cols).agg(valid_agg_dict).reset_index()
+            valid_groups = valid_df.groupby(groupby_cols, observed=True).agg(valid_agg_dict).reset_index()
             
             # Flatten column names for valid metrics
             valid_groups.columns = [
@@ -1829,6 +3585,24 @@ def create_hourly_aggregation(df: pd.DataFrame, params: dict) -> pd.DataFrame:
             
             valid_groups = valid_groups.rename(columns=rename_dict)
             
+            # Convert count/var into mergeable moments (n, M2) for exact pooled std later
+            for metric, (n_col, _, m2_col) in HOURLY_MOMENT_COLUMNS.items():
+                if f'{metric}_count' in valid_groups.columns:
+                    counts = valid_groups.pop(f'{metric}_count')
+                    variances = valid_groups.pop(f'{metric}_var')
+                    valid_groups[n_col] = counts
+                    valid_groups[m2_col] = (variances * (counts - 1)).where(counts > 1, 0.0)
+            
+            # Duration t-digests and the percentiles they give, per valid group
+            if params.get('reliability_percentiles', False) and 'duration' in metric_cols:
+                group_codes = valid_df.groupby(groupby_cols, observed=True).ngroup().to_numpy()
+                sketch_columns = build_duration_sketches(
+                    group_codes, valid_df['duration'].to_numpy(dtype=np.float64, na_value=np.nan),
+                    len(valid_groups), params
+                )
+                for col, values in sketch_columns.items():
+                    valid_groups[col] = values
+            
             # Merge metrics back to main hourly aggregation
             merge_cols = ['link_id', 'date', 'hour_of_day', 'daytype']
             hourly_groups = hourly_groups.merge(
@@ -1860,6 +3634,14 @@ def create_hourly_aggregation(df: pd.DataFrame, params: dict) -> pd.DataFrame:
             if col in hourly_groups.columns:
                 hourly_groups.loc[zero_valid_mask, col] = None
 
+    # Hours without valid rows contribute nothing to pooled moments
+    moment_cols = []
+    for n_col, _, m2_col in HOURLY_MOMENT_COLUMNS.values():
+        if n_col in hourly_groups.columns:
+            hourly_groups[n_col] = hourly_groups[n_col].fillna(0).astype('int64')
+            hourly_groups[m2_col] = hourly_groups[m2_col].fillna(0.0)
+            moment_cols.extend([n_col, m2_col])
+
     # Ensure exact column order as specified in requirements
     # Build column list with static_duration fields right after regular duration
     final_columns = [
@@ -1877,12 +3659,22 @@ def create_hourly_aggregation(df: pd.DataFrame, params: dict) -> pd.DataFrame:
     # Continue with remaining columns
     final_columns.extend(['avg_distance_m', 'avg_speed_kmh'])
     
+    # Reliability percentiles and indices follow the published metrics
+    sketch_cols = []
+    if params.get('reliability_percentiles', False):
+        for col in HOURLY_RELIABILITY_COLUMNS[:3]:
+            if col not in hourly_groups.columns:
+                hourly_groups[col] = np.nan
+        add_reliability_indices(hourly_groups, 'p95_duration_sec', 'avg_duration_sec', 'avg_static_duration_sec')
+        final_columns.extend(HOURLY_RELIABILITY_COLUMNS)
+        sketch_cols = [col for col in HOURLY_SKETCH_COLUMNS if col in hourly_groups.columns]
+    
     # Reorder columns and ensure all exist
     for col in final_columns:
         if col not in hourly_groups.columns:
             hourly_groups[col] = None
     
-    hourly_groups = hourly_groups[final_columns]
+    hourly_groups = hourly_groups[final_columns + moment_cols + sketch_cols]
     
     # Log aggregation statistics
     total_hours = len(hourly_groups)
@@ -1902,136 +3694,417 @@ def create_hourly_aggregation(df: pd.DataFrame, params: dict) -> pd.DataFrame:
     return hourly_groups
 
 
-def add_derived_time_columns(df: pd.DataFrame) -> pd.DataFrame:
+# Mergeable quantile sketches (merging t-digest, Dunning) for travel-time reliability.
+# Each group's sketch is a list of centroids (mean, weight) sorted by mean whose rank
+# spans are bounded by the k1 scale function k(q) = compression / (2*pi) *
+# (asin(2q - 1) + pi/2), i.e. at most 2*pi*sqrt(q*(1 - q)) / compression of the
+# group's weight; tail centroids stay single observations. Sketches merge by
+# concatenating centroids and recompressing, so hourly sketches combine into weekly
+# ones without raw rows.
+QUANTILE_SKETCH_COMPRESSION = 200
+
+# (output column suffix, quantile) pairs published as reliability percentiles
+RELIABILITY_QUANTILES = (('p50', 0.50), ('p85', 0.85), ('p95', 0.95))
+
+
+def _group_offsets(group_ids: np.ndarray, n_groups: int) -> np.ndarray:
+    """Start offset of every group in an array sorted by group id (length n_groups + 1)"""
+    return np.concatenate([[0], np.cumsum(np.bincount(group_ids, minlength=n_groups))])
+
+
+def compress_centroids(group_ids: np.ndarray, means: np.ndarray, weights: np.ndarray,
+                       n_groups: int, compression: int = QUANTILE_SKETCH_COMPRESSION
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build or merge t-digests for many groups in one vectorized pass
+
+    Raw observations are centroids of weight 1; merging sketches is compressing the
+    concatenation of their centroids. NaN values are ignored.
+
+    Args:
+        group_ids: Group code (0..n_groups-1) per input centroid
+        means: Centroid means (or raw values)
+        weights: Centroid weights (ones for raw values)
+        n_groups: Number of groups
+        compression: t-digest compression (at most compression / 2 + 1 centroids per group)
+
+    Returns:
+        Tuple of (group_ids, means, weights) of the compressed centroids, sorted by
+        group and then by mean
+    """
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    means = np.asarray(means, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    present = ~np.isnan(means) & (weights > 0)
+    if not present.all():
+        group_ids, means, weights = group_ids[present], means[present], weights[present]
+    if len(means) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+
+    order = np.lexsort((means, group_ids))
+    group_ids, means, weights = group_ids[order], means[order], weights[order]
+
+    # Quantile of every centroid's midpoint within its group
+    totals = np.bincount(group_ids, weights=weights, minlength=n_groups)
+    group_start = np.concatenate([[0.0], np.cumsum(totals)])[:-1]
+    rank_before = np.cumsum(weights) - weights - group_start[group_ids]
+    q = (rank_before + weights / 2) / totals[group_ids]
+
+    # Centroids merge while they fall in the same unit interval of k1(q)
+    k = np.floor(compression / (2 * np.pi) * (np.arcsin(np.clip(2 * q - 1, -1.0, 1.0)) + np.pi / 2))
+    starts = np.flatnonzero(np.r_[True, (np.diff(group_ids) != 0) | (np.diff(k) != 0)])
+
+    merged_weights = np.add.reduceat(weights, starts)
+    merged_means = np.add.reduceat(weights * means, starts) / merged_weights
+    return group_ids[starts], merged_means, merged_weights
+
+
+def sketch_quantiles(group_ids: np.ndarray, means: np.ndarray, weights: np.ndarray,
+                     n_groups: int, quantiles) -> np.ndarray:
+    """
+    Estimate quantiles per group from compressed centroids
+
+    Interpolates linearly between centroid midpoints (for single observations this
+    is numpy's 'hazen' quantile); targets outside the first/last midpoint take the
+    extreme centroid's mean.
+
+    Args:
+        group_ids, means, weights: Output of compress_centroids
+        n_groups: Number of groups
+        quantiles: Sequence of quantiles in [0, 1]
+
+    Returns:
+        Array of shape (n_groups, len(quantiles)); NaN for groups without data
+    """
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    result = np.full((n_groups, len(quantiles)), np.nan)
+    if len(means) == 0:
+        return result
+
+    offsets = _group_offsets(group_ids, n_groups)
+    totals = np.bincount(group_ids, weights=weights, minlength=n_groups)
+    group_start = np.concatenate([[0.0], np.cumsum(totals)])[:-1]
+    centers = np.cumsum(weights) - weights / 2 - group_start[group_ids]
+
+    # Position of each centroid midpoint as group_id + fraction of the group's weight,
+    # so one searchsorted finds the bracketing centroids for every group
+    position = group_ids + centers / totals[group_ids]
+    has_data = np.flatnonzero(totals > 0)
+
+    for j, quantile in enumerate(quantiles):
+        target_rank = quantile * totals[has_data]
+        upper = np.searchsorted(position, has_data + quantile)
+        first, last = offsets[has_data], offsets[has_data + 1] - 1
+        upper = np.clip(upper, first, last)
+        lower = np.clip(upper - 1, first, last)
+
+        span = centers[upper] - centers[lower]
+        fraction = np.where(span > 0, (target_rank - centers[lower]) / np.where(span > 0, span, 1.0), 0.0)
+        fraction = np.clip(fraction, 0.0, 1.0)
+        estimate = means[lower] + fraction * (means[upper] - means[lower])
+
+        # Below the first or above the last midpoint: the extreme centroid
+        estimate = np.where(target_rank <= centers[first], means[first], estimate)
+        estimate = np.where(target_rank >= centers[last], means[last], estimate)
+        result[has_data, j] = estimate
+    return result
+
+
+def split_sketches(group_ids: np.ndarray, means: np.ndarray, weights: np.ndarray,
+                   n_groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split flat centroids into one (means, weights) array pair per group
+
+    Args:
+        group_ids, means, weights: Output of compress_centroids
+        n_groups: Number of groups
+
+    Returns:
+        Tuple of two object arrays of length n_groups holding per-group float arrays
+    """
+    boundaries = _group_offsets(group_ids, n_groups)[1:-1]
+    group_means = np.empty(n_groups, dtype=object)
+    group_weights = np.empty(n_groups, dtype=object)
+    group_means[:] = np.split(means, boundaries)
+    group_weights[:] = np.split(weights, boundaries)
+    return group_means, group_weights
+
+
+def flatten_sketches(group_codes: np.ndarray, sketch_means: pd.Series,
+                     sketch_weights: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Concatenate per-row sketches into flat centroids tagged with a target group code
+
+    Args:
+        group_codes: Target group code per row
+        sketch_means: Per-row centroid means (arrays, lists or missing values)
+        sketch_weights: Per-row centroid weights aligned with sketch_means
+
+    Returns:
+        Tuple of (group_ids, means, weights) ready for compress_centroids
+    """
+    means = [np.asarray(m, dtype=np.float64) if isinstance(m, (np.ndarray, list)) else np.empty(0)
+             for m in sketch_means]
+    weights = [np.asarray(w, dtype=np.float64) if isinstance(w, (np.ndarray, list)) else np.empty(0)
+               for w in sketch_weights]
+    lengths = np.fromiter((len(m) for m in means), dtype=np.int64, count=len(means))
+    if lengths.sum() == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    return (np.repeat(np.asarray(group_codes, dtype=np.int64), lengths),
+            np.concatenate(means), np.concatenate(weights))
+
+
+def build_duration_sketches(group_codes: np.ndarray, durations: np.ndarray, n_groups: int,
+                            params: dict) -> Dict[str, Any]:
+    """
+    Build per-group duration t-digests and their reliability percentiles
+    
+    Args:
+        group_codes: Group code (0..n_groups-1, negative for dropped keys) per valid row
+        durations: Duration per valid row
+        n_groups: Number of groups
+        params: Processing parameters (quantile_sketch_compression)
+        
+    Returns:
+        Dictionary of column name -> per-group values for the sketch columns and
+        p50/p85/p95_duration_sec
+    """
+    keep = group_codes >= 0
+    compression = params.get('quantile_sketch_compression', QUANTILE_SKETCH_COMPRESSION)
+    centroids = compress_centroids(group_codes[keep], durations[keep], np.ones(int(keep.sum())),
+                                   n_groups, compression)
+    estimates = sketch_quantiles(*centroids, n_groups, [q for _, q in RELIABILITY_QUANTILES])
+    
+    columns = dict(zip(HOURLY_SKETCH_COLUMNS, split_sketches(*centroids, n_groups)))
+    for j, (label, _) in enumerate(RELIABILITY_QUANTILES):
+        columns[f'{label}_duration_sec'] = estimates[:, j]
+    return columns
+
+
+def add_reliability_indices(df: pd.DataFrame, p95_col: str, mean_col: str, free_flow_col: str) -> pd.DataFrame:
+    """
+    Add buffer and planning time indices from the 95th percentile travel time
+    
+    buffer_time_index = (p95 - mean) / mean; planning_time_index = p95 / free-flow
+    time, where the free-flow time is the static (no-traffic) duration when the
+    input provides it, otherwise the index is left empty.
+    
+    Args:
+        df: Hourly or weekly DataFrame with the p95 and mean columns (modified in place)
+        p95_col: 95th percentile duration column
+        mean_col: Mean duration column
+        free_flow_col: Free-flow (static) duration column, if present
+        
+    Returns:
+        The same DataFrame
+    """
+    p95 = pd.to_numeric(df[p95_col], errors='coerce').astype('float64')
+    mean = pd.to_numeric(df[mean_col], errors='coerce').astype('float64')
+    df['buffer_time_index'] = (p95 - mean) / mean.where(mean > 0)
+    if free_flow_col in df.columns:
+        free_flow = pd.to_numeric(df[free_flow_col], errors='coerce').astype('float64')
+        df['planning_time_index'] = p95 / free_flow.where(free_flow > 0)
+    else:
+        df['planning_time_index'] = np.nan
+    return df
+
+
+def _infer_daytype_from_weekday(weekday_index: pd.Series) -> np.ndarray:
+    """Vectorized weekday/weekend inference (0-4=weekday, 5-6=weekend, missing=None)"""
+    weekday = pd.to_numeric(weekday_index, errors='coerce').astype('float64').to_numpy()
+    return np.where(weekday < 5, 'weekday', np.where(np.isnan(weekday), None, 'weekend')).astype(object)
+
+
+def build_calendar_dimension(timestamps: pd.Series, params: Optional[dict] = None,
+                             include_holidays: bool = True) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    Build a calendar dimension table keyed by distinct (date, hour) of a timestamp series
+    
+    Calendar features are computed once per distinct local date and hour rather than
+    per row; callers join them back to rows through the returned integer codes.
+    
+    Args:
+        timestamps: Series of timezone-aware timestamps
+        params: Parameters containing holiday configuration (used when include_holidays)
+        include_holidays: Whether to add is_holiday/holiday_name
+        
+    Returns:
+        Tuple of (row codes into the calendar table, calendar DataFrame with columns
+        date, hour_of_day, iso_week, weekday_index and optionally is_holiday, holiday_name)
+        
+    Daytype is not part of the calendar: it comes from the rows' DayType values
+    (map_daytype_categories), and holidays are folded in by _apply_holiday_daytype.
+    """
+    params = params or {}
+    
+    # Distinct timestamps first (15-minute polling repeats each one across every link),
+    # then distinct (date, hour) among them; NaT is kept as its own key
+    timestamp_codes, unique_timestamps = pd.factorize(timestamps, use_na_sentinel=False)
+    unique_timestamps = pd.DatetimeIndex(unique_timestamps)
+    keys = pd.DataFrame({'date': unique_timestamps.date, 'hour_of_day': unique_timestamps.hour})
+    key_codes = keys.groupby(['date', 'hour_of_day'], dropna=False, sort=False).ngroup().to_numpy()
+    
+    # One representative timestamp per (date, hour) key
+    representative_positions = pd.Series(np.arange(len(keys))).groupby(key_codes).first().to_numpy()
+    representatives = unique_timestamps[representative_positions]
+    
+    calendar = pd.DataFrame({
+        'date': representatives.date,
+        'hour_of_day': representatives.hour,
+        'iso_week': representatives.isocalendar()['week'].to_numpy(),
+        'weekday_index': representatives.weekday
+    })
+    calendar['iso_week'] = calendar['iso_week'].astype('UInt32')
+    
+    if include_holidays:
+        holiday_calendar = build_holiday_calendar(calendar, params)
+        calendar['is_holiday'] = calendar['date'].isin(list(holiday_calendar)).to_numpy()
+        calendar['holiday_name'] = calendar['date'].map(holiday_calendar).fillna('').to_numpy(dtype=object)
+    
+    logger.info(f"Built calendar dimension: {len(calendar):,} distinct date-hours for {len(timestamps):,} rows")
+    return key_codes[timestamp_codes], calendar
+
+
+def join_calendar_columns(df: pd.DataFrame, codes: np.ndarray, calendar: pd.DataFrame,
+                          columns: List[str]) -> pd.DataFrame:
+    """
+    Broadcast calendar dimension columns onto rows through integer codes (in place)
+    
+    Args:
+        df: DataFrame whose rows correspond to codes
+        codes: Row codes returned by build_calendar_dimension
+        calendar: Calendar dimension table
+        columns: Calendar columns to join
+        
+    Returns:
+        The same DataFrame with the calendar columns assigned
+    """
+    return assign_columns(df, {col: calendar[col].array.take(codes) for col in columns})
+
+
+def assign_columns(df: pd.DataFrame, columns: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Add or replace a batch of columns on a frame the caller owns (in-place DataFrame.assign)
+    
+    DataFrame.assign returns a new frame and copies every existing column; stages that own
+    their frame compute all new values first and set them here without touching the rest.
+    
+    Args:
+        df: DataFrame to modify
+        columns: Mapping of column name to array-like values aligned with df's rows
+        
+    Returns:
+        The same DataFrame with the columns assigned
+    """
+    for col, values in columns.items():
+        df[col] = values
+    return df
+
+
+def add_derived_time_columns(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Add derived time columns from timestamp
     
     Args:
         df: DataFrame with timestamp column
+        inplace: Add the columns to df itself instead of a copy
         
     Returns:
         DataFrame with additional time columns: date, hour_of_day, iso_week, weekday_index
     """
-    df_with_time = df.copy()
+    df_with_time = df if inplace else df.copy()
     
     # Skip if timestamp column is all NaT or missing
     if 'timestamp' not in df_with_time.columns or df_with_time['timestamp'].isna().all():
         logger.warning("Cannot add derived time columns: timestamp column missing or all NaT")
         return df_with_time
     
-    # Extract date (YYYY-MM-DD)
-    df_with_time['date'] = df_with_time['timestamp'].dt.date
+    # Compute on distinct date-hours and broadcast back
+    codes, calendar = build_calendar_dimension(df_with_time['timestamp'], include_holidays=False)
+    join_calendar_columns(df_with_time, codes, calendar, ['date', 'hour_of_day', 'iso_week', 'weekday_index'])
+    
+    logger.info("Added derived time columns: date, hour_of_day, iso_week, weekday_index")
+    return df_with_time
+
+
+def _map_hebrew_day_values(day_in_week: pd.Series) -> Optional[pd.Series]:
+    """
+    Map Hebrew day names to weekday indices on distinct values and broadcast to rows
     
-    # Extract hour_of_day (0-23)
-    df_with_time['hour_of_day'] = df_with_time['timestamp'].dt.hour
+    Returns a float Series aligned with day_in_week (NaN where unmapped or missing),
+    or None when the column holds no Hebrew day names.
+    """
+    day_codes, day_values = pd.factorize(day_in_week)
+    if not len(day_values):
+        return None
     
-    # Extract ISO week number
-    df_with_time['iso_week'] = df_with_time['timestamp'].dt.isocalendar().week
+    # Check if any values match Hebrew patterns
+    day_strings = pd.Series(day_values).astype(str)
+    if not day_strings.str.contains('יום|א|ב|ג|ד|ה|ו|ש', na=False).any():
+        return None
     
-    # Extract weekday_index (Monday=0, Sunday=6)
-    df_with_time['weekday_index'] = df_with_time['timestamp'].dt.weekday
+    # Clean Hebrew text: replace non-breaking spaces and other whitespace issues
+    cleaned_hebrew = day_strings.str.replace('\xa0', ' ').str.strip()
     
-    logger.info("Added derived time columns: date, hour_of_day, iso_week, weekday_index")
-    return df_with_time
+    # Map distinct values, then broadcast (code -1 marks missing values)
+    mapped_values = np.append(cleaned_hebrew.map(HEBREW_DAY_MAPPING).to_numpy(dtype='float64'), np.nan)
+    return pd.Series(mapped_values[day_codes], index=day_in_week.index)
 
 
-def map_hebrew_day_names(df: pd.DataFrame) -> pd.DataFrame:
+def map_hebrew_day_names(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Map Hebrew day names to weekday_index with default mappings
     
     Args:
         df: DataFrame with day_in_week column containing Hebrew day names
+        inplace: Update weekday_index on df itself instead of a copy
         
     Returns:
         DataFrame with mapped weekday_index values
     """
-    df_mapped = df.copy()
-    
-    # Default Hebrew day name mapping (יום א=Sunday=6, יום ב=Monday=0, etc.)
-    # Note: In Hebrew calendar, Sunday is the first day, but we use Monday=0 as per ISO standard
-    hebrew_day_mapping = {
-        'יום א': 6,  # Sunday
-        'יום ב': 0,  # Monday  
-        'יום ג': 1,  # Tuesday
-        'יום ד': 2,  # Wednesday
-        'יום ה': 3,  # Thursday
-        'יום ו': 4,  # Friday
-        'יום ש': 5,  # Saturday (Shabbat)
-        # Alternative spellings with apostrophe
-        'יום א\'': 6,
-        'יום ב\'': 0,
-        'יום ג\'': 1,
-        'יום ד\'': 2,
-        'יום ה\'': 3,
-        'יום ו\'': 4,
-        'יום ש\'': 5,
-        # Short forms
-        'א': 6,
-        'ב': 0,
-        'ג': 1,
-        'ד': 2,
-        'ה': 3,
-        'ו': 4,
-        'ש': 5,
-        # Short forms with apostrophe
-        'א\'': 6,
-        'ב\'': 0,
-        'ג\'': 1,
-        'ד\'': 2,
-        'ה\'': 3,
-        'ו\'': 4,
-        'ש\'': 5
-    }
+    df_mapped = df if inplace else df.copy()
     
-    # If day_in_week column exists and contains Hebrew names, map them
+    # If day_in_week column exists and contains Hebrew names, map them.
+    # The column has only a handful of distinct values, so they are mapped once and broadcast.
     if 'day_in_week' in df_mapped.columns:
-        # Only map if weekday_index is not already correctly set from timestamp
-        hebrew_values = df_mapped['day_in_week'].dropna()
-        if not hebrew_values.empty:
-            # Check if any values match Hebrew patterns
-            has_hebrew = hebrew_values.astype(str).str.contains('יום|א|ב|ג|ד|ה|ו|ש', na=False).any()
+        hebrew_mapped = _map_hebrew_day_values(df_mapped['day_in_week'])
+        if hebrew_mapped is not None:
+            logger.info("Mapping Hebrew day names to weekday_index")
             
-            if has_hebrew:
-                logger.info("Mapping Hebrew day names to weekday_index")
-                
-                # Clean Hebrew text: replace non-breaking spaces and other whitespace issues
-                cleaned_hebrew = df_mapped['day_in_week'].astype(str).str.replace('\xa0', ' ').str.strip()
-                
-                # Create mapping series
-                hebrew_mapped = cleaned_hebrew.map(hebrew_day_mapping)
-                
-                # Use Hebrew mapping where available, otherwise keep existing weekday_index
-                if 'weekday_index' in df_mapped.columns:
-                    df_mapped['weekday_index'] = hebrew_mapped.fillna(df_mapped['weekday_index'])
-                else:
-                    df_mapped['weekday_index'] = hebrew_mapped
-                
-                # Log mapping statistics
-                mapped_count = hebrew_mapped.notna().sum()
-                total_hebrew = hebrew_values.notna().sum()
-                logger.info(f"Mapped {mapped_count}/{total_hebrew} Hebrew day names to weekday_index")
-                
-                # Warn about unmapped values
-                unmapped = df_mapped[df_mapped['day_in_week'].notna() & df_mapped['weekday_index'].isna()]
-                if not unmapped.empty:
-                    unique_unmapped = unmapped['day_in_week'].unique()
-                    logger.warning(f"Could not map Hebrew day names: {list(unique_unmapped)}")
+            # Use Hebrew mapping where available, otherwise keep existing weekday_index
+            if 'weekday_index' in df_mapped.columns:
+                df_mapped['weekday_index'] = hebrew_mapped.fillna(df_mapped['weekday_index'])
+            else:
+                df_mapped['weekday_index'] = hebrew_mapped
+            
+            # Log mapping statistics
+            mapped_count = hebrew_mapped.notna().sum()
+            total_hebrew = df_mapped['day_in_week'].notna().sum()
+            logger.info(f"Mapped {mapped_count}/{total_hebrew} Hebrew day names to weekday_index")
+            
+            # Warn about unmapped values
+            unmapped = df_mapped['day_in_week'].notna() & df_mapped['weekday_index'].isna()
+            if unmapped.any():
+                unique_unmapped = df_mapped.loc[unmapped, 'day_in_week'].unique()
+                logger.warning(f"Could not map Hebrew day names: {list(unique_unmapped)}")
     
     return df_mapped
 
 
-def map_daytype_categories(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+def map_daytype_categories(df: pd.DataFrame, params: dict, inplace: bool = False) -> pd.DataFrame:
     """
     Map DayType values to weekday/weekend/holiday categories
     
     Args:
         df: DataFrame with day_type column
         params: Parameters containing daytype mapping configuration
+        inplace: Set daytype on df itself instead of a copy
         
     Returns:
         DataFrame with normalized daytype values
     """
-    df_mapped = df.copy()
+    df_mapped = df if inplace else df.copy()
     
     # Default Hebrew DayType mapping
     default_daytype_mapping = {
@@ -2082,12 +4155,11 @@ def map_daytype_categories(df: pd.DataFrame, params: dict) -> pd.DataFrame:
     if 'day_type' in df_mapped.columns:
         logger.info("Mapping DayType values to weekday/weekend/holiday categories")
         
-        # Clean DayType text: replace non-breaking spaces and other whitespace issues
-        cleaned_daytype = df_mapped['day_type'].astype(str).str.replace('\xa0', ' ').str.strip()
-        
-        # Apply the mapping
-        original_values = df_mapped['day_type'].copy()
-        df_mapped['daytype'] = cleaned_daytype.map(daytype_mapping)
+        # Clean and map the distinct DayType values only, then broadcast through codes
+        daytype_codes, daytype_values = pd.factorize(df_mapped['day_type'])
+        cleaned_daytype = pd.Series(daytype_values, dtype=object).astype(str).str.replace('\xa0', ' ').str.strip()
+        mapped_values = np.append(cleaned_daytype.map(daytype_mapping).to_numpy(dtype=object), np.nan)
+        df_mapped['daytype'] = mapped_values[daytype_codes]
         
         # For unmapped values, try to infer from weekday_index if available
         if 'weekday_index' in df_mapped.columns:
@@ -2096,10 +4168,9 @@ def map_daytype_categories(df: pd.DataFrame, params: dict) -> pd.DataFrame:
                 logger.info("Inferring daytype from weekday_index for unmapped values")
                 
                 # Infer based on weekday_index (0-4=weekday, 5-6=weekend)
-                inferred_daytype = df_mapped.loc[unmapped_mask, 'weekday_index'].apply(
-                    lambda x: 'weekday' if x < 5 else 'weekend' if pd.notna(x) else None
+                df_mapped.loc[unmapped_mask, 'daytype'] = _infer_daytype_from_weekday(
+                    df_mapped.loc[unmapped_mask, 'weekday_index']
                 )
-                df_mapped.loc[unmapped_mask, 'daytype'] = inferred_daytype
         
         # Log mapping statistics
         mapped_count = (df_mapped['daytype'].notna() & df_mapped['day_type'].notna()).sum()
@@ -2107,18 +4178,16 @@ def map_daytype_categories(df: pd.DataFrame, params: dict) -> pd.DataFrame:
         logger.info(f"Mapped {mapped_count}/{total_daytype} DayType values")
         
         # Warn about still unmapped values
-        still_unmapped = df_mapped[df_mapped['day_type'].notna() & df_mapped['daytype'].isna()]
-        if not still_unmapped.empty:
-            unique_unmapped = still_unmapped['day_type'].unique()
+        still_unmapped = df_mapped['day_type'].notna() & df_mapped['daytype'].isna()
+        if still_unmapped.any():
+            unique_unmapped = df_mapped.loc[still_unmapped, 'day_type'].unique()
             logger.warning(f"Could not map DayType values: {list(unique_unmapped)}")
     
     else:
         # If no day_type column, infer from weekday_index
         if 'weekday_index' in df_mapped.columns:
             logger.info("Inferring daytype from weekday_index (no day_type column found)")
-            df_mapped['daytype'] = df_mapped['weekday_index'].apply(
-                lambda x: 'weekday' if x < 5 else 'weekend' if pd.notna(x) else None
-            )
+            df_mapped['daytype'] = _infer_daytype_from_weekday(df_mapped['weekday_index'])
         else:
             logger.warning("Cannot determine daytype: no day_type or weekday_index columns available")
             df_mapped['daytype'] = None
@@ -2280,46 +4349,21 @@ def load_custom_holidays_from_ics(file_path: str) -> Dict[date, str]:
     return custom_holidays
 
 
-def build_holiday_calendar(df: pd.DataFrame, params: dict) -> Dict[date, str]:
-    """
-    Build a comprehensive holiday calendar from Israeli holidays and custom files
-    
-    Args:
-        df: DataFrame containing date information to determine year range
-        params: Parameters containing holiday configuration
-        
-    Returns:
-        Dictionary mapping date objects to holiday names
-    """
+@lru_cache(maxsize=32)
+def _load_holiday_calendar(start_year: int, end_year: int, use_israeli_holidays: bool,
+                           custom_holidays_file: Optional[str], custom_file_mtime: Optional[float]) -> Dict[date, str]:
+    """Load and merge holiday sources once per year range and configuration (memoized across chunks)"""
     holiday_calendar = {}
     
-    # Determine year range from data
-    if 'date' in df.columns and not df['date'].isna().all():
-        dates = pd.to_datetime(df['date']).dropna()
-        if not dates.empty:
-            start_year = dates.dt.year.min()
-            end_year = dates.dt.year.max()
-        else:
-            # Default to current year if no valid dates
-            current_year = datetime.now().year
-            start_year = end_year = current_year
-    else:
-        # Default to current year if no date column
-        current_year = datetime.now().year
-        start_year = end_year = current_year
-    
-    logger.info(f"Building holiday calendar for years {start_year}-{end_year}")
-    
     # Load Israeli holidays if enabled
-    if params.get('use_israeli_holidays', True):
+    if use_israeli_holidays:
         israeli_holidays = load_israeli_holidays((start_year, end_year))
         holiday_calendar.update(israeli_holidays)
     
     # Load custom holidays from text file if provided
-    custom_holidays_file = params.get('custom_holidays_file')
     if custom_holidays_file:
         file_path = Path(custom_holidays_file)
-        if file_path.exists():
+        if custom_file_mtime is not None:
             if file_path.suffix.lower() == '.ics':
                 custom_holidays = load_custom_holidays_from_ics(str(file_path))
             else:
@@ -2334,74 +4378,111 @@ def build_holiday_calendar(df: pd.DataFrame, params: dict) -> Dict[date, str]:
     return holiday_calendar
 
 
-def classify_holidays(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+def build_holiday_calendar(df: pd.DataFrame, params: dict) -> Dict[date, str]:
     """
-    Classify dates as holidays and update daytype accordingly
+    Build a comprehensive holiday calendar from Israeli holidays and custom files
+    
+    The calendar is memoized per year range and holiday configuration, so chunked
+    reads do not rebuild holidays.Israel for every chunk.
     
     Args:
-        df: DataFrame with date column
+        df: DataFrame containing date information to determine year range
         params: Parameters containing holiday configuration
         
     Returns:
-        DataFrame with holiday classifications applied to daytype
+        Dictionary mapping date objects to holiday names
     """
-    if df.empty or 'date' not in df.columns:
-        logger.warning("Cannot classify holidays: missing date column")
-        return df
-    
-    df_with_holidays = df.copy()
-    
-    # Build holiday calendar
-    holiday_calendar = build_holiday_calendar(df, params)
+    # Determine year range from the distinct dates in the data
+    current_year = datetime.now().year
+    start_year = end_year = current_year
+    if 'date' in df.columns and not df['date'].isna().all():
+        dates = pd.to_datetime(pd.Series(pd.unique(df['date'].dropna()))).dropna()
+        if not dates.empty:
+            start_year = int(dates.dt.year.min())
+            end_year = int(dates.dt.year.max())
     
-    if not holiday_calendar:
-        logger.info("No holidays to classify")
-        return df_with_holidays
+    logger.info(f"Building holiday calendar for years {start_year}-{end_year}")
     
-    # Create holiday lookup series
-    df_with_holidays['is_holiday'] = df_with_holidays['date'].apply(
-        lambda x: x in holiday_calendar if pd.notna(x) else False
-    )
+    custom_holidays_file = params.get('custom_holidays_file')
+    custom_file_mtime = None
+    if custom_holidays_file and Path(custom_holidays_file).exists():
+        custom_file_mtime = Path(custom_holidays_file).stat().st_mtime
     
-    # Add holiday name column for reference
-    df_with_holidays['holiday_name'] = df_with_holidays['date'].apply(
-        lambda x: holiday_calendar.get(x, '') if pd.notna(x) else ''
+    holiday_calendar = _load_holiday_calendar(
+        start_year, end_year, bool(params.get('use_israeli_holidays', True)),
+        str(custom_holidays_file) if custom_holidays_file else None, custom_file_mtime
     )
-    
+    return dict(holiday_calendar)
+
+
+def _apply_holiday_daytype(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """Update daytype in place for rows flagged is_holiday according to holidays_as"""
     # Update daytype based on holiday treatment configuration
     holidays_as = params.get('holidays_as', 'holiday')  # 'holiday', 'weekend', or 'weekday'
     
-    if holidays_as == 'holiday':
-        # Keep holidays as separate category
-        df_with_holidays.loc[df_with_holidays['is_holiday'], 'daytype'] = 'holiday'
-    elif holidays_as == 'weekend':
-        # Treat holidays as weekend
-        df_with_holidays.loc[df_with_holidays['is_holiday'], 'daytype'] = 'weekend'
-    elif holidays_as == 'weekday':
-        # Treat holidays as weekday (rare case)
-        df_with_holidays.loc[df_with_holidays['is_holiday'], 'daytype'] = 'weekday'
+    if holidays_as in ('holiday', 'weekend', 'weekday'):
+        # 'holiday' keeps holidays as separate category, 'weekend'/'weekday' fold them in
+        df.loc[df['is_holiday'], 'daytype'] = holidays_as
     
     # Log holiday classification results
-    holiday_count = df_with_holidays['is_holiday'].sum()
-    total_dates = df_with_holidays['date'].notna().sum()
+    holiday_count = df['is_holiday'].sum()
+    total_dates = df['date'].notna().sum()
     
     logger.info(f"Holiday classification completed: {holiday_count}/{total_dates} dates classified as holidays")
     logger.info(f"Holiday treatment: {holidays_as}")
     
     if holiday_count > 0:
-        unique_holidays = df_with_holidays[df_with_holidays['is_holiday']]['holiday_name'].value_counts()
+        unique_holidays = df.loc[df['is_holiday'], 'holiday_name'].value_counts()
         logger.info(f"Holidays found: {dict(unique_holidays.head(10))}")  # Show top 10
     
-    return df_with_holidays
+    return df
+
+
+def classify_holidays(df: pd.DataFrame, params: dict, inplace: bool = False) -> pd.DataFrame:
+    """
+    Classify dates as holidays and update daytype accordingly
+    
+    Args:
+        df: DataFrame with date column
+        params: Parameters containing holiday configuration
+        inplace: Add the holiday columns to df itself instead of a copy
+        
+    Returns:
+        DataFrame with holiday classifications applied to daytype
+    """
+    if df.empty or 'date' not in df.columns:
+        logger.warning("Cannot classify holidays: missing date column")
+        return df
+    
+    df_with_holidays = df if inplace else df.copy()
+    
+    # Look up holidays for distinct dates only and broadcast (code -1 marks missing dates)
+    date_codes, unique_dates = pd.factorize(df_with_holidays['date'])
+    unique_dates = pd.Series(unique_dates, dtype=object)
+    holiday_calendar = build_holiday_calendar(pd.DataFrame({'date': unique_dates}), params)
+    
+    if not holiday_calendar:
+        logger.info("No holidays to classify")
+    
+    is_holiday = np.append(unique_dates.isin(list(holiday_calendar)).to_numpy(), False)
+    holiday_names = np.append(unique_dates.map(holiday_calendar).fillna('').to_numpy(dtype=object), '')
+    assign_columns(df_with_holidays, {
+        'is_holiday': is_holiday[date_codes],
+        'holiday_name': holiday_names[date_codes]
+    })
+    
+    return _apply_holiday_daytype(df_with_holidays, params)
 
 
-def write_hourly_aggregation_csv(hourly_df: pd.DataFrame, output_path: str) -> bool:
+def write_hourly_aggregation_csv(hourly_df: pd.DataFrame, output_path: str,
+                                 write_record: Optional[dict] = None) -> bool:
     """
     Write hourly aggregation DataFrame to CSV with exact schema requirements
     
     Args:
         hourly_df: DataFrame with hourly aggregation data
         output_path: Path where to write the CSV file
+        write_record: Optional dict filled with the rows, bytes and checksum written
         
     Returns:
         True if successful, False otherwise
@@ -2431,8 +4512,11 @@ def write_hourly_aggregation_csv(hourly_df: pd.DataFrame, output_path: str) -> b
         # Continue with remaining required columns
         remaining_columns = ['avg_distance_m', 'avg_speed_kmh']
 
+        # Reliability percentiles and indices are appended when they were computed
+        reliability_columns = [col for col in HOURLY_RELIABILITY_COLUMNS if col in hourly_df.columns]
+
         # Combine all columns in correct order
-        all_columns = required_columns + optional_static_duration + remaining_columns
+        all_columns = required_columns + optional_static_duration + remaining_columns + reliability_columns
 
         # Check that all required columns exist (including remaining columns)
         all_required = required_columns + remaining_columns
@@ -2461,6 +4545,7 @@ def write_hourly_aggregation_csv(hourly_df: pd.DataFrame, output_path: str) -> b
             metric_cols.append('avg_static_duration_sec')
         if 'std_static_duration_sec' in output_df.columns:
             metric_cols.append('std_static_duration_sec')
+        metric_cols.extend(reliability_columns)
 
         for col in metric_cols:
             if col in output_df.columns:
@@ -2469,33 +4554,139 @@ def write_hourly_aggregation_csv(hourly_df: pd.DataFrame, output_path: str) -> b
         # Sort by link_id, date, hour_of_day for consistent output
         output_df = output_df.sort_values(['link_id', 'date', 'hour_of_day'])
         
-        # Write to CSV with proper formatting
-        output_df.to_csv(
+        # Validate the frame about to be written instead of re-reading the file afterwards;
+        # column selection and sorting must not have gained or lost rows
+        if not validate_hourly_aggregation_frame(output_df, len(hourly_df)):
+            logger.error("Hourly aggregation CSV validation failed")
+            return False
+        
+        # Write to CSV with proper formatting, recording row count and checksum as it streams
+        record = write_csv_with_checksum(
+            output_df,
             output_path,
-            index=False,
             na_rep='',  # Empty string for Null values
             date_format='%Y-%m-%d',  # Ensure consistent date format
             float_format='%.6f'  # Consistent float precision
         )
+        if write_record is not None:
+            write_record.update(record)
         
-        # Validate the written file
-        validation_result = validate_hourly_aggregation_output(output_path, len(output_df))
-        
-        if validation_result:
-            logger.info(f"Successfully wrote hourly aggregation CSV: {len(output_df):,} rows")
-            return True
-        else:
-            logger.error("Hourly aggregation CSV validation failed")
-            return False
+        logger.info(f"Successfully wrote hourly aggregation CSV: {len(output_df):,} rows")
+        return True
             
     except Exception as e:
         logger.error(f"Failed to write hourly aggregation CSV: {e}")
         return False
 
 
+class _ChecksumWriter:
+    """Binary file sink for to_csv that hashes and counts the encoded bytes as they are written"""
+
+    def __init__(self, handle: IO[bytes], encoding: str = 'utf-8'):
+        self._handle = handle
+        self._encoding = encoding
+        self.digest = hashlib.sha256()
+        self.bytes_written = 0
+
+    def write(self, text: str) -> int:
+        data = text.encode(self._encoding)
+        self.digest.update(data)
+        self.bytes_written += len(data)
+        self._handle.write(data)
+        return len(text)
+
+
+def write_csv_with_checksum(df: pd.DataFrame, output_path: Union[str, Path], **to_csv_kwargs) -> dict:
+    """
+    Write a DataFrame to CSV in one pass, recording what was written
+    
+    The output bytes are identical to df.to_csv(output_path, index=False, ...); the SHA-256
+    and byte count are taken from the stream, so nothing has to be read back from disk.
+    
+    Args:
+        df: DataFrame to write
+        output_path: Destination CSV path
+        **to_csv_kwargs: Formatting options passed to DataFrame.to_csv
+        
+    Returns:
+        Dictionary with rows, bytes and sha256 of the written file
+    """
+    encoding = to_csv_kwargs.pop('encoding', 'utf-8')
+    with open(output_path, 'wb') as handle:
+        sink = _ChecksumWriter(handle, encoding)
+        df.to_csv(sink, index=False, **to_csv_kwargs)
+    return {'rows': len(df), 'bytes': sink.bytes_written, 'sha256': sink.digest.hexdigest()}
+
+
+def validate_hourly_aggregation_frame(output_df: pd.DataFrame, expected_rows: int) -> bool:
+    """
+    Validate an hourly aggregation frame against the exact output schema requirements
+    
+    Args:
+        output_df: Hourly aggregation frame in output column order
+        expected_rows: Expected number of data rows
+        
+    Returns:
+        True if validation passes, False otherwise
+    """
+    # Check row count
+    if len(output_df) != expected_rows:
+        logger.error(f"Row count mismatch: expected {expected_rows}, got {len(output_df)}")
+        return False
+    
+    # Check exact column order and names (optional static_duration columns may sit after duration,
+    # optional reliability columns after speed)
+    required_columns = [
+        'link_id', 'date', 'hour_of_day', 'daytype', 
+        'n_total', 'n_valid', 'valid_hour', 'no_valid_hour',
+        'avg_duration_sec', 'std_duration_sec', 'avg_distance_m', 'avg_speed_kmh'
+    ]
+    optional_columns = {'avg_static_duration_sec', 'std_static_duration_sec', *HOURLY_RELIABILITY_COLUMNS}
+    present_columns = [col for col in output_df.columns if col not in optional_columns]
+    
+    if present_columns != required_columns:
+        logger.error(f"Column order/names mismatch:")
+        logger.error(f"  Expected: {required_columns}")
+        logger.error(f"  Got: {list(output_df.columns)}")
+        return False
+    
+    # Validate data types and ranges
+    validation_errors = []
+    
+    # Check hour_of_day range (0-23); sums skip nulls in nullable integer columns
+    invalid_hours = int(((output_df['hour_of_day'] < 0) | (output_df['hour_of_day'] > 23)).sum())
+    if invalid_hours:
+        validation_errors.append(f"Invalid hour_of_day values: {invalid_hours} rows")
+    
+    # Check that n_valid <= n_total
+    invalid_counts = int((output_df['n_valid'] > output_df['n_total']).sum())
+    if invalid_counts:
+        validation_errors.append(f"n_valid > n_total in {invalid_counts} rows")
+    
+    # Check for required non-null columns
+    required_non_null = ['link_id', 'date', 'hour_of_day', 'daytype', 'n_total', 'n_valid']
+    for col in required_non_null:
+        null_count = output_df[col].isna().sum()
+        if null_count > 0:
+            validation_errors.append(f"Null values in required column '{col}': {null_count} rows")
+    
+    # Report validation results
+    if validation_errors:
+        logger.error("Hourly aggregation validation errors:")
+        for error in validation_errors:
+            logger.error(f"  - {error}")
+        return False
+    
+    logger.info("Hourly aggregation output validation passed")
+    return True
+
+
 def validate_hourly_aggregation_output(file_path: str, expected_rows: int) -> bool:
     """
-    Validate that the written hourly aggregation CSV matches exact schema requirements
+    Validate that a written hourly aggregation CSV matches exact schema requirements
+    
+    The pipeline validates the frame in memory before writing; this re-reads a file
+    from disk for checking outputs produced elsewhere.
     
     Args:
         file_path: Path to the CSV file to validate
@@ -2510,65 +4701,7 @@ def validate_hourly_aggregation_output(file_path: str, expected_rows: int) -> bo
         # Read the file back to validate with proper encoding
         encoding = detect_file_encoding(file_path)
         validation_df = pd.read_csv(file_path, encoding=encoding)
-        
-        # Check row count
-        if len(validation_df) != expected_rows:
-            logger.error(f"Row count mismatch: expected {expected_rows}, got {len(validation_df)}")
-            return False
-        
-        # Check exact column order and names
-        required_columns = [
-            'link_id', 'date', 'hour_of_day', 'daytype', 
-            'n_total', 'n_valid', 'valid_hour', 'no_valid_hour',
-            'avg_duration_sec', 'std_duration_sec', 'avg_distance_m', 'avg_speed_kmh'
-        ]
-        
-        if list(validation_df.columns) != required_columns:
-            logger.error(f"Column order/names mismatch:")
-            logger.error(f"  Expected: {required_columns}")
-            logger.error(f"  Got: {list(validation_df.columns)}")
-            return False
-        
-        # Validate data types and ranges
-        validation_errors = []
-        
-        # Check hour_of_day range (0-23)
-        if 'hour_of_day' in validation_df.columns:
-            invalid_hours = validation_df[
-                (validation_df['hour_of_day'] < 0) | 
-                (validation_df['hour_of_day'] > 23)
-            ]
-            if not invalid_hours.empty:
-                validation_errors.append(f"Invalid hour_of_day values: {len(invalid_hours)} rows")
-        
-        # Check that n_valid <= n_total
-        if 'n_total' in validation_df.columns and 'n_valid' in validation_df.columns:
-            invalid_counts = validation_df[validation_df['n_valid'] > validation_df['n_total']]
-            if not invalid_counts.empty:
-                validation_errors.append(f"n_valid > n_total in {len(invalid_counts)} rows")
-        
-        # Check that valid_hour is consistent with n_valid
-        if 'valid_hour' in validation_df.columns and 'n_valid' in validation_df.columns:
-            # This would require knowing the min_valid_per_hour parameter, so we'll skip this check
-            pass
-        
-        # Check for required non-null columns
-        required_non_null = ['link_id', 'date', 'hour_of_day', 'daytype', 'n_total', 'n_valid']
-        for col in required_non_null:
-            if col in validation_df.columns:
-                null_count = validation_df[col].isna().sum()
-                if null_count > 0:
-                    validation_errors.append(f"Null values in required column '{col}': {null_count} rows")
-        
-        # Report validation results
-        if validation_errors:
-            logger.error("Hourly aggregation validation errors:")
-            for error in validation_errors:
-                logger.error(f"  - {error}")
-            return False
-        else:
-            logger.info("Hourly aggregation output validation passed")
-            return True
+        return validate_hourly_aggregation_frame(validation_df, expected_rows)
             
     except Exception as e:
         logger.error(f"Error validating hourly aggregation output: {e}")
@@ -2645,7 +4778,7 @@ def create_weekly_profile(hourly_df: pd.DataFrame, params: dict) -> pd.DataFrame
         agg_dict['avg_static_duration_sec'] = 'mean'  # avg_static_dur - mean of avg_static_duration_sec values
     
     # Perform the groupby aggregation
-    weekly_groups = valid_hours_df.groupby(groupby_cols).agg(agg_dict).reset_index()
+    weekly_groups = valid_hours_df.groupby(groupby_cols, observed=True).agg(agg_dict).reset_index()
     
     # Flatten multi-level column names from aggregation
     weekly_groups.columns = ['_'.join(col).strip('_') if isinstance(col, tuple) else col for col in weekly_groups.columns]
@@ -2670,30 +4803,37 @@ def create_weekly_profile(hourly_df: pd.DataFrame, params: dict) -> pd.DataFrame
     # Step 4: Calculate standard deviation based on configuration
     recompute_std_from_raw = params.get('recompute_std_from_raw', False)
     
-    if recompute_std_from_raw:
-        logger.info("Computing std_dur from pooled raw valid rows with ddof=1")
-        weekly_groups['std_dur'] = _compute_std_from_raw_data(valid_hours_df, groupby_cols, params)
-    else:
-        logger.info("Computing std_dur as mean of hourly std_duration_sec values")
-        # Use mean of hourly std_duration_sec values
-        if 'std_duration_sec' in valid_hours_df.columns:
-            std_groups = valid_hours_df.groupby(groupby_cols)['std_duration_sec'].mean().reset_index()
-            std_groups = std_groups.rename(columns={'std_duration_sec': 'std_dur'})
-
-            # Merge std_dur back to weekly_groups
-            weekly_groups = weekly_groups.merge(std_groups, on=groupby_cols, how='left')
-        else:
-            logger.warning("std_duration_sec column not found, setting std_dur to None")
-            weekly_groups['std_dur'] = None
-
-    # Compute std for static_duration if it exists
+    std_targets = [('duration', 'std_duration_sec', 'std_dur')]
     if 'std_static_duration_sec' in valid_hours_df.columns:
-        logger.info("Computing std_static_dur as mean of hourly std_static_duration_sec values")
-        std_static_groups = valid_hours_df.groupby(groupby_cols)['std_static_duration_sec'].mean().reset_index()
-        std_static_groups = std_static_groups.rename(columns={'std_static_duration_sec': 'std_static_dur'})
-
-        # Merge std_static_dur back to weekly_groups
-        weekly_groups = weekly_groups.merge(std_static_groups, on=groupby_cols, how='left')
+        std_targets.append(('static_duration', 'std_static_duration_sec', 'std_static_dur'))
+    
+    for metric, hourly_std_col, weekly_std_col in std_targets:
+        n_col, _, m2_col = HOURLY_MOMENT_COLUMNS[metric]
+        if recompute_std_from_raw and n_col in valid_hours_df.columns:
+            logger.info(f"Computing {weekly_std_col} as exact pooled std from hourly moments (ddof=1)")
+            std_groups = _compute_pooled_std(valid_hours_df, groupby_cols, metric)
+        elif hourly_std_col in valid_hours_df.columns:
+            if recompute_std_from_raw:
+                logger.warning(f"Hourly moments for {metric} not available - using mean of hourly {hourly_std_col} values")
+            else:
+                logger.info(f"Computing {weekly_std_col} as mean of hourly {hourly_std_col} values")
+            std_groups = valid_hours_df.groupby(groupby_cols, observed=True)[hourly_std_col].mean()
+        else:
+            logger.warning(f"{hourly_std_col} column not found, setting {weekly_std_col} to None")
+            weekly_groups[weekly_std_col] = None
+            continue
+        
+        # Merge std back to weekly_groups
+        std_groups = std_groups.rename(weekly_std_col).reset_index()
+        weekly_groups = weekly_groups.merge(std_groups, on=groupby_cols, how='left')
+    
+    # Step 5: Reliability percentiles from the merged hourly duration sketches
+    if all(col in valid_hours_df.columns for col in HOURLY_SKETCH_COLUMNS):
+        logger.info("Merging hourly duration sketches into weekly p50/p85/p95")
+        group_codes = valid_hours_df.groupby(groupby_cols, observed=True).ngroup().to_numpy()
+        for col, values in _merge_duration_sketches(valid_hours_df, group_codes, len(weekly_groups), params).items():
+            weekly_groups[col] = values
+        add_reliability_indices(weekly_groups, 'p95_dur', 'avg_dur', 'avg_static_dur')
     
     # Log weekly profile statistics
     total_profiles = len(weekly_groups)
@@ -2712,41 +4852,280 @@ def create_weekly_profile(hourly_df: pd.DataFrame, params: dict) -> pd.DataFrame
     return weekly_groups
 
 
-def _compute_std_from_raw_data(valid_hours_df: pd.DataFrame, groupby_cols: List[str], params: dict) -> pd.Series:
+def _compute_pooled_std(valid_hours_df: pd.DataFrame, groupby_cols: List[str], metric: str) -> pd.Series:
     """
-    Compute standard deviation from pooled raw valid rows with ddof=1
+    Compute exact pooled standard deviation (ddof=1) from hourly mergeable moments
+    
+    Combines per-hour (n, mean, M2) with the parallel-variance formula
+    (Chan et al.), so the result equals the std over all pooled raw valid rows
+    without access to the raw data.
     
     Args:
-        valid_hours_df: DataFrame with valid hours data
+        valid_hours_df: DataFrame with hourly rows carrying moment columns
         groupby_cols: List of columns to group by
-        params: Parameters dictionary containing raw data access
+        metric: Key in HOURLY_MOMENT_COLUMNS ('duration' or 'static_duration')
         
     Returns:
-        Series with std_dur values indexed by groupby_cols
+        Series with pooled std values indexed by groupby_cols
     """
-    # This is a complex operation that requires access to the original raw data
-    # For now, we'll implement a simplified version that uses the hourly std values
-    # In a full implementation, this would need to access the original raw data
-    # and recompute standard deviation from all valid rows pooled together
+    n_col, mean_col, m2_col = HOURLY_MOMENT_COLUMNS[metric]
     
-    logger.warning("recompute_std_from_raw not fully implemented - using mean of hourly std values as fallback")
+    moments = valid_hours_df[groupby_cols].copy()
+    moments['n'] = pd.to_numeric(valid_hours_df[n_col], errors='coerce').fillna(0).astype('float64')
+    moments['mean'] = pd.to_numeric(valid_hours_df[mean_col], errors='coerce').astype('float64')
+    moments['m2'] = pd.to_numeric(valid_hours_df[m2_col], errors='coerce').fillna(0.0).astype('float64')
+    moments.loc[moments['n'] == 0, 'mean'] = 0.0
+    moments['weighted_sum'] = moments['n'] * moments['mean']
     
-    if 'std_duration_sec' in valid_hours_df.columns:
-        std_groups = valid_hours_df.groupby(groupby_cols)['std_duration_sec'].mean()
-        return std_groups
-    else:
-        # Return None values for all groups
-        group_indices = valid_hours_df.groupby(groupby_cols).size().index
-        return pd.Series([None] * len(group_indices), index=group_indices)
+    grouped = moments.groupby(groupby_cols, sort=False, observed=True)
+    total_n = grouped['n'].transform('sum')
+    pooled_mean = (grouped['weighted_sum'].transform('sum') / total_n.where(total_n > 0)).fillna(0.0)
+    
+    # M2_pooled = sum(M2_i) + sum(n_i * (mean_i - mean_pooled)^2)
+    moments['m2'] = moments['m2'] + moments['n'] * (moments['mean'] - pooled_mean) ** 2
+    
+    pooled = moments.groupby(groupby_cols, observed=True)[['n', 'm2']].sum()
+    variance = pooled['m2'] / (pooled['n'] - 1).where(pooled['n'] > 1)
+    return np.sqrt(variance)
+
+
+def _merge_duration_sketches(valid_hours_df: pd.DataFrame, group_codes: np.ndarray, n_groups: int,
+                             params: dict) -> Dict[str, np.ndarray]:
+    """
+    Merge hourly duration t-digests per weekly group and read off p50/p85/p95
+    
+    Args:
+        valid_hours_df: Valid hourly rows carrying the sketch columns
+        group_codes: Weekly group code per hourly row (negative for dropped keys)
+        n_groups: Number of weekly groups
+        params: Processing parameters (quantile_sketch_compression)
+        
+    Returns:
+        Dictionary with p50_dur, p85_dur and p95_dur arrays in weekly group order
+    """
+    keep = group_codes >= 0
+    means_col, weights_col = HOURLY_SKETCH_COLUMNS
+    centroids = flatten_sketches(group_codes[keep], valid_hours_df[means_col][keep], valid_hours_df[weights_col][keep])
+    centroids = compress_centroids(*centroids, n_groups, params.get('quantile_sketch_compression', QUANTILE_SKETCH_COMPRESSION))
+    estimates = sketch_quantiles(*centroids, n_groups, [q for _, q in RELIABILITY_QUANTILES])
+    return {f'{label}_dur': estimates[:, j] for j, (label, _) in enumerate(RELIABILITY_QUANTILES)}
 
 
-def write_weekly_hourly_profile_csv(weekly_df: pd.DataFrame, output_path: str) -> bool:
+def _update_running_moments(running: np.ndarray, codes: np.ndarray, n: np.ndarray, mean: np.ndarray,
+                             m2: np.ndarray, sign: float) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) hourly moments to running per-group (n, mean, M2)
+    
+    The rows are first pooled per group, then merged into or split off the running
+    state with the parallel-variance formulas (Chan et al.), as in _compute_pooled_std.
+    Working on deviations from the means keeps the std exact for low-variance
+    durations, where sums of squares would cancel catastrophically.
+    
+    Args:
+        running: Array of shape (3, n_groups) with the running n, mean and M2, updated in place
+        codes: Group code per hourly row
+        n, mean, m2: Hourly moments per row (mean 0 where n is 0)
+        sign: 1.0 to add the rows, -1.0 to remove them
+    """
+    n_groups = running.shape[1]
+    batch_n = np.bincount(codes, weights=n, minlength=n_groups)
+    touched = batch_n > 0
+    batch_mean = np.zeros(n_groups)
+    batch_mean[touched] = np.bincount(codes, weights=n * mean, minlength=n_groups)[touched] / batch_n[touched]
+    batch_m2 = np.bincount(codes, weights=m2 + n * (mean - batch_mean[codes]) ** 2, minlength=n_groups)
+    
+    total_n, total_mean, total_m2 = (row[touched] for row in running)
+    batch_n, batch_mean, batch_m2 = batch_n[touched], batch_mean[touched], batch_m2[touched]
+    if sign > 0:
+        new_n = total_n + batch_n
+        delta = batch_mean - total_mean
+        new_mean = total_mean + delta * batch_n / new_n
+        new_m2 = total_m2 + batch_m2 + delta ** 2 * total_n * batch_n / new_n
+    else:
+        new_n = total_n - batch_n
+        remaining = new_n > 0.5
+        safe_n = np.where(remaining, new_n, 1.0)
+        new_mean = total_mean - (batch_mean - total_mean) * batch_n / safe_n
+        new_m2 = total_m2 - batch_m2 - (batch_mean - new_mean) ** 2 * new_n * batch_n / np.maximum(total_n, 1.0)
+        new_n = np.where(remaining, new_n, 0.0)
+        new_mean = np.where(remaining, new_mean, 0.0)
+        new_m2 = np.where(remaining, np.clip(new_m2, 0.0, None), 0.0)
+    running[0, touched] = new_n
+    running[1, touched] = new_mean
+    running[2, touched] = new_m2
+
+
+def _rolling_window_bounds(first_day: int, last_day: int, window_days: int, stride_days: int) -> List[Tuple[int, int]]:
+    """Inclusive (start, end) day offsets of full windows, the last one ending on last_day"""
+    ends = range(last_day, first_day + window_days - 2, -stride_days)
+    return [(end - window_days + 1, end) for end in reversed(ends)]
+
+
+def create_rolling_weekly_profiles(hourly_df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """
+    Generate a series of weekly profiles over sliding date windows
+    
+    Each valid hour contributes additive partials (hour count, n_valid, n_invalid,
+    sums and counts of the hourly means) to its weekly group, and its duration
+    moments are merged into running (n, mean, M2) per group. Windows are processed in date order and only the dates entering and
+    leaving a window are added to or subtracted from the running state, so every
+    window after the first costs O(links x hours of the changed dates) instead of
+    a new pass over the data. Windows are rolling_window_days long and step by
+    rolling_stride_days; the last window ends on the last date with data.
+    Reliability percentiles, when the hourly sketches are present, are merged
+    per window because t-digests cannot be subtracted.
+    
+    Args:
+        hourly_df: Hourly aggregation (create_hourly_aggregation or the incremental store)
+        params: Processing parameters (rolling_window_days, rolling_stride_days,
+            weekly_grouping, recompute_std_from_raw)
+        
+    Returns:
+        DataFrame with window_start, window_end and the weekly profile columns per window
+    """
+    window_days = params.get('rolling_window_days')
+    stride_days = params.get('rolling_stride_days') or 1
+    if not window_days or hourly_df.empty:
+        return pd.DataFrame()
+    
+    if params.get('weekly_grouping', 'daytype') == 'weekday_index':
+        groupby_cols = ['link_id', 'weekday_index', 'hour_of_day']
+    else:
+        groupby_cols = ['link_id', 'daytype', 'hour_of_day']
+    if any(col not in hourly_df.columns for col in groupby_cols + ['date', 'valid_hour']):
+        logger.error(f"Missing columns for rolling weekly profiles: need {groupby_cols + ['date', 'valid_hour']}")
+        return pd.DataFrame()
+    
+    valid_hours = hourly_df[hourly_df['valid_hour'] == True]
+    if valid_hours.empty:
+        logger.warning("No valid hours found for rolling weekly profiles")
+        return pd.DataFrame()
+    
+    # Order rows by date so each day's rows are one contiguous slice
+    days = pd.to_datetime(valid_hours['date']).dt.normalize()
+    first_date = days.min()
+    day_offset = ((days - first_date).dt.days).to_numpy()
+    order = np.argsort(day_offset, kind='stable')
+    valid_hours = valid_hours.iloc[order]
+    day_offset = day_offset[order]
+    
+    grouped = valid_hours.groupby(groupby_cols, observed=True)
+    group_codes = grouped.ngroup().to_numpy()
+    group_keys = grouped.size().reset_index()[groupby_cols]
+    keep = group_codes >= 0
+    
+    # Additive partials per hourly row
+    def numeric(col: str) -> np.ndarray:
+        return pd.to_numeric(valid_hours[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    
+    partials = {
+        'hours': np.ones(len(valid_hours)),
+        'n_valid': numeric('n_valid'),
+        'n_invalid': numeric('n_total') - numeric('n_valid')
+    }
+    mean_targets = [('avg_duration_sec', 'avg_dur'), ('avg_distance_m', 'avg_dist'), ('avg_speed_kmh', 'avg_speed')]
+    if 'avg_static_duration_sec' in valid_hours.columns:
+        mean_targets.append(('avg_static_duration_sec', 'avg_static_dur'))
+    
+    std_targets = [('duration', 'std_duration_sec', 'std_dur')]
+    if 'std_static_duration_sec' in valid_hours.columns:
+        std_targets.append(('static_duration', 'std_static_duration_sec', 'std_static_dur'))
+    pooled_std = {}
+    for metric, hourly_std_col, weekly_std_col in std_targets:
+        n_col, mean_col, m2_col = HOURLY_MOMENT_COLUMNS[metric]
+        if params.get('recompute_std_from_raw', False) and n_col in valid_hours.columns:
+            # Hourly (n, mean, M2), pooled per window with the parallel-variance formulas
+            n = np.nan_to_num(numeric(n_col))
+            mean = np.where(n > 0, np.nan_to_num(numeric(mean_col)), 0.0)
+            pooled_std[weekly_std_col] = (n[keep], mean[keep], np.nan_to_num(numeric(m2_col))[keep])
+        elif hourly_std_col in valid_hours.columns:
+            mean_targets.append((hourly_std_col, weekly_std_col))
+    
+    for hourly_col, weekly_col in mean_targets:
+        if hourly_col in valid_hours.columns:
+            values = numeric(hourly_col)
+            partials[f'{weekly_col}_sum'] = np.nan_to_num(values)
+            partials[f'{weekly_col}_count'] = (~np.isnan(values)).astype('float64')
+    
+    names = list(partials)
+    matrix = np.column_stack([partials[name] for name in names])[keep]
+    codes = group_codes[keep]
+    day_offset = day_offset[keep]
+    day_starts = np.searchsorted(day_offset, np.arange(day_offset.max() + 2))
+    column = {name: j for j, name in enumerate(names)}
+    
+    def accumulate(running: np.ndarray, first: int, last: int, sign: float) -> None:
+        if first > last:
+            return
+        rows = slice(day_starts[first], day_starts[last + 1])
+        np.add.at(running, codes[rows], sign * matrix[rows])
+        for weekly_std_col, (n, mean, m2) in pooled_std.items():
+            _update_running_moments(running_moments[weekly_std_col], codes[rows], n[rows], mean[rows], m2[rows], sign)
+    
+    has_sketches = all(col in valid_hours.columns for col in HOURLY_SKETCH_COLUMNS)
+    window_bounds = _rolling_window_bounds(0, int(day_offset.max()), window_days, stride_days)
+    if not window_bounds:
+        logger.warning(f"Data spans fewer than {window_days} days - no rolling weekly profiles")
+        return pd.DataFrame()
+    
+    running = np.zeros((len(group_keys), len(names)))
+    running_moments = {weekly_std_col: np.zeros((3, len(group_keys))) for weekly_std_col in pooled_std}
+    profiles = []
+    previous = None
+    for start, end in window_bounds:
+        if previous is None:
+            accumulate(running, start, end, 1.0)
+        else:
+            previous_start, previous_end = previous
+            accumulate(running, previous_start, min(previous_end, start - 1), -1.0)
+            accumulate(running, max(previous_end + 1, start), end, 1.0)
+        previous = (start, end)
+        
+        present = running[:, column['hours']] > 0.5
+        window = group_keys[present].copy()
+        stats = running[present]
+        window.insert(0, 'window_end', (first_date + pd.Timedelta(days=end)).date())
+        window.insert(0, 'window_start', (first_date + pd.Timedelta(days=start)).date())
+        
+        hours = stats[:, column['hours']]
+        window['avg_n_valid'] = stats[:, column['n_valid']] / hours
+        window['total_valid_n'] = np.rint(stats[:, column['n_valid']]).astype('int64')
+        window['total_not_valid'] = np.rint(stats[:, column['n_invalid']]).astype('int64')
+        for _, weekly_col in mean_targets:
+            if f'{weekly_col}_sum' in column:
+                counts = stats[:, column[f'{weekly_col}_count']]
+                window[weekly_col] = np.where(counts > 0.5, stats[:, column[f'{weekly_col}_sum']] / np.maximum(counts, 1.0), np.nan)
+        for weekly_std_col, moments in running_moments.items():
+            n, _, m2 = moments[:, present]
+            window[weekly_std_col] = np.where(n > 1.5, np.sqrt(m2 / np.maximum(n - 1, 1.0)), np.nan)
+        window['n_days'] = np.rint(hours).astype('int64')
+        
+        if has_sketches:
+            in_window = (day_offset >= start) & (day_offset <= end)
+            window_codes = np.full(len(group_keys), -1)
+            window_codes[np.flatnonzero(present)] = np.arange(int(present.sum()))
+            window_rows = valid_hours[keep][in_window]
+            percentiles = _merge_duration_sketches(window_rows, window_codes[codes[in_window]], int(present.sum()), params)
+            for col, values in percentiles.items():
+                window[col] = values
+            add_reliability_indices(window, 'p95_dur', 'avg_dur', 'avg_static_dur')
+        profiles.append(window)
+    
+    rolling = pd.concat(profiles, ignore_index=True)
+    logger.info(f"Rolling weekly profiles: {len(window_bounds)} windows of {window_days} days "
+                f"(stride {stride_days}), {len(rolling):,} rows")
+    return rolling
+
+
+def write_weekly_hourly_profile_csv(weekly_df: pd.DataFrame, output_path: str,
+                                    write_record: Optional[dict] = None) -> bool:
     """
     Write weekly hourly profile to CSV with proper column structure
     
     Args:
         weekly_df: DataFrame with weekly profile data
         output_path: Path where to write the CSV file
+        write_record: Optional dict filled with the rows, bytes and checksum written
         
     Returns:
         True if successful, False otherwise
@@ -2758,8 +5137,9 @@ def write_weekly_hourly_profile_csv(weekly_df: pd.DataFrame, output_path: str) -
     try:
         logger.info(f"Writing weekly hourly profile to: {output_path}")
         
-        # Ensure proper column order based on grouping type
+        # Ensure proper column order based on grouping type (rolling profiles lead with their window)
         # Put static_duration fields right after regular duration
+        window_columns = [col for col in ['window_start', 'window_end'] if col in weekly_df.columns]
         if 'weekday_index' in weekly_df.columns:
             # Grouping by weekday_index
             expected_columns = [
@@ -2779,8 +5159,11 @@ def write_weekly_hourly_profile_csv(weekly_df: pd.DataFrame, output_path: str) -
         if 'std_static_dur' in weekly_df.columns:
             expected_columns.append('std_static_dur')
 
-        # Continue with remaining columns
+        # Continue with remaining columns, then the reliability columns when computed
         expected_columns.extend(['avg_dist', 'avg_speed', 'n_days'])
+        reliability_columns = [col for col in WEEKLY_RELIABILITY_COLUMNS if col in weekly_df.columns]
+        expected_columns.extend(reliability_columns)
+        expected_columns = window_columns + expected_columns
         
         # Ensure all expected columns exist
         output_df = weekly_df.copy()
@@ -2799,6 +5182,7 @@ def write_weekly_hourly_profile_csv(weekly_df: pd.DataFrame, output_path: str) -
             numeric_cols.append('avg_static_dur')
         if 'std_static_dur' in output_df.columns:
             numeric_cols.append('std_static_dur')
+        numeric_cols.extend(reliability_columns)
 
         for col in numeric_cols:
             if col in output_df.columns:
@@ -2811,7 +5195,9 @@ def write_weekly_hourly_profile_csv(weekly_df: pd.DataFrame, output_path: str) -
                     output_df[col] = pd.to_numeric(output_df[col], errors='coerce')
         
         # Write to CSV
-        output_df.to_csv(output_path, index=False, na_rep='')
+        record = write_csv_with_checksum(output_df, output_path, na_rep='')
+        if write_record is not None:
+            write_record.update(record)
         
         logger.info(f"Successfully wrote {len(output_df):,} weekly profiles to {output_path}")
         return True
@@ -2821,79 +5207,104 @@ def write_weekly_hourly_profile_csv(weekly_df: pd.DataFrame, output_path: str) -
         return False
 
 
-def generate_quality_by_link_report(raw_df: pd.DataFrame, hourly_df: pd.DataFrame) -> pd.DataFrame:
+def compute_link_quality_partial(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-link row counts for quality_by_link.csv as a mergeable partial
+    
+    Partials from separate chunks or files combine with merge_link_quality_partials
+    (plain sums), so the report can be built without holding all raw rows.
+    
+    Args:
+        raw_df: Processed raw rows with name and (optionally) is_valid columns
+        
+    Returns:
+        DataFrame indexed by link_id with total_rows, valid_rows and invalid_rows
+    """
+    if raw_df.empty or 'name' not in raw_df.columns:
+        return pd.DataFrame(columns=['total_rows', 'valid_rows', 'invalid_rows'], dtype='int64').rename_axis('link_id')
+    
+    if 'is_valid' in raw_df.columns:
+        # One crosstab of link x validity gives total, valid and invalid counts together
+        counts = pd.crosstab(raw_df['name'], raw_df['is_valid'].fillna(False).astype(bool))
+        valid_rows = counts[True] if True in counts.columns else 0
+        invalid_rows = counts[False] if False in counts.columns else 0
+        partial = pd.DataFrame({'valid_rows': valid_rows, 'invalid_rows': invalid_rows}, index=counts.index)
+        partial['total_rows'] = partial['valid_rows'] + partial['invalid_rows']
+    else:
+        # Without a validity column every row counts as valid
+        total_rows = raw_df.groupby('name', observed=True).size()
+        partial = pd.DataFrame({'total_rows': total_rows, 'valid_rows': total_rows, 'invalid_rows': 0})
+    
+    partial.index = pd.Index(partial.index.astype(object), name='link_id')
+    return partial[['total_rows', 'valid_rows', 'invalid_rows']].astype('int64')
+
+
+def merge_link_quality_partials(partials: List[pd.DataFrame]) -> pd.DataFrame:
+    """Combine per-chunk or per-file link quality partials by summing counts per link"""
+    partials = [partial for partial in partials if not partial.empty]
+    if not partials:
+        return compute_link_quality_partial(pd.DataFrame())
+    return pd.concat(partials).groupby(level='link_id', sort=False).sum()
+
+
+def generate_quality_by_link_report(raw_df: pd.DataFrame, hourly_df: pd.DataFrame,
+                                    link_partial: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Generate quality_by_link.csv with data quality metrics per link
     
     Args:
         raw_df: Original processed DataFrame with validity flags
         hourly_df: Hourly aggregation DataFrame
+        link_partial: Pre-merged compute_link_quality_partial result (streaming mode);
+            computed from raw_df when not given
         
     Returns:
         DataFrame with quality metrics per link
     """
-    if raw_df.empty or hourly_df.empty:
+    if link_partial is None:
+        if raw_df.empty or hourly_df.empty:
+            logger.warning("Cannot generate quality by link report: empty input DataFrames")
+            return pd.DataFrame()
+        if 'name' not in raw_df.columns:
+            logger.error("Cannot generate quality report: 'name' column not found in raw data")
+            return pd.DataFrame()
+        link_partial = compute_link_quality_partial(raw_df)
+    elif link_partial.empty or hourly_df.empty:
         logger.warning("Cannot generate quality by link report: empty input DataFrames")
         return pd.DataFrame()
     
     logger.info("Generating quality by link report...")
     
-    # Initialize quality metrics per link
-    quality_metrics = []
+    # Row-level validity per link from the (merged) partial
+    quality_df = link_partial.reset_index()
+    total_rows = quality_df['total_rows']
+    quality_df['percent_valid'] = (quality_df['valid_rows'] / total_rows.where(total_rows > 0) * 100).fillna(0).round(2)
     
-    # Get unique links from raw data
-    if 'name' in raw_df.columns:
-        unique_links = raw_df['name'].unique()
+    # Hour-level metrics per link from the hourly aggregation in one grouped reduction
+    hourly_by_link = hourly_df.groupby(hourly_df['link_id'].astype(object), sort=False)
+    hour_stats = pd.DataFrame({'hours_with_data': hourly_by_link.size()})
+    hour_stats['hours_valid'] = (
+        hourly_by_link['valid_hour'].sum() if 'valid_hour' in hourly_df.columns else hour_stats['hours_with_data']
+    )
+    hour_stats['days_covered'] = hourly_by_link['date'].nunique() if 'date' in hourly_df.columns else 0
+    
+    quality_df = quality_df.merge(hour_stats, left_on='link_id', right_index=True, how='left')
+    for col in ['hours_with_data', 'hours_valid', 'days_covered']:
+        quality_df[col] = quality_df[col].fillna(0).astype(int)
+    quality_df['hours_dropped'] = quality_df['hours_with_data'] - quality_df['hours_valid']
+    
+    hours_with_data = quality_df['hours_with_data']
+    if 'valid_hour' in hourly_df.columns:
+        quality_df['percent_valid_hours'] = (
+            quality_df['hours_valid'] / hours_with_data.where(hours_with_data > 0) * 100
+        ).fillna(0).round(2)
     else:
-        logger.error("Cannot generate quality report: 'name' column not found in raw data")
-        return pd.DataFrame()
-    
-    for link_id in unique_links:
-        # Filter data for this link
-        link_raw_data = raw_df[raw_df['name'] == link_id]
-        link_hourly_data = hourly_df[hourly_df['link_id'] == link_id]
-        
-        # Calculate basic validity metrics
-        total_rows = len(link_raw_data)
-        if 'is_valid' in link_raw_data.columns:
-            valid_rows = link_raw_data['is_valid'].sum()
-            percent_valid = (valid_rows / total_rows * 100) if total_rows > 0 else 0
-        else:
-            valid_rows = total_rows  # Assume all valid if no validity column
-            percent_valid = 100.0
-        
-        # Calculate hour-level metrics from hourly data
-        total_hours = len(link_hourly_data)
-        if 'valid_hour' in link_hourly_data.columns:
-            valid_hours = link_hourly_data['valid_hour'].sum()
-            dropped_hours = total_hours - valid_hours
-            percent_valid_hours = (valid_hours / total_hours * 100) if total_hours > 0 else 0
-        else:
-            valid_hours = total_hours
-            dropped_hours = 0
-            percent_valid_hours = 100.0
-        
-        # Calculate days covered
-        if 'date' in link_hourly_data.columns:
-            days_covered = link_hourly_data['date'].nunique()
-        else:
-            days_covered = 0
-        
-        # Compile metrics for this link
-        link_metrics = {
-            'link_id': link_id,
-            'percent_valid': round(percent_valid, 2),
-            'hours_with_data': total_hours,
-            'hours_valid': int(valid_hours),
-            'hours_dropped': int(dropped_hours),
-            'percent_valid_hours': round(percent_valid_hours, 2),
-            'days_covered': int(days_covered)
-        }
-        
-        quality_metrics.append(link_metrics)
+        quality_df['percent_valid_hours'] = 100.0
     
-    # Convert to DataFrame
-    quality_df = pd.DataFrame(quality_metrics)
+    quality_df = quality_df[[
+        'link_id', 'percent_valid', 'hours_with_data', 'hours_valid',
+        'hours_dropped', 'percent_valid_hours', 'days_covered'
+    ]]
     
     # Sort by link_id for consistent output
     if not quality_df.empty:
@@ -2961,7 +5372,10 @@ def write_quality_reports(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, validat
     
     try:
         # Generate and write quality_by_link.csv
-        quality_by_link_df = generate_quality_by_link_report(raw_df, hourly_df)
+        # Use the per-chunk partials merged during reading when available
+        quality_by_link_df = generate_quality_by_link_report(
+            raw_df, hourly_df, validation_stats.get('link_quality_partial')
+        )
         if not quality_by_link_df.empty:
             quality_by_link_path = output_path / 'quality_by_link.csv'
             quality_by_link_df.to_csv(quality_by_link_path, index=False)
@@ -3005,7 +5419,8 @@ def generate_processing_log(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekl
     duration_seconds = processing_duration.total_seconds()
     
     # Basic row counts
-    total_raw_rows = len(raw_df) if not raw_df.empty else 0
+    # Out-of-core backends report the loaded row count instead of returning raw rows
+    total_raw_rows = len(raw_df) if not raw_df.empty else validation_stats.get('rows_loaded', 0)
     total_hourly_rows = len(hourly_df) if not hourly_df.empty else 0
     total_weekly_rows = len(weekly_df) if not weekly_df.empty else 0
     
@@ -3019,6 +5434,8 @@ def generate_processing_log(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekl
     distinct_links = 0
     if not raw_df.empty and 'name' in raw_df.columns:
         distinct_links = raw_df['name'].nunique()
+    elif validation_stats.get('link_quality_partial') is not None:
+        distinct_links = len(validation_stats['link_quality_partial'])
     elif not hourly_df.empty and 'link_id' in hourly_df.columns:
         distinct_links = hourly_df['link_id'].nunique()
     
@@ -3036,7 +5453,7 @@ def generate_processing_log(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekl
     # Valid hours by daytype
     valid_hours_by_daytype = {}
     if not hourly_df.empty and 'valid_hour' in hourly_df.columns and 'daytype' in hourly_df.columns:
-        daytype_stats = hourly_df[hourly_df['valid_hour']].groupby('daytype').size()
+        daytype_stats = hourly_df[hourly_df['valid_hour']].groupby('daytype', observed=True).size()
         valid_hours_by_daytype = daytype_stats.to_dict()
     
     # Build log content
@@ -3081,6 +5498,184 @@ def generate_processing_log(raw_df: pd.DataFrame, hourly_df: pd.DataFrame, weekl
         for daytype, count in sorted(valid_hours_by_daytype.items()):
             log_lines.append(f"  {daytype}: {count:,} hours")
     
+    # Add reliability percentile coverage if the sketches were built
+    if not hourly_df.empty and 'p95_duration_sec' in hourly_df.columns:
+        has_percentiles = hourly_df['p95_duration_sec'].notna()
+        log_lines.extend([
+            "",
+            "TRAVEL-TIME RELIABILITY (t-digest sketches):",
+            f"  Hours with p50/p85/p95: {int(has_percentiles.sum()):,} / {len(hourly_df):,}",
+            f"  Median buffer time index: {hourly_df['buffer_time_index'].median():.3f}"
+        ])
+        if hourly_df['planning_time_index'].notna().any():
+            log_lines.append(f"  Median planning time index: {hourly_df['planning_time_index'].median():.3f}")
+    
+    # Add rolling weekly profile windows if requested
+    rolling_profiles = validation_stats.get('rolling_profiles')
+    if rolling_profiles:
+        log_lines.extend([
+            "",
+            "ROLLING WEEKLY PROFILES:",
+            f"  Window: {rolling_profiles['window_days']} days, stride {rolling_profiles['stride_days']} days",
+            f"  Windows: {rolling_profiles['windows']:,} ({rolling_profiles['rows']:,} rows)",
+            f"  Computed in {rolling_profiles['seconds']:.2f} seconds from hourly partials"
+        ])
+    
+    # Add per-file ingestion results for multi-file runs
+    input_files = validation_stats.get('files')
+    if input_files:
+        quarantined = [entry for entry in input_files if entry['status'] != 'ok']
+        log_lines.extend([
+            "",
+            "INPUT FILES:",
+            f"  Files read: {len(input_files) - len(quarantined)}/{len(input_files)}"
+        ])
+        for entry in input_files:
+            line = f"  {Path(entry['file']).name}: {entry['status']}, {entry['rows']:,} rows, {entry['seconds']:.2f}s"
+            if entry['error']:
+                line += f" - {entry['error']}"
+            if entry.get('quarantined_to'):
+                line += f" (moved to {entry['quarantined_to']})"
+            log_lines.append(line)
+
+    # Add timestamp parsing throughput if available
+    timestamp_parsing = validation_stats.get('timestamp_parsing')
+    if timestamp_parsing:
+        rows_per_second = timestamp_parsing.get('rows_per_second')
+        log_lines.extend([
+            "",
+            "TIMESTAMP PARSING:",
+            f"  Format: {timestamp_parsing.get('format')}",
+            f"  Rows parsed: {timestamp_parsing.get('rows', 0):,} ({timestamp_parsing.get('unique_values', 0):,} distinct values)",
+            f"  Parse time: {timestamp_parsing.get('seconds', 0):.2f} seconds",
+            f"  Throughput: {rows_per_second:,} rows/s" if rows_per_second else "  Throughput: n/a"
+        ])
+    
+    # Add read volume and speed (compressed and uncompressed) if available
+    read_throughput = validation_stats.get('read_throughput')
+    if read_throughput:
+        compressed_rate = read_throughput.get('compressed_mb_per_s')
+        uncompressed_rate = read_throughput.get('uncompressed_mb_per_s')
+        uncompressed_mb = read_throughput.get('uncompressed_mb')
+        log_lines.extend([
+            "",
+            "READ THROUGHPUT:",
+            f"  Compression: {read_throughput.get('compression')}",
+            f"  Parser: {read_throughput.get('engine', 'c')}",
+            f"  Compressed: {read_throughput.get('compressed_mb', 0):.2f} MB"
+            + (f" at {compressed_rate:.2f} MB/s" if compressed_rate else ""),
+            f"  Uncompressed: {uncompressed_mb:.2f} MB" + (f" at {uncompressed_rate:.2f} MB/s" if uncompressed_rate else "")
+            if uncompressed_mb is not None else "  Uncompressed: n/a"
+        ])
+    
+    # Add adaptive chunk sizes and peak RSS if the reader resized chunks
+    chunk_sizing = validation_stats.get('chunk_sizing')
+    if chunk_sizing:
+        chunk_sizes = chunk_sizing.get('chunk_sizes', [])
+        shown_sizes = [f"{size:,}" for size in chunk_sizes[:10]]
+        if len(chunk_sizes) > 10:
+            shown_sizes.append(f"... ({len(chunk_sizes)} chunks)")
+        peak_rss_mb = chunk_sizing.get('peak_rss_mb')
+        bytes_per_row = chunk_sizing.get('bytes_per_row')
+        log_lines.extend([
+            "",
+            "CHUNK SIZING:",
+            f"  Memory budget: {chunk_sizing.get('memory_budget_mb', 0):,.1f} MB",
+            f"  Chunk sizes (rows): {', '.join(shown_sizes) or 'none'}",
+            f"  Bytes per row after dtype optimization: {bytes_per_row:,.1f}" if bytes_per_row else "  Bytes per row: n/a",
+            f"  Peak RSS: {peak_rss_mb:,.1f} MB" if peak_rss_mb is not None else "  Peak RSS: n/a (psutil not installed)"
+        ])
+    
+    # Add incremental store updates if the run used one
+    store_update = validation_stats.get('incremental_store')
+    if store_update:
+        log_lines.extend([
+            "",
+            "INCREMENTAL STORE:",
+            f"  Store: {store_update.get('path')}",
+            f"  Dates added: {', '.join(store_update['dates_added']) or 'none'}",
+            f"  Dates replaced: {', '.join(store_update['dates_replaced']) or 'none'}",
+            f"  Hourly rows written: {store_update['rows_written']:,}",
+            f"  Dates in store: {store_update['dates_stored']:,}"
+        ])
+    
+    # Add the execution backend when the run did not use the in-memory pandas path
+    backend = validation_stats.get('execution_backend')
+    if backend:
+        log_lines.extend([
+            "",
+            "EXECUTION BACKEND:",
+            f"  Engine: {backend['engine']} (memory limit {backend['memory_limit']}, spill to {backend['temp_directory']})",
+            f"  Calendar keys: {backend['calendar_keys']:,} distinct timestamp/day values"
+            f" (timestamp format: {backend['timestamp_format']})",
+            f"  Rows aggregated: {backend['rows_aggregated']:,} in {backend['hourly_batches']:,} group-aligned batches",
+            f"  Backend time: {backend['seconds']:.2f} seconds"
+        ])
+    
+    # Add spill volume when processed rows went to disk under the memory budget
+    spill = validation_stats.get('spill')
+    if spill:
+        peak_rss_mb = spill.get('peak_rss_mb')
+        log_lines.extend([
+            "",
+            "MEMORY BUDGET / SPILL:",
+            f"  Memory budget: {spill['memory_budget_mb']:,.1f} MB (spill at {spill['threshold_mb']:,.1f} MB RSS)",
+            f"  Spilled: {spill['rows']:,} rows in {spill['events']:,} spill(s), "
+            f"{spill['files']:,} {spill['format']} files, {spill['bytes'] / (1024 * 1024):,.1f} MB on disk",
+            f"  Merge: {spill['buckets']:,} link-hash buckets; write {spill['write_seconds']:.2f} s, "
+            f"read back {spill['read_seconds']:.2f} s",
+            f"  Peak RSS: {peak_rss_mb:,.1f} MB" if peak_rss_mb is not None else "  Peak RSS: n/a"
+        ])
+    
+    # Add the outputs written concurrently before this log
+    output_writes = validation_stats.get('output_writes')
+    if output_writes:
+        log_lines.extend([
+            "",
+            "OUTPUT FILES (written in parallel):"
+        ])
+        for output_type, info in output_writes.items():
+            rows_text = f", {info['rows']:,} rows" if info.get('rows') is not None else ""
+            checksum_text = f", sha256 {info['sha256'][:12]}" if info.get('sha256') else ""
+            log_lines.append(
+                f"  {info['path']}: {info.get('seconds', 0.0):.2f} seconds ({info.get('writer')})"
+                f"{rows_text}{checksum_text}"
+            )
+    
+    # Add read-time pruning and projection results
+    read_pruning = validation_stats.get('read_pruning')
+    if read_pruning and (read_pruning.get('filters_pushed_down') or read_pruning.get('columns_skipped')):
+        rows_read = read_pruning.get('rows_read', 0)
+        rows_pruned = read_pruning.get('rows_pruned', 0)
+        log_lines.extend([
+            "",
+            "READ-TIME FILTERING:",
+            f"  Rows read: {rows_read:,}",
+            f"  Rows pruned by filters at read time: {rows_pruned:,}"
+            + (f" ({rows_pruned / rows_read * 100:.1f}%)" if rows_read else ""),
+            f"  Columns skipped: {', '.join(read_pruning.get('columns_skipped', [])) or 'none'}"
+        ])
+    
+    # Add per-stage memory accounting when the pipeline ran with debug_stage_memory
+    stage_memory = validation_stats.get('stage_memory')
+    if stage_memory:
+        log_lines.extend([
+            "",
+            "STAGE MEMORY (peak across chunks):"
+        ])
+        stage_peaks = {}
+        for record in stage_memory:
+            peak = stage_peaks.setdefault(record['stage'], {'frame_mb': 0.0, 'rss_mb': None, 'seconds': 0.0})
+            peak['frame_mb'] = max(peak['frame_mb'], record['frame_mb'])
+            peak['seconds'] += record['seconds']
+            if record['rss_mb'] is not None:
+                peak['rss_mb'] = max(peak['rss_mb'] or 0.0, record['rss_mb'])
+        for stage_name, peak in stage_peaks.items():
+            rss_text = f"{peak['rss_mb']:,.1f} MB" if peak['rss_mb'] is not None else "n/a"
+            log_lines.append(
+                f"  {stage_name}: frame {peak['frame_mb']:,.2f} MB, RSS {rss_text}, {peak['seconds']:.2f} seconds"
+            )
+    
     # Add invalid reasons if using rule-based validation
     invalid_reasons = validation_stats.get('invalid_reasons', {})
     if invalid_reasons:
@@ -3130,6 +5725,9 @@ def save_run_configuration(params: dict, output_dir: str) -> str:
                 config_data[key] = value
             elif isinstance(value, Path):
                 config_data[key] = str(value)
+            elif is_csv_buffer(value):
+                # An uploaded file read from memory is recorded by its name
+                config_data[key] = csv_input_name(value)
             elif hasattr(value, '__dict__'):
                 # For complex objects, try to convert to dict
                 try:
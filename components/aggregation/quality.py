@@ -15,6 +15,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from utils.icons import render_subheader_with_icon, render_icon_text, get_icon_for_component
+from .data_quality import DataQualityChecker
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +65,29 @@ class QualityReportingInterface:
             
             with tabs[3]:
                 self._render_recommendations(quality_report)
+
+    def render_quality_dashboard_for_data(self, gdf: gpd.GeoDataFrame, results_df: pd.DataFrame,
+                                          checker: Optional[DataQualityChecker] = None,
+                                          show_details: bool = True) -> Dict[str, Any]:
+        """
+        Profile the data (or reuse its cached profile) and render the quality dashboard.
+
+        Streamlit reruns with unchanged data render from the profile cached by data
+        fingerprint instead of re-running the quality checks.
+
+        Args:
+            gdf: Shapefile GeoDataFrame
+            results_df: Results DataFrame
+            checker: DataQualityChecker to use (default configuration when None)
+            show_details: Whether to show detailed quality sections
+
+        Returns:
+            The rendered quality report
+        """
+        checker = checker or DataQualityChecker()
+        quality_report = checker.get_quality_profile(gdf, results_df).report()
+        self.render_quality_dashboard(quality_report, show_details=show_details)
+        return quality_report
     
     def _render_overall_quality_summary(self, quality_report: Dict[str, Any]) -> None:
         """Render overall quality summary with key metrics."""
@@ -0,0 +1,305 @@
+"""
+Deterministic synthetic Google routes exports for tests and benchmarks
+
+Writes CSVs with the columns and value formats of real exports (docs/CSV_SCHEMA.md):
+Hebrew day names and day types with their spelling variants, DataID and
+link+timestamp duplicates, is_valid=FALSE rows (some without a duration), and
+local wall-clock timestamps polled on a UTC schedule, so DST transition days skip
+or repeat an hour. The same config always gives the same bytes. Rows are generated
+one day at a time, so 50M-row files are written in bounded memory.
+
+Usage:
+    python -m components.aggregation.synthetic_data out.csv --rows 1000000 [--seed 7]
+"""
+
+import argparse
+import gzip
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Sunday first, as in the exports (pandas weekday: Monday=0)
+HEBREW_DAY_LETTERS = {6: 'א', 0: 'ב', 1: 'ג', 2: 'ד', 3: 'ה', 4: 'ו', 5: 'ש'}
+DAYTYPE_VARIANTS = {'weekday': ['יום חול', 'חול'], 'weekend': ['סוף שבוע', 'סופש']}
+
+CSV_COLUMNS = ['DataID', 'Name', 'SegmentID', 'RouteAlternative', 'RequestedTime', 'Timestamp',
+               'DayInWeek', 'DayType', 'Duration (seconds)', 'Distance (meters)', 'Speed (km/h)',
+               'Url', 'Polyline', 'is_valid']
+
+
+@dataclass(frozen=True)
+class SyntheticDataConfig:
+    """
+    Shape of a synthetic export
+
+    n_links links are polled every poll_minutes for n_days consecutive days from
+    start_date. With dst_crossing, the DST transition days of the covered years
+    are added when the range misses them. duplicate_rate adds repeated rows (half
+    with the same DataID, half with a new DataID for the same link and
+    timestamp), invalid_rate marks rows is_valid=FALSE, and hebrew_variant_rate
+    writes day names and day types in their alternative spellings.
+    """
+    n_links: int = 100
+    n_days: int = 7
+    start_date: str = '2025-03-23'
+    poll_minutes: int = 15
+    duplicate_rate: float = 0.01
+    invalid_rate: float = 0.05
+    dst_crossing: bool = True
+    hebrew_variant_rate: float = 0.1
+    tz: str = 'Asia/Jerusalem'
+    seed: int = 42
+
+    @classmethod
+    def for_rows(cls, n_rows: int, **overrides) -> 'SyntheticDataConfig':
+        """
+        Config with n_links chosen so the file has about n_rows rows
+
+        Args:
+            n_rows: Target row count
+            **overrides: Any other config field
+
+        Returns:
+            SyntheticDataConfig
+        """
+        config = cls(**overrides)
+        days = len(config.dates())
+        rows_per_link = days * (24 * 60 // config.poll_minutes) * (1 + config.duplicate_rate)
+        return replace(config, n_links=max(1, math.ceil(n_rows / rows_per_link)))
+
+    def dates(self) -> List[date]:
+        """Local dates to generate, including DST transition days when dst_crossing is set"""
+        start = date.fromisoformat(self.start_date)
+        days = {start + timedelta(days=offset) for offset in range(self.n_days)}
+        if self.dst_crossing:
+            for year in {day.year for day in days}:
+                days.update(dst_transition_dates(year, self.tz))
+        return sorted(days)
+
+
+def dst_transition_dates(year: int, tz: str) -> List[date]:
+    """Local dates in a year on which the UTC offset changes"""
+    midnights = pd.date_range(f'{year}-01-01', f'{year + 1}-01-01', freq='D', tz=tz)
+    offsets = np.array([stamp.utcoffset().total_seconds() for stamp in midnights])
+    return [midnights[i].date() for i in np.flatnonzero(np.diff(offsets))]
+
+
+def encode_polyline(lats: np.ndarray, lons: np.ndarray) -> str:
+    """Google encoded polyline for a coordinate sequence"""
+    encoded = []
+    previous = (0, 0)
+    for point in zip(np.round(lats * 1e5).astype(int), np.round(lons * 1e5).astype(int)):
+        for value, last in zip(point, previous):
+            delta = value - last
+            delta = ~(delta << 1) if delta < 0 else delta << 1
+            while delta >= 0x20:
+                encoded.append(chr((0x20 | (delta & 0x1f)) + 63))
+                delta >>= 5
+            encoded.append(chr(delta + 63))
+        previous = point
+    return ''.join(encoded)
+
+
+def _make_links(config: SyntheticDataConfig) -> pd.DataFrame:
+    """Per-link attributes: name, segment, distance, free-flow duration and a route polyline"""
+    rng = np.random.default_rng([config.seed, 0])
+    from_nodes = rng.choice(np.arange(1, 20 * config.n_links + 2), config.n_links, replace=False)
+    distance = rng.uniform(500, 25000, config.n_links).round()
+    free_flow_kmh = rng.uniform(35, 95, config.n_links)
+
+    polylines = []
+    for distance_m in distance:
+        n_points = int(min(60, 4 + distance_m // 500))
+        steps = rng.normal(0, 1, (n_points, 2)).cumsum(axis=0) * distance_m / n_points / 111000 / 1.5
+        polylines.append(encode_polyline(31.5 + rng.uniform(0, 1.5) + steps[:, 0], 34.8 + rng.uniform(0, 0.8) + steps[:, 1]))
+
+    return pd.DataFrame({
+        'name': [f's_{node}-{node + 1 + offset}' for node, offset in zip(from_nodes, rng.integers(0, 5, config.n_links))],
+        'segment_id': rng.choice(np.arange(1_000_000, 2_000_000), config.n_links, replace=False),
+        'distance': distance,
+        'free_flow_sec': distance / free_flow_kmh * 3.6,
+        'polyline': polylines
+    })
+
+
+def _congestion(hours: np.ndarray, weekend: bool) -> np.ndarray:
+    """Travel-time multiplier by local hour with morning and evening peaks"""
+    scale = 0.3 if weekend else 1.0
+    return 1.0 + scale * (0.7 * np.exp(-((hours - 8.0) ** 2) / 2.0) + 0.6 * np.exp(-((hours - 17.0) ** 2) / 3.0))
+
+
+def _pick_variants(rng: np.random.Generator, canonical: np.ndarray, variants: np.ndarray, rate: float) -> np.ndarray:
+    """Replace a share of canonical values with their alternative spellings"""
+    if rate <= 0:
+        return canonical
+    swap = rng.random(len(canonical)) < rate
+    return np.where(swap, variants, canonical)
+
+
+def generate_day(config: SyntheticDataConfig, links: pd.DataFrame, day: date, first_data_id: int) -> pd.DataFrame:
+    """
+    Rows of one local day, deterministic in (config.seed, day)
+
+    Args:
+        config: Synthetic data config
+        links: Result of _make_links
+        day: Local date
+        first_data_id: DataID of the first row
+
+    Returns:
+        DataFrame with the export columns (CSV_COLUMNS)
+    """
+    rng = np.random.default_rng([config.seed, day.toordinal()])
+    day_start = pd.Timestamp(day).tz_localize(config.tz)
+    day_end = pd.Timestamp(day + timedelta(days=1)).tz_localize(config.tz)
+    slots_utc = pd.date_range(day_start.tz_convert('UTC'), day_end.tz_convert('UTC'),
+                              freq=f'{config.poll_minutes}min', inclusive='left')
+    slots_local = slots_utc.tz_convert(config.tz).tz_localize(None)
+
+    n_links, n_slots = len(links), len(slots_local)
+    n_rows = n_links * n_slots
+    link_idx = np.repeat(np.arange(n_links), n_slots)
+    requested = np.tile(slots_local.to_numpy(), n_links)
+    timestamps = requested + rng.integers(5, 150, n_rows).astype('timedelta64[s]')
+
+    weekday = day.weekday()
+    weekend = weekday in (4, 5)
+    hours = pd.DatetimeIndex(requested).hour.to_numpy() + pd.DatetimeIndex(requested).minute.to_numpy() / 60.0
+    duration = (links['free_flow_sec'].to_numpy()[link_idx] * _congestion(hours, weekend)
+                * rng.lognormal(0.0, 0.12, n_rows)).round()
+    distance = links['distance'].to_numpy()[link_idx]
+    speed = (distance / duration * 3.6).astype(np.float32)
+
+    is_valid = rng.random(n_rows) >= config.invalid_rate
+    failed_call = ~is_valid & (rng.random(n_rows) < 0.2)
+    duration = np.where(failed_call, np.nan, duration)
+    speed = np.where(failed_call, np.nan, speed).astype(np.float32)
+
+    letter = HEBREW_DAY_LETTERS[weekday]
+    day_names = _pick_variants(rng, np.full(n_rows, f'יום {letter}', dtype=object),
+                               rng.choice(np.array([f"יום {letter}'", letter], dtype=object), n_rows),
+                               config.hebrew_variant_rate)
+    canonical_type, variant_type = DAYTYPE_VARIANTS['weekend' if weekend else 'weekday']
+    day_types = _pick_variants(rng, np.full(n_rows, canonical_type, dtype=object),
+                               np.full(n_rows, variant_type, dtype=object), config.hebrew_variant_rate)
+
+    data_ids = first_data_id + np.arange(n_rows)
+    segment_ids = links['segment_id'].to_numpy()[link_idx]
+    df = pd.DataFrame({
+        'DataID': data_ids,
+        'Name': links['name'].to_numpy()[link_idx],
+        'SegmentID': segment_ids,
+        'RouteAlternative': 1,
+        'RequestedTime': pd.DatetimeIndex(requested).strftime('%H:%M:%S'),
+        'Timestamp': pd.DatetimeIndex(timestamps).strftime('%Y-%m-%d %H:%M:%S'),
+        'DayInWeek': day_names,
+        'DayType': day_types,
+        'Duration (seconds)': duration,
+        'Distance (meters)': distance,
+        'Speed (km/h)': speed,
+        'Url': [f'https://example.com/recording?s={segment}&d={data_id}&a=1'
+                for segment, data_id in zip(segment_ids, data_ids)],
+        'Polyline': links['polyline'].to_numpy()[link_idx],
+        'is_valid': np.where(is_valid, 'TRUE', 'FALSE')
+    })
+
+    n_duplicates = int(round(n_rows * config.duplicate_rate))
+    if n_duplicates:
+        duplicates = df.iloc[np.sort(rng.choice(n_rows, n_duplicates, replace=False))].copy()
+        # Every second duplicate is a re-poll of the same link and timestamp under a new DataID
+        new_id = np.arange(n_duplicates) % 2 == 1
+        duplicates.loc[duplicates.index[new_id], 'DataID'] = first_data_id + n_rows + np.arange(new_id.sum())
+        df = pd.concat([df, duplicates], ignore_index=True)
+
+    return df
+
+
+def generate_synthetic_csv(path: Union[str, Path], config: SyntheticDataConfig) -> dict:
+    """
+    Write a synthetic export to path (.csv or .csv.gz)
+
+    Args:
+        path: Output file path
+        config: Synthetic data config
+
+    Returns:
+        Summary with rows, links, days, dst_dates, bytes and seconds
+    """
+    start = time.perf_counter()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    links = _make_links(config)
+    days = config.dates()
+    transitions = {day for year in {day.year for day in days} for day in dst_transition_dates(year, config.tz)}
+
+    rows = 0
+    next_data_id = 100_000_000
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'wt', encoding='utf-8', newline='') as f:
+        for index, day in enumerate(days):
+            day_df = generate_day(config, links, day, next_data_id)
+            day_df.to_csv(f, index=False, header=index == 0, lineterminator='\n')
+            rows += len(day_df)
+            next_data_id += len(day_df)
+            logger.info(f"Synthetic data: {day} written ({rows:,} rows so far)")
+
+    summary = {
+        'path': str(path),
+        'rows': rows,
+        'links': config.n_links,
+        'days': len(days),
+        'dst_dates': [day.isoformat() for day in days if day in transitions],
+        'bytes': path.stat().st_size,
+        'seconds': round(time.perf_counter() - start, 3),
+        'config': asdict(config)
+    }
+    logger.info(f"Synthetic data: {rows:,} rows, {summary['bytes'] / (1024 * 1024):,.1f} MB in {summary['seconds']:.1f} s")
+    return summary
+
+
+def parse_row_count(text: str) -> int:
+    """Row count with an optional k/M suffix ('500k', '10M')"""
+    text = text.strip()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:].lower(), 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic Google routes export")
+    parser.add_argument('output', help="Output .csv or .csv.gz path")
+    parser.add_argument('--rows', type=parse_row_count, help="Target row count (e.g. 1M); sets the link count")
+    parser.add_argument('--links', type=int, default=SyntheticDataConfig.n_links)
+    parser.add_argument('--days', type=int, default=SyntheticDataConfig.n_days)
+    parser.add_argument('--start-date', default=SyntheticDataConfig.start_date)
+    parser.add_argument('--poll-minutes', type=int, default=SyntheticDataConfig.poll_minutes)
+    parser.add_argument('--duplicate-rate', type=float, default=SyntheticDataConfig.duplicate_rate)
+    parser.add_argument('--invalid-rate', type=float, default=SyntheticDataConfig.invalid_rate)
+    parser.add_argument('--hebrew-variant-rate', type=float, default=SyntheticDataConfig.hebrew_variant_rate)
+    parser.add_argument('--no-dst', action='store_true', help="Do not add DST transition days")
+    parser.add_argument('--seed', type=int, default=SyntheticDataConfig.seed)
+    args = parser.parse_args()
+
+    fields = dict(n_days=args.days, start_date=args.start_date, poll_minutes=args.poll_minutes,
+                  duplicate_rate=args.duplicate_rate, invalid_rate=args.invalid_rate,
+                  hebrew_variant_rate=args.hebrew_variant_rate, dst_crossing=not args.no_dst, seed=args.seed)
+    if args.rows:
+        config = SyntheticDataConfig.for_rows(args.rows, **fields)
+    else:
+        config = SyntheticDataConfig(n_links=args.links, **fields)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    summary = generate_synthetic_csv(args.output, config)
+    print(f"Wrote {summary['rows']:,} rows ({summary['links']:,} links x {summary['days']} days) to {summary['path']}")
+
+
+if __name__ == "__main__":
+    main()
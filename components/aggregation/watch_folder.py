@@ -0,0 +1,302 @@
+"""
+Watch-folder worker for near-real-time aggregation
+
+Polls a drop folder for new CSV exports and folds every batch of newly completed
+files into the incremental hourly store with run_pipeline, so hourly_agg.csv, the
+weekly profile and their Parquet datasets always cover every date received so far.
+Each update is written to a fresh snapshot folder and published by atomically
+replacing latest.json, so readers such as the maps page never see a half-written
+run. Latency from file drop to published output is appended to watch_metrics.jsonl.
+
+Usage:
+    python -m components.aggregation.watch_folder <watch_dir> <output_dir> [--config run_config.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from components.aggregation.pipeline import INPUT_FILE_PATTERNS, run_pipeline, scan_input_dates
+
+logger = logging.getLogger(__name__)
+
+LATEST_SNAPSHOT_NAME = 'latest.json'
+WATCH_STATE_NAME = '_watch_state.json'
+WATCH_METRICS_NAME = 'watch_metrics.jsonl'
+SNAPSHOTS_DIR = 'snapshots'
+HOURLY_STORE_DIR = 'hourly_store'
+
+
+def _write_json_atomic(path: Path, payload: dict) -> None:
+    """Write JSON to a temporary file next to path and swap it in with os.replace"""
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def read_latest_snapshot(output_dir: Union[str, Path]) -> Optional[dict]:
+    """
+    Read the latest published snapshot of a watch-folder output directory
+
+    Args:
+        output_dir: Worker output directory
+
+    Returns:
+        latest.json contents with 'files' resolved to absolute paths, or None if
+        nothing has been published yet
+    """
+    latest_path = Path(output_dir) / LATEST_SNAPSHOT_NAME
+    if not latest_path.exists():
+        return None
+    with open(latest_path, encoding='utf-8') as f:
+        latest = json.load(f)
+    latest['files'] = {name: str(Path(output_dir) / path) for name, path in latest['files'].items()}
+    return latest
+
+
+class WatchFolderWorker:
+    """
+    Long-running worker that aggregates files dropped into a folder
+
+    A file is picked up once it has not been modified for settle_seconds (so
+    exports still being copied are left alone) and is processed once per
+    (size, mtime). All ready files of a poll go through one pipeline run against
+    the incremental store. The store replaces each date a run touches, so the
+    dates each file covers are kept in the state file, and earlier files covering
+    a touched date are re-aggregated with the new ones. A drop may therefore hold
+    any part of a day.
+    """
+
+    def __init__(self, watch_dir: Union[str, Path], output_dir: Union[str, Path],
+                 params: Optional[dict] = None, poll_interval: float = 5.0,
+                 settle_seconds: float = 2.0, keep_snapshots: int = 3):
+        """
+        Args:
+            watch_dir: Folder to watch for CSV exports
+            output_dir: Folder for the store, snapshots, latest.json, state and metrics
+            params: Pipeline parameters applied to every run (input/output paths are set here)
+            poll_interval: Seconds between polls in run()
+            settle_seconds: Minimum age of a file's last modification before it is read
+            keep_snapshots: Number of published snapshots kept on disk (at least 2)
+        """
+        self.watch_dir = Path(watch_dir)
+        self.output_dir = Path(output_dir)
+        self.params = dict(params or {})
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.keep_snapshots = max(keep_snapshots, 2)
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.output_dir / WATCH_STATE_NAME
+        self.metrics_path = self.output_dir / WATCH_METRICS_NAME
+        if self.state_path.exists():
+            with open(self.state_path, encoding='utf-8') as f:
+                self.state = json.load(f)
+        else:
+            self.state = {'files': {}}
+
+    def find_ready_files(self) -> List[Path]:
+        """
+        List dropped files that are complete and not processed yet, oldest first
+
+        Returns:
+            Paths of ready files ordered by modification time
+        """
+        now = time.time()
+        ready = []
+        candidates = {match for pattern in INPUT_FILE_PATTERNS for match in self.watch_dir.glob(pattern)}
+        for path in candidates:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            seen = self.state['files'].get(path.name)
+            if seen and seen['size'] == stat.st_size and seen['mtime'] == stat.st_mtime:
+                continue
+            if now - stat.st_mtime >= self.settle_seconds:
+                ready.append(path)
+        return sorted(ready, key=lambda path: (path.stat().st_mtime, path.name))
+
+    def poll_once(self) -> Optional[dict]:
+        """
+        Process every ready file in one pipeline run and publish the result
+
+        Returns:
+            The metrics record of the run, or None if no file was ready
+        """
+        files = self.find_ready_files()
+        if not files:
+            return None
+
+        detected_at = time.time()
+        file_stats = {path.name: path.stat() for path in files}
+        run_id = datetime.now().strftime('%Y%m%dT%H%M%S_%f')
+        snapshot_dir = self.output_dir / SNAPSHOTS_DIR / run_id
+        logger.info(f"Watch folder: processing {len(files)} new file(s) into snapshot {run_id}")
+
+        # Dates the run replaces: those of the new files, plus the old dates of a changed file
+        # (every date in the output when a file could not be scanned)
+        file_dates = {path.name: self._scan_dates(path) for path in files}
+        touched = set().union(*file_dates.values())
+        for name in file_dates:
+            touched.update(self.state['files'].get(name, {}).get('dates', []))
+        companions = self._files_covering(touched, exclude=set(file_dates))
+        if companions:
+            logger.info(f"Watch folder: re-aggregating {len(companions)} earlier file(s) covering the same dates")
+
+        run_params = dict(
+            self.params,
+            input_file_path=[str(path) for path in files] + [str(self.watch_dir / name) for name in companions],
+            output_dir=str(snapshot_dir),
+            incremental_store=str(self.output_dir / HOURLY_STORE_DIR),
+            incremental_store_dates=sorted(touched) if all(file_dates.values()) else None,
+            write_parquet_output=True
+        )
+        record = {'run_id': run_id, 'detected_at': datetime.fromtimestamp(detected_at).isoformat(),
+                  'reaggregated_files': companions}
+        started = time.perf_counter()
+        try:
+            _, _, output_files = run_pipeline(run_params)
+            status = 'published' if output_files else 'empty'
+        except Exception as e:
+            logger.error(f"Watch folder: run {run_id} failed: {e}")
+            output_files = {}
+            status = 'failed'
+            record['error'] = str(e)
+        record['processing_seconds'] = round(time.perf_counter() - started, 3)
+
+        if status == 'published':
+            self._publish(run_id, snapshot_dir, output_files, [path.name for path in files])
+            self._prune_snapshots()
+        else:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+        published_at = time.time()
+        record.update({
+            'status': status,
+            'published_at': datetime.fromtimestamp(published_at).isoformat() if status == 'published' else None,
+            'files': [
+                {
+                    'name': name,
+                    'bytes': stat.st_size,
+                    'dropped_at': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    'latency_seconds': round(published_at - stat.st_mtime, 3) if status == 'published' else None
+                }
+                for name, stat in file_stats.items()
+            ]
+        })
+        latencies = [entry['latency_seconds'] for entry in record['files'] if entry['latency_seconds'] is not None]
+        record['max_latency_seconds'] = max(latencies) if latencies else None
+
+        # Failed files are remembered too, so a broken export is not retried until it changes
+        for name, stat in file_stats.items():
+            self.state['files'][name] = {'size': stat.st_size, 'mtime': stat.st_mtime,
+                                         'status': status, 'run_id': run_id, 'dates': file_dates[name]}
+        _write_json_atomic(self.state_path, self.state)
+        with open(self.metrics_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+        logger.info(f"Watch folder: run {run_id} {status} in {record['processing_seconds']:.2f} seconds")
+        return record
+
+    def _scan_dates(self, path: Path) -> List[str]:
+        """Dates a dropped file covers (empty if its timestamps cannot be read)"""
+        try:
+            return scan_input_dates(str(path), self.params)
+        except Exception as e:
+            logger.warning(f"Watch folder: could not scan dates of {path.name}: {e}")
+            return []
+
+    def _files_covering(self, dates: set, exclude: set) -> List[str]:
+        """
+        Earlier published files with rows on any of dates, in name order
+
+        Files recorded before date coverage was kept are scanned once. Files that
+        have since been removed from the watch folder are skipped with a warning,
+        as their hours on those dates cannot be rebuilt.
+        """
+        covering = []
+        for name, entry in sorted(self.state['files'].items()):
+            if name in exclude or entry.get('status') != 'published':
+                continue
+            path = self.watch_dir / name
+            if 'dates' not in entry and path.exists():
+                entry['dates'] = self._scan_dates(path)
+            if not dates.intersection(entry.get('dates', [])):
+                continue
+            if path.exists():
+                covering.append(name)
+            else:
+                logger.warning(f"Watch folder: {name} covers a re-aggregated date but is no longer in {self.watch_dir}")
+        return covering
+
+    def _publish(self, run_id: str, snapshot_dir: Path, output_files: Dict[str, str], source_files: List[str]) -> None:
+        """Point latest.json at a completed snapshot (atomic replace)"""
+        _write_json_atomic(self.output_dir / LATEST_SNAPSHOT_NAME, {
+            'run_id': run_id,
+            'published_at': datetime.now().isoformat(),
+            'snapshot': os.path.relpath(snapshot_dir, self.output_dir),
+            'source_files': source_files,
+            'files': {name: os.path.relpath(path, self.output_dir) for name, path in output_files.items()}
+        })
+
+    def _prune_snapshots(self) -> None:
+        """Remove all but the newest keep_snapshots snapshot folders"""
+        snapshots = sorted(path for path in (self.output_dir / SNAPSHOTS_DIR).iterdir() if path.is_dir())
+        for old_snapshot in snapshots[:-self.keep_snapshots]:
+            shutil.rmtree(old_snapshot, ignore_errors=True)
+
+    def run(self, stop_event: Optional[threading.Event] = None, max_polls: Optional[int] = None) -> None:
+        """
+        Poll until stop_event is set (or max_polls polls have run)
+
+        Args:
+            stop_event: Event that stops the loop between polls
+            max_polls: Optional number of polls after which to return
+        """
+        stop_event = stop_event or threading.Event()
+        logger.info(f"Watching {self.watch_dir} every {self.poll_interval:.1f} seconds; outputs in {self.output_dir}")
+        polls = 0
+        while not stop_event.is_set():
+            self.poll_once()
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            stop_event.wait(self.poll_interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Aggregate CSV exports dropped into a folder")
+    parser.add_argument('watch_dir', help="Folder to watch for CSV exports")
+    parser.add_argument('output_dir', help="Folder for the hourly store, snapshots and latest.json")
+    parser.add_argument('--config', help="JSON file with pipeline parameters (e.g. a run_config.json)")
+    parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls")
+    parser.add_argument('--settle', type=float, default=2.0, help="Seconds a file must be unchanged before it is read")
+    args = parser.parse_args()
+
+    params = {}
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            params = json.load(f)
+        params.pop('_metadata', None)
+
+    worker = WatchFolderWorker(args.watch_dir, args.output_dir, params,
+                               poll_interval=args.interval, settle_seconds=args.settle)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        logger.info("Watch folder worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ import pandas as pd
 import geopandas as gpd
 from pathlib import Path
 import tempfile
+import hashlib
+import io
+import time
 import os
 import shutil
 import zipfile
@@ -16,7 +19,12 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import suppress
 
 # Import validation modules from the same component
-from .validator import validate_dataframe_batch, validate_dataframe_batch_parallel, ValidationParameters
+from .validator import (
+    validate_dataframe_batch,
+    validate_dataframe_batch_parallel,
+    suggest_link_matches,
+    ValidationParameters
+)
 from .report import (
     generate_link_report,
     write_shapefile_with_results,
@@ -29,17 +37,28 @@ from .report import (
     create_failed_observations_unique_polylines_shapefile,
     create_csv_matching_shapefile,
     _parse_timestamp_series,
+    apply_date_window,
     calculate_expected_observations,
+    clip_completeness_to_window,
+    resolve_date_window,
+)
+from components.aggregation.ingestion import (
+    detect_compression,
+    detect_file_encoding,
+    open_csv_chunk_reader,
+    open_csv_input,
+    read_csv_frame,
+    read_csv_header,
+    resolve_csv_engine,
+    describe_read_throughput,
+    map_unique_values
 )
-from components.aggregation.pipeline import resolve_hebrew_encoding
 from utils.icons import render_title_with_icon, render_subheader_with_icon, render_icon_text, get_icon_for_component
 
-try:
-    import chardet  # type: ignore[import]
-    HAS_CHARDET = True
-except ImportError:  # pragma: no cover - optional dependency
-    HAS_CHARDET = False
-    chardet = None  # type: ignore[assignment]
+# The same encoded route repeats across timestamps and alternatives, so polylines are
+# loaded dictionary-encoded: integer codes plus one table of distinct strings. Url is
+# not validated but is carried into validated_data.csv, so it is kept the same way.
+CONTROL_DTYPES = {'Polyline': 'category', 'polyline': 'category', 'Url': 'category'}
 
 
 def control_page():
@@ -98,7 +117,7 @@ def control_page():
         # CSV file upload
         csv_file = st.file_uploader(
             "Upload CSV file with Google Maps polyline data",
-            type=['csv'],
+            type=['csv', 'gz', 'zip', 'zst'],
             help="CSV file with columns: Name, Polyline, RouteAlternative, Timestamp, etc."
         )
 
@@ -488,6 +507,15 @@ def control_page():
                 help="Create shapefile with validation results - shows your original shapefile with validation results added"
             )
 
+            suggest_link_matches_enabled = st.checkbox(
+                "Suggest links for unjoined rows",
+                value=st.session_state.control_params.get('suggest_link_matches', False),
+                help="For rows whose Name cannot be parsed or is not in the shapefile, find the nearest "
+                     "reference links to each decoded polyline and save them to suggested_link_matches.csv",
+                key="suggest_link_matches_input"
+            )
+            st.session_state.control_params['suggest_link_matches'] = suggest_link_matches_enabled
+
     with col2:
         st.markdown("""
         <div style="background-color: #f0f2f6; padding: 1rem; border-radius: 8px; margin-bottom: 1.5rem; border-left: 5px solid #28a745;">
@@ -587,11 +615,28 @@ def run_control_validation(csv_file, shapefile_file, output_dir,
             polyline_precision=polyline_precision
         )
 
+        # Prepare date filter if specified; it is pushed down to the CSV read so rows
+        # outside the window are never validated, and the report still gets the bounds
+        date_filter = None
+        if use_date_filter and date_filter_params:
+            if date_filter_params.get('filter_mode') == "Date range":
+                date_filter = {
+                    'start_date': date_filter_params.get('start_date'),
+                    'end_date': date_filter_params.get('end_date')
+                }
+            else:
+                date_filter = {
+                    'specific_day': date_filter_params.get('specific_day')
+                }
+        completeness_params = clip_completeness_to_window(completeness_params, date_filter)
+
         status_text.text("Loading CSV data...")
         progress_bar.progress(20)
 
-        # Load CSV data with proper encoding handling
-        csv_df = load_csv_with_encoding(csv_file)
+        # Load CSV data with proper encoding handling; loading and the report reuse
+        # the timestamp formats the date range scan sniffed
+        timestamp_parse_state = cached_timestamp_parse_state(csv_file)
+        csv_df = load_csv_with_encoding(csv_file, date_filter, timestamp_parse_state)
 
         # Check if CSV loading failed
         if csv_df is None:
@@ -670,21 +715,9 @@ def run_control_validation(csv_file, shapefile_file, output_dir,
         status_text.text("Generating link reports...")
         progress_bar.progress(80)
 
-        # Prepare date filter if specified
-        date_filter = None
-        if use_date_filter and date_filter_params:
-            if date_filter_params.get('filter_mode') == "Date range":
-                date_filter = {
-                    'start_date': date_filter_params.get('start_date'),
-                    'end_date': date_filter_params.get('end_date')
-                }
-            else:
-                date_filter = {
-                    'specific_day': date_filter_params.get('specific_day')
-                }
-
         # Generate link report
-        report_gdf = generate_link_report(result_df, shapefile_gdf, date_filter, completeness_params)
+        report_gdf = generate_link_report(result_df, shapefile_gdf, date_filter, completeness_params,
+                                          timestamp_parse_state)
 
         # Track report completion time
         report_end_time = datetime.now()
@@ -703,6 +736,19 @@ def run_control_validation(csv_file, shapefile_file, output_dir,
         # Save results
         output_files = save_validation_results(result_df, report_gdf, output_dir, generate_shapefile, completeness_params)
 
+        # Optional recovery pass: spatial-index link suggestions for rows that did not join
+        if st.session_state.control_params.get('suggest_link_matches', False):
+            status_text.text("Suggesting links for unjoined rows...")
+            suggestions_df = suggest_link_matches(result_df, shapefile_gdf, params)
+            if not suggestions_df.empty:
+                suggestions_path = Path(output_dir) / "suggested_link_matches.csv"
+                suggestions_df.to_csv(suggestions_path, index=False, encoding='utf-8-sig')
+                output_files['suggested_link_matches_csv'] = str(suggestions_path)
+                # Each name/polyline pair appears once at rank 1, or once unranked when nothing is in range
+                pairs = suggestions_df[suggestions_df['suggestion_rank'].fillna(1) == 1]
+                suggested_rows = int(pairs.loc[pairs['suggestion_rank'].notna(), 'observations'].sum())
+                st.info(f"Suggested links for {suggested_rows:,} of {int(pairs['observations'].sum()):,} unjoined rows")
+
         # Create automatic performance and parameter log
         params_for_log = {
             'hausdorff_threshold_m': hausdorff_threshold,
@@ -823,15 +869,12 @@ def save_validation_results(result_df, report_gdf, output_dir, generate_shapefil
             # Optimize dtypes in a single pass - much faster than looping
             dtype_map = {}
 
-            # Get all columns by dtype at once
-            category_cols = dataframe.select_dtypes(include=['category']).columns.tolist()
+            # Get all columns by dtype at once; categoricals (Name, Polyline) are written
+            # straight from their codes, never expanded to one string per row
             int64_cols = dataframe.select_dtypes(include=['int64']).columns.tolist()
             float64_cols = dataframe.select_dtypes(include=['float64']).columns.tolist()
 
             # Build dtype mapping
-            for col in category_cols:
-                dtype_map[col] = str
-
             for col in int64_cols:
                 col_min = dataframe[col].min()
                 col_max = dataframe[col].max()
@@ -1436,112 +1479,135 @@ def detect_date_range_from_csv(csv_file):
     """
     Auto-detect start and end dates from CSV timestamp field.
     Returns (start_date, end_date, total_records) tuple.
+
+    Only the timestamp column is streamed (projected, in chunks), and the result is
+    cached on the session by file hash so widget reruns do not scan the upload again.
+    The timestamp formats sniffed by the scan are cached with it (see
+    cached_timestamp_parse_state).
     """
     if csv_file is None:
         return None, None, 0
 
     try:
-        # Load CSV with encoding detection
-        df_sample = load_csv_with_encoding(csv_file)
-
-        if df_sample is None or df_sample.empty:
-            return None, None, 0
-
-        # Find timestamp column
-        timestamp_cols = []
-        for col in df_sample.columns:
-            if col.lower() in ['timestamp', 'datetime', 'date', 'time']:
-                timestamp_cols.append(col)
-
-        if not timestamp_cols:
-            return None, None, len(df_sample)
-
-        # Use the first timestamp column found
-        timestamp_col = timestamp_cols[0]
+        file_bytes = csv_file.getvalue()
+        file_hash = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+        range_cache = st.session_state.setdefault('control_date_range_cache', {})
+        if file_hash not in range_cache:
+            range_cache.clear()  # Keep only the current upload
+            parse_state = {}
+            range_cache[file_hash] = scan_timestamp_range(io.BytesIO(file_bytes), parse_state=parse_state)
+            st.session_state['control_timestamp_parse_state'] = {file_hash: parse_state}
+        return range_cache[file_hash]
 
-        # Parse timestamps
-        timestamps = _parse_timestamp_series(df_sample[timestamp_col])
+    except Exception as e:
+        st.warning(f"Could not auto-detect dates from CSV: {e}")
+        return None, None, 0
 
-        # Remove NaN timestamps
-        valid_timestamps = timestamps.dropna()
 
-        if valid_timestamps.empty:
-            return None, None, len(df_sample)
+def cached_timestamp_parse_state(csv_file):
+    """
+    Timestamp formats the date range scan sniffed for this upload.
 
-        # Get min and max dates
-        start_date = valid_timestamps.min().date()
-        end_date = valid_timestamps.max().date()
+    Loading and reporting start from the same per-file decision as the scan, so the
+    detected range and the date window parse every row alike. Returns a fresh dict
+    when the upload was not scanned.
+    """
+    file_hash = hashlib.blake2b(csv_file.getvalue(), digest_size=16).hexdigest()
+    cached = st.session_state.get('control_timestamp_parse_state', {})
+    return dict(cached.get(file_hash, {}))
 
-        return start_date, end_date, len(df_sample)
 
-    except Exception as e:
-        st.warning(f"Could not auto-detect dates from CSV: {e}")
-        return None, None, 0
+def scan_timestamp_range(source, chunk_size=1_000_000, parse_state=None):
+    """
+    Stream only the timestamp column of a CSV and return (start_date, end_date, total_records)
 
+    Timestamp formats are sniffed on the first chunk and reused for every chunk
+    (see _parse_timestamp_series), so the range does not depend on chunk_size.
+    Input pyarrow cannot parse is re-scanned with the C parser, as in read_csv_frame.
 
-def load_csv_with_encoding(csv_file):
-    """Load CSV with automatic encoding detection and Hebrew support"""
-    # Save uploaded file to temporary location for encoding detection
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as temp_file:
-        temp_file.write(csv_file.getvalue())
-        temp_file_path = temp_file.name
+    Args:
+        source: Path or seekable binary buffer (plain or compressed CSV)
+        chunk_size: Rows per chunk of the single-column scan
+        parse_state: Optional per-file dict that receives the sniffed timestamp formats
 
-    # Detect encoding with fallback approach
-    detected_encoding = 'utf-8-sig'  # Default for files with BOM
-    raw_data = b''
+    Returns:
+        Tuple of (start_date, end_date, total_records); dates are None when no
+        timestamp column or no valid timestamp is found
+    """
+    encoding = detect_file_encoding(source)
+    header = read_csv_header(source, encoding=encoding)
+    if header is None:
+        raise ValueError("Could not read CSV header")
+
+    # Find timestamp column (without one, only the first column is streamed to count rows)
+    timestamp_col = next(
+        (col for col in header if col.strip().lower() in ['timestamp', 'datetime', 'date', 'time']), None
+    )
+    if parse_state is None:
+        parse_state = {}
+
+    def _scan(engine):
+        start, end, total_records = None, None, 0
+        with open_csv_input(source) as stream:
+            for chunk in open_csv_chunk_reader(stream, header, engine, encoding=encoding, chunk_size=chunk_size,
+                                               usecols=[timestamp_col or header[0]]):
+                total_records += len(chunk)
+                if timestamp_col is None:
+                    continue
+                valid_timestamps = _parse_timestamp_series(chunk.iloc[:, 0], parse_state).dropna()
+                if valid_timestamps.empty:
+                    continue
+                chunk_start, chunk_end = valid_timestamps.min(), valid_timestamps.max()
+                start = chunk_start if start is None else min(start, chunk_start)
+                end = chunk_end if end is None else max(end, chunk_end)
+        return start, end, total_records
 
     try:
-        with open(temp_file_path, 'rb') as f:
-            raw_data = f.read(10000)  # Read first 10KB
+        start, end, total_records = _scan(resolve_csv_engine('auto'))
+    except ValueError:
+        # Rows pyarrow cannot parse (e.g. ragged lines): re-scan with the C parser
+        start, end, total_records = _scan('c')
+
+    if start is None:
+        return None, None, total_records
+    return start.date(), end.date(), total_records
 
-        if raw_data.startswith(b'\xef\xbb\xbf'):
-            detected_encoding = 'utf-8-sig'
-            st.info("Detected UTF-8 with BOM encoding")
-        else:
-            detection = chardet.detect(raw_data) if HAS_CHARDET and raw_data else {}
-            candidate = detection.get('encoding') if detection else None
-            confidence = float(detection.get('confidence') or 0.0) if detection else 0.0
-            resolved = resolve_hebrew_encoding(raw_data, candidate)
-
-            if candidate and resolved and resolved.lower() != candidate.lower():
-                detected_encoding = resolved
-                st.info(f"Detected {candidate} (confidence: {confidence:.2f}) but using {resolved} based on Hebrew text")
-            elif candidate and confidence > 0.7:
-                detected_encoding = resolved
-                st.info(f"Detected encoding: {detected_encoding} (confidence: {confidence:.2f})")
-            else:
-                detected_encoding = resolved
-                st.info("Using default encoding: cp1255 (Hebrew)")
-    except Exception:
-        detected_encoding = resolve_hebrew_encoding(raw_data, None) if raw_data else 'utf-8-sig'
-        st.info("Encoding detection fell back to heuristic defaults")
 
-    # Get file size for chunking decision
-    file_size = len(csv_file.getvalue())
+def load_csv_with_encoding(csv_file, date_filter=None, timestamp_parse_state=None):
+    """
+    Load CSV (plain, .gz, .zip or .zst) with automatic encoding detection and Hebrew support
 
-    # Read CSV with proper encoding
+    With a date_filter, the file is streamed in chunks and rows outside the date
+    window are dropped from each chunk as it is parsed (see apply_date_window).
+    The timestamp formats are sniffed on the first chunk and kept in
+    timestamp_parse_state, so every chunk (and the later link report) parses alike.
+    """
+    # Stream the upload from memory; compressed inputs are decompressed on the fly
+    source = io.BytesIO(csv_file.getvalue())
+    compression = detect_compression(source)
+
+    # Shared encoding probe on the decompressed prefix (cached, so reruns skip chardet)
+    detected_encoding = detect_file_encoding(source)
+    st.info(f"Detected encoding: {detected_encoding}")
+
+    file_size = len(source.getvalue())
+
+    # Date window pushdown, with one set of timestamp formats for the whole file
+    if timestamp_parse_state is None:
+        timestamp_parse_state = {}
+    chunk_filter = None
+    if resolve_date_window(date_filter) is not None:
+        def chunk_filter(chunk):
+            return apply_date_window(chunk, date_filter, timestamp_parse_state)
+
+    # Read CSV with proper encoding: one multithreaded pyarrow pass, polylines and
+    # Url dictionary-encoded
+    read_start = time.perf_counter()
     try:
-        if file_size > 50 * 1024 * 1024:  # 50MB threshold for chunking
-            st.info("Large file detected, processing in chunks...")
-            chunk_reader = pd.read_csv(temp_file_path, chunksize=10000, encoding=detected_encoding)
-            chunks = []
-            chunk_count = 0
-            progress_bar = st.progress(0)
-
-            for chunk in chunk_reader:
-                chunks.append(chunk)
-                chunk_count += 1
-                progress_bar.progress(min(chunk_count * 10000 / 100000, 1.0))
-
-            progress_bar.empty()
-            if chunks:
-                csv_df = pd.concat(chunks, ignore_index=True)
-                del chunks
-            else:
-                csv_df = pd.DataFrame()
-            st.success(f"Processed {len(csv_df)} rows from {chunk_count} chunks")
-        else:
-            csv_df = pd.read_csv(temp_file_path, encoding=detected_encoding)
+        csv_df, uncompressed_bytes, rows_read = read_csv_frame(
+            source, detected_encoding, dtypes=CONTROL_DTYPES,
+            chunk_filter=chunk_filter
+        )
 
     except UnicodeDecodeError:
         # Try alternative encodings if detection fails
@@ -1550,24 +1616,11 @@ def load_csv_with_encoding(csv_file):
 
         for fallback_encoding in fallback_encodings:
             try:
-                if file_size > 50 * 1024 * 1024:
-                    chunk_reader = pd.read_csv(temp_file_path, chunksize=10000, encoding=fallback_encoding)
-                    chunks = []
-                    chunk_count = 0
-
-                    for chunk in chunk_reader:
-                        chunks.append(chunk)
-                        chunk_count += 1
-
-                    if chunks:
-                        csv_df = pd.concat(chunks, ignore_index=True)
-                        del chunks
-                    else:
-                        csv_df = pd.DataFrame()
-                    st.success(f"Successfully read file using {fallback_encoding} encoding ({len(csv_df)} rows from {chunk_count} chunks)")
-                else:
-                    csv_df = pd.read_csv(temp_file_path, encoding=fallback_encoding)
-                    st.success(f"Successfully read file using {fallback_encoding} encoding")
+                csv_df, uncompressed_bytes, rows_read = read_csv_frame(
+                    source, fallback_encoding, dtypes=CONTROL_DTYPES,
+                    chunk_filter=chunk_filter
+                )
+                st.success(f"Successfully read file using {fallback_encoding} encoding")
                 break
             except UnicodeDecodeError:
                 continue
@@ -1577,18 +1630,18 @@ def load_csv_with_encoding(csv_file):
         else:
             st.error("Could not read CSV file with any supported encoding. Please check the file format.")
             st.info("Supported encodings: UTF-8, CP1255 (Hebrew), Latin-1, ISO-8859-8, Windows-1255, UTF-16")
-            # Clean up temp file
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
             return None
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(temp_file_path)
-        except:
-            pass
+
+    if compression:
+        throughput = describe_read_throughput(file_size, uncompressed_bytes, time.perf_counter() - read_start, compression)
+        st.info(
+            f"Read {compression} input: {throughput['compressed_mb']:.1f} MB compressed "
+            f"({throughput['compressed_mb_per_s'] or 0:.1f} MB/s), {throughput['uncompressed_mb']:.1f} MB "
+            f"uncompressed ({throughput['uncompressed_mb_per_s'] or 0:.1f} MB/s)"
+        )
+
+    if chunk_filter is not None:
+        st.info(f"Date window kept {len(csv_df):,} of {rows_read:,} rows")
 
     # Normalize column names for validation - just strip whitespace, preserve case
     csv_df.columns = csv_df.columns.str.strip()
@@ -1609,25 +1662,8 @@ def fix_hebrew_columns(csv_df):
         if col not in csv_df.columns:
             continue
 
-        series = csv_df[col]
-        non_null = series[series.notna()].astype(str)
-        if non_null.empty:
-            continue
-
-        cache = {value: fix_hebrew_encoding(value) for value in non_null.unique()}
-
-        def _transform(val):
-            if pd.isna(val):
-                return val
-            val_str = str(val)
-            return cache.get(val_str, fix_hebrew_encoding(val_str))
-
-        transformed = series.map(_transform)
-        csv_df[col] = transformed
-
-        original_compare = series.fillna('__NA__').astype(str)
-        transformed_compare = transformed.fillna('__NA__').astype(str)
-        fixes_in_column = (original_compare != transformed_compare).sum()
+        # fix_hebrew_encoding runs once per distinct value, not once per row
+        csv_df[col], fixes_in_column = map_unique_values(csv_df[col], fix_hebrew_encoding)
         hebrew_fixes_applied += fixes_in_column
 
     if hebrew_fixes_applied > 0:
@@ -1844,6 +1880,7 @@ _DOWNLOAD_LABELS = {
     'failed_observations_reference_zip': 'Failed Observations Reference Shapefile',
     'no_data_links_csv': 'No-Data Links CSV',
     'no_data_links_zip': 'No-Data Links Shapefile',
+    'suggested_link_matches_csv': 'Suggested Link Matches CSV',
 }
 
 
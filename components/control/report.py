@@ -12,6 +12,7 @@ from enum import IntEnum
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing as mp
 import os
+import warnings
 
 from pathlib import Path
 import shutil
@@ -40,28 +41,56 @@ class ResultCode(IntEnum):
     ALL_INVALID = SINGLE_ALT_ALL_INVALID
 from datetime import date, datetime, timedelta
 import numpy as np
+from pandas.tseries.api import guess_datetime_format
 
 try:
     import pyogrio  # type: ignore[import]
 except ImportError:  # pragma: no cover - optional dependency
     pyogrio = None  # type: ignore[assignment]
 
-def _parse_timestamp_series(series: pd.Series) -> pd.Series:
-    """Coerce a timestamp-like series into timezone-naive datetimes with fallbacks."""
+def _sniff_timestamp_formats(series: pd.Series) -> Dict[str, str]:
+    """Pick the ISO/default and dayfirst formats for a file from a sample of its timestamps."""
+    # Same majority vote as the unsliced parse: ISO unless most of the sample fails it
+    iso_failures = pd.to_datetime(series, errors='coerce', format='ISO8601').isna().sum()
+    first_value = series.dropna().astype(str).str.strip()
+    first_value = first_value.iloc[0] if len(first_value) else None
+
+    # pandas infers a format from the first value; fix it here so later chunks agree
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        default_format = guess_datetime_format(first_value) if first_value else None
+        dayfirst_format = guess_datetime_format(first_value, dayfirst=True) if first_value else None
+
+    return {
+        'format': 'ISO8601' if iso_failures <= len(series) * 0.5 else (default_format or 'mixed'),
+        'dayfirst_format': dayfirst_format or 'mixed'
+    }
+
+
+def _parse_timestamp_series(series: pd.Series, parse_state: Optional[Dict[str, str]] = None) -> pd.Series:
+    """
+    Coerce a timestamp-like series into timezone-naive datetimes with fallbacks.
+
+    Without parse_state the formats are chosen from the series itself. A chunked
+    read passes one dict per file instead: the formats are sniffed on the first
+    chunk and every later chunk is parsed with them, so which rows parse does not
+    depend on where the chunk boundaries fall.
+    """
     if pd.api.types.is_datetime64_any_dtype(series):
         return series
 
-    # Try ISO format first (YYYY-MM-DD) - most common in programmatic data
-    parsed = pd.to_datetime(series, errors='coerce', format='ISO8601')
+    if parse_state is None:
+        parse_state = {}
+    if 'format' not in parse_state and not series.isna().all():
+        parse_state.update(_sniff_timestamp_formats(series))
+    formats = parse_state or _sniff_timestamp_formats(series)
 
-    # If ISO parsing failed for most values, try standard parsing without dayfirst
-    # This handles formats like "YYYY-MM-DD HH:MM:SS", "DD/MM/YYYY", etc.
-    if parsed.isna().sum() > len(parsed) * 0.5:  # More than 50% failed
-        parsed = pd.to_datetime(series, errors='coerce')
+    # ISO (YYYY-MM-DD) for programmatic data, otherwise the format of the first value
+    parsed = pd.to_datetime(series, errors='coerce', format=formats['format'])
 
     # If still have NaN values, try dayfirst for European formats
     if parsed.isna().any():
-        parsed_dayfirst = pd.to_datetime(series, errors='coerce', dayfirst=True)
+        parsed_dayfirst = pd.to_datetime(series, errors='coerce', format=formats['dayfirst_format'], dayfirst=True)
         # Only fill NaN values, don't overwrite successfully parsed dates
         parsed = parsed.fillna(parsed_dayfirst)
 
@@ -72,6 +101,83 @@ def _parse_timestamp_series(series: pd.Series) -> pd.Series:
     return parsed
 
 
+def resolve_date_window(date_filter: Optional[Dict]) -> Optional[tuple]:
+    """
+    Bounds of a date filter as a half-open [start, end) datetime window.
+
+    Days are inclusive, like the completeness period: a range ends at 00:00 of
+    the day after end_date and a specific day covers that whole day.
+
+    Args:
+        date_filter: {'specific_day': day} or {'start_date': day, 'end_date': day}
+
+    Returns:
+        (start, end) Timestamps, or None when the filter selects nothing to bound
+    """
+    if not date_filter:
+        return None
+    if date_filter.get('specific_day') is not None:
+        start = pd.Timestamp(date_filter['specific_day']).normalize()
+        return start, start + pd.Timedelta(days=1)
+    if date_filter.get('start_date') is not None and date_filter.get('end_date') is not None:
+        start = pd.Timestamp(date_filter['start_date']).normalize()
+        end = pd.Timestamp(date_filter['end_date']).normalize() + pd.Timedelta(days=1)
+        return start, end
+    return None
+
+
+def apply_date_window(df: pd.DataFrame, date_filter: Optional[Dict],
+                      parse_state: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Keep the rows whose timestamp falls inside the date filter window.
+
+    Used both as a read-time pushdown on each CSV chunk (so rows outside the window
+    are never validated) and by generate_link_report, so both agree on the bounds.
+    Rows without a parseable timestamp are outside every window.
+
+    Args:
+        df: Raw or validated observations
+        date_filter: Filter accepted by resolve_date_window
+        parse_state: Per-file timestamp formats shared across chunks (see _parse_timestamp_series)
+
+    Returns:
+        Filtered DataFrame (df itself when there is no window or no timestamp column)
+    """
+    window = resolve_date_window(date_filter)
+    timestamp_col = next((col for col in ('timestamp', 'Timestamp') if col in df.columns), None)
+    if window is None or timestamp_col is None:
+        return df
+
+    timestamps = _parse_timestamp_series(df[timestamp_col], parse_state)
+    return df[((timestamps >= window[0]) & (timestamps < window[1])).to_numpy()]
+
+
+def clip_completeness_to_window(completeness_params: Optional[Dict[str, Any]],
+                                date_filter: Optional[Dict]) -> Optional[Dict[str, Any]]:
+    """
+    Limit the completeness period to the date filter window.
+
+    Rows outside the window are never loaded, so expected observations must not
+    count those days either.
+
+    Args:
+        completeness_params: {'start_date', 'end_date', 'interval_minutes'} or None
+        date_filter: Filter accepted by resolve_date_window
+
+    Returns:
+        Completeness parameters covering only days inside the window
+    """
+    window = resolve_date_window(date_filter)
+    if not completeness_params or window is None:
+        return completeness_params
+    if completeness_params.get('start_date') is None or completeness_params.get('end_date') is None:
+        return completeness_params
+
+    start_date = max(completeness_params['start_date'], window[0].date())
+    end_date = min(completeness_params['end_date'], (window[1] - pd.Timedelta(days=1)).date())
+    return {**completeness_params, 'start_date': start_date, 'end_date': end_date}
+
+
 def determine_result_code(stats: Dict[str, Any]) -> tuple:
     """
     Legacy function to determine result code for a link.
@@ -423,7 +529,8 @@ def generate_link_report(
     validated_df: pd.DataFrame,
     shapefile_gdf: gpd.GeoDataFrame,
     date_filter: Optional[Dict] = None,
-    completeness_params: Optional[Dict] = None
+    completeness_params: Optional[Dict] = None,
+    timestamp_parse_state: Optional[Dict[str, str]] = None
 ) -> gpd.GeoDataFrame:
     """
     Generate comprehensive per-link validation report with result codes and statistics.
@@ -454,8 +561,10 @@ def generate_link_report(
             - geometry: LineString geometries (preserved in output)
         date_filter: Optional dictionary for temporal filtering:
             - {'specific_day': date} for single day filtering
-            - {'start_date': date, 'end_date': date} for range filtering
+            - {'start_date': date, 'end_date': date} for range filtering (both days inclusive)
             - None to include all data
+        timestamp_parse_state: Timestamp formats sniffed when the file was loaded, so the
+            report's window matches the read-time pushdown row for row
 
     Returns:
         GeoDataFrame with original shapefile geometry plus added transparent metrics:
@@ -525,25 +634,8 @@ def generate_link_report(
         elif 'name' in validated_df.columns:
             validated_df['link_id'] = validated_df['name']
 
-    # Apply date filtering if specified
-    filtered_df = validated_df.copy()
-    if date_filter:
-        if 'timestamp' in filtered_df.columns:
-            # Convert timestamp to datetime if needed
-            if not pd.api.types.is_datetime64_any_dtype(filtered_df['timestamp']):
-                filtered_df['timestamp'] = pd.to_datetime(filtered_df['timestamp'])
-
-            if 'specific_day' in date_filter:
-                target_date = pd.to_datetime(date_filter['specific_day']).date()
-                filtered_df = filtered_df[filtered_df['timestamp'].dt.date == target_date]
-
-            elif 'start_date' in date_filter and 'end_date' in date_filter:
-                start_date = pd.to_datetime(date_filter['start_date'])
-                end_date = pd.to_datetime(date_filter['end_date'])
-                filtered_df = filtered_df[
-                    (filtered_df['timestamp'] >= start_date) &
-                    (filtered_df['timestamp'] <= end_date)
-                ]
+    # Apply date filtering if specified (a no-op when the window was pushed down at read time)
+    filtered_df = apply_date_window(validated_df.copy(), date_filter, timestamp_parse_state)
 
     # Deduplicate observations
     filtered_df = deduplicate_observations(filtered_df)
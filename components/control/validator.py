@@ -14,6 +14,8 @@ import multiprocessing
 import pandas as pd
 import geopandas as gpd
 from shapely.geometry import LineString, Point
+from shapely.strtree import STRtree
+import shapely
 import polyline
 import numpy as np
 import re
@@ -93,6 +95,31 @@ def _precompute_shapefile_lookup(shapefile_gdf: gpd.GeoDataFrame, target_crs: st
     return lookup
 
 
+@dataclass
+class LinkSpatialIndex:
+    """STRtree over the network's metric link geometries; tree positions index keys and geometries."""
+    tree: STRtree
+    keys: np.ndarray
+    geometries: np.ndarray
+
+
+def build_link_spatial_index(shapefile_lookup: Dict[str, Any]) -> LinkSpatialIndex:
+    """
+    Build a spatial index over the metric geometries of a precomputed shapefile lookup.
+
+    Args:
+        shapefile_lookup: Join key -> geometries mapping from _precompute_shapefile_lookup
+
+    Returns:
+        LinkSpatialIndex over every link with a non-empty metric geometry
+    """
+    keys = np.array(list(shapefile_lookup), dtype=object)
+    geometries = np.array([entry['metric'] for entry in shapefile_lookup.values()], dtype=object)
+    present = ~(shapely.is_missing(geometries) | shapely.is_empty(geometries))
+    keys, geometries = keys[present], geometries[present]
+    return LinkSpatialIndex(STRtree(geometries), keys, geometries)
+
+
 def parse_link_name(name: str) -> Tuple[Optional[str], Optional[str]]:
     """
     Parse link name to extract from_id and to_id.
@@ -360,6 +387,28 @@ def _map_row_columns(row, col_map: dict) -> dict:
     return {expected: _pull(actual) for expected, actual in col_map.items()}
 
 
+def _dictionary_encode_columns(df: pd.DataFrame, col_map: dict) -> None:
+    """
+    Store the name and polyline columns as categoricals (integer codes plus distinct values).
+
+    The control page already loads polylines this way; frames built elsewhere are
+    encoded here, in place, before grouping and chunking.
+    """
+    for expected in ('name', 'polyline'):
+        column = col_map[expected]
+        if column is not None and column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+
+
+def _remove_unused_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of a chunk whose categoricals only keep the values it uses, so it pickles its own slice of each table."""
+    df = df.copy()
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            df[column] = df[column].cat.remove_unused_categories()
+    return df
+
+
 def validate_dataframe_batch(
     df: pd.DataFrame,
     shapefile_gdf: gpd.GeoDataFrame,
@@ -383,9 +432,8 @@ def validate_dataframe_batch(
     # Get column mapping to handle different naming conventions
     col_map = _get_column_mapping(df)
 
-    # OPTIMIZATION: Convert name column to categorical for faster groupby
-    if col_map['name'] is not None and col_map['name'] in df.columns:
-        df[col_map['name']] = df[col_map['name']].astype('category')
+    # OPTIMIZATION: Dictionary-encode name (faster groupby) and polyline (repeated routes)
+    _dictionary_encode_columns(df, col_map)
 
     # OPTIMIZATION: Precompute shapefile join keys once
     shapefile_lookup = _precompute_shapefile_lookup(shapefile_gdf, params.crs_metric)
@@ -593,9 +641,8 @@ def validate_dataframe_batch_parallel(
     # Get column mapping
     col_map = _get_column_mapping(df)
 
-    # Convert name column to categorical for faster groupby
-    if col_map['name'] is not None and col_map['name'] in df.columns:
-        df[col_map['name']] = df[col_map['name']].astype('category')
+    # Dictionary-encode name (faster groupby) and polyline, so chunk payloads pickle codes
+    _dictionary_encode_columns(df, col_map)
 
     # Prepare shapefile data for serialization
     shapefile_data = {
@@ -634,11 +681,11 @@ def validate_dataframe_batch_parallel(
         for chunk_groups in chunks:
             if chunk_groups:
                 worker_chunk = pd.concat(chunk_groups, ignore_index=False)
-                worker_chunks.append(worker_chunk)
+                worker_chunks.append(_remove_unused_categories(worker_chunk))
     else:
         # Fallback: split by rows if no name column
         chunk_size = max(100, len(df) // max_workers)
-        worker_chunks = [df[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+        worker_chunks = [_remove_unused_categories(df[i:i + chunk_size]) for i in range(0, len(df), chunk_size)]
 
     # Prepare chunk data for workers
     chunk_data_list = []
@@ -926,4 +973,144 @@ def validate_row(
     if core_result['valid_code'] not in [90, 91, 92, 93]:  # Not a data error
         core_result['valid_code'] = ValidCode.SINGLE_ROUTE_ALTERNATIVE
 
-    return core_result['is_valid'], core_result['valid_code']
\ No newline at end of file
+    return core_result['is_valid'], core_result['valid_code']
+
+
+# Rows that never reached the geometry tests because they did not join to the network
+UNJOINED_CODES = (ValidCode.NAME_PARSE_FAILURE, ValidCode.LINK_NOT_IN_SHAPEFILE)
+
+# Points sampled along a suggested link to measure how much of it the route covers
+COVERAGE_SAMPLE_POINTS = 20
+
+
+def _decode_polylines_metric(encoded: np.ndarray, precision: int, crs_metric: str) -> np.ndarray:
+    """
+    Decode polylines straight into metric LineStrings, projecting all coordinates in one call.
+
+    Follows decode_polyline: routes that fail to decode or have fewer than two points are None.
+    """
+    decoded = []
+    for value in encoded:
+        try:
+            points = polyline.decode(value, precision) if value else []
+        except Exception:
+            points = []
+        decoded.append(points if len(points) >= 2 else [])
+
+    lines = np.full(len(decoded), None, dtype=object)
+    counts = np.array([len(points) for points in decoded], dtype=np.int64)
+    if counts.sum() == 0:
+        return lines
+
+    # Points are (lat, lon); the transformer takes x=lon, y=lat
+    coords = np.array([point for points in decoded for point in points], dtype=float)
+    x, y = get_transformer("EPSG:4326", crs_metric).transform(coords[:, 1], coords[:, 0])
+    present = np.flatnonzero(counts)
+    line_index = np.repeat(np.arange(len(present)), counts[present])
+    lines[present] = shapely.linestrings(np.column_stack([x, y]), indices=line_index)
+    return lines
+
+
+def suggest_link_matches(
+    validated_df: pd.DataFrame,
+    shapefile_gdf: gpd.GeoDataFrame,
+    params: ValidationParameters,
+    max_candidates: int = 3,
+    search_radius_m: Optional[float] = None,
+    shapefile_lookup: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    Suggest reference links for rows that did not join to the shapefile (codes 91 and 92).
+
+    Rows are reduced to distinct (name, polyline) pairs and each distinct polyline is
+    decoded and projected once. Candidate links come from one STRtree query over the
+    network (envelope search refined to links within search_radius_m); endpoint distances,
+    a lower bound on the Hausdorff distance, prune the pairs before the exact Hausdorff
+    distance is computed for all remaining pairs at once. Candidates are ranked by
+    Hausdorff distance, with ties (two-way links sharing a geometry) broken by how well
+    the endpoints line up. Coverage is the share of points sampled along a suggested
+    link that lie within the Hausdorff threshold of the polyline.
+
+    Args:
+        validated_df: Output of validate_dataframe_batch / validate_dataframe_batch_parallel
+        shapefile_gdf: Reference shapefile
+        params: Validation parameters (metric CRS, precision, thresholds)
+        max_candidates: Suggestions kept per (name, polyline) pair
+        search_radius_m: Largest Hausdorff distance suggested (default: four times the
+            Hausdorff threshold, so near misses are reported too)
+        shapefile_lookup: Precomputed lookup to reuse (built from shapefile_gdf otherwise)
+
+    Returns:
+        DataFrame with one row per (name, polyline, suggestion): the original name and
+        polyline columns, valid_code, observations, suggestion_rank, suggested_link_id,
+        hausdorff_distance, coverage_percent and within_threshold. Pairs without any
+        link in range are kept once with empty suggestion fields.
+    """
+    col_map = _get_column_mapping(validated_df)
+    name_col, polyline_col = col_map['name'], col_map['polyline']
+    suggestion_columns = ['valid_code', 'observations', 'suggestion_rank', 'suggested_link_id',
+                          'hausdorff_distance', 'coverage_percent', 'within_threshold']
+    if name_col is None or polyline_col is None or 'valid_code' not in validated_df.columns:
+        return pd.DataFrame(columns=suggestion_columns)
+
+    unjoined = validated_df[validated_df['valid_code'].isin(UNJOINED_CODES)]
+    if unjoined.empty:
+        return pd.DataFrame(columns=[name_col, polyline_col] + suggestion_columns)
+
+    # One entry per distinct (name, polyline): observations repeat across timestamps
+    orphans = (
+        unjoined.groupby([name_col, polyline_col], observed=True, sort=True)['valid_code']
+        .agg(valid_code='first', observations='size')
+        .reset_index()
+    )
+
+    # Distinct routes are decoded, projected and scored once, however many names share them
+    route_codes, routes = pd.factorize(orphans[polyline_col].astype(str))
+    lines = _decode_polylines_metric(np.asarray(routes, dtype=object), params.polyline_precision, params.crs_metric)
+    decoded = np.flatnonzero(~shapely.is_missing(lines))
+
+    if shapefile_lookup is None:
+        shapefile_lookup = _precompute_shapefile_lookup(shapefile_gdf, params.crs_metric)
+    spatial_index = build_link_spatial_index(shapefile_lookup)
+    radius = 4 * params.hausdorff_threshold_m if search_radius_m is None else search_radius_m
+
+    # Candidate links near each route
+    query_positions, link_positions = spatial_index.tree.query(lines[decoded], predicate='dwithin', distance=radius)
+    route_positions = decoded[query_positions]
+    route_lines = lines[route_positions]
+    links = spatial_index.geometries[link_positions]
+
+    # Every endpoint's distance to the other line bounds the Hausdorff distance from below
+    route_start, route_end = shapely.get_point(route_lines, 0), shapely.get_point(route_lines, -1)
+    link_start, link_end = shapely.get_point(links, 0), shapely.get_point(links, -1)
+    lower_bound = np.maximum.reduce([
+        shapely.distance(route_start, links), shapely.distance(route_end, links),
+        shapely.distance(link_start, route_lines), shapely.distance(link_end, route_lines)
+    ])
+    near = lower_bound <= radius
+
+    candidates = pd.DataFrame({
+        'route': route_positions[near],
+        'link': link_positions[near],
+        'hausdorff_distance': shapely.hausdorff_distance(route_lines[near], links[near]),
+        'endpoint_gap': (shapely.distance(route_start[near], link_start[near])
+                         + shapely.distance(route_end[near], link_end[near])),
+    })
+    candidates = candidates[candidates['hausdorff_distance'] <= radius]
+    candidates = candidates.sort_values(['route', 'hausdorff_distance', 'endpoint_gap'], kind='stable')
+    candidates['suggestion_rank'] = candidates.groupby('route').cumcount() + 1
+    candidates = candidates[candidates['suggestion_rank'] <= max_candidates]
+
+    # Coverage for the kept suggestions only: share of evenly spaced link points near the route
+    kept_lines = lines[candidates['route'].to_numpy()]
+    kept_links = spatial_index.geometries[candidates['link'].to_numpy()]
+    fractions = (np.arange(COVERAGE_SAMPLE_POINTS) + 0.5) / COVERAGE_SAMPLE_POINTS
+    samples = shapely.line_interpolate_point(kept_links[:, None], fractions[None, :], normalized=True)
+    coverage = shapely.dwithin(samples, kept_lines[:, None], params.hausdorff_threshold_m).mean(axis=1)
+    candidates['coverage_percent'] = coverage * 100
+    candidates['suggested_link_id'] = spatial_index.keys[candidates['link'].to_numpy()]
+    candidates['within_threshold'] = candidates['hausdorff_distance'] <= params.hausdorff_threshold_m
+
+    suggestions = orphans.assign(route=route_codes).merge(candidates, on='route', how='left')
+    suggestions['suggestion_rank'] = suggestions['suggestion_rank'].astype('Int64')
+    return suggestions[[name_col, polyline_col] + suggestion_columns]
@@ -6,6 +6,7 @@ and preparing data for visualization.
 """
 
 import pandas as pd
+import numpy as np
 import geopandas as gpd
 from datetime import date, datetime
 from typing import Dict, List, Tuple, Optional, Any
@@ -105,25 +106,21 @@ class FilterManager:
         Returns:
             Filtered DataFrame
         """
-        filtered_data = data.copy()
+        # Build one row mask and select once; filtering never modifies data, so no copy is taken
+        mask = np.ones(len(data), dtype=bool)
         
         if date_range is not None:
             start_date, end_date = date_range
-            filtered_data = filtered_data[
-                (pd.to_datetime(filtered_data['date']) >= pd.to_datetime(start_date)) &
-                (pd.to_datetime(filtered_data['date']) <= pd.to_datetime(end_date))
-            ]
+            dates = pd.to_datetime(data['date'])
+            mask &= ((dates >= pd.to_datetime(start_date)) & (dates <= pd.to_datetime(end_date))).to_numpy()
             logger.debug(f"Applied date filter: {start_date} to {end_date}")
         
         if hour_range is not None:
             start_hour, end_hour = hour_range
-            filtered_data = filtered_data[
-                (filtered_data['hour'] >= start_hour) &
-                (filtered_data['hour'] <= end_hour)
-            ]
+            mask &= ((data['hour'] >= start_hour) & (data['hour'] <= end_hour)).to_numpy()
             logger.debug(f"Applied hour filter: {start_hour} to {end_hour}")
         
-        return filtered_data
+        return data if mask.all() else data[mask]
     
     def apply_attribute_filters(self, data: pd.DataFrame, filters: Dict[str, Dict]) -> pd.DataFrame:
         """
@@ -137,7 +134,8 @@ class FilterManager:
         Returns:
             Filtered DataFrame
         """
-        filtered_data = data.copy()
+        # Combine all attribute conditions into one mask and select once
+        mask = np.ones(len(data), dtype=bool)
         
         for field, filter_config in filters.items():
             if field not in data.columns:
@@ -147,18 +145,16 @@ class FilterManager:
             value = filter_config.get('value')
             
             if operator == 'above':
-                filtered_data = filtered_data[filtered_data[field] > value]
+                mask &= (data[field] > value).to_numpy()
             elif operator == 'below':
-                filtered_data = filtered_data[filtered_data[field] < value]
+                mask &= (data[field] < value).to_numpy()
             elif operator == 'between':
                 min_val, max_val = value if isinstance(value, (list, tuple)) else (value, value)
-                filtered_data = filtered_data[
-                    (filtered_data[field] >= min_val) & (filtered_data[field] <= max_val)
-                ]
+                mask &= ((data[field] >= min_val) & (data[field] <= max_val)).to_numpy()
             
             logger.debug(f"Applied {field} filter: {operator} {value}")
         
-        return filtered_data
+        return data if mask.all() else data[mask]
     
     def apply_spatial_filters(self, gdf: gpd.GeoDataFrame, spatial_selection: Optional[gpd.GeoDataFrame] = None) -> gpd.GeoDataFrame:
         """
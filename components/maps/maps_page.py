@@ -390,6 +390,10 @@ class MapsPageInterface:
             if os.path.exists(self.default_weekly_path):
                 found_files['weekly'] = self.default_weekly_path
             
+            # Next, the latest snapshot published by the watch-folder worker
+            if not found_files:
+                self._find_live_snapshot_files(found_files)
+            
             # If default paths not found, look for aggregation output directories
             if not found_files:
                 possible_dirs = ['./output/aggregation', './output', './test_output', './exports']
@@ -446,6 +450,19 @@ class MapsPageInterface:
             st.error(f"❌ Error during auto-detection: {str(e)}")
             logger.error(f"Auto-detection error: {e}")
 
+    def _find_live_snapshot_files(self, found_files: dict, live_dir: str = './output/live') -> None:
+        """Use the files of the watch-folder worker's latest published snapshot, if any."""
+        try:
+            from components.aggregation.watch_folder import read_latest_snapshot
+            latest = read_latest_snapshot(live_dir)
+            if latest is None:
+                return
+            for file_type, output_name in [('hourly', 'hourly_agg'), ('weekly', 'weekly_hourly_profile')]:
+                if output_name in latest['files']:
+                    found_files[file_type] = latest['files'][output_name]
+        except Exception as e:
+            logger.warning(f"Error reading live snapshot in {live_dir}: {e}")
+
     def _search_aggregation_subdirs(self, agg_dir: str, found_files: dict) -> None:
         """Search for CSV files in aggregation subdirectories."""
         try:
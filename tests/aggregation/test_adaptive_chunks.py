@@ -0,0 +1,48 @@
+"""
+Tests for memory-driven adaptive chunk sizing and chunk-independent deduplication
+"""
+
+import numpy as np
+import pandas as pd
+
+from components.aggregation.pipeline import AdaptiveChunkSizer, read_csv_chunked
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem'}
+
+
+def test_sizer_grows_with_headroom_and_shrinks_under_pressure():
+    """Chunk size at most doubles with room to spare and drops as RSS nears the budget"""
+    sizer = AdaptiveChunkSizer(initial_size=10000, memory_budget_mb=1000.0, min_size=1000)
+    one_mb_per_10k_rows = 1024 * 1024
+
+    assert sizer.update(10000, one_mb_per_10k_rows, rss_mb=100.0) == 20000
+    assert sizer.update(20000, 2 * one_mb_per_10k_rows, rss_mb=150.0) == 40000
+
+    # 10 MB headroom * 0.2 share at ~105 bytes/row
+    shrunk = sizer.update(40000, 4 * one_mb_per_10k_rows, rss_mb=990.0)
+    assert shrunk == 20000
+    assert sizer.update(20000, 2 * one_mb_per_10k_rows, rss_mb=1200.0) == 1000
+
+    summary = sizer.summary()
+    assert summary['chunk_sizes'] == [10000, 20000, 40000, 20000]
+    assert summary['peak_rss_mb'] == 1200.0
+
+
+def test_adaptive_read_matches_single_chunk_read(tmp_path, test_data_generator):
+    """Resized chunks give the same rows as one chunk, including duplicates split across chunks"""
+    n_rows = 5000
+    raw = test_data_generator.create_raw_export(
+        pd.date_range('2025-04-08', periods=600, freq='15min'), n_rows, links=['s_1-2', 's_2-3', 's_3-4'], seed=11,
+        DataID=np.random.default_rng(11).integers(0, 4000, n_rows)
+    )
+    raw.to_csv(tmp_path / 'data.csv', index=False)
+
+    whole_df, _ = read_csv_chunked(str(tmp_path / 'data.csv'), dict(PARAMS, chunk_size=n_rows))
+    adaptive_df, stats = read_csv_chunked(str(tmp_path / 'data.csv'), dict(
+        PARAMS, chunk_size=1000, adaptive_chunk_size=True, memory_budget_mb=100000.0
+    ))
+
+    sizes = stats['chunk_sizing']['chunk_sizes']
+    assert sizes == [1000, 2000, 2000]
+    assert sum(sizes) == n_rows
+    pd.testing.assert_frame_equal(adaptive_df, whole_df)
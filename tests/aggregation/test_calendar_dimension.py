@@ -0,0 +1,94 @@
+"""
+Tests for the distinct date-hour calendar dimension used by temporal enrichment
+"""
+
+from datetime import date
+
+import pandas as pd
+
+from components.aggregation.pipeline import (
+    _load_holiday_calendar,
+    apply_temporal_enhancements,
+    build_calendar_dimension,
+    build_holiday_calendar,
+    map_daytype_categories,
+    map_hebrew_day_names
+)
+
+
+def _make_timestamps() -> pd.Series:
+    """Four links polled every 15 minutes over two days, plus one missing timestamp"""
+    stamps = pd.date_range('2025-04-12 22:00', '2025-04-14 02:00', freq='15min', tz='Asia/Jerusalem')
+    return pd.Series(list(stamps) * 4 + [pd.NaT])
+
+
+def test_calendar_is_keyed_by_distinct_date_hours():
+    """Calendar has one row per distinct date-hour and joins back to per-row dt results"""
+    timestamps = _make_timestamps()
+
+    codes, calendar = build_calendar_dimension(timestamps, include_holidays=False)
+
+    assert len(codes) == len(timestamps)
+    assert len(calendar) == 29 + 1  # 28 hours + partial hour, plus the NaT key
+    assert 'daytype' not in calendar.columns  # daytype comes from the rows' DayType values
+    joined = calendar.iloc[codes].reset_index(drop=True)
+    valid = timestamps.notna().to_numpy()
+    assert (joined.loc[valid, 'date'].to_numpy() == timestamps[valid].dt.date.to_numpy()).all()
+    assert (joined.loc[valid, 'hour_of_day'].to_numpy() == timestamps[valid].dt.hour.to_numpy()).all()
+    assert (joined.loc[valid, 'weekday_index'].to_numpy() == timestamps[valid].dt.weekday.to_numpy()).all()
+    assert (joined.loc[valid, 'iso_week'].to_numpy() == timestamps[valid].dt.isocalendar()['week'].to_numpy()).all()
+
+
+def test_holiday_calendar_memoized_across_chunks():
+    """Repeated chunks for the same year range reuse the cached holiday calendar"""
+    _load_holiday_calendar.cache_clear()
+    chunk = pd.DataFrame({'date': [date(2025, 4, 13), date(2025, 4, 14)]})
+
+    first = build_holiday_calendar(chunk, {'use_israeli_holidays': True})
+    second = build_holiday_calendar(chunk, {'use_israeli_holidays': True})
+
+    assert first == second
+    assert _load_holiday_calendar.cache_info().hits == 1
+
+    # Callers get their own copy, so the cached calendar cannot be mutated
+    first[date(2025, 1, 1)] = 'Test'
+    assert date(2025, 1, 1) not in build_holiday_calendar(chunk, {'use_israeli_holidays': True})
+
+
+def test_temporal_enhancements_apply_holidays_from_calendar():
+    """Holiday flags come from the calendar dimension and override daytype"""
+    df = pd.DataFrame({
+        'timestamp': ['2025-04-13 08:00:00', '2025-04-13 08:15:00', '2025-04-15 09:00:00'],
+        'day_in_week': ['יום א', 'יום א', 'יום ג'],
+        'day_type': ['יום חול', 'יום חול', 'יום חול']
+    })
+
+    result = apply_temporal_enhancements(df, {
+        'ts_format': '%Y-%m-%d %H:%M:%S',
+        'tz': 'Asia/Jerusalem',
+        'holidays_as': 'holiday'
+    })
+
+    # 2025-04-13 is the first day of Passover
+    assert result['is_holiday'].tolist() == [True, True, False]
+    assert result['holiday_name'].iloc[0] != ''
+    assert result['daytype'].tolist() == ['holiday', 'holiday', 'weekday']
+    assert result['hour_of_day'].tolist() == [8, 8, 9]
+
+
+def test_day_name_and_daytype_mapping_on_categories():
+    """Distinct-value mapping keeps per-row results including missing and unmapped values"""
+    df = pd.DataFrame({
+        'day_in_week': ['יום ב', '\xa0יום ש', None, 'יום ב'],
+        'day_type': ['יום חול', 'סוף שבוע', None, 'unknown'],
+        'weekday_index': [0, 5, 2, 6]
+    })
+
+    mapped = map_daytype_categories(map_hebrew_day_names(df), {})
+
+    # Hebrew names win over the existing weekday_index; missing names keep it
+    assert mapped['weekday_index'].tolist() == [0, 5, 2, 0]
+    assert mapped['daytype'].tolist()[:2] == ['weekday', 'weekend']
+    assert pd.isna(mapped['daytype'].iloc[2])
+    # Unmapped DayType falls back to the weekday_index inference
+    assert mapped['daytype'].iloc[3] == 'weekday'
@@ -0,0 +1,95 @@
+"""
+Tests for streaming gzip, zip and zstd inputs without unpacking to disk
+"""
+
+import gzip
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from components.aggregation.ingestion import detect_compression, detect_file_encoding, open_csv_input
+from components.aggregation.pipeline import read_csv_chunked, run_pipeline
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem'}
+
+
+def _raw_csv_bytes(generator, encoding: str = 'utf-8') -> bytes:
+    """Small raw export with Hebrew day names"""
+    raw = generator.create_raw_export(pd.date_range('2025-04-08 06:00', periods=40, freq='30min'),
+                                      Name=['s_1-2', 's_2-3'] * 20)
+    return raw.to_csv(index=False).encode(encoding)
+
+
+def test_compressed_files_read_like_plain(tmp_path, test_data_generator):
+    """gzip and zip inputs produce the same frame as the plain CSV and report both MB/s figures"""
+    payload = _raw_csv_bytes(test_data_generator)
+    (tmp_path / 'plain.csv').write_bytes(payload)
+    (tmp_path / 'data.csv.gz').write_bytes(gzip.compress(payload))
+    with zipfile.ZipFile(tmp_path / 'data.zip', 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('README.txt', 'not data')
+        archive.writestr('export.csv', payload)
+
+    plain_df, plain_stats = read_csv_chunked(str(tmp_path / 'plain.csv'), PARAMS)
+    assert plain_stats['read_throughput']['compression'] == 'none'
+
+    for name, compression in [('data.csv.gz', 'gzip'), ('data.zip', 'zip')]:
+        df, stats = read_csv_chunked(str(tmp_path / name), PARAMS)
+        pd.testing.assert_frame_equal(df, plain_df)
+        throughput = stats['read_throughput']
+        assert throughput['compression'] == compression
+        assert throughput['uncompressed_mb'] == pytest.approx(len(payload) / (1024 * 1024), abs=1e-3)
+        assert throughput['compressed_mb'] < throughput['uncompressed_mb']
+
+
+def test_zstd_input_streams(test_data_generator):
+    """zstd buffers are detected by magic bytes and decompressed on the fly"""
+    zstandard = pytest.importorskip('zstandard')
+    payload = _raw_csv_bytes(test_data_generator)
+    source = io.BytesIO(zstandard.ZstdCompressor().compress(payload))
+
+    assert detect_compression(source) == 'zstd'
+    with open_csv_input(source) as stream:
+        assert stream.read() == payload
+
+
+def test_encoding_detected_on_decompressed_prefix(test_data_generator):
+    """cp1255 Hebrew inside a gzip upload is detected from the decompressed bytes"""
+    source = io.BytesIO(gzip.compress(_raw_csv_bytes(test_data_generator, 'cp1255')))
+
+    assert detect_file_encoding(source) == 'cp1255'
+    with open_csv_input(source) as stream:
+        df = pd.read_csv(stream, encoding='cp1255')
+    assert df['DayInWeek'].iloc[0] == 'יום ג'
+
+
+def test_zip_member_selection(tmp_path):
+    """A named member is read; an unknown member is an error"""
+    with zipfile.ZipFile(tmp_path / 'bundle.zip', 'w') as archive:
+        archive.writestr('a.csv', 'x\n1\n')
+        archive.writestr('b.csv', 'x\n2\n')
+
+    with open_csv_input(str(tmp_path / 'bundle.zip')) as stream:
+        assert pd.read_csv(stream)['x'].iloc[0] == 1
+    with open_csv_input(str(tmp_path / 'bundle.zip'), member='b.csv') as stream:
+        assert pd.read_csv(stream)['x'].iloc[0] == 2
+    with pytest.raises(ValueError):
+        with open_csv_input(str(tmp_path / 'bundle.zip'), member='c.csv'):
+            pass
+
+
+def test_uploaded_buffer_runs_like_a_file_on_disk(tmp_path, test_data_generator):
+    """An upload's in-memory buffer (plain or gzip) gives the outputs of the same file on disk"""
+    payload = _raw_csv_bytes(test_data_generator)
+    (tmp_path / 'plain.csv').write_bytes(payload)
+    run_pipeline(dict(PARAMS, input_file_path=str(tmp_path / 'plain.csv'), output_dir=str(tmp_path / 'disk')))
+
+    for name, content in [('upload.csv', payload), ('upload.csv.gz', gzip.compress(payload))]:
+        upload = io.BytesIO(content)
+        upload.name = name
+        output_dir = tmp_path / name
+        run_pipeline(dict(PARAMS, input_file_path=upload, output_dir=str(output_dir)))
+        for output in ['hourly_agg.csv', 'weekly_hourly_profile.csv', 'quality_by_link.csv']:
+            assert (output_dir / output).read_bytes() == (tmp_path / 'disk' / output).read_bytes()
+        assert f'"input_file_path": "{name}"' in (output_dir / 'run_config.json').read_text()
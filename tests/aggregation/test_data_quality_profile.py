@@ -0,0 +1,87 @@
+"""
+Tests for the cached single-pass data quality profile
+"""
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+from shapely.geometry import LineString
+
+data_quality = pytest.importorskip('components.aggregation.data_quality')
+
+
+@pytest.fixture
+def shapefile_and_results():
+    gdf = gpd.GeoDataFrame({
+        'From': [1, 2, 3, 3],
+        'To': [2, 3, 4, 4],
+        'geometry': [LineString([(0, 0), (1, 1)]), LineString([(1, 1), (2, 2)]),
+                     LineString([(2, 2), (3, 3)]), LineString([(2, 2), (3, 3)])]
+    }, crs='EPSG:2039')
+    rng = np.random.default_rng(3)
+    results_df = pd.DataFrame({
+        'link_id': ['s_1-2'] * 10 + ['s_2-3'] * 10 + ['s_9-9'] * 5,
+        'date': '2025-01-01',
+        'hour': list(range(10)) * 2 + list(range(5)),
+        'avg_speed_kmh': np.r_[rng.normal(50, 5, 23), -1.0, 250.0],
+        'avg_duration_sec': np.r_[rng.normal(120, 10, 24), 99999.0],
+        'n_valid': np.r_[np.full(20, 8), [1, 1, 2, 9, 9]]
+    })
+    data_quality._PROFILE_CACHE.clear()
+    yield gdf, results_df
+    data_quality._PROFILE_CACHE.clear()
+
+
+def test_profile_report_sections(shapefile_and_results):
+    """The profile carries every report section with the expected counts"""
+    gdf, results_df = shapefile_and_results
+    report = data_quality.DataQualityChecker().perform_comprehensive_quality_check(gdf, results_df)
+
+    assert {'timestamp', 'data_summary', 'speed_validation', 'duration_validation',
+            'observation_validation', 'geometry_validation', 'join_audit', 'overall_quality'} <= set(report)
+    speeds = report['speed_validation']
+    assert speeds['statistics']['median'] == pytest.approx(np.percentile(results_df['avg_speed_kmh'], 50))
+    assert speeds['statistics']['std'] == pytest.approx(results_df['avg_speed_kmh'].std())
+
+    audit = report['join_audit']
+    assert audit['shapefile_summary']['unique_link_keys'] == 3
+    assert audit['shapefile_summary']['duplicate_keys_in_shapefile'] == 1
+    assert audit['join_analysis']['successful_matches'] == 2
+    assert audit['missing_data']['results_links_not_in_shapefile'] == ['s_9-9']
+    assert audit['missing_data']['shapefile_links_not_in_results'] == ['s_3-4']
+
+
+def test_profile_is_cached_by_fingerprint(shapefile_and_results):
+    """Reruns reuse the cached profile; any data change profiles again"""
+    gdf, results_df = shapefile_and_results
+    checker = data_quality.DataQualityChecker()
+    first = checker.get_quality_profile(gdf, results_df)
+    assert checker.get_quality_profile(gdf, results_df.copy()) is first
+    assert data_quality.DataQualityChecker().get_quality_profile(gdf, results_df) is first
+
+    changed = results_df.copy()
+    changed.loc[0, 'avg_speed_kmh'] += 1
+    assert data_quality.data_fingerprint(gdf, changed) != first.fingerprint
+    assert checker.get_quality_profile(gdf, changed) is not first
+
+    # A different configuration is profiled separately
+    config = data_quality.DataQualityChecker().config
+    config['observation_thresholds'] = dict(config['observation_thresholds'], min_observations_reliable=20)
+    strict = data_quality.DataQualityChecker(config)
+    assert strict.get_quality_profile(gdf, results_df) is not first
+
+
+def test_cached_report_is_fresh_and_private(shapefile_and_results):
+    """A cache hit is stamped when requested and edits to a report do not reach the cache"""
+    gdf, results_df = shapefile_and_results
+    checker = data_quality.DataQualityChecker()
+    first = checker.perform_comprehensive_quality_check(gdf, results_df)
+    first['join_audit']['missing_data']['results_links_not_in_shapefile'].append('s_7-7')
+    first['overall_quality']['score'] = -1
+
+    again = checker.perform_comprehensive_quality_check(gdf, results_df)
+    assert again['timestamp'] >= first['timestamp']
+    assert again['timestamp'] >= checker.get_quality_profile(gdf, results_df).created
+    assert again['join_audit']['missing_data']['results_links_not_in_shapefile'] == ['s_9-9']
+    assert again['overall_quality'] != first['overall_quality']
@@ -0,0 +1,63 @@
+"""
+Tests for the per-file dtype plan applied at read time
+"""
+
+import pandas as pd
+
+from components.aggregation.pipeline import build_dtype_plan, read_csv_chunked
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem'}
+
+
+UNIT_COLUMNS = {'Duration': 'Duration (seconds)', 'Distance': 'Distance (meters)', 'Speed': 'Speed (km/h)'}
+
+
+def _write_csv(generator, path, n_rows: int, links=('s_1-2',)) -> None:
+    """Write a schema-conforming CSV; links come in blocks so later rows introduce new link names"""
+    generator.create_raw_export(
+        pd.date_range('2025-07-01 00:00', periods=n_rows, freq='min'),
+        Name=[links[i * len(links) // n_rows] for i in range(n_rows)]
+    ).rename(columns=UNIT_COLUMNS).to_csv(path, index=False)
+
+
+def test_plan_follows_declared_schema(tmp_path, test_data_generator):
+    """Declared floats become float32, integers fixed nullable widths, names categoricals"""
+    csv_path = tmp_path / 'data.csv'
+    _write_csv(test_data_generator, csv_path, 10)
+
+    plan = build_dtype_plan(str(csv_path))
+
+    assert plan['read_dtypes']['Duration (seconds)'] == 'float32'
+    assert plan['read_dtypes']['DataID'] == 'Int64'
+    assert plan['read_dtypes']['RouteAlternative'] == 'Int32'
+    assert plan['read_dtypes']['Name'] == 'category'
+    assert 'Url' not in plan['read_dtypes']
+
+
+def test_chunks_concat_with_union_vocabulary(tmp_path, test_data_generator):
+    """Chunks seeing different links share one categorical dtype after concat"""
+    csv_path = tmp_path / 'data.csv'
+    _write_csv(test_data_generator, csv_path, 40, links=['s_3-4', 's_1-2', 's_2-3', 's_4-5'])
+
+    df, _ = read_csv_chunked(str(csv_path), dict(PARAMS, chunk_size=10))
+
+    assert isinstance(df['name'].dtype, pd.CategoricalDtype)
+    assert list(df['name'].cat.categories) == ['s_1-2', 's_2-3', 's_3-4', 's_4-5']
+    assert df['name'].value_counts().to_dict() == {'s_1-2': 10, 's_2-3': 10, 's_3-4': 10, 's_4-5': 10}
+    assert isinstance(df['daytype'].dtype, pd.CategoricalDtype)
+    assert df['duration'].dtype == 'float32'
+    assert df['data_id'].dtype == 'Int64'
+
+
+def test_plan_contradicted_by_later_rows_falls_back(tmp_path, test_data_generator):
+    """Text beyond the sample in a planned integer column re-reads with inferred dtypes"""
+    csv_path = tmp_path / 'data.csv'
+    _write_csv(test_data_generator, csv_path, 5010)
+    raw = pd.read_csv(csv_path, dtype={'SegmentID': str})
+    raw.loc[5005, 'SegmentID'] = 'SEG-X'
+    raw.to_csv(csv_path, index=False)
+
+    df, stats = read_csv_chunked(str(csv_path), dict(PARAMS, chunk_size=2000))
+
+    assert len(df) == 5010
+    assert stats['chunks_processed'] == 3
@@ -0,0 +1,60 @@
+"""
+Tests for the out-of-core DuckDB execution backend
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from components.aggregation.pipeline import run_pipeline
+
+duckdb = pytest.importorskip('duckdb')
+duckdb_backend = pytest.importorskip('components.aggregation.duckdb_backend')
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem', 'chunk_size': 150}
+
+
+def _write_raw_csv(generator, path) -> None:
+    """Raw export with DataID and link+timestamp duplicates, invalid rows and a holiday (2025-04-13)"""
+    raw = generator.create_raw_export(pd.date_range('2025-04-10', periods=400, freq='15min'), 600,
+                                      links=['s_1-2', 's_2-3', 's_3-4'], seed=5, invalid_share=0.15,
+                                      random_measurements=True)
+    rng = np.random.default_rng(5)
+    raw.loc[rng.choice(len(raw), 30, replace=False), 'DataID'] = rng.integers(0, len(raw), 30)
+    weekdays = pd.to_datetime(raw['Timestamp']).dt.weekday
+    raw['DayInWeek'] = weekdays.map({3: 'יום ה', 4: 'יום ו', 5: 'יום ש', 6: 'יום א', 0: 'יום ב'})
+    raw['DayType'] = np.where(weekdays >= 4, 'סוף שבוע', 'יום חול')
+    raw.to_csv(path, index=False)
+
+
+@pytest.mark.parametrize('filters', [{}, {'start_date': '2025-04-11', 'hours_include': [6, 7, 8, 17], 'whitelist_links': 's_1-2,s_3-4'}])
+def test_duckdb_outputs_are_byte_identical(tmp_path, filters, test_data_generator):
+    """hourly_agg.csv and weekly_hourly_profile.csv match the pandas backend byte for byte"""
+    _write_raw_csv(test_data_generator, tmp_path / 'raw.csv')
+    outputs = {}
+    for backend in ['pandas', 'duckdb']:
+        output_dir = tmp_path / backend
+        _, _, output_files = run_pipeline(dict(
+            PARAMS, **filters, input_file_path=str(tmp_path / 'raw.csv'), output_dir=str(output_dir),
+            execution_backend=backend, duckdb_batch_rows=64, recompute_std_from_raw=True
+        ))
+        outputs[backend] = output_files
+
+    for name in ['hourly_agg', 'weekly_hourly_profile', 'quality_by_link']:
+        with open(outputs['pandas'][name], 'rb') as expected, open(outputs['duckdb'][name], 'rb') as actual:
+            assert actual.read() == expected.read(), name
+    assert not (tmp_path / 'duckdb' / '.duckdb_tmp').exists()
+
+
+def test_group_batches_never_split_a_group():
+    """Re-cut batches hold whole groups and keep every row in order"""
+    keys = np.repeat(np.arange(10), [1, 5, 2, 7, 1, 1, 9, 3, 4, 2])
+    table = pa.table({'name': keys, 'value': np.arange(len(keys))})
+    reader = pa.RecordBatchReader.from_batches(table.schema, table.to_batches(max_chunksize=4))
+
+    batches = list(duckdb_backend.iter_group_batches(reader, ['name']))
+
+    assert pd.concat(batches)['value'].tolist() == list(range(len(keys)))
+    seen = [set(batch['name']) for batch in batches]
+    assert all(not (a & b) for i, a in enumerate(seen) for b in seen[i + 1:])
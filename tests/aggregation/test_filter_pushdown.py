@@ -0,0 +1,63 @@
+"""
+Tests for read-time filter pushdown and column projection
+"""
+
+import numpy as np
+import pandas as pd
+
+from components.aggregation.pipeline import (
+    apply_filtering_and_selection,
+    apply_temporal_enhancements,
+    build_chunk_predicate,
+    read_csv_chunked
+)
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem'}
+FILTERS = {
+    'start_date': '2025-04-11',
+    'end_date': '2025-04-15',
+    'weekday_include': [0, 4, 6],
+    'hours_include': [7, 8, 9, 17],
+    'blacklist_links': 's_2-3'
+}
+
+
+def _make_raw_csv(generator, path, n_rows: int = 600, seed: int = 5) -> pd.DataFrame:
+    """Raw CSV over ten days; a few DayInWeek values disagree with the timestamp's weekday"""
+    raw = generator.create_raw_export(pd.date_range('2025-04-08', '2025-04-18', freq='15min'), n_rows, replace=False,
+                                      links=['s_1-2', 's_2-3', 's_3-4'], seed=seed)
+    hebrew_days = np.array(['יום ב', 'יום ג', 'יום ד', 'יום ה', 'יום ו', 'יום ש', 'יום א'])
+    raw['DayInWeek'] = hebrew_days[pd.to_datetime(raw['Timestamp']).dt.weekday.to_numpy()]
+    raw.loc[:19, 'DayInWeek'] = 'יום ו'
+    raw.to_csv(path, index=False)
+    return raw
+
+
+def test_predicate_keeps_exactly_post_load_filter_rows(tmp_path, test_data_generator):
+    """Pushed-down predicate agrees with the post-load filters, including Hebrew weekdays"""
+    _make_raw_csv(test_data_generator, tmp_path / 'data.csv')
+    full_df, _ = read_csv_chunked(str(tmp_path / 'data.csv'), dict(PARAMS, use_dtype_plan=False))
+    expected_ids = set(apply_filtering_and_selection(full_df, FILTERS)['data_id'])
+
+    chunk = pd.read_csv(tmp_path / 'data.csv').rename(columns={'Timestamp': 'timestamp', 'Name': 'name',
+                                                                'DayInWeek': 'day_in_week', 'DataID': 'data_id'})
+    chunk = apply_temporal_enhancements(chunk[['data_id', 'name', 'timestamp', 'day_in_week']], PARAMS)
+    keep = build_chunk_predicate(FILTERS)(chunk)
+
+    assert set(chunk.loc[keep, 'data_id']) == expected_ids
+    assert build_chunk_predicate({'weekday_only': True}) is None
+
+
+def test_read_time_pruning_reported_and_columns_projected(tmp_path, test_data_generator):
+    """Filtered reads prune rows before enrichment and skip unused heavy columns"""
+    raw = _make_raw_csv(test_data_generator, tmp_path / 'data.csv')
+
+    pruned_df, stats = read_csv_chunked(str(tmp_path / 'data.csv'), {**PARAMS, **FILTERS, "chunk_size": 200})
+    full_df, _ = read_csv_chunked(str(tmp_path / 'data.csv'), dict(PARAMS, chunk_size=200, filter_pushdown=False))
+
+    expected = apply_filtering_and_selection(full_df, FILTERS)
+    assert sorted(pruned_df['data_id']) == sorted(expected['data_id'])
+    assert stats['read_pruning']['rows_read'] == len(raw)
+    assert stats['read_pruning']['rows_pruned'] == len(raw) - len(pruned_df)
+    assert stats['total_rows'] == len(pruned_df)  # validation only saw surviving rows
+    assert 'url' not in pruned_df.columns and 'polyline' not in pruned_df.columns
@@ -0,0 +1,65 @@
+"""
+Tests for the incremental per-date hourly store and weekly refresh from stored moments
+"""
+
+import pandas as pd
+from datetime import date
+
+from components.aggregation.pipeline import (
+    create_hourly_aggregation,
+    create_weekly_profile,
+    load_hourly_store,
+    update_hourly_store
+)
+
+PARAMS = {'min_valid_per_hour': 1, 'recompute_std_from_raw': True}
+
+
+def test_incremental_updates_match_full_run(tmp_path, test_data_generator):
+    """Two increments give the same hourly and weekly outputs as aggregating everything at once"""
+    first_days = [date(2025, 4, 6), date(2025, 4, 7)]
+    second_days = [date(2025, 4, 8), date(2025, 4, 9)]
+    first_raw = test_data_generator.create_enriched_rows(first_days, seed=3)
+    second_raw = test_data_generator.create_enriched_rows(second_days, seed=4)
+    store = tmp_path / 'store'
+
+    update_hourly_store(store, create_hourly_aggregation(first_raw, PARAMS))
+    update = update_hourly_store(store, create_hourly_aggregation(second_raw, PARAMS))
+    assert update['dates_added'] == ['2025-04-08', '2025-04-09']
+    assert update['dates_stored'] == 4
+
+    stored_hourly = load_hourly_store(store, PARAMS)
+    full_hourly = create_hourly_aggregation(pd.concat([first_raw, second_raw], ignore_index=True), PARAMS)
+
+    keys = ['link_id', 'date', 'hour_of_day']
+    pd.testing.assert_frame_equal(
+        stored_hourly.sort_values(keys).reset_index(drop=True),
+        full_hourly.sort_values(keys).reset_index(drop=True),
+        check_dtype=False, check_categorical=False
+    )
+
+    weekly_keys = ['link_id', 'daytype', 'hour_of_day']
+    pd.testing.assert_frame_equal(
+        create_weekly_profile(stored_hourly, PARAMS).sort_values(weekly_keys).reset_index(drop=True),
+        create_weekly_profile(full_hourly, PARAMS).sort_values(weekly_keys).reset_index(drop=True),
+        check_dtype=False, check_categorical=False
+    )
+
+
+def test_reingesting_a_date_replaces_it(tmp_path, test_data_generator):
+    """Loading the same date twice does not double-count; filters prune stored dates"""
+    store = tmp_path / 'store'
+    days = [date(2025, 4, 6), date(2025, 4, 7)]
+    hourly = create_hourly_aggregation(test_data_generator.create_enriched_rows(days), PARAMS)
+
+    update_hourly_store(store, hourly)
+    update = update_hourly_store(store, hourly[hourly['date'] == days[1]])
+
+    assert update['dates_replaced'] == ['2025-04-07']
+    assert update['dates_added'] == []
+    stored = load_hourly_store(store, PARAMS)
+    assert stored['n_total'].sum() == hourly['n_total'].sum()
+
+    later = load_hourly_store(store, dict(PARAMS, start_date='2025-04-07', hours_include=[8]))
+    assert set(later['date']) == {days[1]}
+    assert set(later['hour_of_day']) == {8}
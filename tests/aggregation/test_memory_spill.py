@@ -0,0 +1,76 @@
+"""
+Tests for spilling processed chunks to disk under a memory budget
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.aggregation.pipeline import SpillBuffer, run_pipeline
+
+pytest.importorskip('psutil')
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem', 'chunk_size': 150,
+          'recompute_std_from_raw': True}
+
+
+def _write_raw_csv(generator, path, seed: int) -> None:
+    """Raw export with invalid rows over a few days and four links"""
+    generator.create_raw_export(
+        pd.date_range('2025-04-10', periods=400, freq='15min'), 700, links=['s_1-2', 's_2-3', 's_3-4', 's_4-5'],
+        seed=seed, first_data_id=seed * 10000, invalid_share=0.15, random_measurements=True, DayInWeek='יום ב'
+    ).to_csv(path, index=False)
+
+
+@pytest.mark.parametrize('spill_format', ['arrow', 'parquet'])
+def test_spilled_run_matches_in_memory_run(tmp_path, spill_format, test_data_generator):
+    """A run that spills every chunk writes the same hourly, weekly and quality outputs"""
+    inputs = [tmp_path / 'a.csv', tmp_path / 'b.csv']
+    for seed, path in enumerate(inputs):
+        _write_raw_csv(test_data_generator, path, seed)
+
+    outputs = {}
+    for label, extra in [('memory', {}),
+                         ('spill', {'spill_to_disk': True, 'memory_budget_mb': 1.0, 'spill_threshold': 0.0,
+                                    'spill_buckets': 3, 'spill_format': spill_format})]:
+        _, _, outputs[label] = run_pipeline(dict(
+            PARAMS, **extra, input_file_path=[str(path) for path in inputs], output_dir=str(tmp_path / label)
+        ))
+
+    for name in ['hourly_agg', 'weekly_hourly_profile', 'quality_by_link']:
+        with open(outputs['memory'][name], 'rb') as expected, open(outputs['spill'][name], 'rb') as actual:
+            assert actual.read() == expected.read(), name
+
+    logs = {}
+    for label, output_files in outputs.items():
+        with open(output_files['processing_log'], encoding='utf-8') as f:
+            logs[label] = f.read()
+    rows_loaded = re.search(r'Raw data rows processed: ([\d,]+)', logs['memory']).group(1)
+    assert f'Raw data rows processed: {rows_loaded}' in logs['spill']
+    assert f'Spilled: {rows_loaded} rows' in logs['spill']
+    assert 'MEMORY BUDGET / SPILL:' not in logs['memory']
+    assert not (tmp_path / 'spill' / '.spill').exists()
+
+
+def test_buckets_keep_links_together_and_read_order(tmp_path):
+    """Each link lands in one bucket and pieces come back in file, then chunk order"""
+    spill = SpillBuffer(tmp_path / '.spill', memory_budget_mb=1.0, n_buckets=4)
+    names = pd.Series(['a', 'b', 'c', 'd', 'e'] * 4, dtype='category')
+    first = pd.DataFrame({'name': names, 'row': np.arange(20)})
+    second = pd.DataFrame({'name': names.astype(str), 'row': np.arange(20, 40)})
+
+    spill.current_file = 1
+    spill.write([second])
+    spill.write([first], file_index=0)
+    buckets = list(spill.iter_buckets())
+
+    assert sum(len(bucket) for bucket in buckets) == 40
+    seen = [set(bucket['name'].astype(str)) for bucket in buckets]
+    assert all(not (a & b) for i, a in enumerate(seen) for b in seen[i + 1:])
+    for bucket in buckets:
+        assert bucket['row'].is_monotonic_increasing
+    assert spill.summary()['rows'] == 40
+    spill.cleanup()
+    assert not (tmp_path / '.spill').exists()
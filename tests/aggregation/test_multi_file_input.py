@@ -0,0 +1,127 @@
+"""
+Tests for multi-file, directory and glob input with per-file quarantine
+"""
+
+import multiprocessing
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from components.aggregation.pipeline import (
+    HOURLY_SKETCH_COLUMNS,
+    aggregate_input_files,
+    apply_filtering_and_selection,
+    create_hourly_aggregation,
+    read_csv_chunked,
+    read_input_files,
+    resolve_input_files
+)
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem', 'min_valid_per_hour': 1}
+
+
+def _make_raw_frame(generator, start: str, links, n_rows: int = 300, seed: int = 3) -> pd.DataFrame:
+    """Raw export rows over three days starting at start"""
+    return generator.create_raw_export(pd.date_range(start, periods=288, freq='15min'), n_rows, links=links,
+                                       seed=seed, first_data_id=seed * 1000, invalid_share=0.1,
+                                       random_measurements=True)
+
+
+def test_resolve_directory_glob_and_missing(tmp_path):
+    """Directories and globs expand to sorted CSV lists; a missing path raises"""
+    for name in ['b.csv', 'a.csv', 'notes.txt']:
+        (tmp_path / name).write_text('x')
+
+    expected = [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')]
+    assert resolve_input_files(tmp_path) == expected
+    assert resolve_input_files(str(tmp_path / '*.csv')) == expected
+    assert resolve_input_files([tmp_path / 'b.csv']) == [str(tmp_path / 'b.csv')]
+
+    with pytest.raises(FileNotFoundError):
+        resolve_input_files(str(tmp_path / 'missing.csv'))
+    with pytest.raises(FileNotFoundError):
+        resolve_input_files(str(tmp_path / '*.parquet'))
+
+
+def test_files_merge_like_one_file_and_bad_file_is_quarantined(tmp_path, test_data_generator):
+    """Per-file reads merge to the single-file result; a bad file is moved aside and reported"""
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    first = _make_raw_frame(test_data_generator, '2025-04-08', ['s_1-2', 's_2-3'], seed=3)
+    second = _make_raw_frame(test_data_generator, '2025-04-11', ['s_2-3', 's_3-4'], seed=4)
+    first.to_csv(input_dir / 'day1.csv', index=False)
+    second.to_csv(input_dir / 'day2.csv', index=False)
+    first.drop(columns=['Duration']).to_csv(input_dir / 'broken.csv', index=False)
+    pd.concat([first, second]).to_csv(tmp_path / 'combined.csv', index=False)
+
+    params = dict(PARAMS, max_workers=2, quarantine_dir=str(tmp_path / 'quarantine'))
+    multi_df, multi_stats = read_input_files(str(input_dir), params)
+    single_df, single_stats = read_csv_chunked(str(tmp_path / 'combined.csv'), PARAMS)
+
+    assert multi_stats['total_rows'] == single_stats['total_rows']
+    assert multi_stats['valid_rows'] == single_stats['valid_rows']
+    pd.testing.assert_frame_equal(
+        multi_stats['link_quality_partial'].sort_index(),
+        single_stats['link_quality_partial'].sort_index()
+    )
+
+    keys = ['link_id', 'date', 'hour_of_day']
+    multi_hourly = create_hourly_aggregation(multi_df, PARAMS).sort_values(keys).reset_index(drop=True)
+    single_hourly = create_hourly_aggregation(single_df, PARAMS).sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(multi_hourly, single_hourly, check_dtype=False, check_categorical=False)
+
+    report = {entry['file'].rsplit('/', 1)[-1]: entry for entry in multi_stats['files']}
+    assert report['day1.csv']['status'] == 'ok'
+    assert report['broken.csv']['status'] == 'quarantined'
+    assert 'Duration' in report['broken.csv']['error']
+    assert (tmp_path / 'quarantine' / 'broken.csv').exists()
+    assert not (input_dir / 'broken.csv').exists()
+
+
+def test_worker_partials_merge_to_the_single_file_aggregation(tmp_path, test_data_generator):
+    """Hours split across files pool their counts, moments and sketches to the single-file result"""
+    rows = _make_raw_frame(test_data_generator, '2025-04-08', ['s_1-2', 's_2-3'], n_rows=600, seed=5)
+    rows = rows.drop_duplicates(['Name', 'Timestamp']).reset_index(drop=True)
+    rows['StaticDuration'] = 250.0 + rows['DataID'] % 7
+    rows.iloc[::2].to_csv(tmp_path / 'a.csv', index=False)
+    rows.iloc[1::2].to_csv(tmp_path / 'b.csv', index=False)
+    rows.to_csv(tmp_path / 'combined.csv', index=False)
+
+    params = dict(PARAMS, reliability_percentiles=True)
+    files = [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')]
+    merged, stats, preview = aggregate_input_files(files, params, max_workers=2)
+    single_df, _ = read_csv_chunked(str(tmp_path / 'combined.csv'), params)
+    single = create_hourly_aggregation(apply_filtering_and_selection(single_df, params), params)
+
+    assert stats['rows_loaded'] == stats['rows_filtered'] == len(single_df)
+    assert len(preview) == 100
+    assert list(merged.columns) == list(single.columns)
+    assert list(merged['link_id'].cat.categories) == ['s_1-2', 's_2-3']
+
+    keys = ['link_id', 'date', 'hour_of_day', 'daytype']
+    merged = merged.sort_values(keys).reset_index(drop=True)
+    single = single.sort_values(keys).reset_index(drop=True)
+    sketches = list(HOURLY_SKETCH_COLUMNS)
+    pd.testing.assert_frame_equal(merged.drop(columns=sketches), single.drop(columns=sketches),
+                                  check_dtype=False, check_categorical=False, rtol=1e-5, atol=1e-4)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='workers must inherit the patched reader')
+def test_crashed_worker_quarantines_its_file(tmp_path, monkeypatch, test_data_generator):
+    """A worker that dies takes only the run's unfinished files with it, not the run"""
+    _make_raw_frame(test_data_generator, '2025-04-08', ['s_1-2']).to_csv(tmp_path / 'crash.csv', index=False)
+    def crash_on_first_file(file_path, params, spill=None):
+        if file_path.endswith('crash.csv'):
+            os._exit(1)
+        return read_csv_chunked(file_path, params, spill)
+
+    monkeypatch.setattr(sys.modules[read_csv_chunked.__module__], 'read_csv_chunked', crash_on_first_file)
+    params = dict(PARAMS, quarantine_dir=str(tmp_path / 'quarantine'))
+    hourly, stats, _ = aggregate_input_files([str(tmp_path / 'crash.csv')], params, max_workers=2)
+
+    assert hourly.empty
+    assert stats['files'][0]['status'] == 'quarantined'
+    assert 'BrokenProcessPool' in stats['files'][0]['error']
+    assert (tmp_path / 'quarantine' / 'crash.csv').exists()
@@ -0,0 +1,75 @@
+"""
+Tests for parallel output writing, in-memory validation and the output manifest
+"""
+
+import hashlib
+import json
+from datetime import date, datetime
+
+import pandas as pd
+
+from components.aggregation.pipeline import (
+    validate_hourly_aggregation_frame,
+    write_all_output_files,
+    write_hourly_aggregation_csv
+)
+
+
+def _make_hourly() -> pd.DataFrame:
+    """Hourly rows for two links on one date"""
+    rows = []
+    for link in ['s_2-3', 's_1-2']:
+        for hour in [7, 8]:
+            rows.append({
+                'link_id': link, 'date': date(2025, 4, 10), 'hour_of_day': hour, 'daytype': 'weekday',
+                'n_total': 4, 'n_valid': 3, 'valid_hour': True, 'no_valid_hour': 0,
+                'avg_duration_sec': 300.0, 'std_duration_sec': 10.0,
+                'avg_distance_m': 1000.0, 'avg_speed_kmh': 12.0
+            })
+    return pd.DataFrame(rows)
+
+
+def test_hourly_csv_records_checksum_and_validates_in_memory(tmp_path):
+    """The recorded checksum matches the file; an invalid frame is rejected before anything is written"""
+    record = {}
+    output_path = tmp_path / 'hourly_agg.csv'
+
+    assert write_hourly_aggregation_csv(_make_hourly(), str(output_path), record)
+    payload = output_path.read_bytes()
+    assert record == {'rows': 4, 'bytes': len(payload), 'sha256': hashlib.sha256(payload).hexdigest()}
+
+    bad = _make_hourly()
+    bad.loc[0, 'n_valid'] = 9
+    bad_path = tmp_path / 'bad.csv'
+    assert not write_hourly_aggregation_csv(bad, str(bad_path))
+    assert not bad_path.exists()
+
+    # The row count is checked against the frame handed in, not the frame being checked
+    assert validate_hourly_aggregation_frame(_make_hourly(), 4)
+    assert not validate_hourly_aggregation_frame(_make_hourly().iloc[:3], 4)
+
+
+def test_manifest_lists_every_output(tmp_path):
+    """Outputs written on the pool appear in the manifest and the processing log"""
+    hourly = _make_hourly()
+    weekly = pd.DataFrame({
+        'link_id': ['s_1-2'], 'daytype': ['weekday'], 'hour_of_day': [8],
+        'avg_n_valid': [3.0], 'total_valid_n': [3], 'total_not_valid': [1],
+        'avg_dur': [300.0], 'std_dur': [10.0], 'avg_dist': [1000.0], 'avg_speed': [12.0], 'n_days': [1]
+    })
+    raw = pd.DataFrame({'name': ['s_1-2'], 'is_valid': [True]})
+    params = {'generate_quality_reports': False, 'write_parquet_output': True}
+
+    output_files = write_all_output_files(raw, hourly, weekly, {}, params, datetime.now(), str(tmp_path))
+
+    manifest = json.loads((tmp_path / 'output_manifest.json').read_text())
+    entries = {entry['output']: entry for entry in manifest['files']}
+    assert set(entries) == set(output_files) - {'output_manifest'}
+    assert entries['hourly_agg']['rows'] == 4
+    assert entries['hourly_agg']['bytes'] == (tmp_path / 'hourly_agg.csv').stat().st_size
+    assert entries['weekly_hourly_profile']['writer'] == 'weekly_csv'
+    assert entries['hourly_agg_parquet']['bytes'] > 0
+    assert manifest['total_bytes'] == sum(entry['bytes'] for entry in entries.values())
+
+    log_text = (tmp_path / 'processing_log.txt').read_text(encoding='utf-8')
+    assert 'hourly_agg.csv:' in log_text and entries['hourly_agg']['sha256'][:12] in log_text
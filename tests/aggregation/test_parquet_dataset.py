@@ -0,0 +1,71 @@
+"""
+Tests for hive-partitioned Parquet dataset outputs and their manifests
+"""
+
+import json
+from datetime import date
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from components.aggregation.pipeline import read_parquet_dataset, write_parquet_outputs
+
+
+def _make_hourly() -> pd.DataFrame:
+    """Hourly rows for three links over two dates, deliberately out of link order"""
+    rows = []
+    for day in [date(2025, 4, 10), date(2025, 4, 11)]:
+        for link in ['s_3-4', 's_1-2', 's_2-3']:
+            for hour in [7, 8, 17]:
+                rows.append({
+                    'link_id': link, 'date': day, 'hour_of_day': hour, 'daytype': 'weekday',
+                    'n_total': 4, 'n_valid': 3, 'valid_hour': True, 'no_valid_hour': 0,
+                    'avg_duration_sec': 300.0 + hour, 'std_duration_sec': 10.0,
+                    'avg_distance_m': 1000.0, 'avg_speed_kmh': 12.0, '_duration_n': 3
+                })
+    return pd.DataFrame(rows)
+
+
+def test_partitioned_datasets_and_manifest(tmp_path):
+    """Hourly is partitioned by date and weekly by daytype, sorted by link, with row counts and time ranges"""
+    hourly = _make_hourly()
+    weekly = pd.DataFrame({
+        'link_id': ['s_2-3', 's_1-2', 's_1-2'],
+        'daytype': ['weekday', 'weekday', 'weekend'],
+        'hour_of_day': [8, 8, 9],
+        'avg_dur': [300.0, 310.0, 290.0]
+    })
+
+    written = write_parquet_outputs(hourly, weekly, str(tmp_path), row_group_size=4)
+
+    hourly_dir = tmp_path / 'hourly_agg.parquet'
+    assert written['hourly_agg_parquet'] == str(hourly_dir / '_manifest.json')
+    assert sorted(p.name for p in hourly_dir.iterdir()) == ['_manifest.json', 'date=2025-04-10', 'date=2025-04-11']
+    assert sorted(p.name for p in (tmp_path / 'weekly_hourly_profile.parquet').iterdir()) == [
+        '_manifest.json', 'daytype=weekday', 'daytype=weekend'
+    ]
+
+    manifest = json.loads((hourly_dir / '_manifest.json').read_text())
+    assert manifest['total_rows'] == 18
+    first = manifest['partitions'][0]
+    assert first['partition'] == '2025-04-10'
+    assert first['rows'] == 9 and first['row_groups'] == 3
+    assert first['time_range'] == {'start': '2025-04-10T07:00:00', 'end': '2025-04-10T18:00:00'}
+
+    part_file = pq.ParquetFile(hourly_dir / first['path'])
+    link_stats = [part_file.metadata.row_group(i).column(0).statistics for i in range(part_file.metadata.num_row_groups)]
+    assert [(s.min, s.max) for s in link_stats] == [('s_1-2', 's_2-3'), ('s_2-3', 's_3-4'), ('s_3-4', 's_3-4')]
+    assert '_duration_n' not in part_file.schema_arrow.names
+    assert 'date' not in part_file.schema_arrow.names
+
+
+def test_read_prunes_by_partition_and_link(tmp_path):
+    """Reading one date and one link returns exactly those rows with the partition column restored"""
+    write_parquet_outputs(_make_hourly(), pd.DataFrame(), str(tmp_path))
+
+    subset = read_parquet_dataset(tmp_path / 'hourly_agg.parquet', partitions=[date(2025, 4, 11)], links=['s_2-3'])
+
+    assert len(subset) == 3
+    assert set(subset['link_id'].astype(str)) == {'s_2-3'}
+    assert set(subset['date'].astype(str)) == {'2025-04-11'}
+    assert subset['hour_of_day'].tolist() == [7, 8, 17]
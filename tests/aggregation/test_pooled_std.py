@@ -0,0 +1,83 @@
+"""
+Tests for exact pooled weekly std computed from hourly mergeable moments
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date
+
+from components.aggregation.pipeline import (
+    create_hourly_aggregation,
+    create_weekly_profile,
+    drop_moment_columns,
+    HOURLY_MOMENT_COLUMNS
+)
+
+
+DAYS = [date(2024, 1, day) for day in range(1, 6)]
+
+
+def test_hourly_aggregation_carries_moments(test_data_generator):
+    """Hourly output keeps n and M2 per metric alongside the published columns"""
+    raw_df = test_data_generator.create_enriched_rows(DAYS, seed=7, max_rows_per_hour=5, static_duration=True)
+    hourly_df = create_hourly_aggregation(raw_df, {'min_valid_per_hour': 1})
+
+    for n_col, _, m2_col in HOURLY_MOMENT_COLUMNS.values():
+        assert n_col in hourly_df.columns
+        assert m2_col in hourly_df.columns
+
+    expected_n = raw_df[raw_df['is_valid']].groupby(['name', 'date', 'hour_of_day']).size()
+    actual_n = hourly_df.set_index(['link_id', 'date', 'hour_of_day'])['_duration_n']
+    actual_n = actual_n[actual_n > 0]
+    assert actual_n.sort_index().tolist() == expected_n.sort_index().tolist()
+
+    published = drop_moment_columns(hourly_df)
+    assert not any(col.startswith('_') for col in published.columns)
+
+
+def test_weekly_pooled_std_matches_raw_std(test_data_generator):
+    """Pooled std_dur equals std over all raw valid rows of the weekly group"""
+    raw_df = test_data_generator.create_enriched_rows(DAYS, seed=7, max_rows_per_hour=5, static_duration=True)
+    hourly_df = create_hourly_aggregation(raw_df, {'min_valid_per_hour': 1})
+    hourly_df['n_total'] = hourly_df['n_total'].astype(int)
+
+    weekly_df = create_weekly_profile(hourly_df, {
+        'weekly_grouping': 'daytype',
+        'recompute_std_from_raw': True
+    })
+
+    valid_hours = hourly_df[hourly_df['valid_hour']][['link_id', 'date', 'hour_of_day']]
+    valid_raw = raw_df[raw_df['is_valid']].merge(
+        valid_hours.rename(columns={'link_id': 'name'}),
+        on=['name', 'date', 'hour_of_day']
+    )
+    expected = valid_raw.groupby(['name', 'daytype', 'hour_of_day']).agg(
+        std_dur=('duration', 'std'),
+        std_static_dur=('static_duration', 'std')
+    ).reset_index().rename(columns={'name': 'link_id'})
+
+    merged = weekly_df.merge(expected, on=['link_id', 'daytype', 'hour_of_day'], suffixes=('', '_expected'))
+    assert len(merged) == len(weekly_df)
+    np.testing.assert_allclose(merged['std_dur'], merged['std_dur_expected'], rtol=1e-9)
+    np.testing.assert_allclose(merged['std_static_dur'], merged['std_static_dur_expected'], rtol=1e-9)
+
+
+def test_weekly_pooled_std_falls_back_without_moments():
+    """Hourly data read back from CSV (no moments) uses mean of hourly std"""
+    hourly_df = pd.DataFrame({
+        'link_id': ['link1', 'link1'],
+        'date': [date(2024, 1, 1), date(2024, 1, 2)],
+        'hour_of_day': [8, 8],
+        'daytype': ['weekday', 'weekday'],
+        'valid_hour': [True, True],
+        'n_total': [10, 12],
+        'n_valid': [10, 12],
+        'avg_duration_sec': [300.0, 320.0],
+        'std_duration_sec': [50.0, 60.0],
+        'avg_distance_m': [1000.0, 1100.0],
+        'avg_speed_kmh': [12.0, 12.4]
+    })
+
+    weekly_df = create_weekly_profile(hourly_df, {'recompute_std_from_raw': True})
+
+    assert weekly_df['std_dur'].iloc[0] == 55.0
@@ -5,11 +5,11 @@ Unit tests for aggregation.py column validation and normalization functions
 import pytest
 import pandas as pd
 from datetime import date, datetime
+from components.aggregation.ingestion import _to_snake_case
 from components.aggregation.pipeline import (
     validate_csv_columns, 
     normalize_column_names, 
     validate_and_normalize_columns,
-    _to_snake_case,
     REQUIRED_COLUMNS,
     COLUMN_MAPPING
 )
@@ -0,0 +1,70 @@
+"""
+Tests for the grouped, mergeable quality_by_link report
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date
+
+from components.aggregation.pipeline import (
+    compute_link_quality_partial,
+    generate_quality_by_link_report,
+    merge_link_quality_partials
+)
+
+
+def _make_data(generator, seed: int = 3):
+    """Raw rows and a matching hourly table for several links"""
+    rng = np.random.default_rng(seed)
+    raw_df = generator.create_enriched_rows([date(2025, 1, d) for d in range(1, 6)],
+                                            links=['s_1-2', 's_2-3', 's_3-4', 's_9-9'], seed=seed,
+                                            max_rows_per_hour=20, invalid_share=0.3)
+    hourly_df = pd.DataFrame({
+        'link_id': rng.choice(['s_1-2', 's_2-3', 's_3-4'], 60),
+        'date': rng.choice([date(2025, 1, d) for d in range(1, 6)], 60),
+        'valid_hour': rng.random(60) > 0.4
+    })
+    return raw_df, hourly_df
+
+
+def _per_link_reference(raw_df: pd.DataFrame, hourly_df: pd.DataFrame) -> pd.DataFrame:
+    """Straightforward per-link computation of the report"""
+    rows = []
+    for link_id in sorted(raw_df['name'].unique()):
+        link_raw = raw_df[raw_df['name'] == link_id]
+        link_hourly = hourly_df[hourly_df['link_id'] == link_id]
+        hours = len(link_hourly)
+        valid_hours = int(link_hourly['valid_hour'].sum())
+        rows.append({
+            'link_id': link_id,
+            'percent_valid': round(link_raw['is_valid'].sum() / len(link_raw) * 100, 2),
+            'hours_with_data': hours,
+            'hours_valid': valid_hours,
+            'hours_dropped': hours - valid_hours,
+            'percent_valid_hours': round(valid_hours / hours * 100, 2) if hours else 0,
+            'days_covered': link_hourly['date'].nunique()
+        })
+    return pd.DataFrame(rows)
+
+
+def test_grouped_report_matches_per_link_scan(test_data_generator):
+    """Grouped reduction gives the same report as scanning each link"""
+    raw_df, hourly_df = _make_data(test_data_generator)
+
+    report = generate_quality_by_link_report(raw_df, hourly_df)
+
+    pd.testing.assert_frame_equal(report, _per_link_reference(raw_df, hourly_df), check_dtype=False)
+    # A link with raw rows but no hourly rows reports zero hours
+    assert report.set_index('link_id').loc['s_9-9', 'hours_with_data'] == 0
+
+
+def test_chunk_partials_merge_to_full_report(test_data_generator):
+    """Per-chunk partials merged together equal the report over all rows"""
+    raw_df, hourly_df = _make_data(test_data_generator)
+    partials = [compute_link_quality_partial(raw_df.iloc[start:start + 100]) for start in range(0, len(raw_df), 100)]
+
+    merged = merge_link_quality_partials(partials)
+    streamed = generate_quality_by_link_report(pd.DataFrame(), hourly_df, link_partial=merged)
+
+    assert merged['total_rows'].sum() == len(raw_df)
+    pd.testing.assert_frame_equal(streamed, generate_quality_by_link_report(raw_df, hourly_df))
@@ -0,0 +1,99 @@
+"""
+Tests for t-digest reliability percentiles on hourly and weekly aggregates
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from components.aggregation.pipeline import (
+    compress_centroids,
+    create_hourly_aggregation,
+    create_weekly_profile,
+    drop_moment_columns,
+    flatten_sketches,
+    load_hourly_store,
+    sketch_quantiles,
+    split_sketches,
+    update_hourly_store
+)
+
+QUANTILES = [0.5, 0.85, 0.95]
+PARAMS = {'min_valid_per_hour': 1, 'reliability_percentiles': True}
+
+
+def _rank_error(sorted_values: np.ndarray, estimate: float, quantile: float) -> float:
+    """Distance between the quantile and the empirical CDF range at the estimate"""
+    low = np.searchsorted(sorted_values, estimate, side='left') / len(sorted_values)
+    high = np.searchsorted(sorted_values, estimate, side='right') / len(sorted_values)
+    return max(low - quantile, quantile - high, 0.0)
+
+
+def test_sketch_matches_exact_quantiles():
+    """Estimates stay within the documented rank bound, also after merging 24 sketches"""
+    rng = np.random.default_rng(11)
+    values = rng.lognormal(5.7, 0.35, 100_000)
+    bound = [2 * np.pi * np.sqrt(q * (1 - q)) / 200 for q in QUANTILES]
+
+    direct = compress_centroids(np.zeros(len(values)), values, np.ones(len(values)), 1)
+    assert len(direct[1]) <= 101
+
+    pieces = compress_centroids(rng.integers(0, 24, len(values)), values, np.ones(len(values)), 24)
+    means, weights = split_sketches(*pieces, 24)
+    merged = compress_centroids(*flatten_sketches(np.zeros(24), pd.Series(means), pd.Series(weights)), 1)
+
+    exact = np.sort(values)
+    for centroids in (direct, merged):
+        estimates = sketch_quantiles(*centroids, 1, QUANTILES)[0]
+        for estimate, quantile, limit in zip(estimates, QUANTILES, bound):
+            assert _rank_error(exact, estimate, quantile) <= limit
+
+
+def test_small_groups_are_exact():
+    """Groups smaller than the centroid budget give numpy's hazen quantiles"""
+    rng = np.random.default_rng(2)
+    sizes = [1, 2, 7, 40]
+    groups = np.repeat(np.arange(len(sizes)), sizes)
+    values = rng.normal(300, 40, len(groups))
+
+    estimates = sketch_quantiles(*compress_centroids(groups, values, np.ones(len(values)), len(sizes)),
+                                 len(sizes), QUANTILES)
+
+    for code in range(len(sizes)):
+        expected = np.quantile(values[groups == code], QUANTILES, method='hazen')
+        np.testing.assert_allclose(estimates[code], expected)
+
+
+def test_weekly_percentiles_from_hourly_and_store(tmp_path):
+    """Weekly p95 merges hourly sketches, survives the incremental store and matches exact pooled p95"""
+    rng = np.random.default_rng(7)
+    days = [date(2025, 4, 6) + timedelta(days=offset) for offset in range(10)]
+    raw = pd.DataFrame({
+        'name': 's_1-2',
+        'date': np.repeat(days, 300),
+        'hour_of_day': 8,
+        'daytype': 'weekday',
+        'is_valid': rng.random(3000) > 0.1,
+        'duration': rng.gamma(9.0, 35.0, 3000).astype('float32'),
+        'static_duration': np.float32(240.0),
+        'distance': 1000.0,
+        'speed': 40.0
+    })
+
+    hourly = create_hourly_aggregation(raw, PARAMS)
+    assert drop_moment_columns(hourly).columns[-5:].tolist() == [
+        'p50_duration_sec', 'p85_duration_sec', 'p95_duration_sec', 'buffer_time_index', 'planning_time_index'
+    ]
+    weekly = create_weekly_profile(hourly, PARAMS)
+
+    update_hourly_store(tmp_path / 'store', hourly)
+    stored_weekly = create_weekly_profile(load_hourly_store(tmp_path / 'store', PARAMS), PARAMS)
+    pd.testing.assert_frame_equal(stored_weekly, weekly, check_dtype=False, check_categorical=False)
+
+    valid = np.sort(raw.loc[raw['is_valid'], 'duration'].to_numpy(dtype='float64'))
+    row = weekly.iloc[0]
+    for label, quantile in zip(['p50_dur', 'p85_dur', 'p95_dur'], QUANTILES):
+        assert _rank_error(valid, row[label], quantile) <= 0.02
+    assert row['buffer_time_index'] == (row['p95_dur'] - row['avg_dur']) / row['avg_dur']
+    assert row['planning_time_index'] == row['p95_dur'] / 240.0
@@ -0,0 +1,85 @@
+"""
+Tests for sliding-window weekly profiles built from hourly partials
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.aggregation.pipeline import (
+    create_hourly_aggregation,
+    create_rolling_weekly_profiles,
+    create_weekly_profile
+)
+
+KEYS = ['link_id', 'daytype', 'hour_of_day']
+
+
+def _make_hourly(params: dict, duration_spread: float = None) -> pd.DataFrame:
+    """Hourly aggregation over 30 days, three links and all hours
+
+    By default durations are gamma distributed; with duration_spread they are about
+    300 s with that standard deviation.
+    """
+    rng = np.random.default_rng(8)
+    days = [date(2025, 3, 1) + timedelta(days=offset) for offset in range(30)]
+    n_rows = 12000
+    raw = pd.DataFrame({
+        'name': rng.choice(['s_1-2', 's_2-3', 's_3-4'], n_rows),
+        'date': rng.choice(days, n_rows),
+        'hour_of_day': rng.integers(0, 24, n_rows),
+        'is_valid': rng.random(n_rows) > 0.1,
+        'duration': rng.gamma(9.0, 35.0, n_rows).astype('float32'),
+        'distance': np.float32(1000.0),
+        'speed': rng.normal(40, 5, n_rows).astype('float32')
+    })
+    if duration_spread is not None:
+        raw['duration'] = 300.0 + rng.normal(0.0, duration_spread, n_rows)
+    raw['daytype'] = np.where(pd.to_datetime(raw['date']).dt.weekday >= 5, 'weekend', 'weekday')
+    return create_hourly_aggregation(raw, params)
+
+
+@pytest.mark.parametrize('recompute_std', [False, True])
+def test_every_window_matches_a_full_weekly_profile(recompute_std):
+    """Adding and subtracting days gives the same profile as aggregating each window from scratch"""
+    params = {'min_valid_per_hour': 2, 'recompute_std_from_raw': recompute_std,
+              'rolling_window_days': 14, 'rolling_stride_days': 4}
+    hourly = _make_hourly(params)
+
+    rolling = create_rolling_weekly_profiles(hourly, params)
+
+    windows = rolling[['window_start', 'window_end']].drop_duplicates()
+    assert windows['window_end'].max() == date(2025, 3, 30)
+    assert (windows['window_end'] - windows['window_start']).eq(timedelta(days=13)).all()
+    assert len(windows) == 5
+    for window_start, window_end in windows.itertuples(index=False):
+        in_window = (hourly['date'] >= window_start) & (hourly['date'] <= window_end)
+        expected = create_weekly_profile(hourly[in_window], params).sort_values(KEYS).reset_index(drop=True)
+        actual = rolling[rolling['window_start'] == window_start].drop(columns=['window_start', 'window_end'])
+        actual = actual.sort_values(KEYS).reset_index(drop=True)[expected.columns]
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_categorical=False, rtol=1e-5)
+
+
+def test_pooled_std_keeps_precision_for_low_variance_durations():
+    """Durations of ~300 s with a spread of milliseconds keep their pooled std across many windows"""
+    params = {'min_valid_per_hour': 2, 'recompute_std_from_raw': True,
+              'rolling_window_days': 7, 'rolling_stride_days': 1}
+    hourly = _make_hourly(params, duration_spread=0.002)
+
+    rolling = create_rolling_weekly_profiles(hourly, params)
+
+    windows = rolling[['window_start', 'window_end']].drop_duplicates()
+    assert len(windows) == 24
+    for window_start, window_end in windows.itertuples(index=False):
+        in_window = (hourly['date'] >= window_start) & (hourly['date'] <= window_end)
+        expected = create_weekly_profile(hourly[in_window], params).sort_values(KEYS).reset_index(drop=True)
+        actual = rolling[rolling['window_start'] == window_start].sort_values(KEYS).reset_index(drop=True)
+        np.testing.assert_allclose(actual['std_dur'], expected['std_dur'], rtol=1e-6)
+
+
+def test_no_windows_when_data_is_shorter_than_window():
+    """A window longer than the data yields no profiles"""
+    params = {'min_valid_per_hour': 1, 'rolling_window_days': 31}
+    assert create_rolling_weekly_profiles(_make_hourly(params), params).empty
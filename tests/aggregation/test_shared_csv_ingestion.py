@@ -0,0 +1,102 @@
+"""
+Tests for the shared CSV ingestion layer (parser choice, encoding probe, unique-value mapping)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.aggregation.ingestion import (
+    _ENCODING_PROBE_CACHE,
+    detect_csv_format,
+    detect_file_encoding,
+    map_unique_values,
+    read_csv_frame,
+    resolve_csv_engine
+)
+from components.aggregation.pipeline import read_input_files
+
+pytest.importorskip('pyarrow')
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem', 'chunk_size': 170}
+
+
+def _write_raw_csv(generator, path, encoding: str = 'utf-8') -> pd.DataFrame:
+    """Raw export with Hebrew day names, missing values and invalid rows"""
+    raw = generator.create_raw_export(pd.date_range('2025-04-10', periods=600, freq='15min'),
+                                      links=['s_1-2', 's_2-3', 's_3-4'], seed=7, invalid_share=0.15,
+                                      random_measurements=True)
+    raw['DayInWeek'] = np.random.default_rng(7).choice(['יום ב', "יום ג'", 'ד'], len(raw))
+    raw.loc[::37, 'Duration'] = np.nan
+    raw.to_csv(path, index=False, encoding=encoding)
+    return raw
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'cp1255'])
+def test_pyarrow_and_c_parsers_read_the_same_frame(tmp_path, encoding, test_data_generator):
+    """Both parsers give identical chunks, dtypes and validation stats"""
+    _write_raw_csv(test_data_generator, tmp_path / 'raw.csv', encoding)
+    frames = {}
+    for engine in ('c', 'pyarrow'):
+        frames[engine] = read_input_files(str(tmp_path / 'raw.csv'), {**PARAMS, 'csv_engine': engine})
+
+    pd.testing.assert_frame_equal(frames['pyarrow'][0], frames['c'][0])
+    assert frames['pyarrow'][1]['valid_rows'] == frames['c'][1]['valid_rows']
+    assert frames['pyarrow'][1]['read_throughput']['engine'] == 'pyarrow'
+    assert frames['c'][1]['read_throughput']['engine'] == 'c'
+
+
+def test_read_csv_frame_projects_and_falls_back(tmp_path, test_data_generator):
+    """Whole-file reads skip excluded columns and decoding errors surface as UnicodeDecodeError"""
+    raw = _write_raw_csv(test_data_generator, tmp_path / 'raw.csv')
+    df, uncompressed_bytes, rows_read = read_csv_frame(str(tmp_path / 'raw.csv'), 'utf-8', exclude_columns=('Url',))
+    assert 'Url' not in df.columns
+    assert rows_read == len(raw)
+    assert uncompressed_bytes == (tmp_path / 'raw.csv').stat().st_size
+    pd.testing.assert_frame_equal(df, pd.read_csv(tmp_path / 'raw.csv').drop(columns='Url'))
+    assert df['DayInWeek'].tolist() == raw['DayInWeek'].tolist()
+
+    _write_raw_csv(test_data_generator, tmp_path / 'hebrew.csv', 'cp1255')
+    with pytest.raises(UnicodeDecodeError):
+        read_csv_frame(str(tmp_path / 'hebrew.csv'), 'utf-8')
+
+    assert resolve_csv_engine('auto', decimal=',') == 'c'
+    with pytest.raises(ValueError):
+        resolve_csv_engine('python')
+
+
+def test_encoding_probe_is_cached(tmp_path, monkeypatch, test_data_generator):
+    """One probe per file content, shared by every later caller"""
+    chardet = pytest.importorskip('chardet')
+    _write_raw_csv(test_data_generator, tmp_path / 'raw.csv', 'cp1255')
+    calls = []
+    detect = chardet.detect
+    monkeypatch.setattr(chardet, 'detect', lambda data: calls.append(1) or detect(data))
+    _ENCODING_PROBE_CACHE.clear()
+
+    first = detect_file_encoding(str(tmp_path / 'raw.csv'))
+    with open(tmp_path / 'raw.csv', 'rb') as f:
+        assert detect_file_encoding(f) == first
+    detect_csv_format(str(tmp_path / 'raw.csv'))
+    assert first == 'cp1255'
+    assert len(calls) == 1
+
+
+def test_map_unique_values_calls_once_per_distinct_value():
+    """The function sees each distinct value once; missing values and categoricals are kept"""
+    calls = []
+
+    def fix(value):
+        calls.append(value)
+        return value.replace('x', 'y')
+
+    series = pd.Series(['ax', 'b', None, 'ax', 'b', 'ax'], name='col')
+    mapped, changed = map_unique_values(series, fix)
+    assert sorted(calls) == ['ax', 'b']
+    assert mapped.tolist() == ['ay', 'b', None, 'ay', 'b', 'ay']
+    assert changed == 3
+
+    mapped, changed = map_unique_values(series.astype('category'), lambda value: value.replace('x', 'b').rstrip('a'))
+    assert isinstance(mapped.dtype, pd.CategoricalDtype)
+    assert mapped.astype(object).where(mapped.notna(), None).tolist() == ['ab', 'b', None, 'ab', 'b', 'ab']
+    assert changed == 3
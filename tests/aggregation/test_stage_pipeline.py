@@ -0,0 +1,110 @@
+"""
+Tests for the copy-free per-chunk stage pipeline and its memory accounting
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from components.aggregation.pipeline import (
+    CHUNK_STAGES,
+    apply_temporal_enhancements,
+    determine_data_validity,
+    generate_processing_log,
+    optimize_dtypes,
+    read_csv_chunked,
+    remove_duplicates,
+    run_chunk_stages,
+    validate_and_normalize_columns
+)
+
+PARAMS = {
+    'ts_format': '%Y-%m-%d %H:%M:%S',
+    'tz': 'Asia/Jerusalem',
+    'duration_range_sec': [10, 3600],
+    'distance_range_m': [1, 20000],
+    'speed_range_kmh': [1, 150]
+}
+
+
+def _make_raw_chunk() -> pd.DataFrame:
+    """Raw CSV-shaped chunk with one DataID duplicate and one out-of-range duration"""
+    return pd.DataFrame({
+        'DataID': ['ID001', 'ID002', 'ID002', 'ID004', 'ID005'],
+        'Name': ['Link_A', 'Link_B', 'Link_B', 'Link_C', 'Link_A'],
+        'SegmentID': ['SEG1', 'SEG2', 'SEG2', 'SEG3', 'SEG1'],
+        'RouteAlternative': [1, 1, 1, 1, 1],
+        'RequestedTime': ['08:00:00'] * 5,
+        'Timestamp': ['2024-01-01 08:05:00', '2024-01-01 09:05:00', '2024-01-01 09:05:00',
+                      '2024-01-01 11:05:00', '2024-01-01 12:05:00'],
+        'DayInWeek': ['יום ב'] * 5,
+        'DayType': ['יום חול'] * 5,
+        'Duration': [300.5, 450.2, 450.2, 5.0, 410.3],
+        'Distance': [1500.0, 2200.0, 2200.0, 1400.0, 2000.0],
+        'Speed': [18.0, 17.6, 17.6, 18.1, 17.5],
+        'Url': ['http://example.com'] * 5,
+        'Polyline': ['poly'] * 5
+    })
+
+
+def _run_with_copies(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Reference result from the public stage functions in their copying mode"""
+    df = validate_and_normalize_columns(chunk)
+    df, _ = determine_data_validity(df, PARAMS)
+    df, _ = remove_duplicates(df, PARAMS)
+    df = apply_temporal_enhancements(df, PARAMS)
+    return optimize_dtypes(df)
+
+
+def test_stage_pipeline_matches_copying_functions():
+    """In-place stages produce the same frame as the copying public functions"""
+    expected = _run_with_copies(_make_raw_chunk())
+    context = {'parse_state': {}}
+
+    result = run_chunk_stages(_make_raw_chunk(), PARAMS, context)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert context['validity_stats']['valid_rows'] == 4
+    assert context['dedup_stats']['duplicates_removed'] == 1
+
+
+def test_public_functions_do_not_modify_input_by_default():
+    """Without inplace the caller's frame is left untouched"""
+    df = validate_and_normalize_columns(_make_raw_chunk())
+    columns_before = list(df.columns)
+
+    validated, _ = determine_data_validity(df, PARAMS)
+    apply_temporal_enhancements(validated, PARAMS)
+
+    assert list(df.columns) == columns_before
+    assert 'date' not in validated.columns
+
+
+def test_inplace_stages_reuse_the_owned_frame():
+    """Stages that only add columns return the same object when inplace is set"""
+    df = validate_and_normalize_columns(_make_raw_chunk(), inplace=True)
+
+    validated, _ = determine_data_validity(df, PARAMS, inplace=True)
+    enhanced = apply_temporal_enhancements(validated, PARAMS, inplace=True)
+
+    assert validated is df
+    assert enhanced is df
+    assert {'is_valid', 'date', 'hour_of_day', 'daytype'} <= set(df.columns)
+
+
+def test_debug_stage_memory_recorded_and_logged(tmp_path):
+    """debug_stage_memory records one memory sample per stage per chunk"""
+    csv_path = tmp_path / 'data.csv'
+    _make_raw_chunk().to_csv(csv_path, index=False)
+
+    raw_df, stats = read_csv_chunked(str(csv_path), dict(PARAMS, chunk_size=2, debug_stage_memory=True))
+
+    records = stats['stage_memory']
+    assert [record['stage'] for record in records[:len(CHUNK_STAGES)]] == [stage.name for stage in CHUNK_STAGES]
+    assert {record['chunk'] for record in records} == {1, 2, 3}
+    assert all(record['frame_mb'] > 0 for record in records)
+
+    now = datetime.now()
+    log = generate_processing_log(raw_df, pd.DataFrame(), pd.DataFrame(), stats, now, now)
+    assert 'STAGE MEMORY' in log
+    assert 'apply_temporal_enhancements: frame' in log
@@ -0,0 +1,68 @@
+"""
+Tests for the synthetic export generator and the aggregation benchmark harness
+"""
+
+import pandas as pd
+import pytest
+
+synthetic_data = pytest.importorskip('components.aggregation.synthetic_data')
+benchmark = pytest.importorskip('components.aggregation.benchmark')
+
+CONFIG = synthetic_data.SyntheticDataConfig(n_links=4, n_days=2, start_date='2025-03-27',
+                                            duplicate_rate=0.1, invalid_rate=0.2, hebrew_variant_rate=0.3)
+
+
+def test_generator_is_deterministic_and_realistic(tmp_path):
+    """Same config gives the same bytes, with DST days, duplicates, invalid rows and Hebrew variants"""
+    first = synthetic_data.generate_synthetic_csv(tmp_path / 'a.csv', CONFIG)
+    synthetic_data.generate_synthetic_csv(tmp_path / 'b.csv', CONFIG)
+    assert (tmp_path / 'a.csv').read_bytes() == (tmp_path / 'b.csv').read_bytes()
+
+    df = pd.read_csv(tmp_path / 'a.csv')
+    assert list(df.columns) == synthetic_data.CSV_COLUMNS
+    assert len(df) == first['rows']
+    assert first['dst_dates'] == ['2025-03-28', '2025-10-26']
+
+    # Spring forward skips 02:00-02:59 local time, fall back repeats 01:00-01:59
+    local_day = df['Timestamp'].str[:10]
+    assert (local_day == '2025-03-28').sum() < (local_day == '2025-03-27').sum()
+    assert not df['Timestamp'].str.startswith('2025-03-28 02:').any()
+    fall_back = df[local_day == '2025-10-26'].drop_duplicates('DataID')
+    assert (fall_back['RequestedTime'] == '01:00:00').sum() > (fall_back['RequestedTime'] == '03:00:00').sum()
+
+    assert df['DataID'].duplicated().any()
+    assert df.duplicated(['Name', 'Timestamp']).sum() > df['DataID'].duplicated().sum()
+    assert (~df['is_valid']).mean() == pytest.approx(0.2, abs=0.05)
+    assert {"יום ה", "יום ה'", 'ה'} <= set(df['DayInWeek'])
+    assert {'סוף שבוע', 'סופש'} <= set(df['DayType'])
+
+
+def test_config_for_rows_targets_row_count():
+    """for_rows picks the link count so the file has about the requested rows"""
+    config = synthetic_data.SyntheticDataConfig.for_rows(1_000_000, dst_crossing=False)
+    rows_per_link = config.n_days * 96 * (1 + config.duplicate_rate)
+    assert abs(config.n_links * rows_per_link - 1_000_000) < rows_per_link
+    assert synthetic_data.parse_row_count('50M') == 50_000_000
+    assert synthetic_data.parse_row_count('500k') == 500_000
+
+
+def test_benchmark_stages_and_regression_check(tmp_path):
+    """Every stage is measured, and only slowdowns beyond the tolerance are regressions"""
+    synthetic_data.generate_synthetic_csv(tmp_path / 'input.csv', CONFIG)
+    stages = benchmark.benchmark_stages(tmp_path / 'input.csv', tmp_path / 'output')
+    assert list(stages) == ['read', 'filter', 'hourly', 'weekly', 'write', 'total']
+    assert stages['read']['rows'] == len(pd.read_csv(tmp_path / 'input.csv'))
+    assert (tmp_path / 'output' / 'hourly_agg.csv').exists()
+
+    def document(seconds, peak_rss_mb):
+        return {'sizes': {'1000': {'stages': {'hourly': {
+            'seconds': seconds, 'peak_rss_mb': peak_rss_mb, 'rows': 1000, 'rows_per_second': round(1000 / seconds)
+        }}}}}
+
+    baseline = document(10.0, 500.0)
+    assert benchmark.compare_to_baseline(document(11.5, 540.0), baseline) == []
+    regressions = benchmark.compare_to_baseline(document(12.5, 560.0), baseline)
+    assert len(regressions) == 2
+    assert 'peak RSS' in regressions[1]
+    # Sub-threshold timings are noise
+    assert benchmark.compare_to_baseline(document(0.2, 500.0), document(0.1, 500.0)) == []
@@ -0,0 +1,62 @@
+"""
+Tests for format-sniffing, unique-value timestamp parsing
+"""
+
+import pandas as pd
+
+from components.aggregation.pipeline import detect_timestamp_format, parse_timestamps_vectorized
+
+
+def test_detect_timestamp_format_from_sample():
+    """Format is sniffed from the sample even when the user format does not match"""
+    sample = pd.Series(['01/07/2025 13:45', '02/07/2025 08:00', '31/07/2025 23:15'])
+
+    assert detect_timestamp_format(sample, '%Y-%m-%d %H:%M:%S') == '%d/%m/%Y %H:%M'
+    assert detect_timestamp_format(pd.Series(['garbage', 'text']), '%Y-%m-%d %H:%M:%S') is None
+
+
+def test_repeated_timestamps_broadcast_with_index_and_nulls():
+    """Distinct values are parsed once and broadcast back to every row"""
+    timestamps = pd.Series(
+        ['2025-07-01 08:00:00', ' 2025-07-01 08:00:00', None, '2025-07-01 08:15:00', '2025-07-01 08:00:00'],
+        index=[10, 11, 12, 13, 14]
+    )
+    parse_state = {}
+
+    result = parse_timestamps_vectorized(timestamps, '%Y-%m-%d %H:%M:%S', 'Asia/Jerusalem', parse_state)
+
+    assert list(result.index) == [10, 11, 12, 13, 14]
+    assert result.iloc[0] == result.iloc[1] == result.iloc[4]
+    assert pd.isna(result.iloc[2])
+    assert result.iloc[3].minute == 15
+    assert str(result.dt.tz) == 'Asia/Jerusalem'
+    assert parse_state['rows'] == 5
+    assert parse_state['unique_values'] == 3
+
+
+def test_format_cached_across_chunks():
+    """Second chunk reuses the cached format instead of re-detecting"""
+    parse_state = {}
+    parse_timestamps_vectorized(pd.Series(['01/07/2025 13:45']), '%Y-%m-%d %H:%M:%S', 'UTC', parse_state)
+    assert parse_state['format'] == '%d/%m/%Y %H:%M'
+
+    # 02/07 is ambiguous between day-first and month-first; the cached day-first format wins
+    result = parse_timestamps_vectorized(pd.Series(['02/07/2025 10:00']), '%Y-%m-%d %H:%M:%S', 'UTC', parse_state)
+    assert result.iloc[0].month == 7
+    assert parse_state['rows'] == 2
+
+
+def test_dst_transitions_localized_vectorized():
+    """Ambiguous times resolve to standard time; non-existent times shift forward one hour"""
+    timestamps = pd.Series([
+        '2024-10-27 01:30:00',  # Fall back: occurs twice
+        '2024-03-29 02:30:00',  # Spring forward: does not exist
+        '2024-03-29 04:00:00'
+    ])
+
+    result = parse_timestamps_vectorized(timestamps, '%Y-%m-%d %H:%M:%S', 'Asia/Jerusalem')
+
+    assert result.iloc[0].utcoffset() == pd.Timedelta(hours=2)
+    assert result.iloc[1].hour == 3 and result.iloc[1].minute == 30
+    assert result.iloc[1].utcoffset() == pd.Timedelta(hours=3)
+    assert result.notna().all()
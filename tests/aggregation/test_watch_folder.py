@@ -0,0 +1,81 @@
+"""
+Tests for the watch-folder worker
+"""
+
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+watch_folder = pytest.importorskip('components.aggregation.watch_folder')
+
+PARAMS = {'ts_format': '%Y-%m-%d %H:%M:%S', 'tz': 'Asia/Jerusalem', 'write_preview_files': False}
+
+
+def _drop_export(generator, path, start: str, days: int, seed: int, periods: int = None) -> None:
+    """Write a raw export covering whole dates (or periods half hours), then age its mtime so it counts as complete"""
+    generator.create_raw_export(
+        pd.date_range(start, periods=periods or days * 48, freq='30min'), seed=seed, first_data_id=seed * 10000,
+        random_measurements=True, DayInWeek='יום ה'
+    ).to_csv(path, index=False)
+    past = time.time() - 60
+    os.utime(path, (past, past))
+
+
+def test_drops_are_aggregated_incrementally_and_published(tmp_path, test_data_generator):
+    """Each poll folds new drops into the store, publishes a complete snapshot and records latency"""
+    watch_dir, output_dir = tmp_path / 'drop', tmp_path / 'live'
+    watch_dir.mkdir()
+    worker = watch_folder.WatchFolderWorker(watch_dir, output_dir, PARAMS, settle_seconds=1.0, keep_snapshots=2)
+
+    assert worker.poll_once() is None
+    _drop_export(test_data_generator, watch_dir / 'export_1.csv', '2025-04-10', 2, seed=1)
+    first = worker.poll_once()
+    assert first['status'] == 'published'
+    assert worker.poll_once() is None  # already processed
+
+    _drop_export(test_data_generator, watch_dir / 'export_2.csv', '2025-04-12', 1, seed=2)
+    (watch_dir / 'still_copying.csv').write_text('DataID,Name\n')  # too recent to be read
+    second = worker.poll_once()
+    assert [entry['name'] for entry in second['files']] == ['export_2.csv']
+
+    latest = watch_folder.read_latest_snapshot(output_dir)
+    assert latest['run_id'] == second['run_id']
+    hourly = pd.read_csv(latest['files']['hourly_agg'])
+    assert sorted(hourly['date'].unique()) == ['2025-04-10', '2025-04-11', '2025-04-12']
+    assert hourly['n_total'].sum() == 3 * 48
+    assert os.path.exists(latest['files']['hourly_agg_parquet'])
+
+    metrics = [json.loads(line) for line in (output_dir / 'watch_metrics.jsonl').read_text().splitlines()]
+    assert [record['run_id'] for record in metrics] == [first['run_id'], second['run_id']]
+    assert all(record['max_latency_seconds'] >= 60 for record in metrics)
+
+    _drop_export(test_data_generator, watch_dir / 'export_3.csv', '2025-04-13', 1, seed=3)
+    worker.poll_once()
+    assert len(list((output_dir / 'snapshots').iterdir())) == 2
+    restarted = watch_folder.WatchFolderWorker(watch_dir, output_dir, PARAMS, settle_seconds=1.0)
+    assert restarted.find_ready_files() == []
+
+
+def test_partial_day_drops_keep_the_hours_stored_earlier(tmp_path, test_data_generator):
+    """A second drop with other hours of a stored date re-aggregates the first file instead of replacing it"""
+    watch_dir, output_dir = tmp_path / 'drop', tmp_path / 'live'
+    watch_dir.mkdir()
+    worker = watch_folder.WatchFolderWorker(watch_dir, output_dir, PARAMS, settle_seconds=1.0)
+
+    _drop_export(test_data_generator, watch_dir / 'morning.csv', '2025-04-10 00:00', 1, seed=1, periods=24)
+    _drop_export(test_data_generator, watch_dir / 'other_day.csv', '2025-04-11 00:00', 1, seed=3)
+    worker.poll_once()
+    assert worker.state['files']['morning.csv']['dates'] == ['2025-04-10']
+
+    _drop_export(test_data_generator, watch_dir / 'afternoon.csv', '2025-04-10 12:00', 1, seed=2, periods=24)
+    record = worker.poll_once()
+    assert record['reaggregated_files'] == ['morning.csv']
+
+    hourly = pd.read_csv(watch_folder.read_latest_snapshot(output_dir)['files']['hourly_agg'])
+    day = hourly[hourly['date'] == '2025-04-10']
+    assert sorted(day['hour_of_day'].unique()) == list(range(24))
+    assert day['n_total'].sum() == 48
+    assert hourly.loc[hourly['date'] == '2025-04-11', 'n_total'].sum() == 48
@@ -222,6 +222,81 @@ class TestDataGenerator:
             })
         
         return pd.DataFrame(data)
+    
+    @staticmethod
+    def create_raw_export(timestamps, n_rows: int = None, replace: bool = True, links=('s_1-2', 's_2-3'),
+                          seed: int = 0, first_data_id: int = 0, invalid_share: float = 0.0,
+                          random_measurements: bool = False, **columns) -> pd.DataFrame:
+        """
+        Create raw Google export rows in the aggregation input schema.
+        
+        Args:
+            timestamps: One timestamp per row, or the pool rows draw from when n_rows is given
+            n_rows: Number of rows to draw from timestamps
+            replace: Draw timestamps with replacement
+            links: Link names drawn per row
+            seed: Seed for the timestamp, link, measurement and validity draws
+            first_data_id: DataID of the first row
+            invalid_share: Expected share of rows with is_valid False
+            random_measurements: Draw Duration ~ N(300, 40) and Speed ~ N(40, 5) instead of constants
+            **columns: Column overrides (scalars or one value per row)
+        """
+        rng = np.random.default_rng(seed)
+        timestamps = pd.to_datetime(pd.Series(timestamps))
+        if n_rows is not None:
+            timestamps = pd.Series(rng.choice(timestamps.to_numpy(), n_rows, replace=replace))
+        n_rows = len(timestamps)
+        
+        raw = pd.DataFrame({
+            'DataID': np.arange(n_rows) + first_data_id,
+            'Name': rng.choice(list(links), n_rows),
+            'SegmentID': 1,
+            'RouteAlternative': 1,
+            'RequestedTime': '08:00:00',
+            'Timestamp': timestamps.dt.strftime('%Y-%m-%d %H:%M:%S'),
+            'DayInWeek': 'יום ג',
+            'DayType': 'יום חול',
+            'Duration': rng.normal(300, 40, n_rows).round(1) if random_measurements else 300.0,
+            'Distance': 1000.0,
+            'Speed': rng.normal(40, 5, n_rows) if random_measurements else 12.0,
+            'Url': 'https://example.com',
+            'Polyline': '_oxwD{_wtE',
+            'is_valid': rng.random(n_rows) >= invalid_share
+        })
+        for column, values in columns.items():
+            raw[column] = values
+        return raw
+    
+    @staticmethod
+    def create_enriched_rows(days, links=('s_1-2', 's_2-3'), hours=(8, 17), seed: int = 3,
+                             max_rows_per_hour: int = 4, invalid_share: float = 0.2,
+                             static_duration: bool = False) -> pd.DataFrame:
+        """
+        Create enriched raw rows (after temporal enhancement) for the aggregation stages.
+        
+        Every link gets 1..max_rows_per_hour rows in each hour of each day; the mean
+        duration rises with the hour so hours differ.
+        """
+        rng = np.random.default_rng(seed)
+        rows = []
+        for day in days:
+            for link in links:
+                for hour in hours:
+                    for _ in range(int(rng.integers(1, max_rows_per_hour + 1))):
+                        row = {
+                            'name': link,
+                            'date': day,
+                            'hour_of_day': hour,
+                            'daytype': 'weekday',
+                            'is_valid': bool(rng.random() >= invalid_share),
+                            'duration': float(rng.normal(300 + hour, 40)),
+                            'distance': 1000.0,
+                            'speed': float(rng.normal(40, 5))
+                        }
+                        if static_duration:
+                            row['static_duration'] = float(rng.normal(280, 10))
+                        rows.append(row)
+        return pd.DataFrame(rows)
 
 
 @pytest.fixture
@@ -257,6 +332,22 @@ def mock_folium_map():
     return MockMap
 
 
+@pytest.fixture
+def mock_uploaded_file():
+    """Mock Streamlit UploadedFile holding the given bytes."""
+    class MockUploadedFile:
+        def __init__(self, content: bytes):
+            self._content = content
+        
+        def getvalue(self):
+            return self._content
+        
+        def seek(self, position):
+            pass
+    
+    return MockUploadedFile
+
+
 # Performance testing utilities
 @pytest.fixture
 def performance_timer():
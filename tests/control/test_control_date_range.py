@@ -0,0 +1,70 @@
+"""
+Tests for the control page's streamed, session-cached date range detection
+"""
+
+import gzip
+from datetime import date
+
+import pandas as pd
+import pytest
+
+page = pytest.importorskip('components.control.page')
+
+
+def _csv_bytes(generator, n_rows: int = 250) -> bytes:
+    raw = generator.create_raw_export(pd.date_range('2025-07-01 06:00', periods=n_rows, freq='h'), links=['s_653-655'])
+    raw.loc[7, 'Timestamp'] = 'not a date'
+    return raw.to_csv(index=False).encode('cp1255')
+
+
+def test_scan_matches_full_load_across_chunks(test_data_generator):
+    """The single-column scan finds the same range and row count as a full load"""
+    content = _csv_bytes(test_data_generator)
+    assert page.scan_timestamp_range(page.io.BytesIO(content), chunk_size=40) == (
+        date(2025, 7, 1), date(2025, 7, 11), 250
+    )
+    assert page.scan_timestamp_range(page.io.BytesIO(gzip.compress(content))) == (
+        date(2025, 7, 1), date(2025, 7, 11), 250
+    )
+
+    no_timestamps = pd.DataFrame({'Name': ['a', 'b', 'c']}).to_csv(index=False).encode()
+    assert page.scan_timestamp_range(page.io.BytesIO(no_timestamps)) == (None, None, 3)
+
+
+def test_scan_formats_do_not_depend_on_chunk_size():
+    """One per-file format decision: the range is the same for any chunking"""
+    timestamps = ['2025-07-01 09:00:00'] * 3 + ['13/07/2025 09:00'] * 3 + ['2025-07-05 09:00:00'] * 3
+    content = pd.DataFrame({'Timestamp': timestamps, 'Name': 's_653-655'}).to_csv(index=False).encode()
+
+    for chunk_size in (3, 100):
+        parse_state = {}
+        assert page.scan_timestamp_range(page.io.BytesIO(content), chunk_size=chunk_size, parse_state=parse_state) == (
+            date(2025, 7, 1), date(2025, 7, 5), 9
+        )
+        assert parse_state['format'] == 'ISO8601'
+
+
+def test_scan_falls_back_to_c_parser_on_ragged_rows():
+    """A row with an extra field does not lose the timestamp range"""
+    content = (
+        b"Timestamp,Name\n2025-07-01 09:00:00,a\n2025-07-02 09:00:00,a,extra\n2025-07-03 09:00:00,b\n"
+    )
+    assert page.scan_timestamp_range(page.io.BytesIO(content)) == (date(2025, 7, 1), date(2025, 7, 3), 3)
+
+
+def test_date_range_is_cached_by_file_hash(monkeypatch, test_data_generator, mock_uploaded_file):
+    """Reruns with the same upload reuse the session result; a new upload is scanned"""
+    monkeypatch.setattr(page.st, 'session_state', {})
+    scans = []
+    scan = page.scan_timestamp_range
+    monkeypatch.setattr(page, 'scan_timestamp_range', lambda source, **kwargs: scans.append(1) or scan(source, **kwargs))
+
+    first = page.detect_date_range_from_csv(mock_uploaded_file(_csv_bytes(test_data_generator)))
+    assert page.detect_date_range_from_csv(mock_uploaded_file(_csv_bytes(test_data_generator))) == first
+    assert len(scans) == 1
+    assert page.cached_timestamp_parse_state(mock_uploaded_file(_csv_bytes(test_data_generator)))['format'] == 'ISO8601'
+
+    assert page.detect_date_range_from_csv(mock_uploaded_file(_csv_bytes(test_data_generator, 30)))[1] == date(2025, 7, 2)
+    assert len(scans) == 2
+    assert len(page.st.session_state['control_date_range_cache']) == 1
+    assert page.cached_timestamp_parse_state(mock_uploaded_file(b'Timestamp\n')) == {}
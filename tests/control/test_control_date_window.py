@@ -0,0 +1,104 @@
+"""
+Tests for the control date-window pushdown and the window-aware completeness period
+"""
+
+import io
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from components.control.report import (
+    apply_date_window,
+    clip_completeness_to_window,
+    resolve_date_window
+)
+
+
+def _observations(generator, n_rows: int = 300) -> pd.DataFrame:
+    raw = generator.create_raw_export(pd.date_range('2025-07-01 00:30', periods=n_rows, freq='h'), links=['s_653-655'])
+    raw.loc[50, 'Timestamp'] = None
+    return raw
+
+
+def _mixed_format_observations(generator) -> pd.DataFrame:
+    """ISO rows around a run of day-first rows on the filtered day"""
+    df = _observations(generator).iloc[:9].copy()
+    df['Timestamp'] = ['2025-07-01 09:00:00'] * 3 + ['13/07/2025 09:00'] * 3 + ['2025-07-02 09:00:00'] * 3
+    return df
+
+
+def test_window_bounds_are_inclusive_days(test_data_generator):
+    """A range covers its whole end day and a specific day covers 24 hours"""
+    assert resolve_date_window({'start_date': date(2025, 7, 2), 'end_date': date(2025, 7, 3)}) == (
+        pd.Timestamp('2025-07-02'), pd.Timestamp('2025-07-04')
+    )
+    assert resolve_date_window({'specific_day': '2025-07-05'}) == (pd.Timestamp('2025-07-05'), pd.Timestamp('2025-07-06'))
+    assert resolve_date_window(None) is None
+
+    df = _observations(test_data_generator)
+    kept = apply_date_window(df, {'start_date': date(2025, 7, 2), 'end_date': date(2025, 7, 3)})
+    assert len(kept) == 47  # 48 hours minus the row without a timestamp
+    assert kept['Timestamp'].str[:10].isin(['2025-07-02', '2025-07-03']).all()
+    assert apply_date_window(df, None) is df
+
+
+def test_completeness_period_is_clipped_to_window():
+    """Expected observations only cover days the window lets through"""
+    completeness = {'start_date': date(2025, 7, 1), 'end_date': date(2025, 7, 13), 'interval_minutes': 15}
+    clipped = clip_completeness_to_window(completeness, {'start_date': date(2025, 7, 4), 'end_date': date(2025, 7, 20)})
+    assert clipped == {'start_date': date(2025, 7, 4), 'end_date': date(2025, 7, 13), 'interval_minutes': 15}
+    assert clip_completeness_to_window(completeness, None) is completeness
+    assert clip_completeness_to_window(None, {'specific_day': date(2025, 7, 4)}) is None
+
+
+def test_window_does_not_depend_on_chunk_boundaries(test_data_generator):
+    """Formats sniffed on the first chunk decide every chunk, like a whole-frame parse"""
+    df = _mixed_format_observations(test_data_generator)
+    date_filter = {'specific_day': date(2025, 7, 13)}
+    whole = apply_date_window(df, date_filter, {})
+
+    for chunk_size in (1, 3, 4):
+        parse_state = {}
+        chunks = [apply_date_window(df.iloc[start:start + chunk_size], date_filter, parse_state)
+                  for start in range(0, len(df), chunk_size)]
+        pd.testing.assert_frame_equal(pd.concat(chunks), whole)
+        assert parse_state['format'] == 'ISO8601'
+    assert whole.empty
+
+
+def test_load_pushes_the_window_down_per_chunk(monkeypatch, test_data_generator, mock_uploaded_file):
+    """Rows outside the window never reach the loaded frame, chunk by chunk"""
+    page = pytest.importorskip('components.control.page')
+    date_filter = {'specific_day': date(2025, 7, 4)}
+    content = _observations(test_data_generator).to_csv(index=False).encode('utf-8')
+
+    chunk_sizes = []
+    read_csv_frame = page.read_csv_frame
+
+    def small_chunks(*args, **kwargs):
+        chunk_filter = kwargs['chunk_filter']
+
+        def recording_filter(chunk):
+            chunk_sizes.append(len(chunk))
+            return chunk_filter(chunk)
+
+        return read_csv_frame(*args, **{**kwargs, 'chunk_filter': recording_filter, 'chunk_size': 64})
+
+    monkeypatch.setattr(page, 'read_csv_frame', small_chunks)
+    loaded = page.load_csv_with_encoding(mock_uploaded_file(content), date_filter)
+
+    assert len(chunk_sizes) == 5
+    full = pd.read_csv(io.BytesIO(content), dtype={'Polyline': 'category', 'Url': 'category'})
+    expected = apply_date_window(full, date_filter).reset_index(drop=True)
+    pd.testing.assert_frame_equal(loaded, expected)
+    assert len(loaded) == 24
+
+    messages = []
+    monkeypatch.setattr(page.st, 'info', messages.append)
+    parse_state = {}
+    mixed = _mixed_format_observations(test_data_generator).to_csv(index=False).encode('utf-8')
+    loaded = page.load_csv_with_encoding(mock_uploaded_file(mixed), {'specific_day': date(2025, 7, 1)}, parse_state)
+    assert len(loaded) == 3
+    assert parse_state['format'] == 'ISO8601'
+    assert 'Date window kept 3 of 9 rows' in messages
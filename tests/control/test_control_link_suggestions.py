@@ -0,0 +1,89 @@
+"""
+Tests for the spatial-index link suggestions for rows that did not join to the shapefile
+"""
+
+import geopandas as gpd
+import pandas as pd
+import polyline
+import pytest
+from shapely.geometry import LineString
+
+from components.control.validator import (
+    ValidationParameters,
+    _precompute_shapefile_lookup,
+    build_link_spatial_index,
+    suggest_link_matches,
+    validate_dataframe_batch
+)
+
+
+LINKS = {
+    (1, 2): [(34.780, 32.080), (34.790, 32.080)],
+    (2, 1): [(34.790, 32.080), (34.780, 32.080)],
+    (2, 3): [(34.790, 32.080), (34.790, 32.090)],
+    (7, 8): [(34.900, 32.200), (34.910, 32.200)],
+}
+
+
+def _encode(line, shift=0.0):
+    return polyline.encode([(lat + shift, lon) for lon, lat in line])
+
+
+@pytest.fixture
+def shapefile_gdf():
+    return gpd.GeoDataFrame(
+        {'From': [key[0] for key in LINKS], 'To': [key[1] for key in LINKS]},
+        geometry=[LineString(line) for line in LINKS.values()],
+        crs='EPSG:4326'
+    )
+
+
+def test_unjoined_rows_get_ranked_suggestions(shapefile_gdf):
+    """Parse failures and unknown links are matched by geometry, closest and same direction first"""
+    observations = pd.DataFrame({
+        'Name': ['link two-three', 'link two-three', 's_2-9', 's_1-2', 'far away'],
+        'RouteAlternative': 1,
+        'Timestamp': ['2025-07-01 00:00:00', '2025-07-01 01:00:00', '2025-07-01 00:00:00',
+                      '2025-07-01 00:00:00', '2025-07-01 00:00:00'],
+        'Polyline': [_encode(LINKS[(2, 3)]), _encode(LINKS[(2, 3)]), _encode(LINKS[(2, 1)], shift=0.00002),
+                     _encode(LINKS[(1, 2)]), _encode([(35.5, 31.0), (35.51, 31.0)])]
+    })
+    params = ValidationParameters()
+    validated = validate_dataframe_batch(observations, shapefile_gdf, params)
+    assert dict(zip(validated['Name'], validated['valid_code'])) == {
+        'far away': 91, 'link two-three': 91, 's_1-2': 2, 's_2-9': 92
+    }
+
+    suggestions = suggest_link_matches(validated, shapefile_gdf, params)
+    top = suggestions[suggestions['suggestion_rank'] == 1].set_index('Name')
+
+    assert top.loc['link two-three', 'suggested_link_id'] == 's_2-3'
+    assert top.loc['link two-three', 'observations'] == 2
+    assert top.loc['link two-three', 'hausdorff_distance'] == pytest.approx(0.0, abs=1e-6)
+    assert top.loc['link two-three', 'coverage_percent'] == 100.0
+
+    # Shifted ~2 m north: the reversed twin s_1-2 has the same distance, direction decides
+    assert top.loc['s_2-9', 'suggested_link_id'] == 's_2-1'
+    assert top.loc['s_2-9', 'hausdorff_distance'] == pytest.approx(2.2, abs=0.3)
+    assert bool(top.loc['s_2-9', 'within_threshold'])
+    ranked = suggestions[suggestions['Name'] == 's_2-9']
+    assert ranked['suggested_link_id'].tolist()[:2] == ['s_2-1', 's_1-2']
+
+    # Nothing in range: the pair is still reported, without a suggestion
+    far = suggestions[suggestions['Name'] == 'far away']
+    assert len(far) == 1 and far['suggestion_rank'].isna().all()
+
+
+def test_spatial_index_is_built_from_the_lookup(shapefile_gdf):
+    """The tree covers every non-empty metric geometry of the precomputed lookup"""
+    gdf = pd.concat([shapefile_gdf, gpd.GeoDataFrame({'From': [9], 'To': [9]}, geometry=[LineString()],
+                                                     crs='EPSG:4326')], ignore_index=True)
+    lookup = _precompute_shapefile_lookup(gdf, 'EPSG:2039')
+    index = build_link_spatial_index(lookup)
+
+    assert sorted(index.keys) == ['s_1-2', 's_2-1', 's_2-3', 's_7-8']
+    assert len(index.tree) == 4
+    assert index.geometries[list(index.keys).index('s_2-3')].equals(lookup['s_2-3']['metric'])
+
+    no_orphans = pd.DataFrame({'Name': ['s_1-2'], 'Polyline': [_encode(LINKS[(1, 2)])], 'valid_code': [2]})
+    assert suggest_link_matches(no_orphans, gdf, ValidationParameters(), shapefile_lookup=lookup).empty
@@ -0,0 +1,88 @@
+"""
+Tests for dictionary-encoded polylines across loading, validation and chunking
+"""
+
+import geopandas as gpd
+import pandas as pd
+import polyline
+import pytest
+from shapely.geometry import LineString
+
+from components.aggregation.ingestion import concat_categorical_chunks
+from components.control.validator import (
+    ValidationParameters,
+    _remove_unused_categories,
+    validate_dataframe_batch
+)
+
+
+def _links_and_observations():
+    coords = {
+        (1, 2): [(34.78, 32.08), (34.79, 32.08)],
+        (2, 3): [(34.79, 32.08), (34.79, 32.09)],
+    }
+    shapefile_gdf = gpd.GeoDataFrame(
+        {'From': [1, 2], 'To': [2, 3]},
+        geometry=[LineString(line) for line in coords.values()],
+        crs='EPSG:4326'
+    )
+    routes = {key: polyline.encode([(lat, lon) for lon, lat in line]) for key, line in coords.items()}
+    rows = []
+    for hour in range(6):
+        for (from_id, to_id), route in routes.items():
+            rows.append({'Name': f's_{from_id}-{to_id}', 'RouteAlternative': 1,
+                         'Timestamp': f'2025-07-01 {hour:02d}:00:00', 'Polyline': route})
+    rows.append({'Name': 's_1-2', 'RouteAlternative': 2, 'Timestamp': '2025-07-01 00:00:00', 'Polyline': 'not a route'})
+    return shapefile_gdf, pd.DataFrame(rows)
+
+
+def test_chunks_concatenate_onto_one_category_table():
+    """Chunks with different category tables stay categorical, keeping only used values"""
+    first = pd.DataFrame({'Polyline': pd.Categorical(['b', 'a', 'z']), 'n': [1, 2, 3]}).iloc[:2]
+    second = pd.DataFrame({'Polyline': pd.Categorical(['c', 'a']), 'n': [4, 5]})
+
+    combined = concat_categorical_chunks([first, second])
+    assert isinstance(combined['Polyline'].dtype, pd.CategoricalDtype)
+    assert list(combined['Polyline'].cat.categories) == ['a', 'b', 'c']
+    assert combined['Polyline'].tolist() == ['b', 'a', 'c', 'a']
+    assert list(combined.index) == [0, 1, 2, 3]
+
+
+def test_validation_encodes_polylines_with_unchanged_results():
+    """Object and categorical polylines validate identically; chunks keep only their own routes"""
+    shapefile_gdf, observations = _links_and_observations()
+    params = ValidationParameters()
+
+    plain = validate_dataframe_batch(observations.copy(), shapefile_gdf, params)
+    encoded_input = observations.astype({'Polyline': 'category'})
+    encoded = validate_dataframe_batch(encoded_input, shapefile_gdf, params)
+
+    assert isinstance(plain['Polyline'].dtype, pd.CategoricalDtype)
+    assert len(plain['Polyline'].cat.categories) == 3
+    pd.testing.assert_frame_equal(plain, encoded)
+    assert plain['valid_code'].value_counts().to_dict() == {2: 11, 3: 1, 93: 1}
+
+    chunk = _remove_unused_categories(encoded_input[encoded_input['Name'] == 's_2-3'])
+    assert len(chunk['Polyline'].cat.categories) == 1
+    assert len(encoded_input['Polyline'].cat.categories) == 3
+
+
+def test_loaded_url_is_encoded_and_carried_to_the_validated_frame():
+    """Url is not validated but still reaches validated_data.csv, read as a categorical"""
+    page = pytest.importorskip('components.control.page')
+    shapefile_gdf, observations = _links_and_observations()
+    observations['Url'] = [f'https://maps.example/{name}' for name in observations['Name']]
+
+    class UploadedFile:
+        def getvalue(self):
+            return observations.to_csv(index=False).encode('utf-8')
+
+        def seek(self, position):
+            pass
+
+    loaded = page.load_csv_with_encoding(UploadedFile())
+    assert isinstance(loaded['Url'].dtype, pd.CategoricalDtype)
+    assert len(loaded['Url'].cat.categories) == 2
+
+    validated = validate_dataframe_batch(loaded, shapefile_gdf, ValidationParameters())
+    assert sorted(validated['Url'].astype(str)) == sorted(observations['Url'])